@@ -60,6 +60,8 @@ from .internals import requires_index_loaded
 from .config import get_config_value_or_default as conf_or_def
 from .command_parsing import expanded_on_bridge_cmd, toggleAddon, rerenderNote, rerender_info, add_note_to_index, try_repeat_last_search, search_by_tags
 from .api import try_open_first_in_queue, queue_has_items
+from .result_metadata import invalidate as invalidate_result_metadata, invalidate_pdf_progress
+from . import review_stats
 
 config = mw.addonManager.getConfig(__name__)
 
@@ -73,6 +75,14 @@ def init_addon():
     if config["mix_reviews_and_reading"]:
         gui_hooks.reviewer_did_answer_card.append(on_reviewer_did_answer)
 
+    # cached retention etc. of a note in the search results is outdated once one of its cards has been answered
+    gui_hooks.reviewer_did_answer_card.append(lambda reviewer, card, ease: invalidate_result_metadata([card.nid]))
+    # add the new review to the precomputed review stats, this only reads the entries added since the last sync()
+    gui_hooks.reviewer_did_answer_card.append(lambda reviewer, card, ease: review_stats.sync())
+    # undo, imports and AnkiWeb syncs can change older revlog entries, these are found by the (background) consistency check
+    gui_hooks.state_did_reset.append(review_stats.schedule_consistency_check)
+    gui_hooks.sync_did_finish.append(review_stats.schedule_consistency_check)
+
     gui_hooks.webview_did_receive_js_message.append(expanded_on_bridge_cmd)
     
     #todo: Find out if there is a better moment to start index creation
@@ -81,6 +91,11 @@ def init_addon():
     gui_hooks.profile_did_open.append(build_index)
     gui_hooks.profile_did_open.append(insert_scripts)
     gui_hooks.profile_did_open.append(lambda : recalculate_priority_queue(True))
+    # imports and bulk edits in the browser end with a reset, the notes they changed have to be updated in the index
+    gui_hooks.state_did_reset.append(update_index_after_reset)
+
+    # the notes db connections are kept open, close them so the WAL is checkpointed before Anki exits
+    gui_hooks.profile_will_close.append(close_connections)
 
     if conf_or_def("searchOnTagEntry", True):
         TagEdit.keyPressEvent = wrap(TagEdit.keyPressEvent, tag_edit_keypress, "around")
@@ -158,6 +173,11 @@ def on_reviewer_did_answer(reviewer, card, ease):
                     try_open_first_in_queue("Reading time!")
         
 
+def update_index_after_reset():
+    index = get_index()
+    if index is not None and hasattr(index, "sync_in_background"):
+        index.sync_in_background()
+
 def editor_save_with_index_update(dialog: EditDialog, _old: Callable):
     """ Used in the edit dialog for Anki notes to update the index on saving an edited note. """
 
@@ -386,6 +406,7 @@ def setup_hooks():
     add_hook("updated-schedule", lambda: recalculate_priority_queue())
     add_hook("updated-schedule", lambda: get_index().ui.reading_modal.reload_bottom_bar())
 
+    add_hook("reading-modal-closed", lambda: invalidate_pdf_progress())
     add_hook("reading-modal-closed", lambda: get_index().ui.sidebar.refresh_tab(1))
     add_hook("reading-modal-closed", lambda: try_repeat_last_search())
 
@@ -59,6 +59,7 @@ except:
     pass
 import utility.misc
 import utility.text
+import utility.accel
 import state
 
 """ command_parsing.py - Mainly used to catch pycmds from the web view, and trigger the appropriate actions for them. """
@@ -108,6 +109,10 @@ def expanded_on_bridge_cmd(handled: Tuple[bool, Any], cmd: str, self: Any) -> Tu
         state.last_page_requested = int(cmd.split()[1])
         index.ui.show_page(self, int(cmd.split()[1]))
 
+    elif cmd.startswith("siac-results-window "):
+        # virtual scrolling: web view requests the next batch of results
+        index.ui.show_window(self, int(cmd.split()[2]), int(cmd.split()[1]))
+
     elif cmd.startswith("siac-r-srch-db "):
         # bottom search input used, so trigger either an add-on search or a browser search
         if index.searchbar_mode.lower() == "add-on":
@@ -218,6 +223,11 @@ def expanded_on_bridge_cmd(handled: Tuple[bool, Any], cmd: str, self: Any) -> Tu
     elif cmd == "siac-rerender":
         index.ui.try_rerender_last()
 
+    elif cmd == "siac-rerender-full":
+        # web view is missing cards that were assumed to be cached
+        index.ui.reset_client_cards()
+        index.ui.try_rerender_last()
+
     elif cmd.startswith("siac-config-bool "):
         key = cmd.split()[1]
         b   = cmd.split()[2].lower() == "true" or cmd.split()[2].lower() == "on"
@@ -481,6 +491,8 @@ def expanded_on_bridge_cmd(handled: Tuple[bool, Any], cmd: str, self: Any) -> Tu
             $('#toggleTop').removeAttr('onclick').unbind("click");
             $('#greyout').show();
             $('#loader').show();""")
+        if index is not None:
+            index.close()
         set_index(None)
         build_index(force_rebuild=True, execute_after_end=after_index_rebuilt)
 
@@ -1164,6 +1176,12 @@ def parse_sort_cmd(cmd):
         index.ui.remove_suspended()
     elif cmd == "remUnsuspended":
         index.ui.remove_unsuspended()
+    elif cmd == "rank":
+        index.ui.sort_by_rank()
+    elif cmd.startswith("sort:"):
+        # sort:<key>:<asc|desc>
+        _, key, order = cmd.split(":")
+        index.ui.sort_by(key, order == "desc")
 
 def parse_predef_search_cmd(cmd: str, editor: aqt.editor.Editor):
     """
@@ -1659,6 +1677,9 @@ def get_index_info():
         shortcuts += "<br>".join(state.shortcuts_failed)
         shortcuts += "<br>"
 
+    # active implementation per accelerated function
+    accel   = ", ".join(["%s: %s" % (name, impl) for name, impl in utility.accel.active_implementations()])
+
     sp_on   = "<span style='background: green; color: white;'>&nbsp;On&nbsp;</span>"
     sp_off  = "<span style='background: red; color: black;'>&nbsp;Off&nbsp;</span>"
     html            = """
@@ -1669,6 +1690,7 @@ def get_index_info():
                <tr><td>Qt Version:</td><td> <b>%s</b></td></tr>
                <tr><td>Chromium Version:</td><td> <b>%s</b></td></tr>
                <tr><td>Rust Libs:</td><td> <b>%s</b></td></tr>
+               <tr><td>Accelerated Functions:</td><td> <b>%s</b></td></tr>
                <tr><td>Index Used:</td><td> <b>%s</b></td></tr>
                <tr><td>SQLite Version</td><td> <b>%s</b></td></tr>
                <tr><td>Index Initialization:</td><td>  <b>%s s</b></td></tr>
@@ -1722,6 +1744,7 @@ def get_index_info():
             qt_v,
             chromium_v,
             str(state.rust_lib),
+            accel,
             index.type, 
             sqlite3.sqlite_version,
             str(index.initializationTime), 
@@ -1806,6 +1829,21 @@ def show_timing_modal(render_time = None):
 
     html += "</table>"
 
+    pooled, unpooled = index.measure_connection_latency()
+    html += "<h4>Index DB Connection:</h4><table class='w-100'>"
+    if "time-connection" in index.lastResDict:
+        html += "<tr><td>%s</td><td><b>%.2f</b> ms</td></tr>" % ("Last Search: Acquiring Connection", index.lastResDict["time-connection"])
+    html += "<tr><td>%s</td><td><b>%.2f</b> ms</td></tr>" % ("Trivial Query (pooled connection)", pooled)
+    html += "<tr><td>%s</td><td><b>%.2f</b> ms</td></tr>" % ("Trivial Query (new connection)", unpooled)
+    html += "<tr><td>%s</td><td><b>%s</b></td></tr>" % ("Open Connections", index.pool.size())
+    html += "</table>"
+
+    html += "<h4>Result Cache:</h4><table class='w-100'>"
+    html += "<tr><td>%s</td><td><b>%s</b></td></tr>" % ("Last Search", "Hit" if index.lastResDict.get("cached") else "Miss")
+    html += "<tr><td>%s</td><td><b>%s</b> / <b>%s</b></td></tr>" % ("Hits / Misses", index.cache_hits, index.cache_misses)
+    html += "<tr><td>%s</td><td><b>%s</b></td></tr>" % ("Cached Searches", len(index.cache))
+    html += "</table>"
+
     index.ui.showInModal(html)
 
 @requires_index_loaded
@@ -66,6 +66,9 @@ def persist_index_info(search_index):
     c_json["index"]["stopwordsSize"]    = search_index.creation_info["stopwords_size"]
     # not used yet
     c_json["index"]["shouldRebuild"]    = False
+    # timings (ms) of the last full rebuild
+    if "build_times" in search_index.creation_info:
+        c_json["index"]["buildTimes"]   = search_index.creation_info["build_times"]
 
     _write_to_data_file(c_json)
 
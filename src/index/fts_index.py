@@ -18,19 +18,38 @@ import sqlite3
 import os
 import sys
 import struct
+import array
 import re
 import time
 import math
 import collections
+import itertools
+import threading
 from aqt import *
 from aqt.utils import showInfo, tooltip
 
 from ..output import *
+from ..result_metadata import prefetch as prefetch_result_metadata
 from ..debug_logging import log, persist_index_info, get_index_info
 from ..models import IndexNote, SiacNote
-from .indexing_data import get_notes_in_collection, index_data_size
+from ..config import get_config_value_or_default
+from ..notes import get_all_notes
+from .indexing_data import iter_notes_in_collection, get_notes_in_collection_by_ids, get_index_mod_keys, get_index_mod_key, index_data_size
 import utility.misc
 import utility.text
+import utility.db
+
+# number of notes that are read and cleaned in one go when the index is built
+CLEAN_BATCH_SIZE        = 2000
+
+# queued index updates are written after this many ms without further updates
+UPDATE_FLUSH_DELAY      = 1000
+
+# number of search results (lists of notes) to keep in the LRU cache
+RESULT_CACHE_SIZE       = 64
+
+# stay well below SQLITE_MAX_VARIABLE_NUMBER, which is only 999 in older SQLite versions
+SQLITE_MAX_BOUND_PARAMS = 500
 
 class FTSIndex:
 
@@ -41,10 +60,35 @@ class FTSIndex:
         self.highlighting       = True
         self.fields_to_exclude  = {}
 
+        # queued changes to the index, see _enqueue and flush
+        self.pending_updates    = []
+        self.update_lock        = threading.Lock()
+        self.flush_lock         = threading.Lock()
+        self.flush_timer        = None
+        # set if the last flush failed, the next one then applies the changes one by one, see flush
+        self.flush_failed       = False
+        # set while sync_in_background() is running
+        self.sync_running       = False
+
+        # used to skip or interrupt searches that have been superseded by a newer one, see search()
+        self.search_lock        = threading.Lock()
+        self.search_seq         = 0
+        self.running_queries    = {}
+
+        # LRU cache of search results, see searchProc
+        self.cache              = collections.OrderedDict()
+        self.cache_lock         = threading.Lock()
+        self.cache_hits         = 0
+        self.cache_misses       = 0
+        # bumped on every change to the index, part of the cache key
+        self.generation         = 0
+
         # stores values useful to determine whether the index has to be rebuilt on restart or not
         self.creation_info      = {}
 
         self.threadPool         = QThreadPool()
+        # keep the worker threads alive, so that their pooled db connections can be reused
+        self.threadPool.setExpiryTimeout(-1)
         self.ui                 = Output()
 
         config                  = mw.addonManager.getConfig(__name__)
@@ -79,24 +123,31 @@ class FTSIndex:
 
         self.ui.fields_to_exclude               = self.fields_to_exclude
 
+        # if enabled, an existing index is not rebuilt if the collection changed, instead, only changed notes are updated
+        self.incremental_sync                   = get_config_value_or_default("index.incrementalSync", True)
+
         # check if we have to rebuild the index
         index_up_to_date = not force_rebuild and not self._should_rebuild()
 
         self.creation_info["index_was_rebuilt"] = not index_up_to_date
+        self.creation_info["index_was_synced"]  = False
 
         if not index_up_to_date:
-            corpus = get_notes_in_collection()
+            build_times = {}
+            start       = time.time()
+            mod_keys    = get_index_mod_keys()
+            build_times["read"] = int((time.time() - start) * 1000)
             if self.porter:
                 sql = "create virtual table notes using fts%s(nid, text, tags, did, source, mid, refs, tokenize=porter)"
             else:
                 sql = "create virtual table notes using fts%s(nid, text, tags, did, source, mid, refs)"
 
-            cleaned     = self._cleanText(corpus)
             file_path   = self.dir + "search-data.db"
-            try:
-                os.remove(file_path)
-            except OSError:
-                pass
+            for f in [file_path, file_path + "-wal", file_path + "-shm"]:
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
 
             conn = sqlite3.connect(file_path)
             conn.execute("drop table if exists notes")
@@ -111,14 +162,32 @@ class FTSIndex:
                     conn.execute(sql % 3)
                     self.type = "SQlite FTS3"
 
-            conn.executemany('INSERT INTO notes VALUES (?,?,?,?,?,?,?)', cleaned)
+            # the collection is read page by page, each page is cleaned and inserted before the next ones are read
+            start       = time.time()
+            pages       = iter_notes_in_collection(CLEAN_BATCH_SIZE)
+            conn.executemany('INSERT INTO notes VALUES (?,?,?,?,?,?,?)', self._clean_corpus(pages))
+            conn.execute("create table index_mod (nid INTEGER PRIMARY KEY, mod TEXT)")
+            conn.executemany("INSERT INTO index_mod VALUES (?,?)", mod_keys.items())
+            build_times["clean_insert"] = int((time.time() - start) * 1000)
+
+            start       = time.time()
             if self.type == "SQLite FTS5":
                 conn.execute("INSERT INTO notes(notes) VALUES('optimize')")
             conn.commit()
             conn.close()
+            build_times["optimize"]     = int((time.time() - start) * 1000)
+            self.creation_info["build_times"] = build_times
         else:
             self.type = self._check_fts_version(config["logging"])
-        if not index_up_to_date:
+            if self._can_sync() and not config["freezeIndex"]:
+                self.creation_info["index_was_synced"] = self._sync(config["logging"])
+
+        # all further access to the index db goes through the pool (one connection per thread)
+        self.pool = utility.db.ConnectionPool(self.dir + "search-data.db")
+        # if the index stores modification keys, they are updated together with the notes in flush()
+        self.has_index_mod = self._has_index_mod()
+
+        if not index_up_to_date or self.creation_info["index_was_synced"]:
             persist_index_info(self)
 
 
@@ -154,12 +223,16 @@ class FTSIndex:
         except:
             return True
 
-        index_size = index_data_size()
-        if info["size"] != index_size:
-            return True
+        # if the index can be synced, a changed collection size doesn't require a rebuild,
+        # instead, changed notes are updated afterwards (see _sync)
+        can_sync    = self._can_sync()
+        if not can_sync or config["alwaysRebuildIndexIfSmallerThan"] > 0:
+            index_size = index_data_size()
+            if not can_sync and info["size"] != index_size:
+                return True
 
-        if index_size < config["alwaysRebuildIndexIfSmallerThan"]:
-            return True
+            if index_size < config["alwaysRebuildIndexIfSmallerThan"]:
+                return True
 
         #if the decks used when building the index the last time differ from the decks used now, rebuild
         if len(config["decks"]) != len(info["decks"]):
@@ -188,6 +261,67 @@ class FTSIndex:
 
         return False
 
+    def _can_sync(self):
+        """ Returns True if incremental syncing is enabled and the existing index has stored the modification keys needed for it. """
+
+        if not self.incremental_sync:
+            return False
+        return self._has_index_mod()
+
+    def _has_index_mod(self):
+        conn = None
+        try:
+            conn    = sqlite3.connect(self.dir + "search-data.db")
+            row     = conn.execute("select count(*) from sqlite_master where type='table' and name='index_mod'").fetchone()
+            return row is not None and row[0] == 1
+        except:
+            return False
+        finally:
+            if conn:
+                conn.close()
+
+    def _sync(self, logging):
+        """
+        Bring an existing index up to date without rebuilding it:
+        Notes whose modification key differs from the one stored in 'index_mod' (new or edited notes, or notes whose cards were moved)
+        are deleted and inserted again, notes that are no longer in the collection are removed.
+        So the time this takes depends on the number of changed notes, not on the size of the collection.
+        Returns True if the index was modified.
+        """
+
+        start       = time.time()
+        current     = get_index_mod_keys()
+        conn        = sqlite3.connect(self.dir + "search-data.db")
+        indexed     = dict(conn.execute("select nid, mod from index_mod").fetchall())
+
+        changed     = [nid for nid, mod in current.items() if indexed.get(nid) != mod]
+        removed     = [nid for nid in indexed.keys() if nid not in current]
+
+        if len(changed) == 0 and len(removed) == 0:
+            conn.close()
+            return False
+
+        _delete_nids(conn, changed + removed)
+        conn.executemany("delete from index_mod where nid = ?", [(nid,) for nid in changed + removed])
+
+        # add-on notes don't have a model id, so they are told apart by checking against the add-on's db
+        user_notes  = { n[0] : n for n in get_all_notes() }
+        corpus      = get_notes_in_collection_by_ids([nid for nid in changed if nid not in user_notes])
+        for nid in changed:
+            if nid in user_notes:
+                (id, title, text, source, tags) = user_notes[nid][:5]
+                corpus.append((id, title + "\u001f" + text + "\u001f" + source, tags, -1, "-1", ""))
+
+        conn.executemany('INSERT INTO notes VALUES (?,?,?,?,?,?,?)', self._cleanText(corpus))
+        conn.executemany("INSERT INTO index_mod VALUES (?,?)", [(nid, current[nid]) for nid in changed])
+        conn.commit()
+        conn.close()
+
+        if logging:
+            log("FTS index - Synced index: %s changed, %s removed, took %s ms" % (len(changed), len(removed), int((time.time() - start) * 1000)))
+
+        return True
+
     def _check_fts_version(self, logging):
         con = sqlite3.connect(':memory:')
         cur = con.cursor()
@@ -205,20 +339,18 @@ class FTSIndex:
     def _cleanText(self, corpus):
         """ Prepare notes for indexing (cut stopwords, remove fields, remove special characters). """
 
-        filtered    = list()
-        text        = ""
-
-        for row in corpus:
-            text = row[1]
+        return _clean_rows(corpus, self.fields_to_exclude)
 
-            #if the notes model id is in our filter dict, that means we want to exclude some field(s)
-            if row[4] in self.fields_to_exclude:
-                text = utility.text.remove_fields(text, self.fields_to_exclude[row[4]])
-
-            text = utility.text.clean(text)
-            filtered.append((row[0], text, row[2], row[3], row[1], row[4], row[5]))
+    def _clean_corpus(self, pages):
+        """
+        Generator that yields the cleaned rows of the given pages (lists of rows, see iter_notes_in_collection),
+        so only one page has to be held in memory at a time.
+        Cleaning stays in this thread: forking the (multithreaded) Anki process is not safe,
+        and spawned workers couldn't import the cleaning code, as it needs aqt and the add-on config.
+        """
 
-        return filtered
+        for page in pages:
+            yield from _clean_rows(page, self.fields_to_exclude)
 
 
     def search(self, text, decks, only_user_notes = False, print_mode = "default"):
@@ -228,8 +360,18 @@ class FTSIndex:
         text - string to search, typically fields content
         decks - list of deck ids, if -1 is contained, all decks are searched
         """
-        worker          = Worker(self.searchProc, text, decks, only_user_notes, print_mode)
+        # every new search supersedes the previous ones: queued workers for older searches will be skipped,
+        # and queries that are still running are interrupted
+        with self.search_lock:
+            self.search_seq += 1
+            seq = self.search_seq
+            for running_seq, conn in self.running_queries.items():
+                if running_seq != seq:
+                    conn.interrupt()
+
+        worker          = Worker(self.searchProc, text, decks, only_user_notes, print_mode, seq)
         worker.stamp    = utility.misc.get_milisec_stamp()
+        worker.is_stale = lambda: self._is_superseded(seq)
         self.ui.latest  = worker.stamp
 
         if print_mode == "default":
@@ -243,7 +385,14 @@ class FTSIndex:
         self.threadPool.start(worker)
 
 
-    def searchProc(self, text, decks, only_user_notes, print_mode):
+    def _is_superseded(self, seq):
+        """ True if a search has been started after the one with the given sequence number. """
+        return seq is not None and seq != self.search_seq
+
+    def searchProc(self, text, decks, only_user_notes, print_mode, seq = None):
+        # make sure queued changes are visible to the search
+        self.flush()
+
         resDict                     = {}
         start                       = time.time()
         orig                        = text
@@ -277,9 +426,13 @@ class FTSIndex:
                 log("Returning - Text was < 2 chars: " + text)
             return { "results" : [] }
 
+        # The match expression is a disjunction of the tokens, so their order doesn't matter for the result.
+        # Sorting them makes queries that only differ in token order (or in tokens that are dropped anyway)
+        # produce the same expression and cache key, so they don't have to be run again.
         tokens                      = text.split(" ")
         if len(tokens) > 10:
             tokens                  = set(tokens)
+        tokens                      = sorted([s.strip() for s in tokens if not utility.text.text_too_small(s.strip())])
         if self.type == "SQLite FTS5":
             query = u" OR ".join(["tags:" + s.strip().replace("OR", "or") for s in tokens if not utility.text.text_too_small(s) ])
             query += " OR " + " OR ".join(["text:" + s.strip().replace("OR", "or") for s in tokens if not utility.text.text_too_small(s) ])
@@ -297,33 +450,59 @@ class FTSIndex:
 
         decks.append("-1")
 
+        # identical searches (e.g. refocusing a field, repeating the last search) can be answered from the cache
+        cache_key                   = (query, frozenset(decks), only_user_notes, self.limit, tuple(sorted(self.pinned)), self.generation)
+        cached                      = self._cache_get(cache_key)
+        resDict["time-connection"]  = 0.0
+        resDict["time-query"]       = 0
+        resDict["highlighting"]     = self.highlighting
+        if cached is not None:
+            resDict["cached"]       = True
+            resDict["results"]      = cached
+            self.lastResDict        = resDict
+            self._prefetch_metadata(cached, print_mode)
+            return resDict
+        resDict["cached"]           = False
+
         rList                       = list()
-        user_note_filter            = "AND mid='-1'" if only_user_notes else ""
-        conn                        = sqlite3.connect(self.dir + "search-data.db")
 
-        if self.type == "SQLite FTS5":
-            dbStr = "select nid, text, tags, did, source, bm25(notes) as score, mid, refs from notes where notes match '%s' %s order by score" %(query, user_note_filter)
+        start                       = time.time()
+        conn                        = self.pool.get()
+        resDict["time-connection"]  = (time.time() - start) * 1000
 
-        else:
+        if self.type != "SQLite FTS5":
             conn.create_function("simple_rank", 1, simple_rank)
-            dbStr = "select nid, text, tags, did, source, simple_rank(matchinfo(notes)) as score, mid, refs from notes where text match '%s' %s order by score desc" %(query, user_note_filter)
 
+        dbStr, params               = self._plan_query(query, decks, allDecks, only_user_notes)
+
+        # register the connection, so that search() can interrupt the query if a newer search comes in
+        with self.search_lock:
+            if self._is_superseded(seq):
+                return None
+            if seq is not None:
+                self.running_queries[seq] = conn
         try:
             start                   = time.time()
-            res                     = conn.execute(dbStr).fetchall()
+            res                     = conn.execute(dbStr, params).fetchall()
             resDict["time-query"]   = int((time.time() - start) * 1000)
         except Exception as e:
             if self.logging:
                 log("Executing db query threw exception: " + str(e))
             res                     = []
         finally:
-            conn.close()
+            with self.search_lock:
+                self.running_queries.pop(seq, None)
+
+        # results of a superseded (possibly interrupted) query would not be displayed anyway, and must not be cached
+        if self._is_superseded(seq):
+            return None
+
         if self.logging:
             log("dbStr was: " + dbStr)
             log("Result length of db query: " + str(len(res)))
 
         resDict["highlighting"] = self.highlighting
-        # if self.type == "SQLite FTS5":
+        # filters are usually applied in the query already, this only matters if they were too large to be bound
         for r in res:
             if not str(r[0]) in self.pinned and (allDecks or str(r[3]) in decks):
                 
@@ -342,9 +521,91 @@ class FTSIndex:
 
         resDict["results"]          = rList[:min(self.limit, len(rList))]
         self.lastResDict            = resDict
+        self._cache_put(cache_key, resDict["results"])
+        self._prefetch_metadata(resDict["results"], print_mode)
 
         return resDict
 
+    def _prefetch_metadata(self, results, print_mode):
+        """ Fetch retentions, suspended state etc. of the first page here in the worker thread, so rendering it only hits the cache. """
+
+        if print_mode != "default":
+            return
+        try:
+            prefetch_result_metadata(results[:RESULT_WINDOW_SIZE])
+        except Exception as e:
+            if self.logging:
+                log("Prefetching result metadata failed: " + str(e))
+
+    def _cache_get(self, key):
+        """ Returns a copy of the cached results for the given key (or None), updates the hit/miss counters. """
+
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+                # copy, so that sorting/filtering the displayed results doesn't touch the cached list
+                return list(self.cache[key])
+            self.cache_misses += 1
+            return None
+
+    def _cache_put(self, key, results):
+
+        with self.cache_lock:
+            self.cache[key] = list(results)
+            self.cache.move_to_end(key)
+            while len(self.cache) > RESULT_CACHE_SIZE:
+                self.cache.popitem(last=False)
+
+    def invalidate_cache(self):
+        """
+        Has to be called whenever the index content changes.
+        Cached entries are keyed by the generation, so results of searches that were still running
+        while the generation was bumped won't be returned later either.
+        """
+
+        with self.cache_lock:
+            self.generation += 1
+            self.cache.clear()
+
+    def _plan_query(self, query, decks, all_decks, only_user_notes):
+        """
+        Builds the sql (and its parameters) for the given match expression.
+        Deck selection, pinned notes and the user notes filter are applied in the query itself and the result is limited,
+        so only the rows that are displayed have to be read, no matter how many notes match.
+        If the deck or pinned lists are too long to be bound as parameters, they are left out of the query,
+        and the query is not limited (filtering happens afterwards in searchProc then).
+        """
+        filters = []
+        params  = [query]
+
+        if only_user_notes:
+            filters.append("mid = '-1'")
+
+        can_filter = len(decks) + len(self.pinned) < SQLITE_MAX_BOUND_PARAMS
+        if can_filter:
+            # nid and did are stored as integers for Anki notes, but as text for add-on notes
+            if not all_decks:
+                filters.append("cast(did as text) in (%s)" % ",".join(["?"] * len(decks)))
+                params.extend([str(d) for d in decks])
+            if len(self.pinned) > 0:
+                filters.append("cast(nid as text) not in (%s)" % ",".join(["?"] * len(self.pinned)))
+                params.extend([str(nid) for nid in self.pinned])
+
+        where = "".join([" and " + f for f in filters])
+        limit = ""
+        if can_filter:
+            limit = " limit ?"
+            params.append(self.limit)
+
+        if self.type == "SQLite FTS5":
+            # 'rank' is bm25(notes) by default, but ordering by it allows fts5 to sort internally
+            sql = "select nid, text, tags, did, source, rank as score, mid, refs from notes where notes match ?%s order by rank%s" % (where, limit)
+        else:
+            sql = "select nid, text, tags, did, source, simple_rank(matchinfo(notes)) as score, mid, refs from notes where text match ?%s order by score desc%s" % (where, limit)
+
+        return (sql, params)
+
     def printOutput(self, result, stamp):
         query_set = None
         if self.highlighting and self.lastResDict is not None and "query" in self.lastResDict and self.lastResDict["query"] is not None:
@@ -424,21 +685,14 @@ class FTSIndex:
 
    
     def deleteNote(self, nid):
-        conn = sqlite3.connect(self.dir + "search-data.db")
-        conn.cursor().execute("DELETE FROM notes WHERE CAST(nid AS INTEGER) = %s;" % nid)
-        conn.commit()
-        conn.close()
+        self._enqueue("delete", int(nid))
 
     def add_user_note(self, note):
         """
         Add a non-anki note to the index.
         """
         text = utility.text.build_user_note_text(title=note[1], text=note[2], source=note[3])
-        conn = sqlite3.connect(self.dir + "search-data.db")
-        conn.cursor().execute("INSERT INTO notes (nid, text, tags, did, source, mid, refs) VALUES (?, ?, ?, ?, ?, ?, '')", (note[0], utility.text.clean(text), note[4], "-1", text, "-1"))
-        conn.commit()
-        conn.close()
-        persist_index_info(self)
+        self._enqueue("insert", ((note[0], utility.text.clean(text), note[4], "-1", text, "-1", ""), get_index_mod_key(note[0], user_note=True)))
 
     def update_user_note(self, note):
         """
@@ -461,56 +715,207 @@ class FTSIndex:
         source  = content
         if str(note.mid) in self.fields_to_exclude:
             content = utility.text.remove_fields(content, self.fields_to_exclude[str(note.mid)])
-        conn = sqlite3.connect(self.dir + "search-data.db")
-        conn.cursor().execute("INSERT INTO notes (nid, text, tags, did, source, mid, refs) VALUES (?, ?, ?, ?, ?, ?, '')", (note.id, utility.text.clean(content), tags, did, source, note.mid))
-        conn.commit()
-        conn.close()
-        persist_index_info(self)
+        self._enqueue("insert", ((note.id, utility.text.clean(content), tags, did, source, note.mid, ""), get_index_mod_key(note.id)))
 
     def updateNote(self, note):
         self.deleteNote(note.id)
         self.addNote(note)
 
+    def update_notes(self, notes):
+        """ Update many (Anki) notes at once, e.g. after an import or a bulk edit. """
+
+        for note in notes:
+            self.updateNote(note)
+        self.flush()
+
+    def sync_in_background(self):
+        """
+        Bring the index up to date with the collection, using the same index_mod diff as on startup (see _sync),
+        so edited, added and deleted notes are handled.
+        Called after mw.reset(), which is how imports and bulk edits in the browser (find & replace, change note type, ...) end.
+        Runs in a background thread, since reading the modification keys touches every note of the collection.
+        """
+
+        if mw.col is None or not self._can_sync() or get_config_value_or_default("freezeIndex", False):
+            return
+        with self.update_lock:
+            if self.sync_running:
+                return
+            self.sync_running = True
+        threading.Thread(target=self._sync_in_background, daemon=True).start()
+
+    def _sync_in_background(self):
+        try:
+            # apply queued changes first, so that they are not written on top of the synced notes afterwards
+            self.flush()
+            with self.flush_lock:
+                if self._sync(self.logging):
+                    self.invalidate_cache()
+                    persist_index_info(self)
+        except Exception as e:
+            log("FTS index - Failed to sync the index after a reset: %s" % e)
+        finally:
+            self.sync_running = False
+
+    def _enqueue(self, op, arg):
+        """
+        Changes to the index are not written immediately, but queued and applied by flush(), in a single transaction.
+        flush() is called once no further changes came in for UPDATE_FLUSH_DELAY ms, and before every search.
+        """
+
+        with self.update_lock:
+            self.pending_updates.append((op, arg))
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+
+        # the timer can only be used from the main thread
+        if QThread.currentThread() != mw.thread():
+            self.flush()
+            return
+        if self.flush_timer is None:
+            self.flush_timer = QTimer()
+            self.flush_timer.setSingleShot(True)
+            self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(UPDATE_FLUSH_DELAY)
+
+    def flush(self):
+        """ Apply all queued changes in one transaction, then update the persisted index info once. """
+
+        with self.flush_lock:
+            with self.update_lock:
+                ops                     = self.pending_updates
+                self.pending_updates    = []
+            if len(ops) == 0:
+                return
+
+            conn = self.pool.get()
+            try:
+                with conn:
+                    self._apply_ops(conn, ops)
+            except Exception as e:
+                if not self.flush_failed:
+                    # the transaction was rolled back, so put the changes back in front of the ones queued in the meantime
+                    self.flush_failed = True
+                    with self.update_lock:
+                        self.pending_updates = ops + self.pending_updates
+                    log("FTS index - Failed to apply %s queued changes, will retry on the next flush: %s" % (len(ops), e))
+                    return
+                # failed twice in a row, so apply the changes one by one and drop the ones that fail,
+                # a single bad row must not block all further changes (and searches, which flush first)
+                dropped = 0
+                for o in ops:
+                    try:
+                        with conn:
+                            self._apply_ops(conn, [o])
+                    except Exception as e:
+                        dropped += 1
+                        log("FTS index - Dropped queued change (%s, %s): %s" % (o[0], o[1] if o[0] == "delete" else o[1][0][0], e))
+                log("FTS index - Applied queued changes one by one, dropped %s of %s" % (dropped, len(ops)))
+
+            self.flush_failed = False
+            self.invalidate_cache()
+            persist_index_info(self)
+
+    def _apply_ops(self, conn, ops):
+        # consecutive operations of the same kind are applied together, but their order is kept (update = delete + insert)
+        for op, group in itertools.groupby(ops, key=lambda o: o[0]):
+            args = [o[1] for o in group]
+            if op == "delete":
+                _delete_nids(conn, args)
+                if self.has_index_mod:
+                    conn.executemany("delete from index_mod where nid = ?", [(nid,) for nid in args])
+            else:
+                # args are (row, modification key) pairs, see addNote and add_user_note
+                conn.executemany("INSERT INTO notes (nid, text, tags, did, source, mid, refs) VALUES (?, ?, ?, ?, ?, ?, ?)", [row for row, _ in args])
+                if self.has_index_mod:
+                    conn.executemany("insert or replace into index_mod (nid, mod) values (?, ?)", [(row[0], mod) for row, mod in args if mod is not None])
+
     def get_last_inserted_id(self):
-        conn = sqlite3.connect(self.dir + "search-data.db")
-        row_id = conn.cursor().execute("SELECT id FROM notes_content ORDER BY id DESC LIMIT 1").fetchone()[0]
-        conn.close()
-        return row_id
+        self.flush()
+        conn = self.pool.get()
+        return conn.execute("SELECT id FROM notes_content ORDER BY id DESC LIMIT 1").fetchone()[0]
 
     def get_number_of_notes(self):
-        res     = 0
-        conn    = None
         try:
-            conn = sqlite3.connect(self.dir + "search-data.db")
-            res = conn.cursor().execute("select count(*) from notes_content").fetchone()[0]
+            return self.pool.get().execute("select count(*) from notes_content").fetchone()[0]
         except:
-            res = 0
-        finally:
-            if conn:
-                conn.close()
-        return res
+            return 0
+
+    def measure_connection_latency(self):
+        """
+        Returns the time (ms) it takes to run a trivial statement on the pooled connection,
+        and the time it would take with a freshly opened connection (what every search did before the pool was added).
+        """
+        sql     = "select rowid from notes limit 1"
+
+        start   = time.time()
+        self.pool.get().execute(sql).fetchone()
+        pooled  = (time.time() - start) * 1000
 
+        start   = time.time()
+        conn    = sqlite3.connect(self.dir + "search-data.db")
+        conn.execute(sql).fetchone()
+        conn.close()
+        unpooled = (time.time() - start) * 1000
+
+        return (pooled, unpooled)
+
+    def close(self):
+        """ Close all pooled connections, has to be called before the index is dropped (e.g. on rebuild). """
+        # queued changes are not needed anymore, the rebuilt index will contain them
+        with self.update_lock:
+            self.pending_updates = []
+        self.pool.close_all()
+
+
+# typecode of a 32-bit unsigned int, matchinfo() returns an array of those in native byte order
+_UINT32 = "I" if array.array("I").itemsize == 4 else "L"
+
+def _delete_nids(conn, nids):
+    """ Delete all the given notes from the index in one pass over it, instead of one scan per note. """
+
+    conn.execute("create temp table if not exists delete_nids (nid INTEGER PRIMARY KEY)")
+    conn.executemany("insert or ignore into delete_nids values (?)", [(nid,) for nid in nids])
+    conn.execute("delete from notes where CAST(nid AS INTEGER) in (select nid from delete_nids)")
+    conn.execute("delete from delete_nids")
+
+def _clean_rows(rows, fields_to_exclude):
+    """ Clean the given (nid, text, tags, did, mid, refs) rows. """
+
+    filtered    = list()
+    text        = ""
+
+    for row in rows:
+        text = row[1]
+
+        #if the notes model id is in our filter dict, that means we want to exclude some field(s)
+        if row[4] in fields_to_exclude:
+            text = utility.text.remove_fields(text, fields_to_exclude[row[4]])
+
+        text = utility.text.clean(text)
+        filtered.append((row[0], text, row[2], row[3], row[1], row[4], row[5]))
+
+    return filtered
 
 def _parseMatchInfo(buf):
-    bufsize = len(buf)
-    return [struct.unpack('@I', buf[i:i+4])[0] for i in range(0, bufsize, 4)]
+    """ Unpacks the whole matchinfo blob with a single C-level copy instead of one struct.unpack per value. """
+    match_info = array.array(_UINT32)
+    match_info.frombytes(buf)
+    return match_info
 
 def simple_rank(rawMatchInfo):
     """ Based on https://github.com/saaj/sqlite-fts-python/blob/master/sqlitefts/ranking.py """
 
     match_info  = _parseMatchInfo(rawMatchInfo)
-    score       = 0.0
-    p, c        = match_info[:2]
 
-    for phrase_num in range(p):
-        phrase_info_idx = 2 + (phrase_num * c * 3)
-        for col_num in range(c):
-            col_idx = phrase_info_idx + (col_num * 3)
-            x1, x2  = match_info[col_idx:col_idx + 2]
-            if x1 > 0:
-                score += float(x1) / x2
+    # matchinfo format 'pcx': p (phrases), c (columns), followed by 3 values for each phrase/column combination:
+    # hits in this row, hits in all rows, rows with at least one hit.
+    # So slicing with step 3 gives all (hits in this row, hits in all rows) pairs without any index arithmetic.
+    hits_row    = match_info[2::3]
+    hits_all    = match_info[3::3]
 
-    return score
+    return sum([x1 / x2 for x1, x2 in zip(hits_row, hits_all) if x1 > 0], 0.0)
 
 
 def bm25(rawMatchInfo):
@@ -575,9 +980,14 @@ class Worker(QRunnable):
         self.fn         = fn
         self.args       = args
         self.signals    = WorkerSignals()
+        # optional callable, if it returns True, the worker is skipped / its result is dropped
+        self.is_stale   = None
 
     @pyqtSlot()
     def run(self):
+        if self.is_stale is not None and self.is_stale():
+            self.signals.finished.emit()
+            return
         try:
             result = self.fn(*self.args)
         except:
@@ -586,7 +996,8 @@ class Worker(QRunnable):
             self.signals.error.emit((exctype, value, traceback.format_exc()))
         else:
             #use stamp to track time
-            self.signals.result.emit(result, self.stamp)
+            if self.is_stale is None or not self.is_stale():
+                self.signals.result.emit(result, self.stamp)
         finally:
             self.signals.finished.emit()
 
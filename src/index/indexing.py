@@ -28,6 +28,7 @@ from ..web.web import show_search_result_area, print_starting_info, fillDeckSele
 from ..web.html import loadSynonyms
 from .fts_index import FTSIndex
 from ..notes import get_all_notes
+from .. import review_stats
 import utility.misc
 
 
@@ -51,6 +52,12 @@ def _build_index(force_rebuild = False):
     
     index                               = FTSIndex(force_rebuild)
     end                                 = time.time()
+
+    # bring the precomputed review stats up to date (including older entries that changed) while we are in the background anyway
+    try:
+        review_stats.check_consistency()
+    except Exception as e:
+        log("Failed to update the review stats: " + str(e))
     initializationTime                  = round(end - start)
  
     index.ui.remove_divs                = config["removeDivsFromOutput"]
@@ -20,47 +20,133 @@ import time
 import os
 import typing
 
-from ..notes import get_all_notes, get_total_notes_count
+from ..notes import get_all_notes_mod, get_note_mod, get_notes_after, get_total_notes_count
+
+
+def iter_notes_in_collection(page_size: int = 2000) -> typing.Iterator[typing.List[typing.Tuple[typing.Any, ...]]]:
+    """
+    Reads the collection in pages of (at most) page_size notes, ordered by note id, and yields each page as
+    a list of tuples (note id, note fields as string, note tags, deck id, model id, refs).
+    The add-on notes follow after the Anki notes.
+    Used to build the index without having to hold the whole collection in memory.
+    """
+
+    last_id             = -1
+    while True:
+        nids            = mw.col.db.list("select id from notes where id > ? order by id limit ?", last_id, page_size)
+        if len(nids) == 0:
+            break
+        last_id         = nids[-1]
+        # with a deck filter, a page might contain no notes to index
+        page            = get_notes_in_collection_by_ids(nids)
+        if len(page) > 0:
+            yield page
 
+    #load addon notes
+    last_id             = -1
+    while True:
+        other_notes     = get_notes_after(last_id, page_size)
+        if len(other_notes) == 0:
+            break
+        last_id         = other_notes[-1][0]
+        page            = []
+        for (id, title, text, source, tags, nid, created, modified, reminder, _, _, _, _, _) in other_notes:
+            text = title + "\u001f" + text + "\u001f" + source
+            page.append((id, text, tags, -1, "-1", ""))
+        yield page
 
-def get_notes_in_collection():
-    """ Reads the collection and builds a list of tuples (note id, note fields as string, note tags, deck id, model id) """
-
-    config              = mw.addonManager.getConfig(__name__)
-    deckList            = config['decks']
-    deckStr             = ""
 
-    for d in list(mw.col.decks.decks.values()):
-        if d['name'] in deckList:
-            deckStr += str(d['id']) + ","
+def index_data_size() -> int:
+    """ Returns the amount of notes that would go into the index. """
 
-    if len(deckStr) > 0:
-        deckStr         = "(%s)" % (deckStr[:-1])
+    s = time.time() * 1000
+    deckStr             = _get_deck_str()
 
+    # todo: find out why count(distinct notes.id) returns slightly different number
     if deckStr:
-        oList           = mw.col.db.all("select distinct notes.id, flds, tags, did, mid from notes left join cards on notes.id = cards.nid where did in %s" %(deckStr))
+        c_anki           = mw.col.db.scalar("select count(*) from (select distinct notes.id, did, mid from notes left join cards on notes.id = cards.nid where did in %s" %(deckStr))
     else:
-        oList           = mw.col.db.all("select distinct notes.id, flds, tags, did, mid from notes left join cards on notes.id = cards.nid")
+        c_anki           = mw.col.db.scalar("select count(*) from (select distinct notes.id, did, mid from notes left join cards on notes.id = cards.nid)")
+
+    if c_anki is None:
+        c_anki = 0
 
 
+    c_anki              = int(c_anki)
+    c_addon             = get_total_notes_count()
     #load addon notes
-    other_notes         = get_all_notes()
 
-    index_notes = [(id, flds, t, did, str(mid), "") for (id, flds, t, did, mid) in oList]
+    print(time.time() * 1000 - s)
+    return c_anki + c_addon
+
+
+def get_index_mod_keys() -> typing.Dict[int, str]:
+    """
+    Returns a dict (note id -> modification key) for all notes that would go into the index.
+    For Anki notes, the key is built from the note's mod and its deck ids (moving a card doesn't touch notes.mod),
+    for add-on notes, it is the modified (or created) timestamp.
+    Used to determine which notes have to be updated when the index is synced incrementally.
+    """
+
+    deckStr             = _get_deck_str()
+
+    if deckStr:
+        rows            = mw.col.db.all("select notes.id, notes.mod, group_concat(distinct did) from notes left join cards on notes.id = cards.nid where did in %s group by notes.id" %(deckStr))
+    else:
+        rows            = mw.col.db.all("select notes.id, notes.mod, group_concat(distinct did) from notes left join cards on notes.id = cards.nid group by notes.id")
+
+    keys                = {}
+    for (id, mod, dids) in rows:
+        dids            = ",".join(sorted(str(dids).split(","))) if dids is not None else ""
+        keys[id]        = "%s|%s" % (mod, dids)
 
-    for (id, title, text, source, tags, nid, created, modified, reminder, _, _, _, _, _) in other_notes:
+    for (id, created, modified) in get_all_notes_mod():
+        keys[id]        = modified if modified else created
 
-        text = title + "\u001f" + text + "\u001f" + source
-        index_notes.append((id, text, tags, -1, "-1", ""))
+    return keys
 
 
+def get_index_mod_key(nid: int, user_note: bool = False) -> typing.Optional[str]:
+    """ Same as get_index_mod_keys, but only for the given note. Used to keep 'index_mod' up to date when single notes are indexed. """
+
+    if user_note:
+        row             = get_note_mod(nid)
+        if row is None:
+            return None
+        return row[1] if row[1] else row[0]
+
+    deckStr             = _get_deck_str()
+    if deckStr:
+        row             = mw.col.db.first("select notes.mod, group_concat(distinct did) from notes left join cards on notes.id = cards.nid where notes.id = ? and did in %s" %(deckStr), nid)
+    else:
+        row             = mw.col.db.first("select notes.mod, group_concat(distinct did) from notes left join cards on notes.id = cards.nid where notes.id = ?", nid)
+
+    if row is None or row[0] is None:
+        return None
+    dids                = ",".join(sorted(str(row[1]).split(","))) if row[1] is not None else ""
+    return "%s|%s" % (row[0], dids)
+
+
+def get_notes_in_collection_by_ids(nids: typing.List[int]):
+    """ Same as get_notes_in_collection, but only reads the given Anki note ids. """
+
+    deckStr             = _get_deck_str()
+    index_notes         = []
+
+    for i in range(0, len(nids), 500):
+        nidStr          = "(%s)" % ",".join([str(nid) for nid in nids[i:i+500]])
+        if deckStr:
+            oList       = mw.col.db.all("select distinct notes.id, flds, tags, did, mid from notes left join cards on notes.id = cards.nid where notes.id in %s and did in %s" %(nidStr, deckStr))
+        else:
+            oList       = mw.col.db.all("select distinct notes.id, flds, tags, did, mid from notes left join cards on notes.id = cards.nid where notes.id in %s" %(nidStr))
+        index_notes.extend([(id, flds, t, did, str(mid), "") for (id, flds, t, did, mid) in oList])
+
     return index_notes
 
 
-def index_data_size() -> int:
-    """ Returns the amount of notes that would go into the index. """
+def _get_deck_str() -> str:
+    """ Returns the ids of the decks to index as sql list, e.g. '(1,2,3)', or an empty string if all decks should be indexed. """
 
-    s = time.time() * 1000
     config              = mw.addonManager.getConfig(__name__)
     deckList            = config['decks']
     deckStr             = ""
@@ -72,19 +158,4 @@ def index_data_size() -> int:
     if len(deckStr) > 0:
         deckStr         = "(%s)" % (deckStr[:-1])
 
-    # todo: find out why count(distinct notes.id) returns slightly different number
-    if deckStr:
-        c_anki           = mw.col.db.scalar("select count(*) from (select distinct notes.id, did, mid from notes left join cards on notes.id = cards.nid where did in %s" %(deckStr))
-    else:
-        c_anki           = mw.col.db.scalar("select count(*) from (select distinct notes.id, did, mid from notes left join cards on notes.id = cards.nid)")
-
-    if c_anki is None:
-        c_anki = 0
-
-
-    c_anki              = int(c_anki)
-    c_addon             = get_total_notes_count()
-    #load addon notes
-
-    print(time.time() * 1000 - s)
-    return c_anki + c_addon
\ No newline at end of file
+    return deckStr
@@ -18,9 +18,11 @@ import os
 import glob
 import shutil
 import sqlite3
+import threading
 import typing
 from typing import Optional, Tuple, List, Dict, Set, Any
 from enum import Enum, unique
+from functools import lru_cache
 from datetime import datetime, time, date, timedelta
 from aqt import mw
 from aqt.utils import tooltip, showInfo
@@ -41,8 +43,14 @@ import utility.misc
 import utility.tags
 import utility.text
 import utility.date
+import utility.db
 
 db_path                 : Optional[str] = None
+# one connection per thread to siac-notes.db, see _get_connection()
+_pool                   : Optional[utility.db.ConnectionPool] = None
+_pool_lock              = threading.Lock()
+# db files that have the notes_fts title index, see _has_title_index()
+_title_index_files      : Set[str]      = set()
 
 # How many times more important is a priority 100 item than a priority 1 item?
 PRIORITY_SCALE_FACTOR   : int           = get_config_value_or_default("notes.queue.priorityScaleFactor", 5)
@@ -53,6 +61,12 @@ PRIORITY_MOD            : float         = get_config_value_or_default("notes.que
 # 2020-10-06 Simplify scheduling
 MISSED_NOTES_HANDLING   : str           = "place-front"
 
+# max. number of notes returned by the title searches (find_notes etc.)
+TITLE_SEARCH_LIMIT      : int           = get_config_value_or_default("notes.titleSearch.limit", 100)
+
+# max. number of values bound to a single statement (SQLite before 3.32: 999), longer lists are queried in chunks
+MAX_BOUND_VARIABLES     : int           = 900
+
 
 
 
@@ -66,32 +80,12 @@ class PDFMark(Enum):
 
 
 def create_db_file_if_not_exists() -> bool:
-    """ Called on add-on startup. """
+    """ Called on add-on startup. Creates the db file if needed and brings its schema up to date. """
 
     file_path   = _get_db_path()
     existed     = False
     if not os.path.isfile(file_path):
         conn = sqlite3.connect(file_path)
-
-        creation_sql = """
-            create table if not exists notes
-            (
-                id INTEGER PRIMARY KEY,
-                title TEXT,
-                text TEXT,
-                source TEXT,
-                tags TEXT,
-                nid INTEGER,
-                created TEXT,
-                modified TEXT,
-                reminder TEXT,
-                lastscheduled TEXT,
-                position INTEGER,
-                extract_start INTEGER,
-                extract_end INTEGER
-            )
-        """
-        conn.execute(creation_sql)
     else:
         existed = True
         try: 
@@ -119,12 +113,40 @@ def create_db_file_if_not_exists() -> bool:
                 to_delete = sorted(backups)[:-limit]
                 for f in to_delete:
                     os.remove(f)
-    
-    # disable for now
-    # info_from_data_json = get_notes_info()
-    # if info_from_data_json is not None and "db_last_checked" in info_from_data_json and len(info_from_data_json["db_last_checked"]) > 0:
-    #     return
-   
+    try:
+        _migrate(conn)
+        _ensure_title_index(conn)
+    finally:
+        conn.close()
+
+    return existed
+
+#region Schema migrations
+
+def _migration_1(conn: sqlite3.Connection):
+    """ 
+    The schema as it was before it was versioned. 
+    Files from that time might have been created with any earlier version, so every step has to be idempotent.
+    """
+    conn.execute("""
+        create table if not exists notes
+        (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            text TEXT,
+            source TEXT,
+            tags TEXT,
+            nid INTEGER,
+            created TEXT,
+            modified TEXT,
+            reminder TEXT,
+            lastscheduled TEXT,
+            position INTEGER,
+            extract_start INTEGER,
+            extract_end INTEGER,
+            delay TEXT
+        )
+    """)
     conn.execute("""
         create table if not exists read
         (
@@ -134,7 +156,6 @@ def create_db_file_if_not_exists() -> bool:
             created TEXT,
             FOREIGN KEY(nid) REFERENCES notes(id)
         );
-       
     """)
     conn.execute("""
         create table if not exists marks
@@ -172,53 +193,128 @@ def create_db_file_if_not_exists() -> bool:
             created TEXT
         ); 
     """)
-
+    conn.execute("""
+        create table if not exists notes_pdf_page (
+            nid INTEGER,
+            siac_nid INTEGER,
+            page INTEGER,
+            type INTEGER,
+            data TEXT,
+            created TEXT
+        ) 
+    """)
     conn.execute("CREATE INDEX if not exists read_nid ON read (nid);")
     conn.execute("CREATE INDEX if not exists mark_nid ON marks (nid);")
-    conn.execute("CREATE INDEX if not exists prio_nid ON queue_prio_log (nid);")
-    conn.commit()
 
-    #
-    # Update code
-    # For lack of some kind of versioning, simply attempt to alter the tables, 
-    # and ignore any sql errors thrown if the modifications did already exist.
-    #
-    try:
-        # conn.execute(""" ALTER TABLE notes ADD COLUMN priority INTEGER; """)
-        # conn.execute(""" ALTER TABLE notes ADD COLUMN last_done TEXT; """)
-        # conn.execute(""" ALTER TABLE notes ADD COLUMN in_queue BOOLEAN; """)
-        # conn.execute(""" ALTER TABLE notes ADD COLUMN extract_start INTEGER; """)
-        # conn.execute(""" ALTER TABLE notes ADD COLUMN extract_end INTEGER;""")
-        conn.commit()
-    except:
-        pass
-    try:
-        conn.execute("""
-            Create table if not exists notes_pdf_page (
-                nid INTEGER,
-                siac_nid INTEGER,
-                page INTEGER,
-                type INTEGER,
-                data TEXT,
-                created TEXT
-            ) 
-        """)
-        conn.commit()
-    except:
-        pass
-    try:
-        conn.execute(""" ALTER TABLE notes add column delay TEXT;""")
-        conn.commit()
-    except:
-        pass
-    finally:
-        conn.close()
+    # delay was added later on
+    columns = [r[1] for r in conn.execute("pragma table_info(notes)").fetchall()]
+    if not "delay" in columns:
+        conn.execute("ALTER TABLE notes add column delay TEXT;")
 
-    # store a timestamp in /user_files/data.json to check next time, so we don't have to do this on every startup
-    # persist_notes_db_checked()
+def _migration_2(conn: sqlite3.Connection):
+    """ Indexes for the queue, priority and pdf page lookups. """
 
-    return existed
+    # queue order: _get_priority_list, get_priority_list, get_queue_count
+    conn.execute("CREATE INDEX if not exists notes_position ON notes (position);")
+    # latest priority per note (max(created) ... group by nid), replaces prio_nid
+    conn.execute("CREATE INDEX if not exists prio_nid_created ON queue_prio_log (nid, created, prio);")
+    conn.execute("DROP INDEX if exists prio_nid;")
+    conn.execute("CREATE INDEX if not exists highlights_nid_page ON highlights (nid, page);")
+    conn.execute("CREATE INDEX if not exists notes_pdf_page_siac_nid_page ON notes_pdf_page (siac_nid, page);")
+
+def _migration_3(conn: sqlite3.Connection):
+    # one row per tag and per parent of a tag, see _tag_rows()
+    conn.execute("""
+        create table if not exists note_tags
+        (
+            nid INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            depth INTEGER NOT NULL
+        )
+    """)
+    conn.execute("delete from note_tags")
+    rows = []
+    for nid, tags in conn.execute("select id, tags from notes where tags is not null").fetchall():
+        rows += _tag_rows(nid, tags)
+    conn.executemany("insert into note_tags (nid, tag, depth) values (?, ?, ?)", rows)
+    # indexes are built after filling the table, that's faster than updating them on every insert
+    # lookups are case-insensitive, like the old like-patterns on notes.tags
+    conn.execute("CREATE INDEX if not exists note_tags_tag ON note_tags (tag COLLATE NOCASE, nid);")
+    # the note's own tags (depth = 0), for listing and counting
+    conn.execute("CREATE INDEX if not exists note_tags_depth_tag ON note_tags (depth, tag, nid);")
+    conn.execute("CREATE INDEX if not exists note_tags_nid ON note_tags (nid, depth, tag);")
+
+def _migration_4(conn: sqlite3.Connection):
+    """
+    Used to create the notes_fts title index. That depends on the SQLite version (trigram tokenizer), not on the file,
+    so it is now done by _ensure_title_index() every time the file is opened.
+    """
+    pass
+
+def _migration_5(conn: sqlite3.Connection):
+    """
+    Drop notes_fts if an earlier version of _migration_4 created it with the unicode61 tokenizer.
+    That one matches words by prefix, so it can't be used for the title searches, and the triggers would only slow down writes.
+    """
+    res = conn.execute("select sql from sqlite_master where name = 'notes_fts'").fetchone()
+    if res is None or "trigram" in res[0]:
+        return
+    for trigger in ["notes_fts_insert", "notes_fts_delete", "notes_fts_update"]:
+        conn.execute(f"drop trigger if exists {trigger}")
+    conn.execute("drop table notes_fts")
+
+# migration i (1-based) brings the file from user_version i - 1 to i
+_MIGRATIONS = [_migration_1, _migration_2, _migration_3, _migration_4, _migration_5]
+
+def _migrate(conn: sqlite3.Connection):
+    """ Run the migrations the file hasn't seen yet, each one in its own transaction, and store the new version in user_version. """
+
+    version = conn.execute("pragma user_version").fetchone()[0]
+    for v, migration in enumerate(_MIGRATIONS[version:], version + 1):
+        try:
+            # DDL would otherwise run in autocommit mode
+            conn.execute("begin")
+            migration(conn)
+            conn.execute(f"pragma user_version = {v}")
+            conn.commit()
+        except:
+            conn.rollback()
+            raise
+
+def _ensure_title_index(conn: sqlite3.Connection):
+    """
+    Create the full-text index over the note titles if it doesn't exist yet, kept up to date by triggers on notes.
+    The trigram tokenizer (SQLite >= 3.34) matches any substring, like the old like-queries did.
+    If it is not available, the title searches keep using like, and creating the index is tried again on the next start,
+    so it is picked up once Anki ships a newer SQLite.
+    The table and its triggers are only ever created together, in one transaction.
+    """
+    if conn.execute("select 1 from sqlite_master where type = 'table' and name = 'notes_fts'").fetchone() is not None:
+        return
+    # triggers left without their table would make every write to notes fail, so they go even if the table can't be created
+    for trigger in ["notes_fts_insert", "notes_fts_delete", "notes_fts_update"]:
+        conn.execute(f"drop trigger if exists {trigger}")
+    conn.commit()
+    try:
+        conn.execute("begin")
+        conn.execute("create virtual table notes_fts using fts5(title, content='notes', content_rowid='id', tokenize='trigram')")
+        conn.execute("""create trigger notes_fts_insert after insert on notes begin
+                            insert into notes_fts (rowid, title) values (new.id, new.title);
+                        end""")
+        conn.execute("""create trigger notes_fts_delete after delete on notes begin
+                            insert into notes_fts (notes_fts, rowid, title) values ('delete', old.id, old.title);
+                        end""")
+        conn.execute("""create trigger notes_fts_update after update of title on notes begin
+                            insert into notes_fts (notes_fts, rowid, title) values ('delete', old.id, old.title);
+                            insert into notes_fts (rowid, title) values (new.id, new.title);
+                        end""")
+        conn.execute("insert into notes_fts (notes_fts) values ('rebuild')")
+        conn.commit()
+    except sqlite3.OperationalError:
+        # no fts5 or no trigram tokenizer
+        conn.rollback()
 
+#endregion Schema migrations
 
 def create_note(title: str, text: str, source: str, tags: str, nid: int, reminder: str, queue_schedule: Optional[int], extract_start: Optional[int] = None, extract_end: Optional[int] = None) -> int:
 
@@ -234,11 +330,10 @@ def create_note(title: str, text: str, source: str, tags: str, nid: int, reminde
     else: 
         tags = ""
 
-    conn    = _get_connection()
-    id      = conn.execute("""insert into notes (title, text, source, tags, nid, created, modified, reminder, lastscheduled, position, extract_start, extract_end, delay)
+    with _transaction() as conn:
+        id  = conn.execute("""insert into notes (title, text, source, tags, nid, created, modified, reminder, lastscheduled, position, extract_start, extract_end, delay)
                 values (?,?,?,?,?,datetime('now', 'localtime'),"",?,"", NULL, ?, ?, NULL)""", (title, text, source, tags, nid, reminder, extract_start, extract_end)).lastrowid
-    conn.commit()
-    conn.close()
+        _set_note_tags(conn, id, tags)
     if queue_schedule is not None and queue_schedule != 0:
         update_priority_list(id, queue_schedule)
     index = get_index()
@@ -260,44 +355,32 @@ def update_priority_without_timestamp(nid_to_update: int, new_prio: int):
     This is useful to simply change the priority of a note in the queue without having it moved 
     at the end of the queue, which would happen if a new entry would be created (time delta would be 0 or very small).
     """
-    conn    = _get_connection()
-    res     = conn.execute(f"select rowid from queue_prio_log where nid = {nid_to_update} order by created desc limit 1").fetchone()
+    with _transaction() as conn:
+        res = conn.execute("select rowid from queue_prio_log where nid = ? order by created desc limit 1", (nid_to_update,)).fetchone()
 
-    if res is None or len(res) == 0:
-        created = _date_now_str()
-        conn.execute(f"insert into queue_prio_log (nid, prio, type, created) values ({nid_to_update}, {new_prio}, '', '{created}')")
-    else:
-        conn.execute(f"update queue_prio_log set prio = {new_prio} where rowid = {res[0]}")
-    conn.commit()
-    conn.close()
+        if res is None or len(res) == 0:
+            conn.execute("insert into queue_prio_log (nid, prio, type, created) values (?, ?, '', ?)", (nid_to_update, new_prio, _date_now_str()))
+        else:
+            conn.execute("update queue_prio_log set prio = ? where rowid = ?", (new_prio, res[0]))
 
 def add_to_prio_log(nid: int, prio: int):
-    created = _date_now_str()
-    conn    = _get_connection()
-    conn.execute(f"insert into queue_prio_log (nid, prio, type, created) values ({nid}, {prio}, '', '{created}')")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("insert into queue_prio_log (nid, prio, type, created) values (?, ?, '', ?)", (nid, prio, _date_now_str()))
 
 def remove_delay(nid: int):
     """ Clear the delay field for the given note. """
-    conn = _get_connection()
-    conn.execute(f"update notes set delay = NULL where id={nid}")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set delay = NULL where id = ?", (nid,))
 
 def set_delay(nid: int, delay: int):
     """ Update the delay field for the given note. """
-    conn = _get_connection()
-    conn.execute(f"update notes set delay = '{_date_now_str()}|{delay}' where id={nid}")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set delay = ? where id = ?", (f"{_date_now_str()}|{delay}", nid))
 
 def set_source(nid: int, source: str):
     """ Update the source field for the given note. """
-    conn = _get_connection()
-    conn.execute(f"update notes set source = ? where id={nid}", [source])
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set source = ? where id = ?", (source, nid))
 
 def update_priority_list(nid_to_update: int, schedule: int) -> Tuple[int, int]:
     """
@@ -315,106 +398,117 @@ def update_priority_list(nid_to_update: int, schedule: int) -> Tuple[int, int]:
     final_list              = []
     index                   = -1
     
-    current                 = _get_priority_list_with_last_prios()
-    scores                  = []
-    nid_was_included        = False
-    now                     = datetime.now()
+    # the queue is read in the same transaction that writes it, so a concurrent update can't be overwritten
+    with _transaction() as conn:
+        current                 = _get_priority_list_with_last_prios()
+        scores                  = []
+        nid_was_included        = False
+        now                     = datetime.now()
+        start                   = now
 
-    for nid, last_prio, last_prio_creation, current_position, rem, delay in current:
+        for nid, last_prio, last_prio_creation, current_position, rem, delay in current:
 
-        if last_prio is None:
-            if not _specific_schedule_is_due_today(rem):
-                continue
-            else:
-                last_prio           = 50
-                now                 += timedelta(seconds=1)
-                ds                  = now.strftime('%Y-%m-%d-%H-%M-%S')
-                last_prio_creation  = ds
+            if last_prio is None:
+                if not _specific_schedule_is_due_today(rem):
+                    continue
+                else:
+                    last_prio           = 50
+                    now                 += timedelta(seconds=1)
+                    ds                  = now.strftime('%Y-%m-%d-%H-%M-%S')
+                    last_prio_creation  = ds
 
-        # assert(current_position >= 0)
-        
-        if nid == nid_to_update:
-            nid_was_included    = True
-            if schedule == 0 or schedule is None:
-                # if not in queue, remove from log
-                to_remove_from_log.append(nid)
+            # assert(current_position >= 0)
+
+            if nid == nid_to_update:
+                nid_was_included    = True
+                if schedule == 0 or schedule is None:
+                    # if not in queue, remove from log
+                    to_remove_from_log.append(nid)
+                else:
+                    score = _calc_score(schedule, 0)
+                    now += timedelta(seconds=1)
+                    ds  = now.strftime('%Y-%m-%d-%H-%M-%S')
+                    if not nid in [x[0] for x in to_update_in_log]:
+                        to_update_in_log.append((nid, ds, schedule))
+                    scores.append((nid, ds, last_prio, score, rem, delay))
             else:
-                score = _calc_score(schedule, 0)
-                now += timedelta(seconds=1)
-                ds  = now.strftime('%Y-%m-%d-%H-%M-%S')
-                if not nid in [x[0] for x in to_update_in_log]:
-                    to_update_in_log.append((nid, ds, schedule))
-                scores.append((nid, ds, last_prio, score, rem, delay))
-        else:
-            days_delta = max(0, (datetime.now() - _dt_from_date_str(last_prio_creation)).total_seconds() / 86400.0)
-            # assert(days_delta >= 0)
-            # assert(days_delta < 10000)
-            score = _calc_score(last_prio, days_delta)
-            scores.append((nid, last_prio_creation, last_prio, score, rem, delay))
-    # note to be updated doesn't have to be in the results, it might not have been in the queue before
-    if not nid_was_included:
-        if schedule == 0:
-            to_remove_from_log.append(nid_to_update)
-        else:
-            now         += timedelta(seconds=1)
-            ds          = now.strftime('%Y-%m-%d-%H-%M-%S')
-            reminder    = get_reminder(nid_to_update)
-            scores.append((nid_to_update, ds, schedule, _calc_score(schedule, 0), reminder, None))
-            to_update_in_log.append((nid_to_update, ds, schedule))
-
-    sorted_by_scores    = sorted(scores, key=lambda x: x[3], reverse=True)
-    final_list          = [s for s in sorted_by_scores if s[4] is None or len(s[4].strip()) == 0 or not _specific_schedule_is_due_today(s[4])]
-    due_today           = [s for s in sorted_by_scores if s[4] is not None and len(s[4].strip()) > 0 and _specific_schedule_is_due_today(s[4])]
-
-    if len(due_today) > 0:
-        due_today   = sorted(due_today, key=lambda x : x[3], reverse=True)
-        final_list  = due_today + final_list
-
-    # account for delays
-    final_list = _apply_delays(final_list)     
-    
-    for ix, s in enumerate(final_list):
-        d = _delay(s[5])
-        if d > 0 and ix <= d + 1:
-            to_decrease_delay.append((s[0], d-1))
-
-    # assert(len(scores) == 0 or len(final_list)  >0)
-    # for s in scores:
-    #     assert(s[3] >= 0)
-    #     assert(s[1] is not None and len(s[1]) > 0)
-    # assert(len(final_list) == len(set([f[0] for f in final_list])))
-        
-    # assert((len(to_update_in_log) + len(to_remove_from_log)) > 0)
-
-    # update log and positions
-    conn                    = _get_connection()
-    conn.isolation_level    = None
-    c                       = conn.cursor()
-    c.execute("begin transaction")
-    c.execute(f"update notes set position = NULL where position is not NULL;")
-
-    for ix, f in enumerate(final_list):
-        c.execute(f"update notes set position = {ix} where id = {f[0]};")
-        if f[0] == nid_to_update:
-            index = ix
-
-    for nid in to_remove_from_log:
-        c.execute(f"delete from queue_prio_log where nid = {nid};")
-        #c.execute(f"update notes set reminder = '' where id = {nid};")
-
-    for nid, created, prio in to_update_in_log:
-        c.execute(f"insert into queue_prio_log (nid, prio, created) values ({nid}, {prio}, '{created}');")
-
-    for nid, new_delay in to_decrease_delay:
-        if new_delay <= 0:
-            c.execute(f"update notes set delay = NULL where id = {nid};")
-        else:
-            c.execute(f"update notes set delay = '{_date_now_str()}|{new_delay}' where id = {nid};")
-    c.execute("commit")
-    conn.close()
+                days_delta = max(0, (start - _dt_from_date_str(last_prio_creation)).total_seconds() / 86400.0)
+                # assert(days_delta >= 0)
+                # assert(days_delta < 10000)
+                score = _calc_score(last_prio, days_delta)
+                scores.append((nid, last_prio_creation, last_prio, score, rem, delay))
+        # note to be updated doesn't have to be in the results, it might not have been in the queue before
+        if not nid_was_included:
+            if schedule == 0:
+                to_remove_from_log.append(nid_to_update)
+            else:
+                now         += timedelta(seconds=1)
+                ds          = now.strftime('%Y-%m-%d-%H-%M-%S')
+                reminder    = get_reminder(nid_to_update)
+                scores.append((nid_to_update, ds, schedule, _calc_score(schedule, 0), reminder, None))
+                to_update_in_log.append((nid_to_update, ds, schedule))
+
+        final_list = _order_queue(scores)
+
+        # account for delays
+        final_list = _apply_delays(final_list)     
+
+        for ix, s in enumerate(final_list):
+            d = _delay(s[5])
+            if d > 0 and ix <= d + 1:
+                to_decrease_delay.append((s[0], d-1))
+
+        # assert(len(scores) == 0 or len(final_list)  >0)
+        # for s in scores:
+        #     assert(s[3] >= 0)
+        #     assert(s[1] is not None and len(s[1]) > 0)
+        # assert(len(final_list) == len(set([f[0] for f in final_list])))
+
+        # assert((len(to_update_in_log) + len(to_remove_from_log)) > 0)
+
+        for ix, f in enumerate(final_list):
+            if f[0] == nid_to_update:
+                index = ix
+                break
+
+        # update log and positions
+        _write_positions(conn, current, final_list)
+        conn.executemany("delete from queue_prio_log where nid = ?", [(nid,) for nid in to_remove_from_log])
+        conn.executemany("insert into queue_prio_log (nid, prio, created) values (?, ?, ?)", [(nid, prio, created) for nid, created, prio in to_update_in_log])
+        _write_delays(conn, to_decrease_delay)
     #return new position (0-based), and length of queue, some functions need that to update the ui
     return (index, len(final_list))
 
+def _order_queue(scores: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """
+    Sort the given (nid, last prio creation, last prio, score, reminder, delay) items by score, highest first.
+    Notes with a specific schedule that is due are placed at the front. The sort is stable, so ties keep their current order.
+    """
+    due     = []
+    rest    = []
+    for s in sorted(scores, key=lambda x: x[3], reverse=True):
+        if s[4] is not None and len(s[4].strip()) > 0 and _specific_schedule_is_due_today(s[4]):
+            due.append(s)
+        else:
+            rest.append(s)
+    return due + rest
+
+def _write_positions(c: sqlite3.Connection, current: List[Tuple[Any, ...]], final_list: List[Tuple[Any, ...]]):
+    """
+    Write the new queue order. current are the rows from _get_priority_list_with_last_prios (which contain the positions before the change),
+    only notes whose position changed are updated.
+    """
+    old = { r[0] : r[3] for r in current if r[3] is not None }
+    new = { f[0] : ix for ix, f in enumerate(final_list) }
+    c.executemany("update notes set position = NULL where id = ?", [(nid,) for nid in old if nid not in new])
+    c.executemany("update notes set position = ? where id = ?", [(ix, nid) for nid, ix in new.items() if old.get(nid) != ix])
+
+def _write_delays(c: sqlite3.Connection, delays: List[Tuple[int, int]]):
+    """ Set the remaining delay of the given (nid, delay) pairs, a delay <= 0 clears the field. """
+    now = _date_now_str()
+    c.executemany("update notes set delay = NULL where id = ?", [(nid,) for nid, d in delays if d <= 0])
+    c.executemany("update notes set delay = ? where id = ?", [(f"{now}|{d}", nid) for nid, d in delays if d > 0])
+
 def _apply_delays(schedule_list: List[Tuple[Any]]):
     """ Modify the queue order by moving back notes that have a delay set. """
     updated_list        = []
@@ -436,37 +530,29 @@ def _calc_score(priority: int, days_delta: float) -> float:
         return PRIORITY_SCALE_FACTOR * days_delta + PRIORITY_MOD * prio_score
 
 def get_reminder(nid: int) -> str:
-    conn    = _get_connection()
-    res     = conn.execute(f"select reminder from notes where id = {nid} limit 1").fetchone()
+    res = _get_connection().execute("select reminder from notes where id = ? limit 1", (nid,)).fetchone()
     if res is None:
         return None
-    conn.close()
     return res[0]
 
 def get_priority(nid: int) -> Optional[int]:
-    conn    = _get_connection()
-    res     = conn.execute(f"select prio from queue_prio_log where nid = {nid} order by created desc limit 1").fetchone()
+    res = _get_connection().execute("select prio from queue_prio_log where nid = ? order by created desc limit 1", (nid,)).fetchone()
     if res is None or len(res) == 0:
         return None
-    conn.close()
     return res[0]
 
 def get_priorities(nids: List[int]) -> Dict[int, int]:
     d = dict()
     if nids is None or len(nids) == 0:
         return d
-    nid_str = ",".join([str(nid) for nid in nids])
     conn    = _get_connection()
-    res     = conn.execute(f"select nid, prio, max(created) from queue_prio_log where nid in ({nid_str}) group by nid").fetchall()
-    conn.close()
-    for r in res:
-        d[r[0]] = r[1]
+    for chunk in _chunks([int(nid) for nid in nids]):
+        for r in conn.execute(f"select nid, prio, max(created) from queue_prio_log where nid in ({_placeholders(chunk)}) group by nid", chunk):
+            d[r[0]] = r[1]
     return d
 
 def get_avg_priority() -> float:
-    conn    = _get_connection()
-    res     = conn.execute(f"select avg(prio) from (select prio, max(created) from queue_prio_log group by nid)").fetchone()
-    conn.close()
+    res     = _get_connection().execute("select avg(prio) from (select prio, max(created) from queue_prio_log group by nid)").fetchone()
     if res is None or len(res) == 0:
         return 0
     if res[0] is None:
@@ -476,9 +562,7 @@ def get_avg_priority() -> float:
 
 def get_priority_as_str(nid: int) -> str:
     """ Get a str representation of the priority of the given note, e.g. 'Very high' """
-    conn    = _get_connection()
-    res     = conn.execute(f"select prio from queue_prio_log where nid = {nid} order by created desc limit 1").fetchone()
-    conn.close()
+    res     = _get_connection().execute("select prio from queue_prio_log where nid = ? order by created desc limit 1", (nid,)).fetchone()
     if res is None or len(res) == 0:
         return "No priority yet"
     return dynamic_sched_to_str(res[0])
@@ -500,11 +584,8 @@ def dynamic_sched_to_str(sched: int) -> str:
 def update_reminder(nid: int, rem: str):
     if rem is None:
         rem = ""
-    conn    = _get_connection()
-    sql     = "update notes set reminder=?, modified=datetime('now', 'localtime') where id=? "
-    conn.execute(sql, (rem, nid))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set reminder=?, modified=datetime('now', 'localtime') where id=? ", (rem, nid))
         
 def recalculate_priority_queue(is_addon_start: bool = False):
     """
@@ -512,15 +593,13 @@ def recalculate_priority_queue(is_addon_start: bool = False):
         priority log. Has to be done at least once on startup to incorporate the changed difference in days.
     """
 
-    for i in range(0,2):
+    # the queue is read in the same transaction that writes it, so a concurrent update can't be overwritten
+    with _transaction() as conn:
         current             = _get_priority_list_with_last_prios()
         scores              = []
-        to_update_in_log    = []
-        to_remove_schedules = []
         to_decrease_delay   = []
-        to_reschedule       = []
         now                 = datetime.now()
-        
+        start               = now
 
         for nid, last_prio, last_prio_creation, current_position, reminder, delay in current:
 
@@ -528,205 +607,141 @@ def recalculate_priority_queue(is_addon_start: bool = False):
                 if not _specific_schedule_is_due_today(reminder):
                     continue
                 else:
-                    last_prio = 50
+                    last_prio           = 50
                     now                 += timedelta(seconds=1)
                     ds                  = now.strftime('%Y-%m-%d-%H-%M-%S')
                     last_prio_creation  = ds
 
-                # # lazy solution: set to average priority
-                # last_prio           = 50
-                # now                 += timedelta(seconds=1)
-                # ds                  = now.strftime('%Y-%m-%d-%H-%M-%S')
-                # last_prio_creation  = ds
-                # to_update_in_log.append((nid, ds, last_prio))
-
-                
             # assert(current_position >= 0)
-            days_delta = max(0, (datetime.now() - _dt_from_date_str(last_prio_creation)).total_seconds() / 86400.0)
-            
+            days_delta = max(0, (start - _dt_from_date_str(last_prio_creation)).total_seconds() / 86400.0)
+
             # assert(days_delta >= 0)
             # assert(days_delta < 10000)
             score = _calc_score(last_prio, days_delta)
             scores.append((nid, last_prio_creation, last_prio, score, reminder, delay))
-        sorted_by_scores    = sorted(scores, key=lambda x: x[3], reverse=True)
-        final_list          = [s for s in sorted_by_scores if s[4] is None or len(s[4].strip()) == 0 or not _specific_schedule_is_due_today(s[4])]
-        due_today           = [s for s in sorted_by_scores if s[4] is not None and len(s[4].strip()) > 0 and _specific_schedule_is_due_today(s[4])]
-        if len(due_today) > 0:
-            due_today   = sorted(due_today, key=lambda x : x[3], reverse=True)
-            final_list  = due_today + final_list
-        
 
-        if i == 1:
-            # account for delays
-            if is_addon_start:
-                for ix in range(0, len(final_list)):
-                    f = final_list[ix]
-                    if f[5] is not None and len(f[5]) > 0 and not utility.date.date_is_today(f[5].split("|")[0]):
-                        f = list(f)
-                        f[5] = f[5].split("|")[0]  + "|0"
-                        f = tuple(f)
-                        final_list[ix] = f
-                        
-            final_list = _apply_delays(final_list)
-            
-            for ix, x in enumerate(final_list):
-                if ix < _delay(x[5]):
-                    to_decrease_delay.append((x[0], ix))
-                elif _delay(x[5]) <= 0:
-                    to_decrease_delay.append((x[0], 0))
-        
+        final_list = _order_queue(scores)
+
+        # account for delays
+        if is_addon_start:
+            for ix in range(0, len(final_list)):
+                f = final_list[ix]
+                if f[5] is not None and len(f[5]) > 0 and not utility.date.date_is_today(f[5].split("|")[0]):
+                    f = list(f)
+                    f[5] = f[5].split("|")[0]  + "|0"
+                    f = tuple(f)
+                    final_list[ix] = f
+
+        final_list = _apply_delays(final_list)
+
+        for ix, x in enumerate(final_list):
+            if ix < _delay(x[5]):
+                to_decrease_delay.append((x[0], ix))
+            elif _delay(x[5]) <= 0 and x[5] is not None:
+                to_decrease_delay.append((x[0], 0))
+
         # assert(len(scores) == 0 or len(final_list)  >0)
-        # for s in scores:
-            # assert(s[3] >= 0)
-            # assert(s[1] is not None and len(s[1]) > 0)
         # assert(len(final_list) == len(set([f[0] for f in final_list])))
-        conn    = _get_connection()
-        c       = conn.cursor()
-        c.execute(f"update notes set position = NULL where position is not NULL;")
-        for ix, f in enumerate(final_list):
-            c.execute(f"update notes set position = {ix} where id = {f[0]};")
-        for nid, created, prio in to_update_in_log:
-            c.execute(f"insert into queue_prio_log (nid, prio, created) values ({nid}, {prio}, '{created}');")
-        for nid in to_remove_schedules:
-            c.execute(f"update notes set reminder = '' where id = {nid};")
-        for nid, new_rem in to_reschedule:
-            c.execute(f"update notes set reminder = '{new_rem}' where id = {nid};")
-        for nid, new_delay in to_decrease_delay:
-            if new_delay <= 0:
-                c.execute(f"update notes set delay = NULL where id = {nid};")
-            else:
-                c.execute(f"update notes set delay = '{_date_now_str()}|{new_delay}' where id = {nid};")
-        conn.commit()
-        conn.close()
+        _write_positions(conn, current, final_list)
+        _write_delays(conn, to_decrease_delay)
 
 
 def find_notes_with_similar_prio(nid_excluded: int, prio: int) -> List[Tuple[int, int, str]]:
     conn = _get_connection()
     if nid_excluded is not None:
-        res = conn.execute(f"select p.prio, notes.id, notes.title from (select nid, prio from (select distinct nid, prio from queue_prio_log group by nid order by max(created) desc) order by abs(prio - {prio}) asc limit 10) as p join notes on p.nid = notes.id where notes.id != {nid_excluded} order by p.prio desc").fetchall()
+        res = conn.execute("select p.prio, notes.id, notes.title from (select nid, prio from (select distinct nid, prio from queue_prio_log group by nid order by max(created) desc) order by abs(prio - ?) asc limit 10) as p join notes on p.nid = notes.id where notes.id != ? order by p.prio desc", (prio, nid_excluded)).fetchall()
     else:
-        res = conn.execute(f"select p.prio, notes.id, notes.title from (select nid, prio from (select distinct nid, prio from queue_prio_log group by nid order by max(created) desc) order by abs(prio - {prio}) asc limit 10) as p join notes on p.nid = notes.id order by p.prio desc").fetchall()
-    conn.close()
+        res = conn.execute("select p.prio, notes.id, notes.title from (select nid, prio from (select distinct nid, prio from queue_prio_log group by nid order by max(created) desc) order by abs(prio - ?) asc limit 10) as p join notes on p.nid = notes.id order by p.prio desc", (prio,)).fetchall()
     return res
 
 def get_notes_scheduled_for_today() -> List[SiacNote]:
     today_dt = _date_now_str()[:4] + _date_now_str()[5:7] + _date_now_str()[8:10]
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where position is not null and reminder like '%|%' and cast((substr(reminder, 21, 4) || substr(reminder, 26,2) || substr(reminder, 29,2)) as integer) <= {today_dt}").fetchall()
-    conn.close()
+    res = _get_connection().execute("select * from notes where position is not null and reminder like '%|%' and cast((substr(reminder, 21, 4) || substr(reminder, 26,2) || substr(reminder, 29,2)) as integer) <= ?", (int(today_dt),)).fetchall()
     return _to_notes(res)
 
 def get_last_done_notes() -> List[SiacNote]:
-    conn = _get_connection()
-    res = conn.execute("select notes.* from (select distinct nid from queue_prio_log group by nid order by max(created) desc) as p join notes on p.nid = notes.id").fetchall()
-    conn.close()
+    res = _get_connection().execute("select notes.* from (select distinct nid from queue_prio_log group by nid order by max(created) desc) as p join notes on p.nid = notes.id").fetchall()
     return _to_notes(res)
 
 
 def link_note_and_page(siac_nid: int, anki_nid: int, page: int):
-    conn = _get_connection()
-    conn.execute(f"insert into notes_pdf_page (nid, siac_nid, page, type, data, created) values ({anki_nid}, {siac_nid}, {page}, 1, '', '{_date_now_str()}')")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("insert into notes_pdf_page (nid, siac_nid, page, type, data, created) values (?, ?, ?, 1, '', ?)", (anki_nid, siac_nid, page, _date_now_str()))
 
 def mark_page_as_read(nid: int, page: int, pages_total: int):
     now = _date_now_str()
-    conn = _get_connection()
-    conn.execute("insert or ignore into read (page, nid) values (%s, %s)" % (page, nid))
-    conn.execute("update read set created = '%s', pagestotal = %s where page = %s and nid = %s" % (now, pages_total, page, nid))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("insert or ignore into read (page, nid) values (?, ?)", (page, nid))
+        conn.execute("update read set created = ?, pagestotal = ? where page = ? and nid = ?", (now, pages_total, page, nid))
 
 def mark_page_as_unread(nid: int, page: int):
-    conn = _get_connection()
-    conn.execute("delete from read where nid = %s and page = %s" % (nid, page))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from read where nid = ? and page = ?", (nid, page))
 
 def mark_range_as_read(nid: int, start: int, end: int, pages_total: int):
     now = _date_now_str()
-    conn = _get_connection()
-    res = conn.execute(f"select page from read where nid={nid} and page > -1").fetchall()
-    res = [r[0] for r in res]
-    to_insert = []
-    for p in range(start, end+1):
-        if not p in res:
-            to_insert.append((nid, p, now, pages_total))  
-    conn.executemany("insert into read (nid, page, created, pagestotal) values (?,?,?,?)", to_insert)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        res = conn.execute("select page from read where nid = ? and page > -1", (nid,)).fetchall()
+        res = set([r[0] for r in res])
+        to_insert = []
+        for p in range(start, end+1):
+            if not p in res:
+                to_insert.append((nid, p, now, pages_total))  
+        conn.executemany("insert into read (nid, page, created, pagestotal) values (?,?,?,?)", to_insert)
 
 def create_pdf_mark(nid: int, page: int, pages_total: int, mark_type: int):
     now = _date_now_str()
-    conn = _get_connection()
-    conn.execute("delete from marks where nid = %s and page = %s and marktype = %s" % (nid, page, mark_type))
-    conn.execute("insert into marks (page, nid, pagestotal, created, marktype) values (?, ?, ?, ?, ?)", (page, nid, pages_total, now, mark_type))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from marks where nid = ? and page = ? and marktype = ?", (nid, page, mark_type))
+        conn.execute("insert into marks (page, nid, pagestotal, created, marktype) values (?, ?, ?, ?, ?)", (page, nid, pages_total, now, mark_type))
 
 def toggle_pdf_mark(nid: int, page: int, pages_total: int, mark_type: int) -> List[Tuple[Any, ...]]:
-    conn = _get_connection()
-    if conn.execute("select nid from marks where nid = %s and page = %s and marktype = %s" % (nid, page, mark_type)).fetchone() is not None:
-        conn.execute("delete from marks where nid = %s and page = %s and marktype = %s" % (nid, page, mark_type))
-    else:
-        now = datetime.today().strftime('%Y-%m-%d-%H-%M-%S')
-        conn.execute("insert into marks (page, nid, pagestotal, created, marktype) values (?, ?, ?, ?, ?)", (page, nid, pages_total, now, mark_type))
-    res = conn.execute("select * from marks where nid = %s" % nid).fetchall()
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        if conn.execute("select nid from marks where nid = ? and page = ? and marktype = ?", (nid, page, mark_type)).fetchone() is not None:
+            conn.execute("delete from marks where nid = ? and page = ? and marktype = ?", (nid, page, mark_type))
+        else:
+            now = datetime.today().strftime('%Y-%m-%d-%H-%M-%S')
+            conn.execute("insert into marks (page, nid, pagestotal, created, marktype) values (?, ?, ?, ?, ?)", (page, nid, pages_total, now, mark_type))
+        res = conn.execute("select * from marks where nid = ?", (nid,)).fetchall()
     return res 
 
 def delete_pdf_mark(nid: int, page: int, mark_type: int):
-    conn = _get_connection()
-    conn.execute("delete from marks where nid = %s and page %s and marktype = %s" % (nid, page, mark_type))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from marks where nid = ? and page = ? and marktype = ?", (nid, page, mark_type))
 
 def get_pdf_marks(nid: int) -> List[Tuple[Any, ...]]:
-    conn = _get_connection()
-    res = conn.execute("select * from marks where nid = %s" % nid).fetchall()
-    conn.close()
+    res = _get_connection().execute("select * from marks where nid = ?", (nid,)).fetchall()
     return res
 
 def get_pdfs_by_sources(sources: List[str]) -> List[str]:
     """
     Takes a list of (full) paths, and gives back those for whom a pdf note exists with the given path.
     """
-    src_str = "','".join([s.replace("'", "''") for s in sources])
-    conn = _get_connection()
-    res = conn.execute(f"select source from notes where source in ('{src_str}')").fetchall()
-    conn.close()
+    if len(sources) == 0:
+        return []
+    conn    = _get_connection()
+    res     = []
+    for chunk in _chunks(list(sources)):
+        res     += conn.execute(f"select source from notes where source in ({_placeholders(chunk)})", chunk).fetchall()
     return [r[0] for r in res]
 
 def get_pdf_id_for_source(source: str) -> int:
     """
     Takes a source and returns the id of the first note with the given source, if existing, else -1
     """
-    conn = _get_connection()
-    res = conn.execute(f"select id from notes where source = ?", (source,)).fetchone()
-    conn.close()
+    res = _get_connection().execute("select id from notes where source = ?", (source,)).fetchone()
     return -1 if res is None or len(res) == 0 else res[0]
 
 def get_unqueued_notes_for_tag(tag: str) -> List[SiacNote]:
     if len(tag.strip()) == 0:
         return []
-    query = ""
-    for t in tag.split(" "):
-        if len(t) > 0:
-            t = t.replace("'", "''")
-            if len(query) > 6:
-                query += " or "
-            query = f"{query}lower(tags) like '% {t} %' or lower(tags) like '% {t}::%' or lower(tags) like '%::{t} %' or lower(tags) like '{t} %' or lower(tags) like '%::{t}::%'"
-    conn = _get_connection()
-    res = conn.execute("select * from notes where (%s) and position is null order by id desc" %(query)).fetchall()
-    conn.close()
+    query, args = _tag_query(tag)
+    res = _get_connection().execute(f"select * from notes where id in ({query}) and position is null order by id desc", args).fetchall()
     return _to_notes(res)
 
 def get_read_pages(nid: int) -> List[int]:
     """ Get read pages for the given note as list. """
-    conn = _get_connection()
-    res = conn.execute("select page from read where nid = %s and page > -1 order by created asc" % nid).fetchall()
-    conn.close()
+    res = _get_connection().execute("select page from read where nid = ? and page > -1 order by created asc", (nid,)).fetchall()
     if res is None:
         return []
     return [r[0] for r in res]
@@ -734,9 +749,7 @@ def get_read_pages(nid: int) -> List[int]:
 def get_read(delta_days: int) -> Dict[int, Tuple[int, str]]:
     """ Get # of read pages by note ID. """
     stamp = utility.date.date_x_days_ago_stamp(abs(delta_days))
-    conn = _get_connection()
-    res  = conn.execute(f"select counts.c, counts.nid, notes.title from notes join (select count(*) as c, nid from read where page > -1 and created like '{stamp}%' group by nid) as counts on notes.id = counts.nid").fetchall()
-    conn.close()
+    res  = _get_connection().execute("select counts.c, counts.nid, notes.title from notes join (select count(*) as c, nid from read where page > -1 and created like ? group by nid) as counts on notes.id = counts.nid", (f"{stamp}%",)).fetchall()
     d = dict()
     for c, nid, title in res:
         d[nid] = (c, title)
@@ -745,9 +758,7 @@ def get_read(delta_days: int) -> Dict[int, Tuple[int, str]]:
 def get_read_last_n_days(delta_days: int) -> Dict[int, Tuple[int, str]]:
     """ Get # of read pages by note ID for the last n days. """
     stamp = utility.date.date_x_days_ago_stamp(abs(delta_days))
-    conn = _get_connection()
-    res  = conn.execute(f"select counts.c, counts.nid, notes.title from notes join (select count(*) as c, nid from read where page > -1 and created >= '{stamp}' group by nid) as counts on notes.id = counts.nid").fetchall()
-    conn.close()
+    res  = _get_connection().execute("select counts.c, counts.nid, notes.title from notes join (select count(*) as c, nid from read where page > -1 and created >= ? group by nid) as counts on notes.id = counts.nid", (stamp,)).fetchall()
     d = dict()
     for c, nid, title in res:
         d[nid] = (c, title)
@@ -756,9 +767,7 @@ def get_read_last_n_days(delta_days: int) -> Dict[int, Tuple[int, str]]:
 def get_read_last_n_days_by_day(delta_days: int) -> Dict[str, int]:
     """ Get # of read pages by dates. """
     stamp   = utility.date.date_x_days_ago_stamp(abs(delta_days))
-    conn    = _get_connection()
-    res     = conn.execute(f"select count(*) as c, substr(created, 0, 11) as date from read where page > -1 and created >= '{stamp}' group by substr(created, 0, 11)").fetchall()
-    conn.close()
+    res     = _get_connection().execute("select count(*) as c, substr(created, 0, 11) as date from read where page > -1 and created >= ? group by substr(created, 0, 11)", (stamp,)).fetchall()
     d       = dict()
     for c, dt in res:
         d[dt] = c
@@ -767,9 +776,7 @@ def get_read_last_n_days_by_day(delta_days: int) -> Dict[str, int]:
 def get_notes_by_future_due_date() -> Dict[str, List[SiacNote]]:
     """ Get notes that have a schedule due in the future. """
 
-    conn    = _get_connection()
-    res     = conn.execute(f"select * from notes where substr(reminder, 21, 10) >= '{utility.date.date_only_stamp()}'").fetchall()
-    conn.close()
+    res     = _get_connection().execute("select * from notes where substr(reminder, 21, 10) >= ?", (utility.date.date_only_stamp(),)).fetchall()
     res     = _to_notes(res)
     d = dict()
     for n in res:
@@ -783,9 +790,7 @@ def get_note_tree_data() -> Dict[str, List[Tuple[int, str]]]:
     """
         Fills a map with the data for the QTreeWidget in the Create dialog.
     """
-    conn                    = _get_connection()
-    last_created            = conn.execute("select id, title, created from notes order by datetime(created, 'localtime') desc limit 500").fetchall()
-    conn.close()
+    last_created            = _get_connection().execute("select id, title, created from notes order by datetime(created, 'localtime') desc limit 500").fetchall()
     n_map                   = {}
     now                     = datetime.now()
     seconds_since_midnight  = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
@@ -812,14 +817,28 @@ def get_all_notes() -> List[Tuple[Any, ...]]:
     """ Fetch all add-on notes, used in indexing. """
     conn = _get_connection()
     res = list(conn.execute("select * from notes"))
-    conn.close()
     return res
 
+def get_notes_after(last_id: int, limit: int) -> List[Tuple[Any, ...]]:
+    """ Fetch up to limit add-on notes with an id greater than last_id, ordered by id, used in indexing. """
+    conn = _get_connection()
+    res = conn.execute("select * from notes where id > ? order by id limit ?", (last_id, limit)).fetchall()
+    return res
+
+def get_all_notes_mod() -> List[Tuple[int, str, str]]:
+    """ Fetch (id, created, modified) for all add-on notes, used to sync the index. """
+    conn = _get_connection()
+    res = list(conn.execute("select id, created, modified from notes"))
+    return res
+
+def get_note_mod(id: int) -> Optional[Tuple[str, str]]:
+    """ Fetch (created, modified) for a single add-on note, see get_all_notes_mod. """
+    return _get_connection().execute("select created, modified from notes where id = ?", (id,)).fetchone()
+
 def get_total_notes_count() -> int:
     """ Returns the number of notes in the add-on's database. """
     conn    = _get_connection()
     c       = conn.execute("select count(*) from notes").fetchone()
-    conn.close()
     if c is None or len(c) == 0:
         return 0
     if c[0] is None:
@@ -830,19 +849,15 @@ def get_total_notes_count() -> int:
 def get_untagged_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where tags is null or trim(tags) = ''").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_note(id: int) -> SiacNote:
-    conn = _get_connection()
-    res = conn.execute("select * from notes where id=" + str(id)).fetchone()
-    conn.close()
+    res = _get_connection().execute("select * from notes where id = ?", (id,)).fetchone()
     return _to_notes([res])[0]
 
 def get_random_id_from_queue() -> int:
     conn = _get_connection()
     res = conn.execute("select id from notes where position >= 0 order by random() limit 1").fetchone()
-    conn.close()
     if res is None or len(res) == 0:
         return -1
     return res[0]
@@ -850,7 +865,6 @@ def get_random_id_from_queue() -> int:
 def get_random_id() -> int:
     conn = _get_connection()
     res = conn.execute("select id from notes order by random() limit 1").fetchone()
-    conn.close()
     if res is None or len(res) == 0:
         return -1
     return res[0]
@@ -858,21 +872,18 @@ def get_random_id() -> int:
 def get_head_of_queue() -> int:
     conn = _get_connection()
     res = conn.execute("select id from notes where position >= 0 order by position asc limit 1").fetchone()
-    conn.close()
     if res is None or len(res) == 0:
         return -1
     return res[0]
 
 def update_note_text(id: int, text: str):
-    conn = _get_connection()
     sql = """
         update notes set text=?, modified=datetime('now', 'localtime') where id=?
     """
     text = utility.text.clean_user_note_text(text)
-    conn.execute(sql, (text, id))
-    conn.commit()
-    note = conn.execute(f"select title, source, tags from notes where id={id}").fetchone()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(sql, (text, id))
+        note = conn.execute("select title, source, tags from notes where id = ?", (id,)).fetchone()
     index = get_index()
     if index is not None:
         index.update_user_note((id, note[0], text, note[1], note[2], -1, ""))
@@ -882,12 +893,11 @@ def update_note_tags(id: int, tags: str):
         tags += " "
     if not tags.startswith(" "):
         tags = f" {tags}"
-    conn = _get_connection()
     sql = """ update notes set tags=?, modified=datetime('now', 'localtime') where id=? """
-    conn.execute(sql, (tags, id))
-    conn.commit()
-    note = conn.execute(f"select title, source, tags, text from notes where id={id}").fetchone()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(sql, (tags, id))
+        _set_note_tags(conn, id, tags)
+        note = conn.execute("select title, source, tags, text from notes where id = ?", (id,)).fetchone()
     index = get_index()
     if index is not None:
         index.update_user_note((id, note[0], note[3], note[1], tags, -1, ""))
@@ -897,11 +907,10 @@ def update_note(id: int, title: str, text: str, source: str, tags: str, reminder
     # text = utility.text.clean_user_note_text(text)
     tags = " %s " % tags.strip()
     mod = _date_now_str()
-    sql = f"update notes set title=?, text=?, source=?, tags=?, modified='{mod}', reminder=? where id=?"
-    conn = _get_connection()
-    conn.execute(sql, (title, text, source, tags, reminder, id))
-    conn.commit()
-    conn.close()
+    sql = "update notes set title=?, text=?, source=?, tags=?, modified=?, reminder=? where id=?"
+    with _transaction() as conn:
+        conn.execute(sql, (title, text, source, tags, mod, reminder, id))
+        _set_note_tags(conn, id, tags)
     # a prio of -1 means unchanged, so don't update
     if priority != -1:
         update_priority_list(id, priority)
@@ -911,13 +920,12 @@ def update_note(id: int, title: str, text: str, source: str, tags: str, reminder
 
 def get_read_stats(nid: int) -> Tuple[Any, ...]:
     conn = _get_connection()
-    res = conn.execute("select count(*), max(created), pagestotal from read where page > -1 and nid = %s" % nid).fetchall()
+    res = conn.execute("select count(*), max(created), pagestotal from read where page > -1 and nid = ?", (nid,)).fetchall()
     res = res[0]
     if res[2] is None:
-        r = conn.execute("select pagestotal from read where page = -1 and nid = %s" % nid).fetchone()
+        r = conn.execute("select pagestotal from read where page = -1 and nid = ?", (nid,)).fetchone()
         if r is not None:
             res = (0, "", r[0])
-    conn.close()
     return res
 
 #
@@ -930,35 +938,24 @@ def insert_highlights(highlights: List[Tuple[Any, ...]]):
     """
     dt = _date_now_str()
     highlights = [h + (dt,) for h in highlights]
-    conn = _get_connection()
-
-    res = conn.executemany("insert into highlights(nid, page, grouping, type, text, x0, y0, x1, y1, created) values (?,?,?,?,?,?,?,?,?,?)", highlights)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.executemany("insert into highlights(nid, page, grouping, type, text, x0, y0, x1, y1, created) values (?,?,?,?,?,?,?,?,?,?)", highlights)
 
 def delete_highlight(id: int):
-    conn = _get_connection()
-    conn.execute(f"delete from highlights where rowid = {id}")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from highlights where rowid = ?", (id,))
 
 def get_highlights(nid: int, page: int) -> List[Tuple[Any, ...]]:
-    conn = _get_connection()
-    res = conn.execute(f"select rowid, * from highlights where nid = {nid} and page = {page}").fetchall()
-    conn.close()
+    res = _get_connection().execute("select rowid, * from highlights where nid = ? and page = ?", (nid, page)).fetchall()
     return res
 
 def update_text_comment_coords(id: int, x0: float, y0: float, x1: float, y1: float):
-    conn = _get_connection()
-    conn.execute(f"update highlights set x0 = {x0}, y0 = {y0}, x1 = {x1}, y1 = {y1} where rowid = {id}")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update highlights set x0 = ?, y0 = ?, x1 = ?, y1 = ? where rowid = ?", (x0, y0, x1, y1, id))
 
 def update_text_comment_text(id: int, text: str):
-    conn = _get_connection()
-    conn.execute("update highlights set text = ? where rowid = ?", (text, id))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update highlights set text = ? where rowid = ?", (text, id))
 
 
 #
@@ -970,16 +967,8 @@ def get_all_tags() -> Set[str]:
     """
         Returns a set containing all tags (str) that appear in the user's notes.
     """
-    conn = _get_connection()
-    all_tags = conn.execute("select tags from notes where tags is not null").fetchall()
-    conn.close()
-    tag_set = set()
-    for tag_str in all_tags:
-        for t in tag_str[0].split():
-            if len(t) > 0:
-                if t not in tag_set:
-                    tag_set.add(t)
-    return tag_set
+    res = _get_connection().execute("select distinct tag from note_tags where depth = 0").fetchall()
+    return set([r[0] for r in res])
 
 def find_by_tag(tag_str, to_output_list=True):
     if len(tag_str.strip()) == 0:
@@ -989,16 +978,8 @@ def find_by_tag(tag_str, to_output_list=True):
     if index is not None:
         pinned = index.pinned
     
-    query = "where "
-    for t in tag_str.split(" "):
-        if len(t) > 0:
-            t = t.replace("'", "''")
-            if len(query) > 6:
-                query += " or "
-            query = f"{query}lower(tags) like '% {t} %' or lower(tags) like '% {t}::%' or lower(tags) like '%::{t} %' or lower(tags) like '{t} %' or lower(tags) like '%::{t}::%'"
-    conn = _get_connection()
-    res = conn.execute("select * from notes %s order by id desc" %(query)).fetchall()
-    conn.close()
+    query, args = _tag_query(tag_str)
+    res = _get_connection().execute(f"select * from notes where id in ({query}) order by id desc", args).fetchall()
     if not to_output_list:
         return res
     return _to_notes(res, pinned)
@@ -1008,76 +989,36 @@ def find_by_text(text: str):
     index.search(text, [])
 
 def find_notes(text: str) -> List[SiacNote]:
-    q = ""
-    for token in text.lower().split():
-        if len(token) > 1:
-            token = token.replace("'", "")
-            q = f"{q} or lower(title) like '%{token}%'"
-    q = q[4:] if len(q) > 0 else "" 
-    if len(q) == 0:
-        return
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where ({q}) order by id desc").fetchall()
-    conn.close()
-    return _to_notes(res)
+    return _find_by_title(text, min_len = 2)
 
 def find_pdf_notes_by_title(text: str) -> List[SiacNote]:
-    q = ""
-    for token in text.lower().split():
-        if len(token) > 0:
-            q = f"{q} or lower(title) like '%{token}%'"
-
-    q = q[4:] if len(q) > 0 else "" 
-    if len(q) == 0:
-        return
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where ({q}) and lower(source) like '%.pdf' order by id desc").fetchall()
-    conn.close()
-    return _to_notes(res)
+    return _find_by_title(text, "lower(source) like '%.pdf'")
 
 def find_unqueued_pdf_notes(text: str) -> Optional[List[SiacNote]]:
-    q = ""
-    for token in text.lower().split():
-        token = token.replace("'", "")
-        if len(token) > 0:
-            q = f"{q} or lower(title) like '%{token}%'"
-
-    q = q[4:] if len(q) > 0 else "" 
-    if len(q) == 0:
-        return
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where ({q}) and lower(source) like '%.pdf' and (position is null or position < 0) order by id desc").fetchall()
-    conn.close()
-    return _to_notes(res)
+    return _find_by_title(text, "lower(source) like '%.pdf' and (position is null or position < 0)")
 
 def find_unqueued_text_notes(text: str) -> Optional[List[SiacNote]]:
-    q = ""
-    for token in text.lower().split():
-        token = token.replace("'", "")
-        if len(token) > 0:
-            q = f"{q} or lower(title) like '%{token}%'"
-
-    q = q[4:] if len(q) > 0 else "" 
-    if len(q) == 0:
-        return
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where ({q}) and not lower(source) like '%.pdf' and not lower(source) like '%youtube.com/watch%' and (position is null or position < 0) order by id desc").fetchall()
-    conn.close()
-    return _to_notes(res)
+    return _find_by_title(text, "not lower(source) like '%.pdf' and not lower(source) like '%youtube.com/watch%' and (position is null or position < 0)")
 
 def find_unqueued_video_notes(text: str) -> Optional[List[SiacNote]]:
-    q = ""
-    for token in text.lower().split():
-        token = token.replace("'", "")
-        if len(token) > 0:
-            q = f"{q} or lower(title) like '%{token}%'"
+    return _find_by_title(text, "lower(source) like '%youtube.com/watch%' and (position is null or position < 0)")
 
-    q = q[4:] if len(q) > 0 else "" 
+def _find_by_title(text: str, where: str = "1", min_len: int = 1) -> Optional[List[SiacNote]]:
+    """
+    Notes whose title contains any of the words in text (and that match the where clause), best matches first.
+    Returns None if text contains no word of at least min_len characters.
+    """
+    match = _title_match(text, min_len)
+    if match is not None:
+        res = _get_connection().execute(f"""select notes.* from notes_fts join notes on notes.id = notes_fts.rowid
+                                            where notes_fts match ? and {where} order by notes_fts.rank limit ?""", (match, TITLE_SEARCH_LIMIT)).fetchall()
+        return _to_notes(res)
+
+    # no full-text index, or words it can't match
+    q, args = _title_query(text, min_len)
     if len(q) == 0:
         return
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where ({q}) and lower(source) like '%youtube.com/watch%' and (position is null or position < 0) order by id desc").fetchall()
-    conn.close()
+    res = _get_connection().execute(f"select * from notes where ({q}) and {where} order by id desc limit ?", args + [TITLE_SEARCH_LIMIT]).fetchall()
     return _to_notes(res)
 
 def get_most_used_pdf_folders() -> List[str]:
@@ -1087,40 +1028,31 @@ def get_most_used_pdf_folders() -> List[str]:
     """
     conn = _get_connection()
     res = conn.execute(sql).fetchall()
-    conn.close()
     return [r[0] for r in res]
 
 def get_position(nid: int) -> Optional[int]:
-    conn = _get_connection()
-    res = conn.execute("select position from notes where id = %s" % nid).fetchone()
-    conn.close()
+    res = _get_connection().execute("select position from notes where id = ?", (nid,)).fetchone()
     if res is None or res[0] is None:
         return None 
     return res[0]
 
 def null_position(nid: int):
-    conn = _get_connection()
-    conn.execute("update notes set position = null where id = %s" % nid)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set position = null where id = ?", (nid,))
 
 def delete_note(id: int):
     update_priority_list(id, 0)
-    conn = _get_connection()
-    conn.executescript(f"""delete from read where nid ={id};
-                            delete from marks where nid ={id};
-                            delete from notes where id={id};
-                            delete from queue_prio_log where nid={id}; 
-                            delete from highlights where nid={id};
-                            """)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from read where nid = ?", (id,))
+        conn.execute("delete from marks where nid = ?", (id,))
+        conn.execute("delete from notes where id = ?", (id,))
+        conn.execute("delete from queue_prio_log where nid = ?", (id,))
+        conn.execute("delete from highlights where nid = ?", (id,))
+        conn.execute("delete from note_tags where nid = ?", (id,))
 
 def get_read_today_count() -> int:
     now     = datetime.today().strftime('%Y-%m-%d')
-    conn    = _get_connection()
-    c       = conn.execute("select count(*) from read where page > -1 and created like '%s%%'" % now).fetchone()
-    conn.close()
+    c       = _get_connection().execute("select count(*) from read where page > -1 and created like ?", (f"{now}%",)).fetchone()
     if c is None:
         return 0
     return c[0]
@@ -1128,9 +1060,7 @@ def get_read_today_count() -> int:
 def get_avg_pages_read(delta_days: int) -> float:
     dt      = date.today() - timedelta(delta_days)
     stamp   = dt.strftime('%Y-%m-%d')
-    conn    = _get_connection()
-    c       = conn.execute("select count(*) from read where page > -1 and created >= '%s'" % stamp).fetchone()
-    conn.close()
+    c       = _get_connection().execute("select count(*) from read where page > -1 and created >= ?", (stamp,)).fetchone()
     if c is None:
         return 0.0
     return float("{0:.1f}".format(c[0] / delta_days))
@@ -1139,13 +1069,11 @@ def get_avg_pages_read(delta_days: int) -> float:
 def get_queue_count() -> int:
     conn    = _get_connection()
     c       = conn.execute("select count(*) from notes where position is not null and position >= 0").fetchone()
-    conn.close()
     return c[0]
 
 def get_invalid_pdfs() -> List[SiacNote]:
     conn        = _get_connection()
     res         = conn.execute("select * from notes where lower(source) like '%.pdf'").fetchall()
-    conn.close()
     filtered    = list()
     c           = 0
     for (_, _, _, source, _, _, _, _, _, _, _, _, _, _) in res:
@@ -1170,33 +1098,16 @@ def get_recently_used_tags_with_counts() -> Dict[str, int]:
 
 def _get_recently_used_tags_counts(limit: int) -> Dict[str, int]:
 
-    conn    = _get_connection()
-    res     = conn.execute("select tags from notes where tags is not null order by id desc limit %s" % limit).fetchall()
-    conn.close()
-    if res is None or len(res) == 0:
-        return dict()
-    counts  = dict()
-    for r in res:
-        spl = r[0].split()
-        for tag in spl:
-            if tag in counts:
-                counts[tag] += 1
-            else:
-                counts[tag] = 1
-    return counts
+    # cross join: look up the tags of the few recent notes, instead of going through all tags (the planner's default here)
+    res     = _get_connection().execute("""select note_tags.tag, count(*) from (select id from notes where tags is not null order by id desc limit ?) as recent
+                                            cross join note_tags on note_tags.nid = recent.id and note_tags.depth = 0 group by note_tags.tag""", (limit,)).fetchall()
+    return dict(res)
 
 def _get_priority_list(nid_to_exclude: int = None) -> List[SiacNote]:
     if nid_to_exclude is not None:
-        sql = """
-            select * from notes where position >= 0 and id != %s order by position asc
-        """ % nid_to_exclude
+        res = _get_connection().execute("select * from notes where position >= 0 and id != ? order by position asc", (nid_to_exclude,)).fetchall()
     else:
-        sql = """
-            select * from notes where position >= 0 order by position asc
-        """
-    conn    = _get_connection()
-    res     = conn.execute(sql).fetchall()
-    conn.close()
+        res = _get_connection().execute("select * from notes where position >= 0 order by position asc").fetchall()
     return _to_notes(res)
 
 
@@ -1204,13 +1115,11 @@ def _get_priority_list_with_last_prios() -> List[Tuple[Any, ...]]:
     """ Returns (nid, last prio, last prio creation, current position, schedule) """
 
     stp     = utility.date.date_x_days_ago_stamp(7)
-    sql     = f""" select notes.id, prios.prio, prios.created, notes.position, notes.reminder, notes.delay 
-                        from notes left join (select distinct nid, prio, max(created) as created, type from queue_prio_log group by nid) as prios on prios.nid = notes.id 
-                        where notes.position >= 0 or (substr(notes.reminder, 21, 10) <= '{utility.date.date_only_stamp()}' and substr(notes.reminder, 21, 10) >= '{stp}')
+    sql     = """ select notes.id, prios.prio, prios.created, notes.position, notes.reminder, notes.delay 
+                        from notes left join (select nid, prio, max(created) as created from queue_prio_log group by nid) as prios on prios.nid = notes.id 
+                        where notes.position >= 0 or (substr(notes.reminder, 21, 10) <= ? and substr(notes.reminder, 21, 10) >= ?)
                         order by position asc"""
-    conn    = _get_connection()
-    res     = conn.execute(sql).fetchall()
-    conn.close()
+    res     = _get_connection().execute(sql, (utility.date.date_only_stamp(), stp)).fetchall()
     return res
 
 def get_priority_list() -> List[SiacNote]:
@@ -1221,7 +1130,6 @@ def get_priority_list() -> List[SiacNote]:
     conn    = _get_connection()
     sql     = """ select * from notes where position >= 0 order by position asc """
     res     = conn.execute(sql).fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_newest(limit: int, pinned: List[int]) -> List[SiacNote]:
@@ -1229,41 +1137,29 @@ def get_newest(limit: int, pinned: List[int]) -> List[SiacNote]:
         Returns newest user notes ordered by created date desc.
         Result is in the form that Output.print_search_results wants.
     """
-    conn = _get_connection()
-    sql = """
-       select * from notes order by datetime(created) desc limit %s
-    """ % limit
-    res = conn.execute(sql).fetchall()
-    conn.close()
+    res = _get_connection().execute("select * from notes order by datetime(created) desc limit ?", (limit,)).fetchall()
     return _to_notes(res, pinned)
 
 def get_random(limit: int, pinned: List[int]) -> List[SiacNote]:
-    conn = _get_connection()
-    res = conn.execute("select * from notes order by random() limit %s" % limit).fetchall()
-    conn.close()
+    res = _get_connection().execute("select * from notes order by random() limit ?", (limit,)).fetchall()
     return _to_notes(res, pinned)
 
 def get_queue_in_random_order() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where position is not null order by random()").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def set_priority_list(ids: List[int]):
     ulist = list()
     for ix,id in enumerate(ids):
         ulist.append((ix, id))
-    conn = _get_connection()
-    conn.execute('update notes set position = NULL;')
-    conn.executemany('update notes set position = ? where id = ?', ulist)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute('update notes set position = NULL where position is not NULL;')
+        conn.executemany('update notes set position = ? where id = ?', ulist)
 
 def empty_priority_list():
-    conn = _get_connection()
-    conn.execute("update notes set position = null")
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("update notes set position = null where position is not null")
 
 def get_all_tags_as_hierarchy(include_anki_tags: bool) -> Dict:
     tags = None
@@ -1278,79 +1174,64 @@ def get_all_tags_as_hierarchy(include_anki_tags: bool) -> Dict:
 def get_all_text_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where not lower(source) like '%.pdf' and not lower(source) like '%youtube.com/watch%' order by rowid desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_all_video_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%youtube.com/watch%' order by rowid desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_all_pdf_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%.pdf' order by rowid desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_all_unread_pdf_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%.pdf' and id not in (select distinct nid from read where page >= 0) order by created desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_in_progress_pdf_notes() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%.pdf' and id in (select nid from (select nid, pagestotal, max(created) from read where page > -1  group by nid having count(nid) < pagestotal)) order by created desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 
 def get_pdf_notes_last_added_first(limit : int = None) -> List[SiacNote]:
-    if limit:
-        limit = f"limit {limit}"
-    else:
-        limit = ""
-    conn = _get_connection()
-    res = conn.execute(f"select * from notes where lower(source) like '%.pdf' order by id desc {limit}").fetchall()
-    conn.close()
+    # a negative limit means no limit
+    res = _get_connection().execute("select * from notes where lower(source) like '%.pdf' order by id desc limit ?", (limit or -1,)).fetchall()
     return _to_notes(res)
 
 def get_pdf_notes_last_read_first() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select notes.id,notes.title,notes.text,notes.source,notes.tags,notes.nid,notes.created,notes.modified,notes.reminder,notes.lastscheduled,notes.position,notes.extract_start,notes.extract_end,notes.delay from notes join read on notes.id == read.nid where lower(notes.source) like '%.pdf' group by notes.id order by max(read.created) desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_pdf_notes_ordered_by_size(order: str) -> List[SiacNote]:
-    conn = _get_connection()
-    res = conn.execute(f"select notes.id,notes.title,notes.text,notes.source,notes.tags,notes.nid,notes.created,notes.modified,notes.reminder,notes.lastscheduled,notes.position,notes.extract_start,notes.extract_end,notes.delay from notes join read on notes.id == read.nid where lower(notes.source) like '%.pdf' group by notes.id order by max(read.pagestotal) {order}").fetchall()
-    conn.close()
+    # order can't be bound as a parameter
+    order = "desc" if order.lower() == "desc" else "asc"
+    res = _get_connection().execute(f"select notes.id,notes.title,notes.text,notes.source,notes.tags,notes.nid,notes.created,notes.modified,notes.reminder,notes.lastscheduled,notes.position,notes.extract_start,notes.extract_end,notes.delay from notes join read on notes.id == read.nid where lower(notes.source) like '%.pdf' group by notes.id order by max(read.pagestotal) {order}").fetchall()
     return _to_notes(res)
 
 def get_pdf_notes_not_in_queue() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%.pdf' and position is null order by id desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_text_notes_not_in_queue() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where not lower(source) like '%.pdf' and not lower(source) like '%youtube.com/watch%' and position is null order by id desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_video_notes_not_in_queue() -> List[SiacNote]:
     conn = _get_connection()
     res = conn.execute("select * from notes where lower(source) like '%youtube.com/watch%' and position is null order by id desc").fetchall()
-    conn.close()
     return _to_notes(res)
 
 def get_pdf_quick_open_suggestions() -> List[SiacNote]:
     conn        = _get_connection()
     last_added  = conn.execute("select * from notes where lower(source) like '%.pdf' order by id desc limit 8").fetchall()
     last_read   = conn.execute("select notes.id,notes.title,notes.text,notes.source,notes.tags,notes.nid,notes.created,notes.modified,notes.reminder,notes.lastscheduled,notes.position,notes.extract_start,notes.extract_end,notes.delay from notes join read on notes.id == read.nid where lower(notes.source) like '%.pdf' group by notes.id order by max(read.created) desc limit 8").fetchall()
-    conn.close()
     res         = []
     used        = set()
     for nt in zip(last_read, last_added):
@@ -1367,16 +1248,18 @@ def get_pdf_quick_open_suggestions() -> List[SiacNote]:
 def get_pdf_info(nids: List[int]) -> List[Tuple[int, int, int]]:
     """ Returns tuples of (nid, read pages, pages total) for all the given note IDs. """
 
-    nids    = ",".join([str(n) for n in nids])
-    sql     = f"""select nid, pagestotal, 
+    if len(nids) == 0:
+        return []
+    sql     = """select nid, pagestotal, 
                 case count(*)
                     when 1 then 
                         case page when -1 then 0 else 1 end
                     else count(*) - 1
-                end, max(created) from read where nid in ({nids}) and page >= -1 group by nid"""
+                end, max(created) from read where nid in (%s) and page >= -1 group by nid"""
     conn    = _get_connection()
-    res     = conn.execute(sql).fetchall()
-    conn.close()
+    res     = []
+    for chunk in _chunks([int(n) for n in nids]):
+        res += conn.execute(sql % _placeholders(chunk), chunk).fetchall()
     ilist   = [(r[0], r[2], r[1]) for r in res]
     return ilist
 
@@ -1401,20 +1284,16 @@ def get_related_notes(id: int) -> NoteRelations:
         conn = _get_connection()
         for t in tags:
             if len(t) > 0:
-                t = t.replace("'", "''")
-                query = f"where lower(tags) like '% {t} %' or lower(tags) like '% {t}::%' or lower(tags) like '%::{t} %' or lower(tags) like '{t} %' or lower(tags) like '%::{t}::%'"
-                res = conn.execute("select * from notes %s order by id desc" %(query)).fetchall()
+                query, args = _tag_query(t)
+                res = conn.execute(f"select * from notes where id in ({query}) order by id desc", args).fetchall()
                 if len(res) > 0:
                     related_by_tags += res
                 if len(related_by_tags) >= 10:
                     break
-        conn.close()
         related_by_tags = _to_notes(related_by_tags)
 
     if note.is_pdf() and note.get_containing_folder():
-        conn    = _get_connection()
-        res     = conn.execute(f"select * from notes where id != {id} and source glob '{note.get_containing_folder()}[^/]*' order by created desc limit 5").fetchall()
-        conn.close()
+        res     = _get_connection().execute("select * from notes where id != ? and source glob ? order by created desc limit 5", (id, f"{note.get_containing_folder()}[^/]*")).fetchall()
         if res:
             related_by_folder += res
             related_by_folder = _to_notes(related_by_folder)
@@ -1423,13 +1302,11 @@ def get_related_notes(id: int) -> NoteRelations:
 
 def mark_all_pages_as_read(note: SiacNote, num_pages: int):
     now         = _date_now_str()
-    conn        = _get_connection()
-    existing    = [r[0] for r in conn.execute("select page from read where page > -1 and nid = %s" % note.id).fetchall()]
     start       = note.extract_start if note.extract_start is not None else 1
-    to_insert   = [(p, note.id, num_pages, now) for p in range(start, num_pages +1) if p not in existing]
-    conn.executemany("insert into read (page, nid, pagestotal, created) values (?, ?, ?, ?)", to_insert)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        existing    = set([r[0] for r in conn.execute("select page from read where page > -1 and nid = ?", (note.id,)).fetchall()])
+        to_insert   = [(p, note.id, num_pages, now) for p in range(start, num_pages +1) if p not in existing]
+        conn.executemany("insert into read (page, nid, pagestotal, created) values (?, ?, ?, ?)", to_insert)
 
 def mark_as_read_up_to(note: SiacNote, page: int, num_pages: int):
     now         = _date_now_str()
@@ -1437,29 +1314,23 @@ def mark_as_read_up_to(note: SiacNote, page: int, num_pages: int):
     end         = min(note.extract_end + 1,page + 1) if note.extract_start is not None else page + 1
     if end <= start:
         return
-    conn        = _get_connection()
-    existing    = [r[0] for r in conn.execute("select page from read where page > -1 and nid = %s" % note.id).fetchall()]
-    to_insert   = [(p, note.id, num_pages, now) for p in range(start, end) if p not in existing]
-    conn.executemany("insert into read (page, nid, pagestotal, created) values (?, ?, ?, ?)", to_insert)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        existing    = set([r[0] for r in conn.execute("select page from read where page > -1 and nid = ?", (note.id,)).fetchall()])
+        to_insert   = [(p, note.id, num_pages, now) for p in range(start, end) if p not in existing]
+        conn.executemany("insert into read (page, nid, pagestotal, created) values (?, ?, ?, ?)", to_insert)
 
 def mark_all_pages_as_unread(nid: int):
-    conn = _get_connection()
-    conn.execute("delete from read where nid = %s and page > -1" % nid)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("delete from read where nid = ? and page > -1", (nid,))
 
 def insert_pages_total(nid: int, pages_total: int):
     """
         Inserts a special page entry (page = -1), that is used to save the number of pages even if no page has been read yet.
     """
-    conn = _get_connection()
-    existing = conn.execute("select * from read where page == -1 and nid = %s" % nid).fetchone()
-    if existing is None or len(existing) == 0:
-        conn.execute("insert into read (page, nid, pagestotal, created) values (-1,%s,%s, datetime('now', 'localtime'))" % (nid, pages_total))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        existing = conn.execute("select * from read where page == -1 and nid = ?", (nid,)).fetchone()
+        if existing is None or len(existing) == 0:
+            conn.execute("insert into read (page, nid, pagestotal, created) values (-1, ?, ?, datetime('now', 'localtime'))", (nid, pages_total))
 
 #region stats
 
@@ -1468,7 +1339,6 @@ def pdf_topic_distribution() -> List[Tuple[str, float]]:
 
     conn    = _get_connection()
     res     = conn.execute("select tags from notes where trim(tags, ' ') != '' and lower(source) like '%.pdf'").fetchall()
-    conn.close()
     if not res:
         return []
     d = dict()
@@ -1489,19 +1359,12 @@ def pdf_topic_distribution_recently_read(delta_days: int) -> List[Tuple[str, flo
     """ Counts the tags used in PDF notes which where recently read and returns an ordered list of tag - percentage share pairs. """
 
     stamp   = utility.date.date_x_days_ago_stamp(abs(delta_days))
-    conn    = _get_connection()
-    res     = conn.execute(f"select notes.tags from notes join read on notes.id = read.nid where read.created > '{stamp}' and trim(notes.tags, ' ') != ''").fetchall()
-    conn.close()
+    # every read page counts
+    res     = _get_connection().execute("""select note_tags.tag, count(*) from read cross join note_tags on note_tags.nid = read.nid and note_tags.depth = 0
+                                            where read.created > ? group by note_tags.tag""", (stamp,)).fetchall()
     if not res:
         return []
-    d = dict()
-    for r in res:
-        for t in r[0].split():
-            if len(t) > 0:
-                if t in d:
-                    d[t] += 1
-                else:
-                    d[t] = 1
+    d = dict(res)
 
     total_c     = sum(d.values()) 
     res_list    = [(utility.text.trim_if_longer_than(k, 60), v * 100 / total_c) for k,v in d.items()]
@@ -1515,8 +1378,7 @@ def pdf_topic_distribution_recently_read(delta_days: int) -> List[Tuple[str, flo
 def get_linked_anki_notes_for_pdf_page(siac_nid: int, page: int) -> List[IndexNote]:
     """ Query to retrieve the Anki notes that were created while on a given pdf page. """
 
-    conn = _get_connection()
-    nids = conn.execute(f"select nid from notes_pdf_page where siac_nid = {siac_nid} and page = {page}").fetchall()
+    nids = _get_connection().execute("select nid from notes_pdf_page where siac_nid = ? and page = ?", (siac_nid, page)).fetchall()
     if not nids or len(nids) == 0:
         return []
     nids_str = ",".join([str(nid[0]) for nid in nids])
@@ -1524,17 +1386,13 @@ def get_linked_anki_notes_for_pdf_page(siac_nid: int, page: int) -> List[IndexNo
     if len(res) != len(nids):
         anki_nids = [r[0] for r in res]
         siac_nids = [r[0] for r in nids]
-        for snid in siac_nids: 
-            if snid not in anki_nids:
-                conn.execute(f"delete from notes_pdf_page where nid = {snid}")
-        conn.commit()
-    conn.close()
+        # links to Anki notes that were deleted in the meantime
+        with _transaction() as conn:
+            conn.executemany("delete from notes_pdf_page where nid = ?", [(snid,) for snid in siac_nids if snid not in anki_nids])
     return _anki_to_index_note(res)
 
 def get_linked_anki_notes_around_pdf_page(siac_nid: int, page: int) -> List[Tuple[int, int]]:
-    conn = _get_connection()
-    nps  = conn.execute(f"select page from notes_pdf_page where siac_nid = {siac_nid} and page >= {page-6} and page <= {page + 6}").fetchall()
-    conn.close()
+    nps  = _get_connection().execute("select page from notes_pdf_page where siac_nid = ? and page >= ? and page <= ?", (siac_nid, page - 6, page + 6)).fetchall()
     if not nps or len(nps) == 0:
         return []
     return [n[0] for n in nps]
@@ -1542,9 +1400,7 @@ def get_linked_anki_notes_around_pdf_page(siac_nid: int, page: int) -> List[Tupl
 def get_deck_mostly_linked_to_note(siac_nid: int) -> Optional[str]:
     """ Count which deck was most common among Anki notes that have been created while reading the given note. """
 
-    conn = _get_connection()
-    nids = conn.execute(f"select nid from notes_pdf_page where siac_nid = {siac_nid} order by rowid desc limit 50").fetchall()
-    conn.close()
+    nids = _get_connection().execute("select nid from notes_pdf_page where siac_nid = ? order by rowid desc limit 50", (siac_nid,)).fetchall()
     if len(nids) == 0:
         return None
     nids = ",".join([str(nid[0]) for nid in nids])
@@ -1560,9 +1416,7 @@ def get_deck_mostly_linked_to_note(siac_nid: int) -> Optional[str]:
 
 def get_last_linked_notes(siac_nid: int, limit: int = 10) -> List[int]:
     """ Returns the last linked Anki note IDs for the given add-on note. """
-    conn = _get_connection()
-    nids = conn.execute(f"select nid from notes_pdf_page where siac_nid = {siac_nid} order by rowid desc limit {limit}").fetchall()
-    conn.close()
+    nids = _get_connection().execute("select nid from notes_pdf_page where siac_nid = ? order by rowid desc limit ?", (siac_nid, limit)).fetchall()
     if not nids:
         return []
     return [nid[0] for nid in nids]
@@ -1575,8 +1429,96 @@ def get_last_linked_notes(siac_nid: int, limit: int = 10) -> List[int]:
 #
 
 def _get_connection() -> sqlite3.Connection:
+    """
+    Returns the calling thread's connection to siac-notes.db. Connections are kept open and must not be closed,
+    writes should go through _transaction().
+    """
+    return _get_pool().get()
+
+def _transaction():
+    """ with _transaction() as conn: ... - commits at the end of the block, rolls back if it raises. """
+    return _get_pool().transaction()
+
+def _get_pool() -> utility.db.ConnectionPool:
+    global _pool
     file_path = _get_db_path()
-    return sqlite3.connect(file_path)
+    with _pool_lock:
+        if _pool is None or _pool.file_path != file_path:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = utility.db.ConnectionPool(file_path)
+        return _pool
+
+def close_connections():
+    """ Close all pooled connections, e.g. before the db file is moved. """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+def _placeholders(values) -> str:
+    return ",".join(["?"] * len(values))
+
+def _chunks(values: List[Any]) -> List[List[Any]]:
+    """ Splits values into lists of at most MAX_BOUND_VARIABLES. """
+    return [values[i:i + MAX_BOUND_VARIABLES] for i in range(0, len(values), MAX_BOUND_VARIABLES)]
+
+def _tag_rows(nid: int, tags: Optional[str]) -> List[Tuple[int, str, int]]:
+    """
+    (nid, tag, depth) rows for note_tags: every tag of the note with depth 0, and each of its parents,
+    with depth = number of levels above the tag, e.g. 'a::b::c' gives ('a::b::c', 0), ('a::b', 1), ('a', 2).
+    Parts of the hierarchy that don't start at its root get depth -1 ('b::c', 'b', 'c'), so that they can be looked up too.
+    """
+    rows = {}
+    for t in (tags or "").split():
+        parts = t.split("::")
+        n     = len(parts)
+        for i in range(n):
+            for j in range(i + 1, n + 1):
+                sub     = "::".join(parts[i:j])
+                depth   = n - j if i == 0 else -1
+                if len(sub) > 0 and (sub not in rows or rows[sub] == -1 or 0 <= depth < rows[sub]):
+                    rows[sub] = depth
+    return [(nid, t, d) for t, d in rows.items()]
+
+def _set_note_tags(conn: sqlite3.Connection, nid: int, tags: Optional[str]):
+    conn.execute("delete from note_tags where nid = ?", (nid,))
+    conn.executemany("insert into note_tags (nid, tag, depth) values (?, ?, ?)", _tag_rows(nid, tags))
+
+def _tag_query(tag_str: str) -> Tuple[str, List[str]]:
+    """
+    Query (and its args) for the ids of the notes that have any of the space-separated tags, or a tag below one of them.
+    A tag also matches further down in a hierarchy, e.g. 'b' matches 'a::b' and 'a::b::c'.
+    """
+    tags = [t for t in tag_str.split(" ") if len(t) > 0]
+    return (f"select nid from note_tags where tag collate nocase in ({_placeholders(tags)})", tags)
+
+def _has_title_index(file_path: str) -> bool:
+    """ True if the db file has the notes_fts index (see _ensure_title_index). Only a positive result is cached, the index is created on startup. """
+    if file_path in _title_index_files:
+        return True
+    if _get_connection().execute("select 1 from sqlite_master where name = 'notes_fts'").fetchone() is None:
+        return False
+    _title_index_files.add(file_path)
+    return True
+
+def _title_match(text: str, min_len: int = 1) -> Optional[str]:
+    """ fts5 query that matches the same titles as _title_query(text, min_len), None if notes_fts can't be used for it. """
+
+    if not _has_title_index(_get_db_path()):
+        return None
+    tokens = [t for t in text.lower().split() if len(t) >= min_len]
+    # trigrams can't match words shorter than 3 characters, and like treats % and _ as wildcards, so these are left to like
+    if len(tokens) == 0 or any([len(t) < 3 or "%" in t or "_" in t for t in tokens]):
+        return None
+    return " OR ".join(['"%s"' % t.replace('"', '""') for t in tokens])
+
+def _title_query(text: str, min_len: int = 1) -> Tuple[str, List[str]]:
+    """ Where clause (and its args) that matches notes whose title contains any of the tokens in text. """
+
+    tokens = [t for t in text.lower().split() if len(t) >= min_len]
+    return (" or ".join(["lower(title) like ?"] * len(tokens)), [f"%{t}%" for t in tokens])
 
 def _get_db_path() -> str:
     global db_path
@@ -1658,13 +1600,13 @@ def _delay(delay_str: str) -> int:
 def _date_now_str() -> str:
     return datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
 
+# the same (prio log) dates are parsed on every queue update
+@lru_cache(maxsize=65536)
 def _dt_from_date_str(dtst) -> datetime:
     return datetime.strptime(dtst, '%Y-%m-%d-%H-%M-%S')
 
 def _table_exists(name) -> bool:
-    conn = _get_connection()
-    res = conn.execute(f"SELECT count(name) FROM sqlite_master WHERE type='table' AND name='{name}'").fetchone()
-    conn.close()
+    res = _get_connection().execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
     if res[0]==1:
         return True
     return False
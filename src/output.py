@@ -17,6 +17,7 @@
 import re
 import time
 import json
+import collections
 import os
 import math
 from datetime import datetime
@@ -30,6 +31,8 @@ from .stats import getRetentions
 from .state import get_index
 from .notes import get_pdf_info
 from .special_searches import get_suspended
+from .result_metadata import get_metadata, get_pdf_progress, get_retentions
+from .result_set import ResultSet, SORT_KEYS
 from .web.reading_modal import ReadingModal
 from .web.sidebar import Sidebar
 from .config import get_config_value_or_default
@@ -41,13 +44,14 @@ import utility.text
 import utility.misc
 import state
 
-try:
-    # from .rs.siacrs.siacrs import rs_mark_highlights
-    utility.misc.load_rust_lib()
-    from siacrs import *
-    state.rust_lib = True
-except:
-    state.rust_lib = False
+import utility.accel
+
+state.rust_lib = utility.accel.native_lib_loaded()
+
+# number of rendered cards the web view is assumed to still have (it keeps twice as many, see patchSearchResults)
+CLIENT_CARD_CACHE_SIZE = 200
+# number of cards rendered per page, and per batch when virtual scrolling is on
+RESULT_WINDOW_SIZE     = 50
 
 class Output:
     """
@@ -74,6 +78,8 @@ class Output:
         self.plotjsLoaded           = False
         self.showRetentionScores    = True
         self.lastResults            = None
+        # sorts / filters the last results, see _result_set
+        self.result_set             = None
         self.hideSidebar            = False
         self.uiVisible              = True
         self.show_clozes            = not get_config_value_or_default("results.hide_cloze_brackets", False)
@@ -85,6 +91,12 @@ class Output:
         self.scale                  = 1.0
         #cache previous calls
         self.previous_calls         = []
+        # nid -> hash of the card that was last sent to the web view for this note
+        self.client_cards           = collections.OrderedDict()
+        # if true, results are not paginated, but rendered in batches while scrolling
+        self.virtual_scrolling      = get_config_value_or_default("results.virtualScrolling", False)
+        # identifies the result list the web view is scrolling through, to drop requests for older lists
+        self.window_id              = 0
 
 
     def set_editor(self, editor):
@@ -93,6 +105,8 @@ class Output:
             All included children should have a ref to the instance too.
         """
         self._editor = editor
+        # new editor means new web view, so there are no cached cards on the js side
+        self.reset_client_cards()
         self.reading_modal.set_editor(editor)
         self.sidebar.set_editor(editor)
 
@@ -122,6 +136,10 @@ class Output:
             if stamp != self.latest:
                 return
 
+        # with virtual scrolling, there is only a single page, the remaining results are rendered while scrolling (see show_window)
+        if self.virtual_scrolling:
+            page = 1
+
         # if we were on e.g. on page 2 which contains exactly one note (nr. 51 of 51 search results), and deleted that note, the
         # refresh call would still be to rerender page 2 with the updated search results, 
         # but page 2 would not exist anymore, so we have to check for that:
@@ -145,13 +163,6 @@ class Output:
             if len(self.previous_calls) > 11:
                 self.previous_calls.pop(0)
 
-        html                        = ""
-        allText                     = ""
-        tags                        = []
-        epochTime                   = int(time.time() * 1000)
-        timeDiffString              = ""
-        newNote                     = ""
-        ret                         = 0
         self.last_had_timing_info   = printTimingInfo
 
         if notes is not None and len(notes) > 0:
@@ -160,32 +171,99 @@ class Output:
 
     
 
-        searchResults               = notes[(page- 1) * 50: page * 50]
-        nids                        = [r.id for r in searchResults]
-
-        if self.showRetentionScores:
-            retsByNid               = getRetentions(nids)
-
+        searchResults               = notes[(page- 1) * RESULT_WINDOW_SIZE: page * RESULT_WINDOW_SIZE]
         # various time stamps to collect information about rendering performance
         start                       = time.time()
+
+        cards, tags, allText, highlight_total, build_user_note_total = self._build_cards(searchResults, (page - 1) * RESULT_WINDOW_SIZE, query_set, logging)
+        self._record_client_cards(cards)
+
+        tags.sort()
+        pageMax = 1 if self.virtual_scrolling else math.ceil(len(notes) / 50.0)
+
+        if get_index() is not None and get_index().lastResDict is not None:
+            get_index().lastResDict["time-html"]                    = int((time.time() - start) * 1000)
+            get_index().lastResDict["time-html-highlighting"]       = int(highlight_total * 1000)
+            get_index().lastResDict["time-html-build-user-note"]    = int(build_user_note_total * 1000)
+            get_index().lastResDict["html-cards-reused"]            = len([c for c in cards if not "html" in c])
+        if stamp is None and self.last_took is not None:
+            took = self.last_took
+            stamp = -1
+        elif stamp is not None:
+            took = utility.misc.get_milisec_stamp() - stamp
+            self.last_took = took
+        else:
+            took = "?"
+        timing      = "true" if printTimingInfo else "false"
+        rerender    = "true" if is_rerender else "false" 
+
+        if not self.hideSidebar:
+            infoMap = {
+                "Took" :  "<b>%s</b> ms %s" % (took, "&nbsp;<b style='cursor: pointer' onclick='pycmd(`siac-last-timing`)'><i class='fa fa-info-circle'></i></b>" if printTimingInfo else ""),
+                "Found" :  "<b>%s</b> notes" % (len(notes) if len(notes) > 0 else "<span style='color: red;'>0</span>")
+            }
+            info = self.build_info_table(infoMap, tags, allText)
+            cmd = "patchSearchResults(%s, `%s`, %s, page=%s, pageMax=%s, total=%s, cacheSize=%s, stamp=%s, printTiming=%s, isRerender=%s);" % (json.dumps(cards), info[0].replace("`", "&#96;"), json.dumps(info[1]), page, pageMax, len(notes), len(self.previous_calls), stamp, timing, rerender)
+        else:
+            cmd = "patchSearchResults(%s, ``, null, page=%s , pageMax=%s, total=%s, cacheSize=%s, stamp=%s, printTiming=%s, isRerender=%s);" % (json.dumps(cards), page, pageMax, len(notes), len(self.previous_calls), stamp, timing, rerender)
+        # every render invalidates the batches requested for the previous window, even if this one has no window
+        self.window_id += 1
+        if self.virtual_scrolling and len(notes) > len(cards):
+            cmd = f"if ({cmd[:-1]}) {{ initResultWindow({self.window_id}, {len(notes)}, {len(cards)}, {RESULT_WINDOW_SIZE}); }}"
+        cmd = f"{cmd}updateSwitchBtn({len(notes)});" 
+
+        self._js(cmd, editor)
+
+        return (highlight_total * 1000, build_user_note_total)
+
+    def show_window(self, editor, start: int, window_id: int):
+        """
+            Virtual scrolling: renders the batch of the last results that starts at the given rank.
+            The web view requests these while the user scrolls, so they are not cached like pages are.
+        """
+        if self.lastResults is None or window_id != self.window_id:
+            return
+        start       = max(0, min(start, len(self.lastResults)))
+        batch       = self.lastResults[start:start + RESULT_WINDOW_SIZE]
+        cards       = self._build_cards(batch, start, self.last_query_set, False)[0]
+
+        # the web view drops batches for an old window, so they must not be assumed to be cached there
+        if window_id != self.window_id:
+            return
+        self._record_client_cards(cards)
+        self._js("insertResultWindow(%s, %s, %s);" % (window_id, start, json.dumps(cards)), editor)
+
+    def _build_cards(self, searchResults, offset: int, query_set, logging: bool):
+        """ 
+        Builds the cards for the given slice of the results, offset is the rank of the first note in the slice.
+        Returns (cards, tags, allText, highlight time, user note build time).
+        """
+
+        allText                     = ""
+        tags                        = []
+        epochTime                   = int(time.time() * 1000)
+
         highlight_start             = None
         build_user_note_start       = None
 
         highlight_total             = 0.0
         build_user_note_total       = 0.0
 
-        remaining_to_highlight      = {}
-        highlight_boundary          = 15 if self.gridView else 10
-
-        # for better performance, collect all notes that are .pdfs, and
-        # query their reading progress after they have been rendered
-        pdfs                        = []
+        # retention, suspended state and pdf reading progress are part of the rendered card, 
+        # so they are fetched (batched and cached, usually already prefetched by the search worker) before rendering
+        meta                        = get_metadata([r.id for r in searchResults if r.note_type == "index"])
+        pdf_info                    = get_pdf_progress([r.id for r in searchResults if r.note_type == "user" and r.is_pdf()])
+        retsByNid                   = { nid : m.retention for nid, m in meta.items() if m.retention is not None }
+        suspended                   = set([r.id for r in searchResults if r.note_type == "index" and r.did > 0 and int(r.id) in meta and meta[int(r.id)].suspended])
 
-        check_for_suspended         = []
+        # list of { nid, hash, counter, [html] }, html is only sent if the web view doesn't have the card yet
+        cards                       = []
+        # the web view keeps one element per card, so a note that is in the batch twice needs its html both times
+        emitted                     = set()
 
         for counter, res in enumerate(searchResults):
             nid     = res.id
-            counter += (page - 1)* 50
+            counter += offset
             try:
                 timeDiffString = self._getTimeDifferenceString(nid, epochTime)
             except:
@@ -202,6 +280,25 @@ class Output:
             else:
                 retInfo = ""
 
+            if nid in suspended:
+                susp_style  = " style='left: 150px;'" if str(nid) in self.edited else ""
+                retInfo     = f"<span id='siac-susp-lbl-{nid}' onclick='pycmd(\"siac-unsuspend-modal {nid}\")' class='siac-susp-lbl'{susp_style}>&nbsp;SUSPENDED&nbsp;</span>{retInfo}"
+
+            tags = self._addToTags(tags, res.tags)
+            if counter - offset < 20:
+                # todo: title for user notes
+                allText = f"{allText} {res.text[:5000]}"
+                if res.note_type == "user":
+                    allText = f"{allText} {res.title}"
+
+            # if the web view still has this card with identical content, it only has to be moved to its new position
+            card_hash       = self._card_hash(res, timeDiffString, retInfo, pdf_info.get(nid), query_set)
+            first_in_batch  = nid not in emitted
+            emitted.add(nid)
+            if first_in_batch and self.client_cards.get(nid) == card_hash:
+                cards.append({ "nid": nid, "hash": card_hash, "counter": counter + 1 })
+                continue
+
             #non-anki notes should be displayed differently, we distinguish between title, text and source here
             #confusing: 'source' on notes from the index means the original note content (without stopwords removed etc.),
             #on SiacNotes, it means the source field.
@@ -212,10 +309,8 @@ class Output:
             if res.note_type == "user": 
                 icon = "book"
                 if res.is_pdf():
-                    pdfs.append(nid)
                     extract             = f"<span class='siac-extract-mark'> | P. {res.extract_start} - {res.extract_end}&nbsp;</span>" if res.extract_start else ""
-                    p_html              = "<div class='siac-prog-sq'></div>" * 10
-                    progress            = f"<div id='ptmp-{nid}' class='siac-prog-tmp'>{p_html} <span>&nbsp;0 / ?</span></div><div style='display: inline-block;'>{extract}</div>"
+                    progress            = f"<div id='ptmp-{nid}' class='siac-prog-tmp'>{self._pdf_progress_bar(pdf_info.get(nid))}</div><div style='display: inline-block;'>{extract}</div>"
                     pdf_class           = "pdf" if not res.extract_start else "pdf extract"
                 elif int(res.id) < 0:
                     # meta card
@@ -223,8 +318,6 @@ class Output:
 
                 elif res.is_yt():
                     icon = "film"
-            elif res.note_type == "index" and res.did > 0:
-                check_for_suspended.append(res.id)
 
             build_user_note_total   += time.time() - build_user_note_start
 
@@ -233,7 +326,7 @@ class Output:
                 text                = "\u001f".join([spl for i, spl in enumerate(text.split("\u001f")) if i not in self.fields_to_hide_in_results[str(res.mid)]])
 
             # remove double fields separators
-            text                    = utility.text.cleanFieldSeparators(text).replace("\\", "\\\\")
+            text                    = utility.text.cleanFieldSeparators(text)
 
             # try to remove image occlusion fields
             text                    = utility.text.try_hide_image_occlusion(text)
@@ -251,23 +344,11 @@ class Output:
 
             #highlight
             highlight_start         = time.time()
+            # highlighting is linear in the text length, so all notes are highlighted in this pass
             if query_set is not None:
-                if counter - (page -1) * 50 < highlight_boundary:
-                    if state.rust_lib:
-                        try: 
-                            text            = rs_mark_highlights(text, list(query_set))
-                        except: 
-                            text            = utility.text.mark_highlights(text, query_set)
-                            state.rust_lib  = False
-                    else:
-                        text            = utility.text.mark_highlights(text, query_set)
-                else:
-                    remaining_to_highlight[nid] = ""
+                text = utility.accel.mark_highlights(text, list(query_set))
             highlight_total += time.time() - highlight_start
 
-            if query_set is not None and counter - (page -1) * 50 >= highlight_boundary:
-                remaining_to_highlight[nid] = text
-
             gridclass = "grid" if self.gridView else ""
 
             # meta notes (graphs etc.) should be full width
@@ -321,82 +402,52 @@ class Output:
                     text        = text, 
                     tags        = utility.tags.build_tag_string(res.tags, self.gridView), 
                     ret         = retInfo)
-         
-            html = f"{html}{newNote}"
-            tags = self._addToTags(tags, res.tags)
-            if counter - (page - 1) * 50 < 20:
-                # todo: title for user notes
-                allText = f"{allText} {res.text[:5000]}"
-                if res.note_type == "user":
-                    allText = f"{allText} {res.title}"
 
+            cards.append({ "nid": nid, "hash": card_hash, "counter": counter + 1, "html": newNote })
 
-        tags.sort()
-        html    = html.replace("`", "&#96;").replace("$", "&#36;")
-        pageMax = math.ceil(len(notes) / 50.0)
+        return (cards, tags, allText, highlight_total, build_user_note_total)
 
-        if get_index() is not None and get_index().lastResDict is not None:
-            get_index().lastResDict["time-html"]                    = int((time.time() - start) * 1000)
-            get_index().lastResDict["time-html-highlighting"]       = int(highlight_total * 1000)
-            get_index().lastResDict["time-html-build-user-note"]    = int(build_user_note_total * 1000)
-        if stamp is None and self.last_took is not None:
-            took = self.last_took
-            stamp = -1
-        elif stamp is not None:
-            took = utility.misc.get_milisec_stamp() - stamp
-            self.last_took = took
-        else:
-            took = "?"
-        timing      = "true" if printTimingInfo else "false"
-        rerender    = "true" if is_rerender else "false" 
+    def _record_client_cards(self, cards):
+        """ Remember the cards that are sent to the web view, only call this for cards that are actually rendered there. """
 
-        if not self.hideSidebar:
-            infoMap = {
-                "Took" :  "<b>%s</b> ms %s" % (took, "&nbsp;<b style='cursor: pointer' onclick='pycmd(`siac-last-timing`)'><i class='fa fa-info-circle'></i></b>" if printTimingInfo else ""),
-                "Found" :  "<b>%s</b> notes" % (len(notes) if len(notes) > 0 else "<span style='color: red;'>0</span>")
-            }
-            info = self.build_info_table(infoMap, tags, allText)
-            cmd = "setSearchResults(`%s`, `%s`, %s, page=%s, pageMax=%s, total=%s, cacheSize=%s, stamp=%s, printTiming=%s, isRerender=%s);" % (html, info[0].replace("`", "&#96;"), json.dumps(info[1]), page, pageMax, len(notes), len(self.previous_calls), stamp, timing, rerender)
-        else:
-            cmd = "setSearchResults(`%s`, ``, null, page=%s , pageMax=%s, total=%s, cacheSize=%s, stamp=%s, printTiming=%s, isRerender=%s);" % (html, page, pageMax, len(notes), len(self.previous_calls), stamp, timing, rerender)
-        cmd = f"{cmd}updateSwitchBtn({len(notes)});" 
+        for card in cards:
+            self.client_cards[card["nid"]] = card["hash"]
+            self.client_cards.move_to_end(card["nid"])
 
-        self._js(cmd, editor)
+        # the web view keeps twice as many cards, so every card we assume to be there is still there
+        while len(self.client_cards) > CLIENT_CARD_CACHE_SIZE:
+            self.client_cards.popitem(last=False)
 
-        if len(remaining_to_highlight) > 0:
-            cmd = ""
-            for nid,text in remaining_to_highlight.items():
-                cmd = ''.join((cmd, "document.getElementById('%s').innerHTML = `%s`;" % (nid, utility.text.mark_highlights(text, query_set))))
-            self._js(cmd, editor)
-        
-        if len(check_for_suspended) > 0:
-            susp = get_suspended(check_for_suspended)
-            if len(susp) > 0:
-                cmd = ""
-                for nid in susp:
-                    cmd = f"{cmd}$('#cW-{nid}').after(`<span id='siac-susp-lbl-{nid}' onclick='pycmd(\"siac-unsuspend-modal {nid}\")' class='siac-susp-lbl'>&nbsp;SUSPENDED&nbsp;</span>`);"
-                    if str(nid) in self.edited:
-                        cmd = f"{cmd} $('#siac-susp-lbl-{nid}').css('left', '150px');"
-                self._js(cmd, editor)
-
-        if len(pdfs) > 0:
-            pdf_info_list = get_pdf_info(pdfs)
-
-            if pdf_info_list is not None and len(pdf_info_list) > 0:
-                cmd = ""
-                for i in pdf_info_list:
-                    perc        = int(i[1] * 10.0 / i[2])
-                    prog_bar    = ""
-
-                    for x in range(0, 10):
-                        if x < perc:
-                            prog_bar = ''.join((prog_bar, "<div class='siac-prog-sq-filled'></div>"))
-                        else:
-                            prog_bar = ''.join((prog_bar, "<div class='siac-prog-sq'></div>"))
-                    cmd = ''.join((cmd, "document.querySelector('#ptmp-%s').innerHTML = `%s &nbsp;<span>%s / %s</span>`;" % (i[0], prog_bar, i[1], i[2])))
-                self._js(cmd, editor)
-            
-        return (highlight_total * 1000, build_user_note_total)
+    def _card_hash(self, res, creation: str, ret: str, pdf_info: Optional[Tuple[int, int, int]], query_set) -> str:
+        """ Hash over everything that determines the rendered card of the given note, except its position. """
+
+        if res.note_type == "user":
+            content = (res.title, res.text, res.source, res.position, res.extract_start, res.extract_end, pdf_info)
+        else:
+            content = (res.source, res.mid)
+        key = (res.note_type, res.id, content, res.tags, creation, ret, self.edited.get(str(res.id)), 
+                frozenset(query_set) if query_set is not None else None, 
+                self.gridView, self.scale, self.show_clozes, self.remove_divs)
+        return str(hash(key))
+
+    def _pdf_progress_bar(self, pdf_info: Optional[Tuple[int, int, int]]) -> str:
+        """ Progress squares + 'read / total' for a pdf note, pdf_info is a tuple from get_pdf_info. """
+
+        if pdf_info is None:
+            return "%s <span>&nbsp;0 / ?</span>" % ("<div class='siac-prog-sq'></div>" * 10)
+        perc        = int(pdf_info[1] * 10.0 / pdf_info[2])
+        prog_bar    = ""
+
+        for x in range(0, 10):
+            if x < perc:
+                prog_bar = ''.join((prog_bar, "<div class='siac-prog-sq-filled'></div>"))
+            else:
+                prog_bar = ''.join((prog_bar, "<div class='siac-prog-sq'></div>"))
+        return "%s &nbsp;<span>%s / %s</span>" % (prog_bar, pdf_info[1], pdf_info[2])
+
+    def reset_client_cards(self):
+        """ Forget which cards the web view has cached, so that the next render sends all cards again. """
+        self.client_cards.clear()
     
     def js(self, js):
         """
@@ -421,78 +472,72 @@ class Output:
 
     ### Sorting & Filtering
 
+    def _result_set(self) -> Optional[ResultSet]:
+        """ Sort/filter engine over the last results, a new one is created if there were new results since the last sort/filter. """
+        if self.lastResults is None:
+            return None
+        if self.result_set is None or not self.result_set.owns(self.lastResults):
+            self.result_set = ResultSet(self.lastResults)
+        return self.result_set
+
+    def _print_sorted(self, notes):
+        stamp       = utility.misc.get_milisec_stamp()
+        self.latest = stamp
+        self.print_search_results(notes, stamp)
+
     def sortByDate(self, mode):
         """ Rerenders the last search results, but sorted by creation date. """
-        if self.lastResults is None:
+        self.sort_by("created", mode == "desc")
+
+    def sort_by(self, key: str, desc: bool):
+        """ Rerenders the last search results, sorted by the given key (see result_set.SORT_KEYS). """
+        rs = self._result_set()
+        if rs is None or key not in SORT_KEYS:
             return
-        stamp = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        sortedByDate = list(sorted(self.lastResults, key=lambda x: int(x.id)))
-        if mode == "desc":
-            sortedByDate = list(reversed(sortedByDate))
-        self.print_search_results(sortedByDate, stamp)
+        self._print_sorted(rs.sort(key, desc))
 
+    def sort_by_rank(self):
+        """ Rerenders the last search results in the order the search returned them. """
+        rs = self._result_set()
+        if rs is None:
+            return
+        self._print_sorted(rs.restore_rank())
 
-    def removeUntagged(self):
-        if self.lastResults is None:
+    def _filter(self, keep):
+        rs = self._result_set()
+        if rs is None:
             return
-        stamp = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        filtered = []
-        for r in self.lastResults:
-            if r.tags is None or len(r.tags.strip()) == 0:
-                continue
-            filtered.append(r)
-        self.print_search_results(filtered, stamp)
+        self._print_sorted(rs.filter(keep))
+
+    def removeUntagged(self):
+        self._filter(lambda r: r.tags is not None and len(r.tags.strip()) > 0)
 
     def removeTagged(self):
-        if self.lastResults is None:
-            return
-        stamp = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        filtered = []
-        for r in self.lastResults:
-            if r.tags is None or len(r.tags.strip()) == 0:
-                filtered.append(r)
-        self.print_search_results(filtered, stamp)
+        self._filter(lambda r: r.tags is None or len(r.tags.strip()) == 0)
 
     def remove_unreviewed(self):
         if self.lastResults is None:
             return
-        stamp       = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        nids        = [str(r.id) for r in self.lastResults]
-        nidStr      =  "(%s)" % ",".join(nids)
-        unreviewed  = [r[0] for r in mw.col.db.all("select nid from cards where nid in %s and reps = 0" % nidStr)]
-        filtered    = [r for r in self.lastResults if int(r.id) not in unreviewed]
-        self.print_search_results(filtered, stamp)
+        meta = get_metadata([r.id for r in self.lastResults if r.note_type == "index"])
+        self._filter(lambda r: not (int(r.id) in meta and meta[int(r.id)].has_unreviewed))
 
     def remove_reviewed(self):
         if self.lastResults is None:
             return
-        stamp       = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        nids        = [str(r.id) for r in self.lastResults]
-        nidStr      = "(%s)" % ",".join(nids)
-        reviewed    = [r[0] for r in mw.col.db.all("select nid from cards where nid in %s and reps > 0" % nidStr)]
-        filtered    = [r for r in self.lastResults if int(r.id) not in reviewed]
-        self.print_search_results(filtered, stamp)
+        meta = get_metadata([r.id for r in self.lastResults if r.note_type == "index"])
+        self._filter(lambda r: not (int(r.id) in meta and meta[int(r.id)].has_reviewed))
 
     def remove_suspended(self):
-        if self.lastResults is None: return
-        stamp       = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        susp        = get_suspended([r.id for r in self.lastResults])
-        filtered    = [r for r in self.lastResults if int(r.id) not in susp]
-        self.print_search_results(filtered, stamp)
-   
+        if self.lastResults is None:
+            return
+        meta = get_metadata([r.id for r in self.lastResults if r.note_type == "index"])
+        self._filter(lambda r: not (int(r.id) in meta and meta[int(r.id)].suspended))
+
     def remove_unsuspended(self):
-        if self.lastResults is None: return
-        stamp       = utility.misc.get_milisec_stamp()
-        self.latest = stamp
-        susp        = get_suspended([r.id for r in self.lastResults])
-        filtered    = [r for r in self.lastResults if int(r.id) in susp]
-        self.print_search_results(filtered, stamp)
+        if self.lastResults is None:
+            return
+        meta = get_metadata([r.id for r in self.lastResults if r.note_type == "index"])
+        self._filter(lambda r: int(r.id) in meta and meta[int(r.id)].suspended)
 
     ### End Sorting & Filtering
 
@@ -606,7 +651,7 @@ class Output:
         nids            = [r.id for r in db_list]
 
         if self.showRetentionScores:
-            retsByNid   = getRetentions(nids)
+            retsByNid   = get_retentions(nids)
 
         for counter, res in enumerate(db_list):
             try:
@@ -703,6 +748,8 @@ class Output:
     def empty_result(self, message):
         if self._editor is None or self._editor.web is None:
             return
+        # the result window (virtual scrolling) is cleared with the results
+        self.window_id += 1
         self._editor.web.eval("setSearchResults('', `%s`, null, 1, 1, 50, %s)" % (message, len(self.previous_calls) + 1))
 
     def show_search_modal(self, on_enter_attr, header):
@@ -0,0 +1,126 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Metadata that is displayed with / used to filter search results: retention, suspension and review state of Anki notes,
+reading progress of pdf notes.
+Fetched with one batched query per database and cached per note id.
+Cached retentions are validated against the cards' mod time, so they are only looked up again if the note's cards changed.
+"""
+
+import threading
+import typing
+from typing import Dict, List, Optional, Tuple, Iterable
+from aqt import mw
+
+from .notes import get_pdf_info
+from .stats import getRetentions
+
+
+class NoteMeta:
+
+    __slots__ = ["retention", "suspended", "has_reviewed", "has_unreviewed", "mod"]
+
+    def __init__(self, retention: Optional[float], suspended: bool, has_reviewed: bool, has_unreviewed: bool, mod: int):
+        # % of passed reviews, None if the note has never been reviewed
+        self.retention      = retention
+        # true if at least one card of the note is suspended / has been reviewed / is new
+        self.suspended      = suspended
+        self.has_reviewed   = has_reviewed
+        self.has_unreviewed = has_unreviewed
+        # max(cards.mod) at the time the entry was fetched
+        self.mod            = mod
+
+
+_lock       = threading.Lock()
+# nid -> NoteMeta
+_meta       : Dict[int, NoteMeta]                           = {}
+# nid -> (nid, pages read, pages total), None if nothing has been read yet
+_pdf_info   : Dict[int, Optional[Tuple[int, int, int]]]     = {}
+
+
+def get_metadata(nids: Iterable[int]) -> Dict[int, NoteMeta]:
+    """ Returns the metadata for the given Anki note ids. Notes without cards are not contained in the result. """
+
+    nids = list(set([int(nid) for nid in nids]))
+    if len(nids) == 0 or mw is None or mw.col is None:
+        return {}
+
+    nid_str = ",".join([str(nid) for nid in nids])
+    # cheap, uses the cards' nid index
+    states  = mw.col.db.all(f"select nid, max(queue = -1), max(reps > 0), max(reps = 0), max(mod) from cards where nid in ({nid_str}) group by nid")
+
+    result  = {}
+    stale   = []
+    with _lock:
+        for nid, suspended, has_reviewed, has_unreviewed, mod in states:
+            cached = _meta.get(nid)
+            if cached is not None and cached.mod == mod:
+                cached.suspended        = bool(suspended)
+                cached.has_reviewed     = bool(has_reviewed)
+                cached.has_unreviewed   = bool(has_unreviewed)
+                result[nid]             = cached
+            else:
+                result[nid]             = NoteMeta(None, bool(suspended), bool(has_reviewed), bool(has_unreviewed), mod)
+                stale.append(nid)
+
+    # retentions only have to be looked up for notes whose cards changed since they were cached
+    if len(stale) > 0:
+        for nid, ret in getRetentions(stale).items():
+            result[nid].retention = ret
+        with _lock:
+            for nid in stale:
+                _meta[nid] = result[nid]
+
+    return result
+
+def get_retentions(nids: Iterable[int]) -> Dict[int, float]:
+    """ Same as stats.getRetentions, but cached. """
+    return { nid: m.retention for nid, m in get_metadata(nids).items() if m.retention is not None }
+
+def get_pdf_progress(nids: Iterable[int]) -> Dict[int, Tuple[int, int, int]]:
+    """ Returns (nid, pages read, pages total) for the given pdf notes, notes without read pages are not contained. """
+
+    nids    = [int(nid) for nid in nids]
+    with _lock:
+        missing = [nid for nid in nids if nid not in _pdf_info]
+    if len(missing) > 0:
+        fetched = { i[0] : i for i in (get_pdf_info(missing) or []) }
+        with _lock:
+            for nid in missing:
+                _pdf_info[nid] = fetched.get(nid)
+    with _lock:
+        return { nid: _pdf_info[nid] for nid in nids if _pdf_info.get(nid) is not None }
+
+def prefetch(notes: List):
+    """ Fetch the metadata for the given results (typically the first page), called from the search worker thread. """
+
+    get_metadata([n.id for n in notes if n.note_type == "index"])
+    get_pdf_progress([n.id for n in notes if n.note_type == "user" and n.is_pdf()])
+
+def invalidate(nids: Optional[Iterable[int]] = None):
+    """ Drop the cached metadata of the given Anki notes (of all notes if nids is None). """
+
+    with _lock:
+        if nids is None:
+            _meta.clear()
+        else:
+            for nid in nids:
+                _meta.pop(int(nid), None)
+
+def invalidate_pdf_progress():
+    with _lock:
+        _pdf_info.clear()
@@ -0,0 +1,122 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Sorting and filtering of the last search results without running the search again.
+The ranked results are kept as they were returned by the search, sorts and filters only permute / shrink
+a list of positions into them, so they can be chained and the original ranking can be restored.
+Sort keys are fetched on first use, with one batched query for all results, and stored in arrays indexed by position.
+"""
+
+import typing
+from array import array
+from datetime import datetime
+from typing import List, Callable, Optional, Dict, Any
+from aqt import mw
+
+from .result_metadata import get_retentions
+
+SORT_KEYS = ["created", "mod", "ease", "interval", "lapses", "retention"]
+
+
+class ResultSet:
+
+    def __init__(self, notes: List[Any]):
+        self.base           = notes
+        # positions (in base) of the notes in the current view
+        self.positions      = array("l", range(len(notes)))
+        # key name -> (values, bytearray with 1 if the note has a value for the key)
+        self._keys          : Dict[str, Any] = {}
+
+    @property
+    def view(self) -> List[Any]:
+        return [self.base[i] for i in self.positions]
+
+    def owns(self, notes: List[Any]) -> bool:
+        """ True if the given list is (equal to) the current view. """
+        return len(notes) == len(self.positions) and all(n is self.base[i] for n, i in zip(notes, self.positions))
+
+    def sort(self, key: str, desc: bool) -> List[Any]:
+        """ Stable sort of the current view, notes without a value for the key are placed at the end. """
+
+        values, present = self._key(key)
+        with_value      = sorted([i for i in self.positions if present[i]], key=values.__getitem__, reverse=desc)
+        self.positions  = array("l", with_value + [i for i in self.positions if not present[i]])
+        return self.view
+
+    def restore_rank(self) -> List[Any]:
+        """ Sort the current view by the original ranking. """
+        self.positions  = array("l", sorted(self.positions))
+        return self.view
+
+    def filter(self, keep: Callable[[Any], bool]) -> List[Any]:
+        """ Returns the notes of the current view for which keep is true. If none are left, the view is not changed. """
+
+        kept = array("l", [i for i in self.positions if keep(self.base[i])])
+        if len(kept) > 0:
+            self.positions = kept
+        return [self.base[i] for i in kept]
+
+    def _key(self, key: str):
+        if key not in self._keys:
+            values              = array("d", bytes(8 * len(self.base)))
+            present             = bytearray(len(self.base))
+            for i, v in self._fetch(key).items():
+                values[i]       = v
+                present[i]      = 1
+            self._keys[key]     = (values, present)
+        return self._keys[key]
+
+    def _fetch(self, key: str) -> Dict[int, float]:
+        """ position -> value, for all notes that have a value for the given key. """
+
+        if key == "created":
+            return { i: int(n.id) for i, n in enumerate(self.base) }
+
+        by_nid = { int(n.id) : i for i, n in enumerate(self.base) if n.note_type == "index" }
+
+        if key == "mod":
+            res = { i: _parse_mod(n.modified) for i, n in enumerate(self.base) if n.note_type == "user" }
+            res = { i: v for i, v in res.items() if v is not None }
+            if len(by_nid) > 0:
+                for nid, mod in mw.col.db.all(f"select id, mod from notes where id in ({','.join([str(nid) for nid in by_nid])})"):
+                    res[by_nid[nid]] = mod
+            return res
+
+        if len(by_nid) == 0:
+            return {}
+
+        if key == "retention":
+            return { by_nid[nid]: ret for nid, ret in get_retentions(by_nid.keys()).items() }
+
+        # card based keys, only reviewed cards are taken into account
+        agg = { "ease": "avg(factor)", "interval": "max(ivl)", "lapses": "sum(lapses)" }[key]
+        return { by_nid[nid]: v for nid, v in mw.col.db.all(f"select nid, {agg} from cards where nid in ({','.join([str(nid) for nid in by_nid])}) and reps > 0 group by nid") }
+
+
+# add-on notes store their modification date as 'YYYY-MM-DD HH:MM:SS' (sqlite's datetime()),
+# or as 'YYYY-MM-DD-HH-MM-SS' if it was written by notes.update_note (_date_now_str)
+_MOD_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d-%H-%M-%S")
+
+def _parse_mod(modified: Optional[str]) -> Optional[float]:
+    if not modified:
+        return None
+    for fmt in _MOD_FORMATS:
+        try:
+            return datetime.strptime(modified[:19], fmt).timestamp()
+        except ValueError:
+            pass
+    return None
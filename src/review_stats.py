@@ -0,0 +1,415 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Per-card and per-note aggregates of the review log (only entries of type 1 = review),
+stored in the add-on's data folder, so that the stats functions don't have to scan the revlog every time.
+Additionally, the interval history (reviews and relearning steps) of every card is stored as a compact blob,
+for the similar review history search.
+The first VECTOR_STEPS intervals of every history (in days) are stored as a fixed-length vector, and one row per step
+indexed by (step, interval), so that the cards closest to a given history can be found by widening an interval range around one
+of its steps, without reading the histories that are further away (see nearest_histories).
+
+The tables are built with a single aggregating query over the revlog on first use, afterwards only
+revlog entries with an id greater than the last one seen are added (e.g. after a card has been answered).
+This is cheap enough to run after every answer. Entries up to that id can also change (undo of an answer, import,
+deleted cards, AnkiWeb sync), this is found by check_consistency(), which compares the per-card entry counts and
+computes only the affected cards again. It scans the whole revlog, so it runs once in the background after a reset
+or sync (see schedule_consistency_check()) and when the index is built.
+Only a different collection (or a new schema) rebuilds everything.
+"""
+
+import os
+import re
+import threading
+import typing
+import heapq
+from array import array
+from itertools import groupby
+from typing import Dict, List, Tuple, Optional, Iterable, Iterator
+from aqt import mw
+
+try:
+    from .debug_logging import log
+except:
+    from debug_logging import log
+import utility.misc
+import utility.db
+
+# (passed, failed, hard, good/easy, time in ms, reviews)
+Counts = Tuple[int, int, int, int, int, int]
+# (cid, intervals, times in ms, eases, revlog types), one entry per step
+History = Tuple[int, array, array, bytes, bytes]
+
+# bump if the tables change, forces a rebuild
+_SCHEMA = 4
+
+# number of steps per history that are indexed for the nearest neighbour search
+VECTOR_STEPS = 16
+
+_CREATE = [
+    """create table if not exists card_stats (
+        cid         INTEGER PRIMARY KEY,
+        nid         INTEGER,
+        passed      INTEGER NOT NULL,
+        failed      INTEGER NOT NULL,
+        hard        INTEGER NOT NULL,
+        good_easy   INTEGER NOT NULL,
+        time_ms     INTEGER NOT NULL,
+        reviews     INTEGER NOT NULL
+    )""",
+    "create index if not exists card_stats_nid on card_stats (nid)",
+    """create table if not exists note_stats (
+        nid         INTEGER PRIMARY KEY,
+        passed      INTEGER NOT NULL,
+        failed      INTEGER NOT NULL,
+        hard        INTEGER NOT NULL,
+        good_easy   INTEGER NOT NULL,
+        time_ms     INTEGER NOT NULL,
+        reviews     INTEGER NOT NULL
+    )""",
+    """create table if not exists card_history (
+        cid         INTEGER PRIMARY KEY,
+        steps       INTEGER NOT NULL,
+        ivls        BLOB NOT NULL,
+        times       BLOB NOT NULL,
+        eases       BLOB NOT NULL,
+        types       BLOB NOT NULL
+    )""",
+    """create table if not exists card_vectors (
+        cid         INTEGER PRIMARY KEY,
+        steps       INTEGER NOT NULL,
+        %s
+    )""" % ", ".join([f"v{i} REAL" for i in range(VECTOR_STEPS)]),
+    """create table if not exists step_ivls (
+        step        INTEGER NOT NULL,
+        ivl         REAL NOT NULL,
+        cid         INTEGER NOT NULL,
+        PRIMARY KEY (step, ivl, cid)
+    ) WITHOUT ROWID""",
+    "create index if not exists step_ivls_cid on step_ivls (cid)",
+    # number of revlog entries (all types) per card that are included above, to find the cards whose entries changed
+    "create table if not exists card_entries (cid INTEGER PRIMARY KEY, entries INTEGER NOT NULL)",
+    "create table if not exists sync_state (key TEXT PRIMARY KEY, value INTEGER)"
+]
+
+_COUNT_COLS = "passed, failed, hard, good_easy, time_ms, reviews"
+_UPSERT     = """insert into %s values (%s) on conflict(%s) do update set
+                    passed = passed + excluded.passed, failed = failed + excluded.failed, hard = hard + excluded.hard,
+                    good_easy = good_easy + excluded.good_easy, time_ms = time_ms + excluded.time_ms, reviews = reviews + excluded.reviews"""
+
+_lock   = threading.RLock()
+_pool   : Optional[utility.db.ConnectionPool] = None
+# True while a consistency check is scheduled or running, see schedule_consistency_check()
+_check_pending = False
+
+
+def _db_path() -> str:
+    config  = mw.addonManager.getConfig(__name__)
+    folder  = config["addon.data_folder"]
+    if not folder:
+        folder = utility.misc.get_application_data_path()
+    # one file per profile, as the profiles have different collections
+    profile = re.sub(r"[^\w\-]", "_", mw.pm.name or "default")
+    return os.path.join(folder, f"siac-review-stats-{profile}.db")
+
+def _conn():
+    global _pool
+    with _lock:
+        if _pool is None or _pool.file_path != _db_path():
+            if _pool is not None:
+                _pool.close_all()
+            _pool = utility.db.ConnectionPool(_db_path())
+            conn  = _pool.get()
+            for stmt in _CREATE:
+                conn.execute(stmt)
+            conn.commit()
+        return _pool.get()
+
+def sync():
+    """ Add the revlog entries that are not in the aggregates yet (id greater than the last one seen). """
+
+    _sync(False)
+
+def check_consistency():
+    """
+    Add the new revlog entries and compute the cards again whose older entries have changed (undo, import, sync).
+    Counts the whole revlog, so this should not run on the main thread.
+    """
+
+    _sync(True)
+
+def schedule_consistency_check():
+    """ Run check_consistency() in a background thread, unless it is already scheduled. Used after a reset or sync. """
+
+    global _check_pending
+    with _lock:
+        if _check_pending or mw is None or mw.col is None:
+            return
+        _check_pending = True
+    threading.Thread(target=_run_consistency_check, daemon=True).start()
+
+def _run_consistency_check():
+    global _check_pending
+    try:
+        check_consistency()
+    except Exception as e:
+        log("Failed to check the review stats: " + str(e))
+    finally:
+        with _lock:
+            _check_pending = False
+
+def _sync(check: bool):
+    if mw is None or mw.col is None:
+        return
+    with _lock:
+        conn        = _conn()
+        state       = dict(conn.execute("select key, value from sync_state").fetchall())
+        crt         = mw.col.db.scalar("select crt from col")
+        last_id     = state.get("last_revlog_id", 0)
+        last_count  = state.get("revlog_count", 0)
+
+        # different collection: start from scratch
+        if state.get("crt") != crt or state.get("schema") != _SCHEMA:
+            for table in ("card_stats", "note_stats", "card_history", "card_entries", "card_vectors", "step_ivls"):
+                # tables of an older schema might have different columns
+                conn.execute(f"delete from {table}" if state.get("schema") == _SCHEMA else f"drop table if exists {table}")
+            for stmt in _CREATE:
+                conn.execute(stmt)
+            last_id     = 0
+            last_count  = 0
+
+        # both are lookups on the primary key, no scan
+        max_id      = mw.col.db.scalar("select max(id) from revlog") or 0
+        new_count   = mw.col.db.scalar("select count(*) from revlog where id > ?", last_id)
+
+        if check:
+            # entries up to last_id were removed (undo, deleted cards) or added (import, sync): find the affected cards
+            total = mw.col.db.scalar("select count(*) from revlog")
+            if total - new_count != last_count:
+                _recompute_changed_cards(conn, min(last_id, max_id))
+                last_count  = total - new_count
+            last_id = min(last_id, max_id)
+
+        if max_id > last_id:
+            _add_entries(conn, "revlog.id > ? and revlog.id <= ?", (last_id, max_id), last_id > 0)
+            last_id     = max_id
+            last_count  += new_count
+
+        conn.executemany("insert or replace into sync_state (key, value) values (?, ?)",
+                            [("last_revlog_id", last_id), ("revlog_count", last_count), ("crt", crt), ("schema", _SCHEMA)])
+        conn.commit()
+
+def _add_entries(conn, where: str, args: tuple, merge: bool):
+    """ Add the revlog entries matching where to the tables, if merge is False, the cards are known to have no entries stored yet. """
+
+    rows    = mw.col.db.all(f"""select revlog.cid, cards.nid, sum(ease != 1), sum(ease = 1), sum(ease = 2), sum(ease != 1 and ease != 2), sum(time), count(*)
+                                from revlog left join cards on revlog.cid = cards.id
+                                where revlog.type = 1 and {where} group by revlog.cid""", *args)
+    conn.executemany(_UPSERT % ("card_stats", "?,?,?,?,?,?,?,?", "cid"), rows)
+    # cards of deleted notes can't be attributed to a note anymore
+    by_nid  = {}
+    for r in rows:
+        if r[1] is None:
+            continue
+        if r[1] in by_nid:
+            by_nid[r[1]] = [a + b for a, b in zip(by_nid[r[1]], r[2:])]
+        else:
+            by_nid[r[1]] = list(r[2:])
+    conn.executemany(_UPSERT % ("note_stats", "?,?,?,?,?,?,?", "nid"), [[nid] + counts for nid, counts in by_nid.items()])
+    conn.executemany("insert into card_entries (cid, entries) values (?, ?) on conflict(cid) do update set entries = entries + excluded.entries",
+                        mw.col.db.all(f"select revlog.cid, count(*) from revlog where {where} group by revlog.cid", *args))
+    _append_history(conn, where, args, merge)
+
+def _recompute_changed_cards(conn, up_to_id: int):
+    """ Compute the aggregates again for the cards whose number of revlog entries with id <= up_to_id differs from the stored one. """
+
+    stored      = dict(conn.execute("select cid, entries from card_entries").fetchall())
+    current     = dict(mw.col.db.all("select cid, count(*) from revlog where id <= ? group by cid", up_to_id))
+    cids        = [cid for cid in set(stored) | set(current) if stored.get(cid) != current.get(cid)]
+    if len(cids) == 0:
+        return
+    cid_list    = ",".join([str(c) for c in cids])
+
+    # the note aggregates are sums over their cards, so they are summed up again from card_stats afterwards
+    nids        = set([r[0] for r in conn.execute(f"select nid from card_stats where cid in ({cid_list}) and nid is not null")])
+    for table in ("card_stats", "card_history", "card_entries", "card_vectors", "step_ivls"):
+        conn.execute(f"delete from {table} where cid in ({cid_list})")
+    _add_entries(conn, f"revlog.cid in ({cid_list}) and revlog.id <= ?", (up_to_id,), False)
+
+    nids.update([r[0] for r in conn.execute(f"select nid from card_stats where cid in ({cid_list}) and nid is not null")])
+    nid_list    = ",".join([str(n) for n in nids])
+    conn.execute(f"delete from note_stats where nid in ({nid_list})")
+    conn.execute(f"""insert into note_stats select nid, {', '.join(['sum(%s)' % c for c in _COUNT_COLS.split(', ')])}
+                        from card_stats where nid in ({nid_list}) group by nid""")
+
+def _append_history(conn, where: str, args: tuple, merge: bool):
+    """ Append the review and relearning steps matching where to the cards' histories. """
+
+    rows        = mw.col.db.all(f"""select cid, ivl, time, ease, type from revlog
+                                    where (type = 1 or type = 2) and {where} order by cid, id""", *args)
+    existing    = {}
+    if merge and len(rows) > 0:
+        cids        = ",".join(set([str(r[0]) for r in rows]))
+        existing    = { r[0] : r[1:] for r in conn.execute(f"select cid, ivls, times, eases, types from card_history where cid in ({cids})") }
+
+    updated     = []
+    vectors     = []
+    step_rows   = []
+    for cid, steps in groupby(rows, key=lambda r: r[0]):
+        steps   = list(steps)
+        ivls    = array("i")
+        times   = array("i")
+        eases   = b""
+        types   = b""
+        if cid in existing:
+            ivls.frombytes(existing[cid][0])
+            times.frombytes(existing[cid][1])
+            eases, types = existing[cid][2], existing[cid][3]
+        step_rows.extend([(len(ivls) + i, _day_ivl(r[1]), cid) for i, r in enumerate(steps[:max(0, VECTOR_STEPS - len(ivls))])])
+        ivls.extend([r[1] for r in steps])
+        times.extend([r[2] for r in steps])
+        eases   += bytes([r[3] for r in steps])
+        types   += bytes([r[4] for r in steps])
+        updated.append((cid, len(ivls), ivls.tobytes(), times.tobytes(), eases, types))
+        vector  = [_day_ivl(ivl) for ivl in ivls[:VECTOR_STEPS]]
+        vectors.append([cid, len(ivls)] + vector + [None] * (VECTOR_STEPS - len(vector)))
+    conn.executemany("insert or replace into card_history (cid, steps, ivls, times, eases, types) values (?, ?, ?, ?, ?, ?)", updated)
+    conn.executemany("insert or replace into card_vectors values (%s)" % ",".join(["?"] * (2 + VECTOR_STEPS)), vectors)
+    conn.executemany("insert or replace into step_ivls (step, ivl, cid) values (?, ?, ?)", step_rows)
+
+def _day_ivl(ivl: int) -> float:
+    """ Revlog intervals are in days, or negative in seconds for (re)learning steps. """
+    if ivl < 0:
+        return abs(ivl) / (24 * 60 * 60)
+    return ivl
+
+def _to_history(row) -> History:
+    ivls    = array("i")
+    times   = array("i")
+    ivls.frombytes(row[1])
+    times.frombytes(row[2])
+    return (row[0], ivls, times, row[3], row[4])
+
+def card_history(cid: int) -> Optional[History]:
+    """ Interval history of the given card, None if it has never been reviewed. """
+
+    sync()
+    row = _conn().execute("select cid, ivls, times, eases, types from card_history where cid = ?", (int(cid),)).fetchone()
+    if row is None:
+        return None
+    return _to_history(row)
+
+def nearest_histories(cid: int, min_steps: int) -> Iterator[Tuple[float, History]]:
+    """
+    (distance, history) of the cards that went through at least min_steps reviews / relearning steps, closest first.
+    The distance is the sum of the absolute differences (in days) between the intervals of the given card and the other card,
+    over the given card's steps.
+
+    The distance over the first VECTOR_STEPS steps is computed on the stored vectors in the query. It is a lower bound of the
+    full distance and at least the difference at any single step, so all cards with a lower bound up to r are among the ones
+    whose interval at the last indexed step is within r of the given card's. That range is doubled when needed, and the
+    histories are only read in the order of their lower bound, as long as they can still be closer than the ones read so far.
+    """
+
+    history = card_history(cid)
+    if history is None:
+        return
+    days    = [_day_ivl(ivl) for ivl in history[1]]
+    indexed = days[:VECTOR_STEPS]
+    step    = len(indexed) - 1
+    center  = indexed[-1]
+    conn    = _conn()
+    lowest, highest = conn.execute("select min(ivl), max(ivl) from step_ivls where step = ?", (step,)).fetchone()
+    if lowest is None:
+        return
+
+    bound   = " + ".join([f"abs(v.v{i} - ?)" for i in range(len(indexed))])
+    scan    = f"""select s.cid, {bound} from step_ivls s cross join card_vectors v on v.cid = s.cid
+                    where s.step = ? and s.ivl >= ? and s.ivl <= ? and s.ivl not between ? and ? and v.steps >= ?"""
+    # (lower bound, cid) of the cards in the scanned range whose histories haven't been read yet
+    bounds  = []
+    # (distance, cid, history) of the read ones
+    found   = []
+    # the range around the center that has been scanned already, nothing at first
+    scanned = -1.0
+    radius  = 1.0
+    while True:
+        if radius > scanned:
+            complete = center - radius <= lowest and center + radius >= highest
+            for ocid, lower in conn.execute(scan, (*indexed, step, center - radius, center + radius, center - scanned, center + scanned, min_steps)):
+                if ocid != cid:
+                    heapq.heappush(bounds, (lower, ocid))
+            scanned = radius
+
+        # every card outside the scanned range is further away than radius
+        limit = float("inf") if complete else radius
+        if found and found[0][0] <= limit and (not bounds or found[0][0] < bounds[0][0]):
+            distance, _, other = heapq.heappop(found)
+            yield (distance, other)
+        elif bounds and bounds[0][0] <= limit:
+            cids = [heapq.heappop(bounds)[1] for _ in range(min(32, len(bounds)))]
+            for row in conn.execute(f"select cid, ivls, times, eases, types from card_history where cid in ({','.join([str(c) for c in cids])})"):
+                other       = _to_history(row)
+                distance    = sum([abs(_day_ivl(ivl) - day) for ivl, day in zip(other[1], days)])
+                heapq.heappush(found, (distance, row[0], other))
+        elif complete:
+            return
+        else:
+            radius *= 2
+
+def card_counts(cids: Optional[Iterable[int]] = None) -> Dict[int, Counts]:
+    """ cid -> counts, for all reviewed cards if cids is None. """
+
+    sync()
+    conn = _conn()
+    if cids is None:
+        rows = conn.execute(f"select cid, {_COUNT_COLS} from card_stats").fetchall()
+    else:
+        rows = conn.execute(f"select cid, {_COUNT_COLS} from card_stats where cid in ({','.join([str(int(c)) for c in cids])})").fetchall()
+    return { r[0] : r[1:] for r in rows }
+
+def note_counts(nids: Iterable[int]) -> Dict[int, Counts]:
+    """ nid -> counts over all cards of the note. """
+
+    sync()
+    rows = _conn().execute(f"select nid, {_COUNT_COLS} from note_stats where nid in ({','.join([str(int(n)) for n in nids])})").fetchall()
+    return { r[0] : r[1:] for r in rows }
+
+def sum_counts(cids: Iterable[int]) -> Optional[Counts]:
+    """ Summed counts of the given cards, None if none of them has been reviewed. """
+
+    sync()
+    row = _conn().execute(f"select {', '.join(['sum(%s)' % c for c in _COUNT_COLS.split(', ')])} from card_stats where cid in ({','.join([str(int(c)) for c in cids])})").fetchone()
+    if row is None or row[0] is None:
+        return None
+    return row
+
+def collection_counts() -> Optional[Counts]:
+    """ Summed counts over the whole revlog, None if there are no reviews. """
+
+    sync()
+    row = _conn().execute(f"select {', '.join(['sum(%s)' % c for c in _COUNT_COLS.split(', ')])} from card_stats").fetchone()
+    if row is None or row[0] is None:
+        return None
+    return row
+
+def close():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
@@ -0,0 +1,94 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Bulk helpers for the revlog based statistics (note info modal, tag info).
+Filtering and ordering of the revlog entries is done in a single query that only selects the needed columns,
+these are then aggregated with Counter / accumulate / groupby instead of branching per entry in Python.
+"""
+
+import time
+import typing
+from functools import lru_cache
+from typing import List, Tuple, Dict, Iterable, Optional
+from collections import Counter
+from itertools import accumulate, groupby
+from aqt import mw
+
+# (id, cid, ease, ivl, time, type)
+Review = Tuple[int, int, int, int, int, int]
+
+
+def load_reviews(cids: Iterable[int], types: Tuple[int, ...] = (1,)) -> List[Review]:
+    """ Revlog entries of the given cards and types, ordered by card, then by time. """
+
+    cids = [str(int(c)) for c in cids]
+    if len(cids) == 0:
+        return []
+    return mw.col.db.all(f"""select id, cid, ease, ivl, time, type from revlog
+                            where cid in ({",".join(cids)}) and type in ({",".join([str(int(t)) for t in types])}) order by cid, id""")
+
+def load_eases(cids: Iterable[int]) -> List[int]:
+    """ Eases of the reviews (type 1) of the given cards, ordered by card, then by time. """
+
+    cids = [str(int(c)) for c in cids]
+    if len(cids) == 0:
+        return []
+    return mw.col.db.list(f"select ease from revlog where cid in ({','.join(cids)}) and type = 1 order by cid, id")
+
+def running_retention(eases: Iterable[int], min_reviews: int = 3) -> List[float]:
+    """ Pass rate after each review, starting after the first min_reviews reviews. """
+
+    passed = accumulate(1 if e != 1 else 0 for e in eases)
+    return [round(100 * p / n, 1) for n, p in enumerate(passed, 1) if n > min_reviews]
+
+def ease_counts(eases: Iterable[int]) -> Tuple[int, int, int, int, int]:
+    """ (reviews, failed, hard, good, easy) """
+
+    c       = Counter(eases)
+    cnt     = sum(c.values())
+    # everything that is neither again, hard nor good is counted as easy
+    easy    = cnt - c[1] - c[2] - c[3]
+    return (cnt, c[1], c[2], c[3], easy)
+
+@lru_cache(maxsize=4096)
+def _day(minute: int) -> str:
+    # utc offsets are whole minutes, so all timestamps in a minute fall on the same local day
+    return time.strftime("%Y-%m-%d", time.localtime(minute * 60))
+
+def day(revlog_id: int) -> str:
+    return _day(revlog_id // 60000)
+
+def plot_series(reviews: List[Review]) -> Tuple[Dict[int, List], Dict[int, List], Dict[int, List], Dict[int, int]]:
+    """
+    Per-card plot data for the note info modal: (eases, intervals, times taken, last interval), keyed by card id.
+    The x value of every point is the index of the review among all given reviews.
+    """
+
+    review_plot = {}
+    ivl_plot    = {}
+    time_plot   = {}
+    last_ivl    = {}
+    for cid, group in groupby(enumerate(reviews, 1), key=lambda r: r[1][1]):
+        group               = [(i, r, day(r[0])) for i, r in group]
+        review_plot[cid]    = [[i, r[2], d] for i, r, d in group]
+        ivl_plot[cid]       = [[i, max(0, r[3]), d] for i, r, d in group]
+        time_plot[cid]      = [[i, r[4] / 1000, d] for i, r, d in group]
+        last_ivl[cid]       = group[-1][1][3]
+    return (review_plot, ivl_plot, time_plot, last_ivl)
+
+def by_card(reviews: List[Review]) -> Dict[int, List[Review]]:
+    return { cid: list(group) for cid, group in groupby(reviews, key=lambda r: r[1]) }
@@ -22,9 +22,11 @@ import random
 try:
     from .state import check_index
     from .models import SiacNote, IndexNote
+    from . import review_stats
 except:
     from state import check_index
     from models import SiacNote, IndexNote
+    import review_stats
 
 
 """
@@ -277,52 +279,32 @@ def getLastModifiedNotes(index, editor, decks, limit):
 
 
 def _find_cards_with_one_more_rep(cid: int):
-    reps = mw.col.db.all("select count(*) from revlog where (type = 1 or type = 2) and cid = %s" % cid)[0]
-
-    cards_ivls = []
-    others = {}
-    query = "select ro.id, ro.cid, ro.ease, ro.ivl, ro.factor, ro.time, ro.type from revlog ro join (select cid, count(*) from revlog where type = 1 or type = 2 group by cid having count(*) > %s or cid = %s) ri on ro.cid = ri.cid where type = 1 or type = 2" % (reps, cid)
-    res = mw.col.db.all(query)
-    for r in res:
-        if r[1] == cid:
-            cards_ivls.append(r[3])
-        else:
-            if not r[1] in others:
-                others[r[1]] = []
-            if len(others[r[1]]) < reps + 1:
-                others[r[1]].append([r[3], r[5], r[2], r[6]])
-
-    #find most similar
-    similarities = []
-    
-    if cards_ivls:
-        ivl_one_percent = sum(cards_ivls) / 100.0
-    else:
-        ivl_one_percent = 1
-
-    for cid, rev_list in others.items():
-        
-        ivl_diff                    = 0.0
-        ivl_diff_in_percent_total   = 0.0
-        times_diff                  = 0.0
-        pass_rate_sum               = 0.0
-        
-        for i, rev_list_item in enumerate(rev_list):
-            if i < len(rev_list) - 1:
-                c_ivl = _to_day_ivl(rev_list_item[0])
-                card_ivl = _to_day_ivl(cards_ivls[i])
-                ivl_diff += abs(c_ivl - card_ivl)
-                pass_rate_sum += (1 if rev_list_item[2] != 1 else 0) 
-            else:
-                ivl_diff_in_percent_total = round(ivl_diff / ivl_one_percent, 1)
-                ivl_diff_in_percent_avg = round(ivl_diff_in_percent_total / (len(rev_list) - 1), 1)
-                ivl_at_current_step = _to_day_ivl(rev_list[-2][0])
-                avg_pass_rate = 100 * pass_rate_sum / (len(rev_list) - 1)
-
-                similarities.append([ivl_diff, cid, rev_list_item, ivl_diff_in_percent_total, ivl_diff_in_percent_avg, ivl_at_current_step, avg_pass_rate, rev_list])                
-    similarities = sorted(similarities, key=lambda x: x[4])
-
-    return [cards_ivls, similarities]
+    """
+    Returns the interval history of the given card and the cards with at least one more review / relearning step,
+    the ones with the most similar interval history first.
+    The nearest histories are looked up in the precomputed index in review_stats, the similarities are yielded lazily,
+    so only as many as the caller consumes are looked up and built.
+    """
+    history     = review_stats.card_history(cid)
+    cards_ivls  = list(history[1]) if history else []
+    reps        = len(cards_ivls)
+    if reps == 0:
+        return [cards_ivls, []]
+
+    ivl_one_percent = sum(cards_ivls) / 100.0 or 1
+
+    def similarities():
+        # the distance is over the first reps steps of the other cards
+        for ivl_diff, (ocid, ivls, times, eases, types) in review_stats.nearest_histories(cid, reps + 1):
+            rev_list                    = [[ivls[i], times[i], eases[i], types[i]] for i in range(reps + 1)]
+            ivl_diff_in_percent_total   = round(ivl_diff / ivl_one_percent, 1)
+            ivl_diff_in_percent_avg     = round(ivl_diff_in_percent_total / reps, 1)
+            ivl_at_current_step         = _to_day_ivl(rev_list[-2][0])
+            avg_pass_rate               = 100 * len([e for e in eases[:reps] if e != 1]) / reps
+
+            yield [ivl_diff, ocid, rev_list[-1], ivl_diff_in_percent_total, ivl_diff_in_percent_avg, ivl_at_current_step, avg_pass_rate, rev_list]
+
+    return [cards_ivls, similarities()]
 
 
 
@@ -23,10 +23,14 @@ try:
     from .special_searches import *
     from .special_searches import _to_day_ivl
     from .models import IndexNote
+    from . import review_stats
+    from . import revlog_analytics
 except: 
     from special_searches import *
     from special_searches import _to_day_ivl
     from models import IndexNote
+    import review_stats
+    import revlog_analytics
 
 import time
 import json
@@ -100,8 +104,13 @@ def _calcScores(decks, limit, retOnly):
             cardsByNotes[note[0]][1].append(note[1])
         else:
             cardsByNotes[note[0]] = (note, [note[1]])
+    # review counts of all cards, read once from the precomputed table
+    countsByCid = review_stats.card_counts()
     for k, v in cardsByNotes.items():
-        score = _getScore(v[1], retOnly)
+        counts = [countsByCid[cid] for cid in v[1] if cid in countsByCid]
+        if not counts:
+            continue
+        score = _scoreFromCounts([sum(c) for c in zip(*counts)], retOnly)
         if score is not None:
             if retOnly:
                 scores[k] = (score, v[0])
@@ -132,51 +141,23 @@ def getRetentions(nids):
     # for testing
     if mw is None:
         return dict()
-    passedById  = dict()
-    failedById  = dict()
     retsByNid   = {}
-    query       = "select a.nid, ease from revlog join (select notes.id as nid, cards.id as cid from notes join cards on notes.id = cards.nid where notes.id in (%s)) as a on revlog.cid = a.cid where revlog.type = 1"
-    query       = query % ",".join([str(n) for n in nids])
-    res         = list(mw.col.db.all(query))
-
-    for r in res:
-        if r[0] is None:
-            continue
-        if r[0] not in passedById:
-            passedById[r[0]] = 0
-        if r[0] not in failedById:
-            failedById[r[0]] = 0
-        if r[1] != 1:
-            passedById[r[0]] += 1
-        else:
-            failedById[r[0]] += 1
-
-    for k, v in passedById.items():
-        retsByNid[k] = round(100 * v / (v + failedById[k]), 0)
+    for nid, (passed, failed, _, _, _, _) in review_stats.note_counts(nids).items():
+        if passed + failed > 0:
+            retsByNid[nid] = round(100 * passed / (passed + failed), 0)
 
     return retsByNid
 
 def getAvgTrueRetentionAndTime():
-    eases       = mw.col.db.all("select ease, time from revlog where type = 1")
-    if not eases:
+    counts      = review_stats.collection_counts()
+    if not counts:
         return 0
-    cnt         = 0
-    passed      = 0
-    failed      = 0
-    timeTaken   = 0
-
-    for ease, taken in eases:
-        cnt += 1
-        if ease != 1:
-            passed += 1
-        else:
-            failed += 1
-        timeTaken += taken / 1000.0
+    passed, failed, _, _, time_ms, cnt = counts
 
     retention   = 100 * passed / (passed + failed) if cnt > 0 else 0
     retention   = round(retention, 2)
 
-    return (round(retention, 1), round(timeTaken / cnt, 1))
+    return (round(retention, 1), round(time_ms / 1000.0 / cnt, 1))
 
 def calcAbsDiffInPercent(i1, i2):
     return round(i1 - i2, 2)
@@ -184,78 +165,26 @@ def calcAbsDiffInPercent(i1, i2):
 def _getTrueRetentionOverTime(cards):
     if not cards:
         return None
-    cStr = "("
-    for c in cards:
-        cStr += str(c) + ", "
-    cStr = cStr[:-2] + ")"
 
-    entries = mw.col.db.all(
-        "select cid, ease, time, type from revlog where cid in %s" % (cStr))
-    if not entries:
+    eases = revlog_analytics.load_eases(cards)
+    if len(eases) <= 3:
         return None
-    cnt = 0
-    passed = 0
-    failed = 0
-    goodAndEasy = 0
-    hard = 0
-
-    retentionsOverTime = []
-
-    for (_, ease, _, ty) in entries:
-        # only look for reviews
-        if ty != 1:
-            continue
-        cnt += 1
-        if ease != 1:
-            passed += 1
-            if ease == 2:
-                hard += 1
-            else:
-                goodAndEasy += 1
-        else:
-            failed += 1
-        if cnt > 3:
-            retention = 100 * passed / (passed + failed)
-            retention = round(retention, 1)
-            retentionsOverTime.append(retention)
-    if cnt <= 3:
-        return None
-    return retentionsOverTime
+    return revlog_analytics.running_retention(eases)
 
 def _getScore(cards, onlyRet=False):
     if not cards:
         return None
 
-    cStr        = "("
-    for c in cards:
-        cStr    += str(c) + ", "
-    cStr        = cStr[:-2] + ")"
-
-    entries     = mw.col.db.all("select cid, ease, time, type from revlog where cid in %s" % (cStr))
-    if not entries:
+    counts      = review_stats.sum_counts(cards)
+    if not counts:
         return None
+    return _scoreFromCounts(counts, onlyRet)
 
-    cnt         = 0
-    passed      = 0
-    failed      = 0
-    goodAndEasy = 0
-    hard        = 0
-    timeTaken   = 0
-    for (cid, ease, taken, ty) in reversed(entries):
-        # only look for reviews
-        if ty != 1:
-            continue
-        cnt += 1
-        if ease != 1:
-            passed += 1
-            if ease == 2:
-                hard += 1
-            else:
-                goodAndEasy += 1
-        else:
-            failed += 1
+def _scoreFromCounts(counts, onlyRet=False):
+    """ counts is (passed, failed, hard, good/easy, time in ms, reviews), see review_stats. """
 
-        timeTaken += taken / 1000.0
+    passed, failed, hard, goodAndEasy, time_ms, cnt = counts
+    timeTaken   = time_ms / 1000.0
     if cnt <= 3:
         return None
     retention = 100 * passed / (passed + failed)
@@ -301,20 +230,16 @@ def calculateStats(nid, gridView):
     cardEaseFactorById  = {}
     cardQueueById       = {}
     decks               = set()
-    cStr                = "("
 
     for c in cards:
         d = mw.col.decks.get(c[2])["name"]
         if not d in decks:
             decks.add(d)
-        cStr                        += str(c[0]) + ", "
         cardOrdById[c[0]]           = c[3]
         cardTypeById[c[0]]          = _cardTypeStr(c[6])
         cardEaseFactorById[c[0]]    = int(c[10] / 10)
         cardQueueById[c[0]]         = c[7]
 
-    cStr                = cStr[:-2] + ")"
-
     if len(decks) > 0:
         infoTable["Deck(s)"] = ", ".join(decks)
     else:
@@ -327,15 +252,11 @@ def calculateStats(nid, gridView):
             if temp['ord'] == v:
                 cardNameById[k] = temp['name']
 
-    entries = mw.col.db.all(
-        "select id, cid, ease, ivl, time, type from revlog where cid in %s" % (cStr))
-
-    hasReview = False
-    if entries:
-        for (_, _, _, _, _, ty) in entries:
-            if ty == 1:
-                hasReview = True
-                break
+    # reviews and relearning entries, the latter are only needed for the revlog graphs
+    entries             = revlog_analytics.load_reviews(cardOrdById.keys(), (1, 2))
+    entriesByCid        = revlog_analytics.by_card(entries)
+    reviews             = [e for e in entries if e[5] == 1]
+    hasReview           = len(reviews) > 0
 
     reviewPlotData      = {}
     ivlPlotData         = {}
@@ -344,52 +265,15 @@ def calculateStats(nid, gridView):
 
     infoTable["Card ID(s)"]     = ", ".join([str(c[0]) + f" ({_cardTypeStr(c[6])}) <span class='keyword' onclick='pycmd(\"siac-copy-to-cb {c[0]}\")'>[Copy]</span>" for c in cards])
 
-    if not entries or not hasReview:
+    if not hasReview:
         infoTable["[Stats]"]        = "Not enough reviews to compute statistics"
         tables["Note"].append(infoTable)
     else:
-        cnt             = 0
-        passed          = 0
-        failed          = 0
-        easy            = 0
-        goodAndEasy     = 0
-        good            = 0
-        hard            = 0
-        timeTaken       = 0
-        intervalsByCid  = {}
-
-        for (stamp, cid, ease, ivl, taken, ty) in entries:
-            # only look for reviews
-            if ty != 1:
-                continue
-            cnt += 1
-            intervalsByCid[cid] = ivl
-            if not cid in reviewPlotData:
-                reviewPlotData[cid] = []
-            if not cid in ivlPlotData:
-                ivlPlotData[cid] = []
-            if not cid in timePlotData:
-                timePlotData[cid] = []
-            reviewPlotData[cid].append([cnt, ease, time.strftime(
-                "%Y-%m-%d", time.localtime(int(stamp)/1000))])
-            ivlPlotData[cid].append([cnt, max(0, ivl), time.strftime(
-                "%Y-%m-%d", time.localtime(int(stamp)/1000))])
-            timePlotData[cid].append(
-                [cnt, taken / 1000, time.strftime("%Y-%m-%d", time.localtime(int(stamp)/1000))])
-            if ease != 1:
-                passed += 1
-                if ease == 2:
-                    hard += 1
-                else:
-                    goodAndEasy += 1
-                    if ease == 3:
-                        good += 1
-                    else:
-                        easy += 1
-            else:
-                failed += 1
-
-            timeTaken += taken / 1000.0
+        reviewPlotData, ivlPlotData, timePlotData, intervalsByCid = revlog_analytics.plot_series(reviews)
+        cnt, failed, hard, good, easy = revlog_analytics.ease_counts([r[2] for r in reviews])
+        passed          = cnt - failed
+        goodAndEasy     = good + easy
+        timeTaken       = sum([r[4] for r in reviews]) / 1000.0
 
         retention               = 100 * passed / (passed + failed) if cnt > 0 else 0
         retention               = round(retention, 1)
@@ -416,7 +300,7 @@ def calculateStats(nid, gridView):
             infoTable["<b>%s</b>  &nbsp;(%s):" % (v, k)] = label
 
             if k in intervalsByCid:
-                infoTable[_get_revlog_graph(k)] = ""
+                infoTable[_get_revlog_graph(k, entriesByCid.get(k, []))] = ""
                 infoTable["Interval"] = "%s %s" % (
                     abs(intervalsByCid[k]), "Days" if intervalsByCid[k] > 0 else "Seconds")
 
@@ -634,11 +518,13 @@ def retention_stats_for_tag(true_ret_over_time, graph_div_id, graph_div_lbl_id):
     return cmd
 
 
-def _get_revlog_graph(cid):
-    entries = mw.col.db.all("select * from revlog where cid = %s and (type = 1 or type = 2)" % cid)
+def _get_revlog_graph(cid, entries=None):
+    """ entries are the card's review and relearning entries as returned by revlog_analytics.load_reviews. """
+    if entries is None:
+        entries = revlog_analytics.load_reviews([cid], (1, 2))
     html = "<div class='full-width'>%s</div>"
     blocks = ""
-    for _,_,_,ease,ivl,_,_,_,type in entries:
+    for _,_,ease,ivl,_,type in entries:
         ease = ease + 1 if type == 2 and ease > 1 else ease
         sivl = int(_to_day_ivl(ivl)) if int(_to_day_ivl(ivl)) > 0 else "<1"
         blocks += "<div class='revlog-block revlog-block-%s %s'>%s</div>" % (ease, "larger" if ivl > 1000 else "",  sivl)
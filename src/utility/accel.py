@@ -0,0 +1,113 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Registry for the functions the native (Rust) lib offers.
+For every function, the fastest available implementation is used: the native one if the lib could be loaded
+and its output agrees with the Python implementation on a small probe, otherwise the Python one.
+If a native implementation fails at runtime, only that function falls back to Python.
+"""
+
+import typing
+from typing import Callable, Dict, List, Tuple, Any, Optional
+
+import utility.misc
+import utility.text
+
+
+class _Entry:
+
+    def __init__(self, name: str, python_impl: Callable, probe: Tuple[Any, ...]):
+        self.name           = name
+        self.python_impl    = python_impl
+        self.probe          = probe
+        self.native_impl    : Optional[Callable] = None
+        self.active         = "python"
+        self.failures       = 0
+
+    def __call__(self, *args):
+        if self.native_impl is not None:
+            try:
+                return self.native_impl(*args)
+            except Exception:
+                self.failures    += 1
+                self.native_impl  = None
+                self.active       = "python (native failed)"
+        return self.python_impl(*args)
+
+
+_native_module  = None
+_native_loaded  = False
+_registry       : Dict[str, _Entry] = {}
+
+
+def _load_native():
+    """ Try to load the native lib once. Returns the module or None. """
+
+    global _native_module, _native_loaded
+    if _native_loaded:
+        return _native_module
+    _native_loaded = True
+    try:
+        _native_module = utility.misc.load_rust_lib()
+    except Exception:
+        _native_module = None
+    return _native_module
+
+
+def _register(name: str, python_impl: Callable, probe: Tuple[Any, ...], native_name: Optional[str] = None) -> _Entry:
+
+    entry   = _Entry(name, python_impl, probe)
+    mod     = _load_native()
+    if mod is not None and hasattr(mod, native_name or name):
+        native = getattr(mod, native_name or name)
+        # only use the native implementation if it gives the same result as the Python one
+        try:
+            if native(*probe) == python_impl(*probe):
+                entry.native_impl   = native
+                entry.active        = "native"
+            else:
+                entry.active        = "python (native mismatch)"
+        except Exception:
+            entry.active            = "python (native failed)"
+    _registry[name] = entry
+    return entry
+
+
+def native_lib_loaded() -> bool:
+    return _load_native() is not None
+
+def active_implementations() -> List[Tuple[str, str]]:
+    """ (function name, active implementation) for every registered function. """
+    return [(name, e.active) for name, e in _registry.items()]
+
+
+# region Registered functions
+
+def _mark_highlights_py(text: str, query_set: List[str]) -> str:
+    return utility.text.mark_highlights(text, set(query_set))
+
+def _probe_file() -> str:
+    return utility.misc.get_rust_folder_path() + "Cargo.toml"
+
+# rs_mark_highlights takes a list, so the registered function does too
+mark_highlights = _register("mark_highlights", _mark_highlights_py,
+                            ("Some text with a test word, and test words. Next\u001fnext field", ["test", "word", "words", "next"]),
+                            native_name="rs_mark_highlights")
+
+encode_file     = _register("encode_file", utility.misc.pdf_to_base64, (_probe_file(),))
+
+# endregion Registered functions
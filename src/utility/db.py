@@ -0,0 +1,99 @@
+# anki-search-inside-add-card
+# Copyright (C) 2019 - 2020 Tom Z.
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+import threading
+import typing
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# pragmas applied to every new pooled connection
+DEFAULT_PRAGMAS : List[str] = [
+    "pragma journal_mode = WAL",
+    "pragma synchronous = NORMAL",
+    "pragma temp_store = MEMORY",
+    # negative value = size in KiB, so ~16 MB of page cache per connection
+    "pragma cache_size = -16000",
+    "pragma mmap_size = 268435456",
+    # wait (ms) instead of failing with 'database is locked' if another thread is writing
+    "pragma busy_timeout = 5000",
+]
+
+
+class ConnectionPool:
+    """
+    Keeps one long-lived connection per thread to a single SQLite file.
+    Opening a connection means opening the file and parsing the schema on the first statement,
+    which is noticeable if it happens on every search.
+    Reusing the connection also lets sqlite3's statement cache hold on to prepared (parameterized) statements.
+    """
+
+    def __init__(self, file_path: str, pragmas: Optional[List[str]] = None):
+
+        self.file_path      = file_path
+        self.pragmas        = pragmas if pragmas is not None else DEFAULT_PRAGMAS
+        self._connections   : Dict[int, sqlite3.Connection] = {}
+        self._lock          = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """ Returns the connection of the calling thread, opens it if there is none yet. """
+
+        tid     = threading.get_ident()
+        conn    = self._connections.get(tid)
+        if conn is None:
+            # check_same_thread is disabled only so that close_all() can be called from the main thread,
+            # each connection is still only used by the thread that opened it
+            conn = sqlite3.connect(self.file_path, check_same_thread=False, cached_statements=256)
+            for p in self.pragmas:
+                conn.execute(p)
+            with self._lock:
+                self._connections[tid] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        with pool.transaction() as conn: ...
+        Commits when the block is left, rolls back if it raises. Nested blocks join the outer transaction.
+        """
+
+        conn = self.get()
+        if conn.in_transaction:
+            yield conn
+            return
+        # take the write lock right away, so that concurrent writers wait (busy_timeout) instead of failing on lock upgrade
+        conn.execute("begin immediate")
+        try:
+            yield conn
+        except:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def close_all(self):
+        """ Close all pooled connections, e.g. before the db file is deleted. """
+
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = {}
+
+    def size(self) -> int:
+        return len(self._connections)
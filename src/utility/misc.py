@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import base64
+import mmap
 import requests
 import random
 from glob import glob  
@@ -110,8 +111,12 @@ def url_to_base64(url):
     return base64.b64encode(requests.get(url).content).decode('ascii')
 
 def pdf_to_base64(path):
+    """ base64 encode the file without first copying its content into a bytes object. """
     with open(path, "rb") as pdf_file:
-        encoded_string = base64.b64encode(pdf_file.read()).decode("ascii")
+        if os.fstat(pdf_file.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoded_string = base64.b64encode(mapped).decode("ascii")
     return encoded_string
 
 def count_cards_added_today():
@@ -368,11 +373,11 @@ def find_pdf_files_in_dir_recursive(directory, cut_path=True):
     return result
 
 def load_rust_lib():
-    """ Attempt to load the Rust library which should be in the addon data folder. """
+    """ Attempt to load the Rust library which should be in the addon data folder. Returns the module or None. """
 
     if isLin:
         # no built lib for linux yet
-        return
+        return None
     lib  = "siacrs.so" if isMac else "siacrs.pyd"
     path = get_application_data_path()
     if not os.path.isdir(path):
@@ -385,6 +390,7 @@ def load_rust_lib():
     spec = importlib.util.spec_from_file_location("siacrs", os.path.join(path, lib))
     mod  = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
+    return mod
 
 def subdirs_fullpath(path):
     return [entry.path for entry in os.scandir(path) if entry.is_dir()]
@@ -25,9 +25,9 @@ from typing import Optional
 import aqt
 import os
 
-cleanWordReg    = re.compile(u"^[^a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]*(\S+?)[^a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]*$", re.I |re.U)    
-ignoreReg       = re.compile(u"^[^a-zA-Z0-9À-ÖØ-öø-ÿǒāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]+$", re.I | re.U)
-nonWordReg      = re.compile(u"[^a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]", re.I | re.U) 
+# runs of non-word characters, replaced by a single space in clean()
+nonWordReg      = re.compile(u"[^a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]+", re.I | re.U) 
+wordRunReg      = re.compile(u"[a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]+", re.I | re.U)
 wordToken       = re.compile(u"[a-zA-Z0-9À-ÖØ-öø-ÿāōūēīȳǒǎǐě\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]", re.I | re.U)
 
 # used to merge multiple field separator signs into singles 
@@ -49,7 +49,6 @@ normalChar      = re.compile(u"[a-z0-9öäü\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9
 asian_or_arabic_char    = re.compile(u"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D\u0621-\u064A]", re.U)
 asian_char              = re.compile(u"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D]", re.U)
 
-clean_spaces    = re.compile(u"[\r\n\t\u001f]+", re.U)
 asian_char_or_whitespace  = re.compile(u"([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3131-\uD79D ])", re.U)
 
 
@@ -65,32 +64,23 @@ def _get_config():
 stopwords       = set([s.lower() for s in _get_config()["stopwords"]])
 
 def clean(text):
-
-    filtered    = ""
+    """
+    Normalize the given text for indexing / searching: strip html, split into tokens, drop stopwords and tokens that are too short or too long.
+    All characters that are not word characters end up as single spaces after the two substitutions,
+    so the tokens don't need any further per-token regex cleaning.
+    """
 
     text        = text.replace("`", "")
-    text        = clean_spaces.sub(" ", text)
-    # text        = text.replace("\r\n", " ").replace("\n", " ")
-    # text        = text.replace("\t", " ")
-    # text        = text.replace("\u001f", " ")
     text        = tagReg.sub(" ", text)
     text        = nonWordReg.sub(" ", text)
-    text        = spaceReg.sub(" ", text)
 
-    for token in tokenize(text):
-        #this will prevent indexing / searching for base64 data urls
-        if len(token) > 200:
-            continue
-        if ignoreReg.match(token) is not None:
-            continue
-        token = cleanWordReg.sub(r'\1', token.strip())
-        if (len(token) <= 1 and not asian_or_arabic_char.search(token)) or token.lower() in stopwords:
-            continue
-        filtered = f"{filtered}{token} "
+    # this will prevent indexing / searching for base64 data urls (len > 200)
+    filtered    = [token for token in tokenize(text) 
+                    if len(token) <= 200
+                    and (len(token) > 1 or asian_or_arabic_char.search(token))
+                    and token.lower() not in stopwords]
 
-    if len(filtered) > 0:
-        return filtered[:-1]
-    return ""
+    return " ".join(filtered)
 
 
 def trim_if_longer_than(text, n):
@@ -181,6 +171,9 @@ def ascii_fold_char(char):
         return 'y'
     return char
 
+# same mapping as ascii_fold_char, for already lowercased text
+_fold_table = str.maketrans({ c : base for chars, base in [("àáâãåāăǎ", "a"), ("ùúûūǔ", "u"), ("òóôōǒ", "o"), ("èéêëēěę", "e"), ("ìíîïīǐ", "i"), ("ýỳÿȳ", "y")] for c in chars })
+
 def delete_chars(text, chars):
     for c in chars:
         text = text.replace(c, "")
@@ -476,53 +469,69 @@ def clean_tags(tags):
 
 
 def mark_highlights(text, querySet):
+    """
+    Wrap all words of the given text whose (lowercased, accent-folded) form is in querySet in <MARK> tags.
+    Adjacent marked words (only separated by non-word chars, but not by a field separator) share a single tag.
+    Single asian chars that are in querySet are marked too.
+    Output is collected as list of parts and joined once, so this is linear in the length of the text.
+    """
 
-    currentWord             = ""
-    currentWordNormalized   = ""
-    textMarked              = ""
+    parts                   = []
+    # index in parts of the closing tag of the last marked word, so it can be dropped if the next word is marked too
+    last_close              = -1
     lastIsMarked            = False
-    # c = 0
-    for char in text:
-        # c += 1
-        if wordToken.match(char):
-            currentWordNormalized = ''.join((currentWordNormalized, ascii_fold_char(char).lower()))
-            # currentWordNormalized = ''.join((currentWordNormalized, char.lower()))
-            if is_asian_char(char) and str(char) in querySet:
-                currentWord = ''.join((currentWord, "<MARK>%s</MARK>" % char))
-            else:
-                currentWord = ''.join((currentWord, char))
-
-        else:
-            #we have reached a word boundary
-            #check if word is empty
-            if currentWord == "":
-                textMarked = ''.join((textMarked, char))
-            else:
-                #if the word before the word boundary is in the query, we want to highlight it
-                if currentWordNormalized in querySet:
-                    #we check if the word before has been marked too, if so, we want to enclose both, the current word and
-                    # the word before in the same <mark></mark> tag (looks better)
-                    if lastIsMarked and not "\u001f" in textMarked[textMarked.rfind("<MARK>"):]:
-                    # if lastIsMarked:
-                        closing_index   = textMarked.rfind("</MARK>")
-                        textMarked      = ''.join((textMarked[0: closing_index], textMarked[closing_index + 7 :]))
-                        textMarked      = ''.join((textMarked, currentWord, "</MARK>", char))
-                    else:
-                        textMarked      = ''.join((textMarked, "<MARK>", currentWord, "</MARK>", char))
-                        # c += 13
-                    lastIsMarked = True
-                #if the word is not in the query, we simply append it unhighlighted
+    # True if a field separator has been emitted after the last <MARK>
+    sep_since_mark          = False
+    pos                     = 0
+    length                  = len(text)
+
+    for m in wordRunReg.finditer(text):
+        start, end          = m.span()
+        if start > pos:
+            gap             = text[pos:start]
+            parts.append(gap)
+            if not sep_since_mark and "\u001f" in gap:
+                sep_since_mark = True
+        pos                 = end
+
+        word                = m.group()
+        normalized          = word.lower().translate(_fold_table)
+        has_inner_marks     = False
+
+        if asian_char.search(word) is not None:
+            chars = []
+            for char in word:
+                if is_asian_char(char) and char in querySet:
+                    chars.append("<MARK>%s</MARK>" % char)
+                    has_inner_marks = True
                 else:
-                    textMarked      = ''.join((textMarked, currentWord, char))
-                    lastIsMarked    = False
+                    chars.append(char)
+            word = "".join(chars)
 
-                currentWord             = ""
-                currentWordNormalized   = ""
+        # the last word of the text is never merged with the one before
+        if end == length:
+            if word != "MARK" and normalized in querySet:
+                parts.extend(("<MARK>", word, "</MARK>"))
+            else:
+                parts.append(word)
+            break
 
-    if currentWord != "":
-        if currentWord != "MARK" and currentWordNormalized in querySet:
-            textMarked = ''.join((textMarked, "<MARK>", currentWord, "</MARK>"))
+        if normalized in querySet:
+            if lastIsMarked and not sep_since_mark:
+                parts[last_close] = ""
+                parts.extend((word, "</MARK>"))
+            else:
+                parts.extend(("<MARK>", word, "</MARK>"))
+            last_close      = len(parts) - 1
+            lastIsMarked    = True
+            sep_since_mark  = False
         else:
-            textMarked = ''.join((textMarked, currentWord))
+            parts.append(word)
+            lastIsMarked    = False
+            if has_inner_marks:
+                sep_since_mark = False
+
+    if pos < length:
+        parts.append(text[pos:])
 
-    return textMarked
\ No newline at end of file
+    return "".join(parts)
\ No newline at end of file
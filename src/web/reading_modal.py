@@ -58,14 +58,7 @@ from ..stats import getRetentions
 from ..markdown import markdown
 
 
-try:
-    # from ..rs.siacrs.siacrs import *
-    utility.misc.load_rust_lib()
-    from siacrs import *
-    state.rust_lib = True
-
-except:
-    state.rust_lib = False
+import utility.accel
 
 
 
@@ -375,14 +368,8 @@ class ReadingModal:
 
     def _display_pdf(self, full_path: str, note_id: int):
 
-        # use rust based lib for better performance if possible
-        if state.rust_lib:
-            try:
-                base64pdf       = encode_file(full_path)
-            except:
-                state.rust_lib = False
-        if not state.rust_lib:
-            base64pdf       = utility.misc.pdf_to_base64(full_path)
+        # uses the rust based lib if available, mmap + base64 otherwise
+        base64pdf       = utility.accel.encode_file(full_path)
         blen            = len(base64pdf)
 
         #pages read are stored in js array [int]
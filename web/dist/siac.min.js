@@ -1,24 +1,204 @@
-(function(t,e){for(var a in e)t[a]=e[a]})(window,function(e){function t(a){if(i[a])return i[a].exports;var n=i[a]={i:a,l:!1,exports:{}};return e[a].call(n.exports,n,n.exports,t),n.l=!0,n.exports}var i={};return t.m=e,t.c=i,t.d=function(e,i,a){t.o(e,i)||Object.defineProperty(e,i,{enumerable:!0,get:a})},t.r=function(e){'undefined'!=typeof Symbol&&Symbol.toStringTag&&Object.defineProperty(e,Symbol.toStringTag,{value:'Module'}),Object.defineProperty(e,'__esModule',{value:!0})},t.t=function(e,i){if(1&i&&(e=t(e)),8&i)return e;if(4&i&&'object'==typeof e&&e&&e.__esModule)return e;var a=Object.create(null);if(t.r(a),Object.defineProperty(a,'default',{enumerable:!0,value:e}),2&i&&'string'!=typeof e)for(var n in e)t.d(a,n,function(t){return e[t]}.bind(null,n));return a},t.n=function(e){var i=e&&e.__esModule?function(){return e['default']}:function(){return e};return t.d(i,'a',i),i},t.o=function(e,t){return Object.prototype.hasOwnProperty.call(e,t)},t.p='',t(t.s=0)}([function(e,t,i){e.exports=i(10)},function(){var e=Math.min,t=Math.max;window.siacState={selectedDecks:['-1'],timeout:null,isFrozen:!1,searchOnSelection:!0,searchOnTyping:!0,keepPositionAtRendering:!1},window.lastHadResults=!1,window.loadingTimer=null,window.calTimer=null,window.gridView=!1,window.tagHoverCB=null,window.tagHoverTimeout=750,window.searchMaskTimer=null,window.$fields=null,window.byId=function(e){return document.getElementById(e)},window.sendContent=function(e){if(e&&e.repeat||null!=pdfDisplayed||siacState.isFrozen)return;if(!$fields.text())return;let t='';showLoading('Typing'),$fields.each(function(e,i){t+=i.innerHTML+'\x1F'}),pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+t)},window.searchCurrentField=function(){if(!(displayedNoteId||siacState.isFrozen)){let e=$('.field:focus').first();if(e.length){let i=e.text();i&&0!==i.trim().length&&(showLoading('Typing'),pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+i))}}},window.sendSearchFieldContent=function(){showLoading('Searchbar'),html=byId('siac-browser-search-inp').value+'\x1F',pycmd('siac-r-srch-db '+siacState.selectedDecks.toString()+' ~ '+html)},window.searchFor=function(e){showLoading('Note Search'),e+='\x1F',pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+e)},window.updateSelectedDecks=function(e){siacState.selectedDecks=[];let t='';e&&$(e).toggleClass('selected'),$('.deck-list-item.selected').each(function(){$(this).data('id')&&(siacState.selectedDecks.push($(this).data('id')),t+=' '+$(this).data('id'))}),pycmd('deckSelection'+t)},window.selectAllDecks=function(){$('.deck-list-item').addClass('selected'),updateSelectedDecks()},window.unselectAllDecks=function(){$('.deck-list-item').removeClass('selected'),updateSelectedDecks()},window.selectDeckWithId=function(e){$('.deck-list-item').removeClass('selected'),$('.deck-list-item').each(function(){$(this).data('id')==e&&$(this).addClass('selected')}),updateSelectedDecks()},window.selectDeckAndSubdecksWithId=function(e){$('.deck-list-item').removeClass('selected'),$(`.deck-list-item[data-id=${e}]`).addClass('selected'),$(`.deck-list-item[data-id=${e}] .deck-list-item`).addClass('selected'),updateSelectedDecks()},window.fixRetMarkWidth=function(e){e&&0<e.parentElement.getElementsByClassName('retMark').length&&0==e.parentElement.getElementsByClassName('retMark')[0].style.maxWidth.length&&(e.parentElement.getElementsByClassName('retMark')[0].style.maxWidth=e.offsetWidth+'px')},window.expandRankingLbl=function(e){fixRetMarkWidth(e),null===e.getElementsByClassName('rankingLblAddInfo')[0].offsetParent?(e.getElementsByClassName('rankingLblAddInfo')[0].style.display='inline',e.getElementsByClassName('editedStamp')[0].style.display='none',0!==e.parentElement.getElementsByClassName('siac-susp-lbl').length&&(e.parentElement.getElementsByClassName('siac-susp-lbl')[0].style.display='none')):(e.getElementsByClassName('rankingLblAddInfo')[0].style.display='none',e.getElementsByClassName('editedStamp')[0].style.display='inline',0!==e.parentElement.getElementsByClassName('siac-susp-lbl').length&&(e.parentElement.getElementsByClassName('siac-susp-lbl')[0].style.display='block'))},window.expandCard=function(e){pycmd('siac-note-stats '+e)},window.pinMouseLeave=function(e){$(e).css('opacity','0')},window.pinMouseEnter=function(e){$(e).css('opacity','1')},window.cardMouseEnter=function(e,t,i='full'){'full'==i?$(`#btnBar-${t}`).css('opacity','1'):$(`#btnBarSmp-${t}`).css('opacity','1')},window.showLoading=function(e){loadingTimer=setTimeout(function(){byId('searchInfo').innerHTML=`<table><tr><td>Status</td><td><b>Searching</b></td></tr><tr><td>Source</td><td><i>${e}</i></td></tr></table>`},1e3)},window.totalOffset=function(e){var t=0,i=0;do t+=e.offsetTop||0,i+=e.offsetLeft||0,e=e.offsetParent;while(e);return{top:t,left:i}},window.cardMouseLeave=function(e,t,i='full'){setTimeout(function(){'full'==i?!$('#btnBar-'+t).is(':hover')&&$('#btnBar-'+t).css('opacity','0'):!$('#btnBarSmp-'+t).is(':hover')&&$('#btnBarSmp-'+t).css('opacity','0')},100)},window.tagMouseEnter=function(e){showTagInfoOnHover&&e&&e.parentElement&&!displayedNoteId&&(tagHoverCB=setTimeout(function(){e&&e.parentElement&&e.parentElement.querySelector(':hover')===e&&!byId('siac-tag-info-box-'+$(e).data('stamp'))&&pycmd('siac-tag-info '+$(e).data('stamp')+' '+$(e).data('name'))},tagHoverTimeout))},window.showTagInfo=function(e){let t=$(e).data('stamp');$(e).css('z-index','9999'),e&&$('#greyout').show();let a=totalOffset(e);a.top+=17;let n=document.getElementsByClassName('siac-tag-info-box');e.parentElement.id&&'tagContainer'===e.parentElement.id?a.top-=byId('tagContainer').scrollTop:1<n.length?0<=e.parentElement.parentElement.parentElement.className.indexOf('siac-tag-info-box-left')&&(a.top-=e.parentElement.parentElement.parentElement.scrollTop):null===byId('cal-info').offsetParent?a.top-=byId('searchResults').scrollTop:a.top-=byId('cal-info-notes').scrollTop;let s='siac-tag-info-box-'+t;a.left>window.outerWidth-a.left&&(a.left-=$('#siac-tag-info-box-'+t).outerWidth(),a.left+=$(e).outerWidth()+2);let d=0;for(var o=0;o<n.length;o++)+$(n[o]).css('z-index')>d&&(d=+$(n[o]).css('z-index'));if($('#siac-tag-info-box-'+t).css('top',a.top).css('left',a.left).css('z-index',d+1),a.top>window.outerHeight-a.top){byId(s).style.visibility='hidden',byId(s).style.display='block';let e=17;1<n.length&&(e=15),$('#'+s).css('top',a.top-$('#'+s).outerHeight()-e),byId(s).style.visibility='visible'}else byId(s).style.display='block'},window.tagMouseLeave=function(e){let t=$(e).data('stamp');if(!($('#siac-tag-info-box-'+t+':hover').length||$(`.tagLbl[data-stamp='${t}']:hover`).length)){let i=document.getElementsByClassName('siac-tag-info-box'),n=+$(e).css('z-index'),s=$('.siac-tag-info-box:hover').first();if(!s.length&&!$(`.tagLbl[data-stamp]:hover`).length)return $('.siac-tag-info-box').remove(),$('.tagLbl').css('z-index','4'),void $('#greyout').hide();if(s.length){let t=+s.css('z-index');if(e.id&&t>n)return;for(var a=0;a<i.length;a++)+$(i[a]).css('z-index')>t&&($(i[a]).remove(),a--)}$(`.tagLbl[data-stamp='${t}']`).first().css('z-index','4'),byId('siac-tag-info-box-'+t)&&$('#siac-tag-info-box-'+t).remove(),(!i||1>i.length)&&$('#greyout').hide()}},window.tagInfoBoxClicked=function(e){let t=+$(e).css('z-index'),a=document.getElementsByClassName('siac-tag-info-box');for(var n=0;n<a.length;n++)+$(a[n]).css('z-index')<t&&($(a[n]).remove(),n--)},window.appendToField=function(e,t){$(`.field:eq(${e})`).text().length?$(`.field:eq(${e})`).append('<br/>'+t):$(`.field:eq(${e})`).html(t),pycmd(`blur:${e}:${currentNoteId}:${$(`.field:eq(${e})`).html()}`)},window.getSelectionText=function(){if(siacState.searchOnSelection&&!siacState.isFrozen){var e='';window.getSelection?e=window.getSelection().toString():document.selection&&'Control'!=document.selection.type&&(e=document.selection.createRange().text),0<e.trim().length&&'&nbsp;'!=e&&(showLoading('Selection'),pycmd('siac-r-fld-selected '+siacState.selectedDecks.toString()+' ~ '+e))}},window.searchForUserNote=function(e,t){t&&0!==t.value.length&&t.value.trim()&&(13==e.keyCode?(t.id&&(t.parentElement.parentElement.style.display='none'),pycmd('siac-r-user-note-search-inp '+t.value)):t.id&&('Escape'===e.key||'Esc'===e.key)?t.parentElement.style.display='none':(clearTimeout(searchMaskTimer),searchMaskTimer=setTimeout(function(){pycmd('siac-r-user-note-search-inp '+t.value)},800)))},window.searchUserNoteTag=function(t,e){t.ctrlKey||t.metaKey?pycmd('siac-create-note-tag-prefill '+e):pycmd('siac-r-user-note-search-tag '+e)},window.switchLeftRight=function(){let e=byId('leftSide'),t=byId('siac-right-side');'leftSide'===e.parentNode.children[0].id?(e.parentNode.insertBefore(t,e),$(document.body).addClass('siac-left-right-switched'),pycmd('siac-switch-left-right true')):(e.parentNode.insertBefore(e,t),$(document.body).removeClass('siac-left-right-switched'),pycmd('siac-switch-left-right false'))},window.onWindowResize=function(e=!0){let t=byId('topbutsOuter').offsetHeight+3;byId('outerWr').style.marginTop=t+'px',byId('outerWr').style.height=`calc(100vh - ${t}px)`,$('#switchBtn').is(':visible')||($('#leftSide').css('display','flex'),$('#outerWr').css('display','flex').removeClass('onesided'),byId('switchBtn').innerHTML='&#10149; Search'),e&&'undefined'!=typeof pdfDisplayed&&pdfDisplayed&&(this.resizeTimeout&&clearTimeout(this.resizeTimeout),this.resizeTimeout=setTimeout(function(){pdfDisplayed&&pdfFitToPage()},300))},window.setHighlighting=function(e){let t=$(e).is(':checked')?'on':'off';pycmd('siac-toggle-highlight '+t)},window.setTagSearch=function(e){let t=$(e).is(':checked')?'on':'off';pycmd('tagSearch '+t)},window.tagClick=function(e){if($(e).data('tags')&&$(e).data('tags')==$(e).data('name'))return $('#a-modal').show(),void pycmd('siac-render-tags '+$(e).data('tags'));let t=$(e).data('target')||$(e).data('name');$('.siac-tag-info-box').remove(),$('#greyout').hide(),pycmd('siac-tag-clicked '+t)},window.noteSidebarExpandAll=function(){$('#siac-notes-sidebar .exp').each(function(e,t){let i=$(t);i.text().length&&'[+]'===i.text()&&(i.text('[-]'),i.parent().parent().children('ul').toggle())})},window.noteSidebarCollapseAll=function(){$('#siac-notes-sidebar .exp').each(function(e,t){let i=$(t);i.text().length&&'[-]'===i.text()&&(i.text('[+]'),i.parent().parent().children('ul').toggle())})},window.deleteNote=function(e){byId('siac-del-modal').innerHTML='<center style="margin: 20px 0 20px 0;">Deleting...</center>',setTimeout(function(){pycmd('siac-delete-user-note '+e)},80)},window.synInputKeyup=function(e,t){13==e.keyCode&&t.value&&pycmd('siac-save-synonyms '+t.value)},window.synonymSetKeydown=function(e,t,i){13==e.keyCode&&t.innerHTML.length&&(pycmd('siac-edit-synonyms '+i+' '+t.innerHTML),e.preventDefault(),$(t).blur())},window.searchSynset=function(e){let t=e.parentElement.parentElement.children[0].children[0].innerHTML;t&&pycmd('siac-r-synset-search '+t)},window.updateFieldToExclude=function(e,t,i){$(e).is(':checked')?pycmd('siac-update-field-to-exclude '+t+' '+i+' false'):pycmd('siac-update-field-to-exclude '+t+' '+i+' true')},window.updateFieldToHideInResult=function(e,t,i){$(e).is(':checked')?pycmd('siac-update-field-to-hide-in-results '+t+' '+i+' false'):pycmd('siac-update-field-to-hide-in-results '+t+' '+i+' true')},window.setSearchOnTyping=function(e,t=!0){siacState.searchOnTyping=e,e?($('.field').on('keydown.siac',fieldKeypress),t&&sendContent()):$('.field').off('keydown.siac',fieldKeypress),sendSearchOnTyping()},window.sendSearchOnTyping=function(){pycmd('siac-config-bool searchOnTyping '+siacState.searchOnTyping)},window.sendSearchOnSelection=function(){pycmd('siac-config-bool searchOnSelection '+siacState.searchOnSelection)},window.fieldKeypress=function(e){return 13==e.keyCode||9==e.keyCode||91==e.keyCode||37<=e.keyCode&&40>=e.keyCode||e.ctrlKey||e.altKey||(siacState.timeout&&(clearTimeout(siacState.timeout),siacState.timeout=null),siacState.timeout=setTimeout(function(){sendContent(e)},delayWhileTyping)),!0},window.searchMaskKeypress=function(e){13===e.keyCode&&sendSearchFieldContent()},window.pinCard=function(e,t){$('#cW-'+t).css('padding','3px 4px 5px 5px'),$('#cW-'+t).css('font-size','9px');let i=byId('cW-'+t).getElementsByClassName('rankingLblAddInfo')[0],a=byId('cW-'+t).getElementsByClassName('editedStamp')[0];$('#cW-'+t).html('<span>&#128204;</span>'),byId('cW-'+t).appendChild(i),byId('cW-'+t).appendChild(a),$('#'+t).parents().first().addClass('pinned'),updatePinned()},window.searchCard=function(e){let t=$(e).parent().next().html();showLoading('Note Search'),pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+t)},window.searchCardFromFloated=function(e){let t=byId(e).innerHTML;showLoading('Note Search'),pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+t)},window.edit=function(e){pycmd('siac-edit-note '+e)},window.updatePinned=function(){let e='siac-pin';$('.pinned').each(function(){e+=' '+$(this).children().first().children().first().attr('id').substring(3)}),$('.noteFloating').each(function(){e+=' '+$(this).attr('id').substring(3)}),pycmd(e)},window.clearSearchResults=function(){let e=document.querySelectorAll('#searchResults .cardWrapper:not(.pinned)');for(var t=0;t<e.length;t++)e[t].remove();try{byId('startInfo').remove(),byId('greyout').style.display='none'}catch(t){}$('.siac-tag-info-box,#siac-results-loader-wrapper').remove(),$('.tagLbl').css('z-index','999')},window.setSearchResults=function(e,t,i,a=1,n=1,s=50,d=-1,o=-1,l=!1,r=!1){let p=new Date().getTime();clearSearchResults();var f=byId('searchResults');f.style.overflowY='hidden',f.style.paddingRight='24px',f.innerHTML+=e,r||siacState.keepPositionAtRendering||!(0<e.length)?siacState.keepPositionAtRendering&&(siacState.keepPositionAtRendering=!1):f.scrollTop=0;let g=1;if(clearTimeout(loadingTimer),i&&lastHadResults&&byId('info-Took')?(byId('info-Took').innerHTML=i.Took,byId('info-Found').innerHTML=i.Found,byId('tagContainer').innerHTML=i.Tags,byId('keywordContainer').innerHTML=i.Keywords):byId('searchInfo').innerHTML=t,lastHadResults=!!i,$searchInfo.hasClass('hidden')||($searchInfo.get(0).style.display='flex'),!renderImmediately){function t(){gridView?$('#nWr-'+(g+50*(a-1))).fadeIn().css('display','inline-block'):$('#nWr-'+(g+50*(a-1))).fadeIn(),setTimeout(function(){g++,g<count?t():(gridView?$('#searchResults .cardWrapper').css('display','inline-block'):$('#searchResults .cardWrapper').show(),f.style.overflowY='auto',f.style.paddingRight='10px',byId('greyout').style.display='none')},time)}if(time=gridView?100:130,count=gridView?16:10,-1<o&&byId('info-took'))if(l){let e=new Date().getTime()-o;byId('info-Took').innerHTML=`<b>${e}</b> ms &nbsp;<b style='cursor: pointer' onclick='pycmd("siac-last-timing ${new Date().getTime()-p}")'><i class='fa fa-info-circle'></i></b>`}else byId('info-Took').innerHTML=`<b>${new Date().getTime()-o}</b> ms`;t(),displayPagination(a,n,s,0<e.length,d)}else if(gridView?$('#searchResults .cardWrapper').css('display','inline-block'):$('#searchResults .cardWrapper').show(),f.style.overflowY='auto',f.style.paddingRight='10px',byId('greyout').style.display='none',displayPagination(a,n,s,0<e.length,d),-1<o&&byId('info-took'))if(l){let e=new Date().getTime()-o;byId('info-Took').innerHTML=`<b>${e}</b> ms &nbsp;<b style='cursor: pointer' onclick='pycmd("siac-last-timing ${new Date().getTime()-p}")'><i class='fa fa-info-circle'></i></b>`}else byId('info-Took').innerHTML=`<b>${new Date().getTime()-o}</b> ms`},window.displayPagination=function(n,s,a,d,o){if(-1!==o){let e='';if(1<o){e+=`<div onclick='pycmd("siac-rerender ${o-2}")' style='display: inline; cursor: pointer;'>Last Results: &nbsp;</div>`;for(var l=0;l<o-1;l++)e+=`<span onclick='pycmd("siac-rerender ${o-l-2}")'>${l+1}</span>`}byId('siac-cache-displ').innerHTML=e}let i='';if(0===s||!d)return byId('siac-pagination-status').innerHTML='',void(byId('siac-pagination-wrapper').innerHTML='');if(1===n&&1==s)i='';else{i+=`<div class='siac-pg-icn' onclick='pycmd("siac-page 1")'>&#171;</div>`,i+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${t(n-1,1)}")'>&#8249;</div>`;let d=0,a=0;n+5>s&&(d=n+5-s),0>=n-5&&(a=Math.abs(n-5)+1);for(var l=t(n-5-d,1);l<=n+5+a;l++)l==n?i+=`<div class='siac-pg-icn siac-pg-icn-active' onclick='pycmd("siac-page ${l}")'>${l}</div>`:l<=s&&(i+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${l}")'>${l}</div>`);i+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${e(n+1,s)}")'>&#8250;</div>`,i+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${s}")'>&#187;</div>`}byId('siac-pagination-status').innerHTML=`Showing ${50*(n-1)+1} - ${e(a,50*n)} of ${a}`,byId('siac-pagination-wrapper').innerHTML=i},window.sendClickedInformation=function(e,t){let i=document.elementFromPoint(e,t);return'IMG'==i.tagName?'img '+i.src:('SPAN'==i.tagName||'DIV'==i.tagName||'MARK'==i.tagName)&&'siac-inner-card'==i.parentElement.className?'note '+i.parentElement.id+' '+i.parentElement.innerHTML:'siac-inner-card'==i.className?'note '+i.id+' '+i.innerHTML:void 0},window.toggleTooltip=function(e){$(e).children().first().toggle()},window.toggleFreeze=function(e){siacState.isFrozen=!siacState.isFrozen,$(e).hasClass('frozen')?$(e).removeClass('frozen'):$(e).addClass('frozen')},window.hideTop=function(){$('#topContainer').hide(),$('#toggleTop').children().first().html('&#10097;'),pycmd('toggleTop off')},window.toggleTop=function(e){$('#topContainer').toggle(),$('#topContainer').is(':hidden')?($(e).children().first().html('&#10097;'),pycmd('toggleTop off')):($(e).children().first().html('&#10096;'),pycmd('toggleTop on'))},window.toggleGrid=function(e){$(e).is(':checked')?(pycmd('toggleGrid on'),gridView=!0):(pycmd('toggleGrid off'),gridView=!1)},window.activateGridView=function(){gridView=!0,window.setTimeout(function(){$('#gridCb').prop('checked',!0)},400)},window.predefSearchFromSidebar=function(e){let t=siacState.selectedDecks.toString();-1===['lowestPerf','highestPerf','highestRet','lowestRet'].indexOf(e)?pycmd('siac-predef-search '+e+' 200 '+t):(showSearchLoader('<i class=\'fa fa-spinner bold mb-10\' style=\'font-size: 24px;\' /><br>Computing ...'),setTimeout(function(){pycmd('siac-predef-search '+e+' 200 '+t)},250))},window.predefSearch=function(){let t=byId('predefSearchSelect'),e=t.options[t.selectedIndex].value,i=byId('predefSearchNumberSel'),a=i.options[i.selectedIndex].value,n=siacState.selectedDecks.toString();-1===['lowestPerf','highestPerf','highestRet','lowestRet'].indexOf(e)?pycmd('siac-predef-search '+e+' '+a+' '+n):(showSearchLoader('<i class=\'fa fa-spinner bold mb-10\' style=\'font-size: 24px;\' /><br>Computing ...'),setTimeout(function(){pycmd('siac-predef-search '+e+' '+a+' '+n)},250))},window.sort=function(){let t=byId('sortSelect'),e=t.options[t.selectedIndex].value;pycmd('siac-p-sort '+e)},window.toggleAddon=function(){try{'none'!==byId('siac-reading-modal').style.display&&pdfFullscreen?$(document.body).hasClass('siac-fullscreen-show-fields')?$(document.body).removeClass('siac-fullscreen-show-fields').addClass('siac-fullscreen-show-right'):$(document.body).addClass('siac-fullscreen-show-fields').removeClass('siac-fullscreen-show-right'):($('#outerWr').hasClass('onesided')?(showSearchPaneOnLeftSide(),$('#siac-right-side').toggleClass('addon-hidden')):$('#switchBtn').is(':visible')?showSearchPaneOnLeftSide():$('#siac-right-side').toggleClass('addon-hidden'),pycmd('toggleAll '+($('#siac-right-side').hasClass('addon-hidden')?'off':'on'))),onWindowResize(!1)}catch(t){pycmd('siac-notification Failed to toggle: '+t.message)}},window.showSearchPaneOnLeftSide=function(){$('#outerWr').hasClass('onesided')?($('#leftSide').show(),byId('switchBtn').innerHTML='&#10149; Search',$('#outerWr').css('display','flex').removeClass('onesided')):($('#leftSide').hide(),$('#siac-right-side').removeClass('addon-hidden'),byId('switchBtn').innerHTML='&#10149; Back',$('#outerWr').css('display','block').addClass('onesided'),onWindowResize())},window.updateSwitchBtn=function(e){$('#outerWr').hasClass('onesided')||(byId('switchBtn').innerHTML=`&#10149; Search (${e})`)},window.removeNote=function(e){$(byId('cW-'+e).parentElement.parentElement).remove(),updatePinned()},window.getOffset=function(e){for(var t=0,i=0;e&&'siac-right-side'!==e.id&&!isNaN(e.offsetLeft)&&!isNaN(e.offsetTop);)t+=e.offsetLeft-e.scrollLeft,i+=e.offsetTop-e.scrollTop,e=e.offsetParent;return{top:i,left:t}},window.calBlockMouseEnter=function(e,t){calTimer=setTimeout(function(){$('#cal-row').is(':hover')&&e.ctrlKey&&(displayCalInfo(t),calTimer=null)},100)},window.displayCalInfo=function(e){let t=getOffset(e.children[0]),i=t.left-153,a=byId('siac-second-col-wrapper').clientWidth-t.left-153;0>i?(i-=t.left-153,document.documentElement.style.setProperty('--tleft',t.left+'px')):document.documentElement.style.setProperty('--tleft','50%'),0>a&&(document.documentElement.style.setProperty('--tleft',-a+153+'px'),i+=a),$('#cal-info').css('left',i+'px').css('top',t.top-275+'px'),byId('cal-info').style.display='block',pycmd('siac-cal-info '+$(e.children[0]).data('index'))},window.calMouseLeave=function(){calTimer=setTimeout(function(){$('#cal-row').is(':hover')||$('#cal-info').is(':hover')||(byId('cal-info').style.display='none'),calTimer=null},300)},window.fieldsBtnClicked=function(){if(siacState.isFrozen)return void pycmd('siac-notification Results are frozen.');if(!$fields.text())return void pycmd('siac-notification Fields are empty.');let e='';showLoading('Typing'),$fields.each(function(t,i){e+=i.innerHTML+'\x1F'}),pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+e)},window.showModalSubpage=function(e){$('#modalText').hide(),$('#modal-subpage-inner').html(e),byId('modal-subpage').style.display='flex'},window.hideModalSubpage=function(){$('#modal-subpage-inner').html(''),$('#modal-subpage').hide(),$('#modalText').show()},window.showPDFLoader=function(){let e=pageSidebarDisplayed?230:0;byId('siac-reading-modal-center').innerHTML+=`
+(function(t,e){for(var a in e)t[a]=e[a]})(window,function(e){function t(a){if(i[a])return i[a].exports;var n=i[a]={i:a,l:!1,exports:{}};return e[a].call(n.exports,n,n.exports,t),n.l=!0,n.exports}var i={};return t.m=e,t.c=i,t.d=function(e,i,a){t.o(e,i)||Object.defineProperty(e,i,{enumerable:!0,get:a})},t.r=function(e){'undefined'!=typeof Symbol&&Symbol.toStringTag&&Object.defineProperty(e,Symbol.toStringTag,{value:'Module'}),Object.defineProperty(e,'__esModule',{value:!0})},t.t=function(e,i){if(1&i&&(e=t(e)),8&i)return e;if(4&i&&'object'==typeof e&&e&&e.__esModule)return e;var a=Object.create(null);if(t.r(a),Object.defineProperty(a,'default',{enumerable:!0,value:e}),2&i&&'string'!=typeof e)for(var n in e)t.d(a,n,function(t){return e[t]}.bind(null,n));return a},t.n=function(e){var i=e&&e.__esModule?function(){return e['default']}:function(){return e};return t.d(i,'a',i),i},t.o=function(e,t){return Object.prototype.hasOwnProperty.call(e,t)},t.p='',t(t.s=0)}([function(e,t,i){e.exports=i(10)},function(){window.siacState={selectedDecks:["-1"],timeout:null,isFrozen:false,searchOnSelection:true,searchOnTyping:true,keepPositionAtRendering:false,resultWindow:null};window.lastHadResults=false;window.loadingTimer=null;window.calTimer=null;window.gridView=false;window.tagHoverCB=null;window.tagHoverTimeout=750;window.searchMaskTimer=null;window.$fields=null;window.byId=function(id){return document.getElementById(id);};window.sendContent=function(event){if((event&&event.repeat)||pdfDisplayed!=null||siacState.isFrozen){return;}
+if(!$fields.text()){return;}
+let html="";showLoading("Typing");$fields.each(function(index,elem){html+=elem.innerHTML+"\u001f";});pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+html);};window.searchCurrentField=function(){if(displayedNoteId||siacState.isFrozen){return;}
+let f=$('.field:focus').first();if(!f.length){return;}
+let t=f.text();if(!t||t.trim().length===0){return;}
+showLoading("Typing");pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+t);};window.sendSearchFieldContent=function(){showLoading("Searchbar");html=byId('siac-browser-search-inp').value+"\u001f";pycmd('siac-r-srch-db '+siacState.selectedDecks.toString()+' ~ '+html);}
+window.searchFor=function(text){showLoading("Note Search");text+="\u001f";pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+text);}
+window.updateSelectedDecks=function(elem){siacState.selectedDecks=[];let str="";if(elem)
+$(elem).toggleClass("selected");$(".deck-list-item.selected").each(function(){if($(this).data('id')){siacState.selectedDecks.push($(this).data('id'));str+=" "+$(this).data('id');}});pycmd("deckSelection"+str);}
+window.selectAllDecks=function(){$('.deck-list-item').addClass('selected');updateSelectedDecks();}
+window.unselectAllDecks=function(){$('.deck-list-item').removeClass('selected');updateSelectedDecks();}
+window.selectDeckWithId=function(did){$('.deck-list-item').removeClass('selected');$(".deck-list-item").each(function(){if($(this).data('id')==did){$(this).addClass("selected");}});updateSelectedDecks();}
+window.selectDeckAndSubdecksWithId=function(did){$('.deck-list-item').removeClass('selected');$(`.deck-list-item[data-id=${did}]`).addClass("selected");$(`.deck-list-item[data-id=${did}] .deck-list-item`).addClass("selected");updateSelectedDecks();}
+window.fixRetMarkWidth=function(elem){if(elem&&elem.parentElement.getElementsByClassName("retMark").length>0&&elem.parentElement.getElementsByClassName("retMark")[0].style.maxWidth.length==0)
+elem.parentElement.getElementsByClassName("retMark")[0].style.maxWidth=elem.offsetWidth+"px";}
+window.expandRankingLbl=function(elem){fixRetMarkWidth(elem);if(elem.getElementsByClassName("rankingLblAddInfo")[0].offsetParent===null){elem.getElementsByClassName("rankingLblAddInfo")[0].style.display="inline";elem.getElementsByClassName("editedStamp")[0].style.display="none";if(elem.parentElement.getElementsByClassName("siac-susp-lbl").length!==0){elem.parentElement.getElementsByClassName("siac-susp-lbl")[0].style.display="none";}}else{elem.getElementsByClassName("rankingLblAddInfo")[0].style.display="none";elem.getElementsByClassName("editedStamp")[0].style.display="inline";if(elem.parentElement.getElementsByClassName("siac-susp-lbl").length!==0){elem.parentElement.getElementsByClassName("siac-susp-lbl")[0].style.display="block";}}}
+window.expandCard=function(id,icn){pycmd("siac-note-stats "+id);}
+window.pinMouseLeave=function(elem){$(elem).css('opacity','0');}
+window.pinMouseEnter=function(elem){$(elem).css('opacity','1');}
+window.cardMouseEnter=function(elem,nid,mode="full"){if(mode=="full"){$(`#btnBar-${nid}`).css('opacity','1');}else{$(`#btnBarSmp-${nid}`).css('opacity','1');}}
+window.showLoading=function(source){loadingTimer=setTimeout(function(){byId('searchInfo').innerHTML=`<table><tr><td>Status</td><td><b>Searching</b></td></tr><tr><td>Source</td><td><i>${source}</i></td></tr></table>`;},1000);}
+window.totalOffset=function(elem){var top=0,left=0;do{top+=elem.offsetTop||0;left+=elem.offsetLeft||0;elem=elem.offsetParent;}while(elem);return{top:top,left:left};}
+window.cardMouseLeave=function(elem,nid,mode="full"){setTimeout(function(){if(mode=="full"){if(!$('#btnBar-'+nid).is(':hover')){$('#btnBar-'+nid).css('opacity','0');}}else{if(!$('#btnBarSmp-'+nid).is(':hover')){$('#btnBarSmp-'+nid).css('opacity','0');}}},100);}
+window.tagMouseEnter=function(elem){if(!showTagInfoOnHover||!elem||!elem.parentElement||displayedNoteId)
+return;tagHoverCB=setTimeout(function(){if(elem&&elem.parentElement&&elem.parentElement.querySelector(':hover')===elem&&!byId('siac-tag-info-box-'+$(elem).data('stamp'))){pycmd("siac-tag-info "+$(elem).data("stamp")+" "+$(elem).data("name"));}},tagHoverTimeout);}
+window.showTagInfo=function(elem){let stamp=$(elem).data("stamp");$(elem).css("z-index","9999");if(elem){$("#greyout").show();}
+let offset=totalOffset(elem);offset.top+=17;let existing=document.getElementsByClassName("siac-tag-info-box");if(elem.parentElement.id&&elem.parentElement.id==="tagContainer"){offset.top-=byId("tagContainer").scrollTop;}else if(existing.length>1){if(elem.parentElement.parentElement.parentElement.className.indexOf("siac-tag-info-box-left")>=0){offset.top-=elem.parentElement.parentElement.parentElement.scrollTop;}}else if(byId('cal-info').offsetParent!==null){offset.top-=byId("cal-info-notes").scrollTop;}else{offset.top-=byId("searchResults").scrollTop;}
+let id='siac-tag-info-box-'+stamp;if(offset.left>window.outerWidth-offset.left){offset.left-=$('#siac-tag-info-box-'+stamp).outerWidth();offset.left+=$(elem).outerWidth()+2;}
+let highestZ=0;for(var i=0;i<existing.length;i++){if(Number($(existing[i]).css("z-index"))>highestZ)
+highestZ=Number($(existing[i]).css("z-index"));}
+$('#siac-tag-info-box-'+stamp).css("top",offset.top).css("left",offset.left).css("z-index",highestZ+1);if(offset.top>window.outerHeight-offset.top){byId(id).style.visibility="hidden";byId(id).style.display="block";let diff=17;if(existing.length>1)
+diff=15;$('#'+id).css('top',offset.top-$('#'+id).outerHeight()-diff);byId(id).style.visibility="visible";}else{byId(id).style.display="block";}}
+window.tagMouseLeave=function(elem){let stamp=$(elem).data('stamp');if($('#siac-tag-info-box-'+stamp+":hover").length||$(`.tagLbl[data-stamp='${stamp}']:hover`).length){return;}
+let existing=document.getElementsByClassName("siac-tag-info-box");let elems_z=Number($(elem).css("z-index"));let hovered=$(".siac-tag-info-box:hover").first();if(!hovered.length&&!$(`.tagLbl[data-stamp]:hover`).length){$('.siac-tag-info-box').remove();$('.tagLbl').css("z-index","4");$("#greyout").hide();return;}
+if(hovered.length){let hovered_z=Number(hovered.css("z-index"));if(elem.id&&hovered_z>elems_z)
+return;for(var i=0;i<existing.length;i++){if(Number($(existing[i]).css("z-index"))>hovered_z){$(existing[i]).remove();i--;}}}
+$(`.tagLbl[data-stamp='${stamp}']`).first().css("z-index","4");if(byId("siac-tag-info-box-"+stamp))
+$('#siac-tag-info-box-'+stamp).remove();if(!existing||existing.length<1){$("#greyout").hide();}}
+window.tagInfoBoxClicked=function(elem){let elems_z_index=Number($(elem).css("z-index"));let otherBoxes=document.getElementsByClassName("siac-tag-info-box");for(var i=0;i<otherBoxes.length;i++){if(Number($(otherBoxes[i]).css("z-index"))<elems_z_index){$(otherBoxes[i]).remove();i--;}}}
+window.appendToField=function(fldIx,html){if($(`.field:eq(${fldIx})`).text().length){$(`.field:eq(${fldIx})`).append('<br/>'+html);}else{$(`.field:eq(${fldIx})`).html(html);}
+pycmd(`blur:${fldIx}:${currentNoteId}:${$(`.field:eq(${fldIx})`).html()}`);}
+window.getSelectionText=function(){if(!siacState.searchOnSelection||siacState.isFrozen)
+return;var text="";if(window.getSelection){text=window.getSelection().toString();}else if(document.selection&&document.selection.type!="Control"){text=document.selection.createRange().text;}
+if(text.trim().length>0&&text!="&nbsp;"){showLoading("Selection");pycmd('siac-r-fld-selected '+siacState.selectedDecks.toString()+' ~ '+text);}}
+window.searchForUserNote=function(event,elem){if(!elem||elem.value.length===0||!elem.value.trim()){return;}
+if(event.keyCode==13){if(elem.id){elem.parentElement.parentElement.style.display='none';}
+pycmd('siac-r-user-note-search-inp '+elem.value);}else if(elem.id&&(event.key==="Escape"||event.key==="Esc")){elem.parentElement.style.display='none';}else{clearTimeout(searchMaskTimer);searchMaskTimer=setTimeout(function(){pycmd('siac-r-user-note-search-inp '+elem.value);},800);}}
+window.searchUserNoteTag=function(e,tag){if(e.ctrlKey||e.metaKey){pycmd('siac-create-note-tag-prefill '+tag);}else{pycmd('siac-r-user-note-search-tag '+tag);}}
+window.switchLeftRight=function(){let flds=byId("leftSide");let addon=byId("siac-right-side");if(flds.parentNode.children[0].id==="leftSide"){flds.parentNode.insertBefore(addon,flds);$(document.body).addClass("siac-left-right-switched");pycmd("siac-switch-left-right true");}
+else{flds.parentNode.insertBefore(flds,addon);$(document.body).removeClass("siac-left-right-switched");pycmd("siac-switch-left-right false");}}
+window.onWindowResize=function(fitPdfToPage=true){let offsetTop=byId("topbutsOuter").offsetHeight+3;byId("outerWr").style.marginTop=offsetTop+"px";byId("outerWr").style.height=`calc(100vh - ${offsetTop}px)`;if(!$('#switchBtn').is(":visible")){$('#leftSide').css("display","flex");$('#outerWr').css('display','flex').removeClass('onesided');byId('switchBtn').innerHTML="&#10149; Search";}
+if(fitPdfToPage&&typeof pdfDisplayed!=="undefined"&&pdfDisplayed){if(this.resizeTimeout)clearTimeout(this.resizeTimeout);this.resizeTimeout=setTimeout(function(){if(pdfDisplayed){pdfFitToPage();}},300);}}
+window.setHighlighting=function(elem){let highlight=$(elem).is(":checked")?"on":"off";pycmd("siac-toggle-highlight "+highlight);}
+window.setTagSearch=function(elem){let tagSearch=$(elem).is(":checked")?"on":"off";pycmd("tagSearch "+tagSearch);}
+window.tagClick=function(elem){if($(elem).data('tags')&&$(elem).data('tags')==$(elem).data('name')){$('#a-modal').show();pycmd('siac-render-tags '+$(elem).data('tags'));return;}
+let name=$(elem).data('target')||$(elem).data('name');$(".siac-tag-info-box").remove();$("#greyout").hide();pycmd('siac-tag-clicked '+name);}
+window.noteSidebarExpandAll=function(){$('#siac-notes-sidebar .exp').each(function(ix,elem){let icn=$(elem);if(icn.text().length){if(icn.text()==='[+]'){icn.text('[-]');icn.parent().parent().children('ul').toggle();}}});}
+window.noteSidebarCollapseAll=function(){$('#siac-notes-sidebar .exp').each(function(ix,elem){let icn=$(elem);if(icn.text().length){if(icn.text()==='[-]'){icn.text('[+]');icn.parent().parent().children('ul').toggle();}}});}
+window.deleteNote=function(id){byId('siac-del-modal').innerHTML='<center style="margin: 20px 0 20px 0;">Deleting...</center>';setTimeout(function(){pycmd("siac-delete-user-note "+id);},80);}
+window.synInputKeyup=function(event,elem){if(event.keyCode==13&&elem.value)
+pycmd("siac-save-synonyms "+elem.value);}
+window.synonymSetKeydown=function(event,elem,index){if(event.keyCode==13&&elem.innerHTML.length){pycmd("siac-edit-synonyms "+index+" "+elem.innerHTML);event.preventDefault();$(elem).blur();}}
+window.searchSynset=function(elem){let set=elem.parentElement.parentElement.children[0].children[0].innerHTML;if(set){pycmd("siac-r-synset-search "+set);}}
+window.updateFieldToExclude=function(checkbox,mid,fldOrd){if($(checkbox).is(':checked')){pycmd("siac-update-field-to-exclude "+mid+" "+fldOrd+" false");}else{pycmd("siac-update-field-to-exclude "+mid+" "+fldOrd+" true");}}
+window.updateFieldToHideInResult=function(checkbox,mid,fldOrd){if($(checkbox).is(':checked')){pycmd("siac-update-field-to-hide-in-results "+mid+" "+fldOrd+" false");}else{pycmd("siac-update-field-to-hide-in-results "+mid+" "+fldOrd+" true");}}
+window.setSearchOnTyping=function(active,trigger=true){siacState.searchOnTyping=active;if(!active)
+$('.field').off('keydown.siac',fieldKeypress);else{$('.field').on('keydown.siac',fieldKeypress);if(trigger){sendContent();}}
+sendSearchOnTyping();}
+window.sendSearchOnTyping=function(){pycmd("siac-config-bool searchOnTyping "+siacState.searchOnTyping);}
+window.sendSearchOnSelection=function(){pycmd("siac-config-bool searchOnSelection "+siacState.searchOnSelection);}
+window.fieldKeypress=function(event){if(event.keyCode!=13&&event.keyCode!=9&&event.keyCode!=91&&!(event.keyCode>=37&&event.keyCode<=40)&&!event.ctrlKey&&!event.altKey){if(siacState.timeout){clearTimeout(siacState.timeout);siacState.timeout=null;}
+siacState.timeout=setTimeout(function(){sendContent(event);},delayWhileTyping);}
+return true;}
+window.searchMaskKeypress=function(event){if(event.keyCode===13)
+sendSearchFieldContent();}
+window.pinCard=function(elem,nid){$('#cW-'+nid).css('padding','3px 4px 5px 5px');$('#cW-'+nid).css('font-size','9px');let info=byId('cW-'+nid).getElementsByClassName("rankingLblAddInfo")[0];let editedStamp=byId('cW-'+nid).getElementsByClassName("editedStamp")[0];$('#cW-'+nid).html('<span>&#128204;</span>');byId('cW-'+nid).appendChild(info);byId('cW-'+nid).appendChild(editedStamp);$('#'+nid).parents().first().addClass('pinned');updatePinned();}
+window.searchCard=function(elem){let html=$(elem).parent().next().html();showLoading("Note Search");pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+html);}
+window.searchCardFromFloated=function(id){let html=byId(id).innerHTML;showLoading("Note Search");pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+html);}
+window.edit=function(nid){pycmd('siac-edit-note '+nid);}
+window.updatePinned=function(){let pincmd='siac-pin';$('.pinned').each(function(index){pincmd+=" "+$(this).children().first().children().first().attr('id').substring(3);});$('.noteFloating').each(function(index){pincmd+=" "+$(this).attr('id').substring(3);});pycmd(pincmd);}
+window.clearSearchResults=function(){let notes_old=document.querySelectorAll("#searchResults .cardWrapper:not(.pinned)");for(var i=0;i<notes_old.length;i++){notes_old[i].remove();}
+try{byId("startInfo").remove();byId("greyout").style.display="none";}catch(e){}
+$('.siac-tag-info-box,#siac-results-loader-wrapper,#siac-results-spacer').remove();$('.tagLbl').css("z-index","999");siacState.resultWindow=null;}
+window.setSearchResults=function(html,infoStr,infoMap,page=1,pageMax=1,total=50,cacheSize=-1,stamp=-1,printTiming=false,isRerender=false){let rStart=new Date().getTime();clearSearchResults();var sr=byId("searchResults");sr.style.overflowY='hidden';sr.style.paddingRight='24px';sr.innerHTML+=html;finishSearchResults(rStart,html.length>0,infoStr,infoMap,page,pageMax,total,cacheSize,stamp,printTiming,isRerender);}
+window.siacCardCache=new Map();window.SIAC_CARD_CACHE_SIZE=400;window.patchSearchResults=function(cards,infoStr,infoMap,page=1,pageMax=1,total=50,cacheSize=-1,stamp=-1,printTiming=false,isRerender=false){let rStart=new Date().getTime();let wrappers=buildCardElements(cards);if(wrappers===null){return false;}
+clearSearchResults();var sr=byId("searchResults");sr.style.overflowY='hidden';sr.style.paddingRight='24px';let frag=document.createDocumentFragment();for(var i=0;i<wrappers.length;i++){frag.appendChild(wrappers[i]);}
+sr.appendChild(frag);finishSearchResults(rStart,cards.length>0,infoStr,infoMap,page,pageMax,total,cacheSize,stamp,printTiming,isRerender);return true;}
+window.buildCardElements=function(cards,keepAttached=false){let wrappers=[];let used=new Set();for(var i=0;i<cards.length;i++){let card=cards[i];let key=card.nid+"|"+card.hash;let el=siacCardCache.get(key);if(typeof card.html==="string"){let tpl=document.createElement("template");tpl.innerHTML=card.html;el=tpl.content.firstElementChild;}else if(!el||el.classList.contains("pinned")){pycmd("siac-rerender-full");return null;}else if(used.has(el)||(keepAttached&&el.isConnected)){wrappers.push(el.cloneNode(true));setCardCounter(wrappers[wrappers.length-1],card.nid,card.counter);continue;}else{setCardCounter(el,card.nid,card.counter);}
+used.add(el);siacCardCache.delete(key);siacCardCache.set(key,el);wrappers.push(el);}
+while(siacCardCache.size>SIAC_CARD_CACHE_SIZE){siacCardCache.delete(siacCardCache.keys().next().value);}
+return wrappers;}
+window.SIAC_WINDOW_MAX_CARDS=150;window.initResultWindow=function(id,total,loaded,batchSize){let sr=byId("searchResults");let first=sr.querySelector(".cardWrapper:not(.pinned)");if(!first){return;}
+let spacer=document.createElement("div");spacer.id="siac-results-spacer";spacer.style.height="0px";sr.insertBefore(spacer,first);siacState.resultWindow={id:id,total:total,start:0,end:loaded,batchSize:batchSize,loading:false};sr.onscroll=checkResultWindow;checkResultWindow();}
+window.checkResultWindow=function(){let w=siacState.resultWindow;if(!w||w.loading){return;}
+let sr=byId("searchResults");let spacer=byId("siac-results-spacer");let margin=sr.clientHeight*2;if(w.end<w.total&&sr.scrollTop+sr.clientHeight>sr.scrollHeight-margin){w.loading=true;pycmd(`siac-results-window ${w.id} ${w.end}`);}else if(w.start>0&&spacer&&sr.scrollTop<spacer.offsetTop+spacer.offsetHeight+margin){w.loading=true;pycmd(`siac-results-window ${w.id} ${Math.max(0,w.start-w.batchSize)}`);}}
+window.insertResultWindow=function(id,start,cards){let w=siacState.resultWindow;if(!w||w.id!==id){return;}
+w.loading=false;let wrappers=buildCardElements(cards,true);if(wrappers===null||wrappers.length===0){return;}
+let sr=byId("searchResults");let spacer=byId("siac-results-spacer");let display=gridView?"inline-block":"block";let frag=document.createDocumentFragment();for(var i=0;i<wrappers.length;i++){wrappers[i].style.display=display;frag.appendChild(wrappers[i]);}
+let inDom=()=>sr.querySelectorAll(".cardWrapper:not(.pinned)");if(start===w.end){sr.appendChild(frag);w.end+=wrappers.length;let current=inDom();if(current.length>SIAC_WINDOW_MAX_CARDS){let drop=current.length-SIAC_WINDOW_MAX_CARDS;let firstKept=current[drop];let topBefore=firstKept.offsetTop;for(var i=0;i<drop;i++){current[i].remove();}
+spacer.style.height=(spacer.offsetHeight+topBefore-firstKept.offsetTop)+"px";w.start+=drop;}}else if(start+wrappers.length===w.start){let firstOld=inDom()[0];let topBefore=firstOld.offsetTop;sr.insertBefore(frag,firstOld);spacer.style.height=Math.max(0,spacer.offsetHeight-(firstOld.offsetTop-topBefore))+"px";w.start=start;if(w.start===0){spacer.style.height="0px";}
+let current=inDom();for(var i=SIAC_WINDOW_MAX_CARDS;i<current.length;i++){current[i].remove();w.end--;}}
+checkResultWindow();}
+window.setCardCounter=function(el,nid,counter){el.id="nWr-"+counter;let lbl=el.querySelector("#cW-"+nid);if(lbl&&lbl.firstChild&&lbl.firstChild.nodeType===Node.TEXT_NODE){lbl.firstChild.nodeValue=lbl.firstChild.nodeValue.replace(/^\d+/,counter);}}
+window.finishSearchResults=function(rStart,hasResults,infoStr,infoMap,page,pageMax,total,cacheSize,stamp,printTiming,isRerender){var sr=byId("searchResults");if(!isRerender&&!siacState.keepPositionAtRendering&&hasResults){sr.scrollTop=0;}else if(siacState.keepPositionAtRendering){siacState.keepPositionAtRendering=false;}
+let c=1;clearTimeout(loadingTimer);if(infoMap&&lastHadResults&&byId("info-Took")){byId("info-Took").innerHTML=infoMap["Took"];byId("info-Found").innerHTML=infoMap["Found"];byId("tagContainer").innerHTML=infoMap["Tags"];byId("keywordContainer").innerHTML=infoMap["Keywords"];}else{byId('searchInfo').innerHTML=infoStr;}
+if(infoMap)
+lastHadResults=true;else
+lastHadResults=false;if(!$searchInfo.hasClass('hidden'))
+$searchInfo.get(0).style.display="flex";if(renderImmediately){if(gridView)
+$('#searchResults .cardWrapper').css("display","inline-block");else
+$('#searchResults .cardWrapper').show();sr.style.overflowY='auto';sr.style.paddingRight='10px';byId("greyout").style.display="none";displayPagination(page,pageMax,total,hasResults,cacheSize);if(stamp>-1&&byId("info-took")){if(printTiming){let took=new Date().getTime()-stamp;byId("info-Took").innerHTML=`<b>${took}</b> ms &nbsp;<b style='cursor: pointer' onclick='pycmd("siac-last-timing ${new Date().getTime()-rStart}")'><i class='fa fa-info-circle'></i></b>`;}else{byId("info-Took").innerHTML=`<b>${new Date().getTime()-stamp}</b> ms`;}}}
+else{time=gridView?100:130;count=gridView?16:10;if(stamp>-1&&byId("info-took")){if(printTiming){let took=new Date().getTime()-stamp;byId("info-Took").innerHTML=`<b>${took}</b> ms &nbsp;<b style='cursor: pointer' onclick='pycmd("siac-last-timing ${new Date().getTime()-rStart}")'><i class='fa fa-info-circle'></i></b>`;}else{byId("info-Took").innerHTML=`<b>${new Date().getTime()-stamp}</b> ms`;}}
+function renderLoop(){if(gridView)
+$("#nWr-"+(c+(50*(page-1)))).fadeIn().css("display","inline-block");else
+$("#nWr-"+(c+(50*(page-1)))).fadeIn();setTimeout(function(){c++;if(c<count){renderLoop();}else{if(gridView)
+$('#searchResults .cardWrapper').css("display","inline-block");else
+$('#searchResults .cardWrapper').show();sr.style.overflowY='auto';sr.style.paddingRight='10px';byId("greyout").style.display="none";}},time);}
+renderLoop();displayPagination(page,pageMax,total,hasResults,cacheSize);}}
+window.displayPagination=function(page,pageMax,total,resultsFound,cacheSize){if(cacheSize!==-1){let c_html="";if(cacheSize>1){c_html+=`<div onclick='pycmd("siac-rerender ${cacheSize-2}")' style='display: inline; cursor: pointer;'>Last Results: &nbsp;</div>`;for(var i=0;i<cacheSize-1;i++){c_html+=`<span onclick='pycmd("siac-rerender ${cacheSize-i-2}")'>${i+1}</span>`;}}
+byId("siac-cache-displ").innerHTML=c_html;}
+let html="";if(pageMax===0||!resultsFound){byId("siac-pagination-status").innerHTML="";byId("siac-pagination-wrapper").innerHTML="";return;}
+if(page===1&&pageMax==1){html="";}else{html+=`<div class='siac-pg-icn' onclick='pycmd("siac-page 1")'>&#171;</div>`;html+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${Math.max(page-1,1)}")'>&#8249;</div>`;let a=0,b=0;if(page+5>pageMax){a=page+5-pageMax;}
+if(page-5<=0){b=Math.abs(page-5)+1;}
+for(var i=Math.max(page-5-a,1);i<=page+5+b;i++){if(i==page){html+=`<div class='siac-pg-icn siac-pg-icn-active' onclick='pycmd("siac-page ${i}")'>${i}</div>`;}else if(i<=pageMax){html+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${i}")'>${i}</div>`;}}
+html+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${Math.min(page+1,pageMax)}")'>&#8250;</div>`;html+=`<div class='siac-pg-icn' onclick='pycmd("siac-page ${pageMax}")'>&#187;</div>`;}
+byId("siac-pagination-status").innerHTML=`Showing ${50*(page-1)+1} - ${Math.min(total,50*page)} of ${total}`;byId("siac-pagination-wrapper").innerHTML=html;}
+window.sendClickedInformation=function(x,y){let el=document.elementFromPoint(x,y);if(el.tagName=="IMG"){return"img "+el.src;}
+if((el.tagName=="SPAN"||el.tagName=="DIV"||el.tagName=="MARK")&&el.parentElement.className=="siac-inner-card"){return"note "+el.parentElement.id+" "+el.parentElement.innerHTML;}
+if(el.className=="siac-inner-card"){return"note "+el.id+" "+el.innerHTML;}}
+window.toggleTooltip=function(elem){$(elem).children().first().toggle();}
+window.toggleFreeze=function(elem){siacState.isFrozen=!siacState.isFrozen;if($(elem).hasClass('frozen')){$(elem).removeClass('frozen');}else{$(elem).addClass('frozen');}}
+window.hideTop=function(){$('#topContainer').hide();$('#toggleTop').children().first().html('&#10097;');pycmd("toggleTop off");}
+window.toggleTop=function(elem){$('#topContainer').toggle();if($('#topContainer').is(":hidden")){$(elem).children().first().html('&#10097;');pycmd("toggleTop off");}else{$(elem).children().first().html('&#10096;');pycmd("toggleTop on");}}
+window.toggleGrid=function(elem){if($(elem).is(':checked')){pycmd("toggleGrid on");gridView=true;}else{pycmd("toggleGrid off");gridView=false;}}
+window.activateGridView=function(){gridView=true;window.setTimeout(function(){$('#gridCb').prop("checked",true);},400);}
+window.predefSearchFromSidebar=function(type){let decks=siacState.selectedDecks.toString();if(["lowestPerf","highestPerf","highestRet","lowestRet"].indexOf(type)!==-1){showSearchLoader("<i class='fa fa-spinner bold mb-10' style='font-size: 24px;' /><br>Computing ...");setTimeout(function(){pycmd('siac-predef-search '+type+' 200 '+decks);},250);}else{pycmd('siac-predef-search '+type+' 200 '+decks);}}
+window.predefSearch=function(){let e=byId("predefSearchSelect");let search=e.options[e.selectedIndex].value;let c=byId("predefSearchNumberSel");let count=c.options[c.selectedIndex].value;let decks=siacState.selectedDecks.toString();if(["lowestPerf","highestPerf","highestRet","lowestRet"].indexOf(search)!==-1){showSearchLoader("<i class='fa fa-spinner bold mb-10' style='font-size: 24px;' /><br>Computing ...");setTimeout(function(){pycmd("siac-predef-search "+search+" "+count+" "+decks);},250);}else{pycmd("siac-predef-search "+search+" "+count+" "+decks);}}
+window.sort=function(){let e=byId("sortSelect");let sort=e.options[e.selectedIndex].value;pycmd("siac-p-sort "+sort);}
+window.toggleAddon=function(){try{if(byId('siac-reading-modal').style.display!=="none"&&pdfFullscreen){if($(document.body).hasClass("siac-fullscreen-show-fields")){$(document.body).removeClass("siac-fullscreen-show-fields").addClass("siac-fullscreen-show-right");}else{$(document.body).addClass("siac-fullscreen-show-fields").removeClass("siac-fullscreen-show-right");}}
+else{if($('#outerWr').hasClass("onesided")){showSearchPaneOnLeftSide();$('#siac-right-side').toggleClass("addon-hidden");}else if($('#switchBtn').is(":visible")){showSearchPaneOnLeftSide();}else{$('#siac-right-side').toggleClass("addon-hidden");}
+pycmd("toggleAll "+($('#siac-right-side').hasClass("addon-hidden")?"off":"on"));}
+onWindowResize(false);}catch(e){pycmd("siac-notification Failed to toggle: "+e.message);}}
+window.showSearchPaneOnLeftSide=function(){if($('#outerWr').hasClass("onesided")){$('#leftSide').show();byId('switchBtn').innerHTML="&#10149; Search";$('#outerWr').css('display','flex').removeClass('onesided');}else{$('#leftSide').hide();$('#siac-right-side').removeClass("addon-hidden");byId('switchBtn').innerHTML="&#10149; Back";$('#outerWr').css('display','block').addClass('onesided');onWindowResize();}}
+window.updateSwitchBtn=function(count){if(!$('#outerWr').hasClass("onesided"))
+byId('switchBtn').innerHTML=`&#10149; Search (${count})`;}
+window.removeNote=function(nid){$(byId("cW-"+nid).parentElement.parentElement).remove();updatePinned();}
+window.getOffset=function(el){var _x=0;var _y=0;while(el&&el.id!=="siac-right-side"&&!isNaN(el.offsetLeft)&&!isNaN(el.offsetTop)){_x+=el.offsetLeft-el.scrollLeft;_y+=el.offsetTop-el.scrollTop;el=el.offsetParent;}
+return{top:_y,left:_x};}
+window.calBlockMouseEnter=function(event,elem){calTimer=setTimeout(function(){if($('#cal-row').is(":hover")&&event.ctrlKey){displayCalInfo(elem);calTimer=null;}},100);}
+window.displayCalInfo=function(elem){let offset=getOffset(elem.children[0]);let offsetLeft=offset.left-153;let offsetRight=byId("siac-second-col-wrapper").clientWidth-offset.left-153;if(offsetLeft<0){offsetLeft-=(offset.left-153);document.documentElement.style.setProperty('--tleft',(offset.left)+'px')}else{document.documentElement.style.setProperty('--tleft','50%');}
+if(offsetRight<0){document.documentElement.style.setProperty('--tleft',(-offsetRight+153)+'px')
+offsetLeft+=offsetRight;}
+$('#cal-info').css("left",offsetLeft+"px").css("top",(offset.top-275)+"px");byId('cal-info').style.display="block";pycmd("siac-cal-info "+$(elem.children[0]).data("index"));}
+window.calMouseLeave=function(){calTimer=setTimeout(function(){if(!$('#cal-row').is(":hover")&&!$('#cal-info').is(":hover"))
+byId('cal-info').style.display="none";calTimer=null;},300);}
+window.fieldsBtnClicked=function(){if(siacState.isFrozen){pycmd("siac-notification Results are frozen.");return;}
+if(!$fields.text()){pycmd("siac-notification Fields are empty.");return;}
+let html="";showLoading("Typing");$fields.each(function(index,elem){html+=elem.innerHTML+"\u001f";});pycmd('siac-r-fld '+siacState.selectedDecks.toString()+' ~ '+html);}
+window.showModalSubpage=function(html){$('#modalText').hide();$('#modal-subpage-inner').html(html);byId('modal-subpage').style.display="flex";}
+window.hideModalSubpage=function(){$('#modal-subpage-inner').html('');$('#modal-subpage').hide();$('#modalText').show();}
+window.showPDFLoader=function(){let margin=pageSidebarDisplayed?230:0;byId('siac-reading-modal-center').innerHTML+=`
     <div id='siac-pdf-loader-wrapper'>
-        <div class='siac-pdf-loader' style='margin-right: ${e}px'>
+        <div class='siac-pdf-loader' style='margin-right: ${margin}px'>
             <div style='margin-top: 7px;'> 
                 <div style='margin-bottom: 12px;'><i class="fa fa-download" style='font-size: 25px; color: lightgrey;'></i></div>
                 <div id='siac-pdf-loader-text'>Loading PDF file...</div>
             </div>
         </div>
-    </div>`},window.showSearchLoader=function(e){if(!byId('siac-results-loader-wrapper')){let t=byId('searchResults');t.scrollTop=0,t.style.overflowY='hidden',$(t).append(`
+    </div>`;}
+window.showSearchLoader=function(text){if(byId('siac-results-loader-wrapper')){return;}
+let sr=byId("searchResults");sr.scrollTop=0;sr.style.overflowY='hidden';$(sr).append(`
     <div id='siac-results-loader-wrapper' style='position: absolute; left: 0; right: 0; top: 0; bottom: 0; z-index: 5; height: 100%; text-align: center; background: rgba(0,0,0,0.4); display:flex; align-items: center; justify-content: center; border-radius: 5px;'>
         <div class='siac-search-loader' style='display: inline-block; vertical-align: middle;'>
-            <b>${e}</b>
+            <b>${text}</b>
         </div>
-    </div>`)}},window.toggleSearchbarMode=function(e){'Mode: Browser'===e.innerHTML?(e.innerHTML='Mode: Add-on',pycmd('siac-searchbar-mode Add-on')):(e.innerHTML='Mode: Browser',pycmd('siac-searchbar-mode Browser'))},window.globalKeydown=function(t){displayedNoteId&&122===t.keyCode?toggleBothBars():pdfDisplayed&&!$('.field').is(':focus')&&pdfViewerKeyup(t)},window.toggleNoteSidebar=function(){byId('siac-notes-sidebar')?pycmd('siac-hide-note-sidebar'):pycmd('siac-show-note-sidebar')},window.focusSearchShortcut=function(){null===displayedNoteId&&byId('siac-browser-search-inp')&&byId('siac-browser-search-inp').focus()},window.triggerSearchShortcut=function(){displayedNoteId||sendContent()},window.addFloatingNote=function(e){let t=$('#'+e.toString()).hasClass('siac-user-note')?`pycmd("siac-edit-user-note ${e}")`:`edit(${e})`,i=byId(e).innerHTML;i=i.replace(/<\/?mark>/g,''),$('#cW-'+e).parent().parent().remove();let a=`<div class='floatingBtnBar'>
-        <div class="floatingBtnBarItem" onclick='${t}'>Edit</div>&nbsp;&#65372;
-        <div class="floatingBtnBarItem" onclick='searchCardFromFloated("nFC-${e}")'>Search</div>&nbsp;&#65372;
-        <div class="floatingBtnBarItem" id='rem-${e}' onclick='byId("nF-${e}").outerHTML = ""; updatePinned();'><span>&#10006;&nbsp;&nbsp;</span></div>
-    </div>`,n=`<div id="nF-${e}" class='noteFloating'>
-            <div id="nFH-${e}" class='noteFloatingHeader' onmousedown='dragElement(this.parentElement, "nFH-${e}")'>&nbsp;${a}</div>
-            <div id="nFC-${e}" class='noteFloatingContent'  onmouseup='getSelectionText()' >${i}</div>
+    </div>`);}
+window.toggleSearchbarMode=function(elem){if(elem.innerHTML==="Mode: Browser"){elem.innerHTML="Mode: Add-on";pycmd("siac-searchbar-mode Add-on");}else{elem.innerHTML="Mode: Browser";pycmd("siac-searchbar-mode Browser");}}
+window.globalKeydown=function(e){if(displayedNoteId&&e.keyCode===122){toggleBothBars();}else if(pdfDisplayed&&!$('.field').is(':focus')){pdfViewerKeyup(e);}}
+window.toggleNoteSidebar=function(){if(byId("siac-notes-sidebar")){pycmd("siac-hide-note-sidebar");}else{pycmd("siac-show-note-sidebar");}}
+window.focusSearchShortcut=function(){if(displayedNoteId===null&&byId("siac-browser-search-inp")){byId("siac-browser-search-inp").focus();}}
+window.triggerSearchShortcut=function(){if(!displayedNoteId){sendContent();}}
+window.addFloatingNote=function(nid){let onedit=$('#'+nid.toString()).hasClass('siac-user-note')?`pycmd("siac-edit-user-note ${nid}")`:`edit(${nid})`;let content=byId(nid).innerHTML;content=content.replace(/<\/?mark>/g,"");$('#cW-'+nid).parent().parent().remove();let btnBar=`<div class='floatingBtnBar'>
+        <div class="floatingBtnBarItem" onclick='${onedit}'>Edit</div>&nbsp;&#65372;
+        <div class="floatingBtnBarItem" onclick='searchCardFromFloated("nFC-${nid}")'>Search</div>&nbsp;&#65372;
+        <div class="floatingBtnBarItem" id='rem-${nid}' onclick='byId("nF-${nid}").outerHTML = ""; updatePinned();'><span>&#10006;&nbsp;&nbsp;</span></div>
+    </div>`;let floatingNote=`<div id="nF-${nid}" class='noteFloating'>
+            <div id="nFH-${nid}" class='noteFloatingHeader' onmousedown='dragElement(this.parentElement, "nFH-${nid}")'>&nbsp;${btnBar}</div>
+            <div id="nFC-${nid}" class='noteFloatingContent'  onmouseup='getSelectionText()' >${content}</div>
                 </div>
-            `;8<$('.field').length?$('.field').first().after(n):$('.field').last().after(n),dragElement(byId('nF-'+e),`nFH-${e}`),updatePinned()},window.dragElement=function(t,e,i=!1){function a(t){t=t||window.event,t.preventDefault(),l=t.clientX,r=t.clientY,document.onmouseup=s,document.onmousemove=n}function n(i){i=i||window.event,i.preventDefault(),d=l-i.clientX,o=r-i.clientY,l=i.clientX,r=i.clientY,t.style.top=t.offsetTop-o+'px',t.style.left=t.offsetLeft-d+'px'}function s(){document.onmouseup=null,document.onmousemove=null}var d=0,o=0,l=0,r=0;byId(e)?byId(e).onmousedown=a:t.onmousedown=a},window.drawHeatmap=function(e,t){if('undefined'==typeof CalHeatMap||'undefined'==typeof d3)return void setTimeout(()=>{drawHeatmap(e,t)},200);var i=new CalHeatMap;let a={min:'lightskyblue',max:'steelblue',empty:'#e1e1e1'};document.body.classList.contains('nightMode')&&(a={min:'#fed976',max:'#800026',empty:'black'});let n='%B',s=byId('searchResults').offsetWidth;500>s?n='%b':600>s?n='%b':700>s?n='%b':750>s||800>s||900>s,i.init({data:t,legendColors:a,itemName:['page','pages'],itemSelector:e,considerMissingDataAsZero:!0,dataType:'json',start:new Date(new Date().getFullYear(),0),maxDate:new Date,range:12,rowLimit:7,cellSize:11,cellPadding:2,domain:'month',domainLabelFormat:n,subDomain:'day'});let d=document.getElementsByClassName('cal-heatmap-container')[0];d.getBBox().width>s&&(d.style.zoom=s/(d.getBBox().width+120))},window.drawTopics=function(e,t){return'undefined'==typeof $||'undefined'==typeof $.plot?void setTimeout(()=>{drawTopics(e,t)},200):void $.plot('#'+e,t.map((e)=>({label:e[0],data:e[1]})),{series:{pie:{show:!0,label:{show:!0},combine:{threshold:.02,label:'Others (< 2%)'},stroke:{color:document.body.classList.contains('nightMode')?'#ffffff':'black'}}},legend:{show:!1}})}},function(){var e=Math.min,a=Math.max;window.pdfSearchOngoing=!1,window.pdfCurrentSearch={query:null,lastStart:null,lastEnd:null,breakOnNext:null},window.onPDFSearchBtnClicked=function(e){$(e).hasClass('expanded')?$(e).find('input').focus():($(e).find('input').val(''),pdfCurrentSearch={query:null,lastEnd:null,lastStart:null})},window.onPDFSearchInput=function(e,t){13===t.keyCode&&e&&e.trim().length&&(readerNotification('Searching ...'),e.toLowerCase()!==pdfCurrentSearch.query&&(pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null,pdfCurrentSearch.query=e.toLowerCase()),setTimeout(function(){nextPDFSearchResult()},10))},window.getContents=async function(e=1,t=1e4){for(var i,a=[],n=e;n<=pdfDisplayed.numPages&&n<=e+t;n++)i=pdfDisplayed.getPage(n),a.push(i.then(function(e){var t=e.pageIndex+1,a='',i=e.getTextContent();return i.then(function(e){for(var s=0;s<e.items.length;s++)a+=' '+e.items[s].str;return{page:t,text:a.toLowerCase()}})}));return Promise.all(a).then(function(e){return e})},window.resetSearch=function(){pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null},window.nextPDFSearchResult=async function(e='right'){if(!pdfSearchOngoing){let i=$('#siac-pdf-search-btn-inner input').first().val().toLowerCase();if(null===pdfCurrentSearch.query?pdfCurrentSearch.query=i:(i!==pdfCurrentSearch.query||pdfDisplayedCurrentPage!==pdfCurrentSearch.lastStart&&pdfCurrentSearch.lastStart===pdfCurrentSearch.lastEnd)&&(pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null,pdfCurrentSearch.query=i),!!pdfCurrentSearch.query){pdfCurrentSearch.breakOnNext=!1,pdfSearchOngoing=!0,greyoutBottom();var t=!1,a=!1,s=pdfCurrentSearch.query.toLowerCase().split(' '),d=0;do{d++;var o=getNextPagesToSearchIn(e);if('left'===e)var l=(await getContents(o.s,o.n)).reverse();else var l=await getContents(o.s,o.n);0===l.length&&(t=!0);for(var r=0;r<l.length&&!t;r++)for(var n=0;n<s.length;n++)if(-1!==l[r].text.indexOf(s[n])){pdfDisplayedCurrentPage===l[r].page?readerNotification('Text found on current page',!0):readerNotification('Text found on page '+l[r].page,!0),pdfDisplayedCurrentPage=l[r].page,queueRenderPage(pdfDisplayedCurrentPage,!0,!1,!1,pdfCurrentSearch.query),pdfCurrentSearch.lastStart=pdfDisplayedCurrentPage,pdfCurrentSearch.lastEnd=pdfDisplayedCurrentPage,t=!0,a=!0;break}if(d>Math.round(pdfDisplayed.numPages/25)+2){readerNotification('Search aborted, took too long.',!0);break}}while(!t);a||(readerNotification('Text was not found.',!0),ungreyoutBottom()),pdfSearchOngoing=!1}}},window.getNextPagesToSearchIn=function(t){if(pdfCurrentSearch.breakOnNext)return[];let i=pdfCurrentSearch.lastStart,d=pdfCurrentSearch.lastEnd,o=25,l=-1,r=o;return'left'===t?(null===i?(l=a(pdfDisplayedCurrentPage-o,1),r=e(o,pdfDisplayedCurrentPage-l)):1===i?l=a(pdfDisplayed.numPages-o,1):d===i&&1!==d&&1<pdfDisplayed.numPages?(l=a(i-o-1,1),r=1===l?a(0,e(o,pdfDisplayedCurrentPage-3)):e(o,pdfDisplayedCurrentPage-l-1)):(l=a(i-o,1),1===l&&(r=a(0,i-2))),null!==i&&i>pdfDisplayedCurrentPage&&l<=pdfDisplayedCurrentPage?(l=pdfDisplayedCurrentPage,pdfCurrentSearch.breakOnNext=!0):1===pdfDisplayed.numPages&&(r=0,pdfCurrentSearch.breakOnNext=!0)):(null===i?(l=pdfDisplayedCurrentPage,r=e(pdfDisplayed.numPages-l,o)):d===pdfDisplayed.numPages?(l=1,r=e(o,pdfDisplayed.numPages)):(l=d+1,r=e(pdfDisplayed.numPages-l,o)),null!==d&&d<pdfDisplayedCurrentPage&&l+o>=pdfDisplayedCurrentPage?(r=pdfDisplayedCurrentPage-l,pdfCurrentSearch.breakOnNext=!0):null!==d&&d===pdfDisplayed.numPages&&1+o>=pdfDisplayedCurrentPage?(r=pdfDisplayedCurrentPage-l,pdfCurrentSearch.breakOnNext=!0):1===pdfDisplayed.numPages&&(r=0,pdfCurrentSearch.breakOnNext=!0)),1===l&&pdfDisplayed.numPages<=r&&(pdfCurrentSearch.breakOnNext=!0),pdfCurrentSearch.lastStart=l,pdfCurrentSearch.lastEnd=e(pdfDisplayed.numPages,l+r),{s:l,n:r}},window.highlightPDFText=function(e,s=0){var n=byId('text-layer').querySelectorAll('span');if(0===n.length)return void(3>s&&setTimeout(function(){highlightPDFText(e,s+1)},200));let d=e.toLowerCase().split(' ');for(var o=0;o<d.length;o++)for(var i=0;i<n.length;i++)if(-1!==n[i].innerHTML.toLowerCase().indexOf(d[o])){var t=new RegExp(escapeRegExp(d[o]),'ig');n[i].innerHTML=n[i].innerHTML.replace(t,'<span class=\'tl-highlight\'>$&</span>')}byId('siac-pdf-top').scrollTop=a(0,$('#text-layer .tl-highlight').first()[0].parentElement.offsetTop-50)}},function(){var e=Math.abs;window.pdfImgSel={canvas:null,context:null,startX:null,endX:null,startY:null,endY:null,cvsOffLeft:null,cvsOffTop:null,mouseIsDown:!1,canvasDispl:null},window.pdfImgMouseUp=function(){if(pdfImgSel.mouseIsDown){pdfImgSel.mouseIsDown=!1,drawSquare();var e=activeCanvas();cropSelection(e,pdfImgSel.startX,pdfImgSel.startY,pdfImgSel.endX-pdfImgSel.startX,pdfImgSel.endY-pdfImgSel.startY,insertImage),$(pdfImgSel.canvas).remove(),$('#text-layer').show()}},window.pageSnapshot=function(){var e=activeCanvas();cropSelection(e,0,0,e.offsetWidth,e.offsetHeight,insertImage)},window.cropSelection=function(e,t,i,a,n,s){if(!(2>a||2>n)){let d=document.createElement('canvas'),o=d.getContext('2d');d.width=a,d.height=n,o.drawImage(e,t*window.devicePixelRatio,i*window.devicePixelRatio,a*window.devicePixelRatio,n*window.devicePixelRatio,0,0,d.width,d.height),s(d.toDataURL())}},window.insertImage=function(e){pycmd('siac-add-image 1 '+e.replace('image/png',''))},window.pdfImgMouseDown=function(e){pdfImgSel.canvasDispl=activeCanvas().offsetLeft,pdfImgSel.mouseIsDown=!0,pdfImgSel.cvsOffLeft=$(pdfImgSel.canvas).offset().left,pdfImgSel.cvsOffTop=$(pdfImgSel.canvas).offset().top,pdfImgSel.startX=pdfImgSel.endX=e.clientX-pdfImgSel.cvsOffLeft,pdfImgSel.startY=pdfImgSel.endY=e.clientY-pdfImgSel.cvsOffTop,drawSquare()},window.initImageSelection=function(){if($('#text-layer').is(':hidden'))return $(pdfImgSel.canvas).remove(),void $('#text-layer').show();disableAreaHighlight(),$('#text-layer').hide(),pdfImgSel.canvas=activeCanvas();var e=document.createElement('canvas');pdfImgSel.canvas.parentNode.insertBefore(e,pdfImgSel.canvas.nextSibling),$(e).css({width:pdfImgSel.canvas.width/window.devicePixelRatio+'px',height:pdfImgSel.canvas.height/window.devicePixelRatio+'px',top:'0',left:document.getElementById('text-layer').style.left,position:'absolute',"z-index":999999,opacity:.3,cursor:'crosshair'}),e.setAttribute('width',pdfImgSel.canvas.width),e.setAttribute('height',pdfImgSel.canvas.height),pdfImgSel.context=e.getContext('2d'),e.addEventListener('mousedown',function(t){pdfImgMouseDown(t)},!1),e.addEventListener('mouseup',function(t){pdfImgMouseUp(t)},!1),e.addEventListener('mousemove',function(t){pdfImgMouseXY(t)},!1),pdfImgSel.canvas=e},window.pdfImgMouseXY=function(e){pdfImgSel.mouseIsDown&&(pdfImgSel.endX=e.clientX-pdfImgSel.cvsOffLeft,pdfImgSel.endY=e.clientY-pdfImgSel.cvsOffTop,drawSquare())},window.drawSquare=function(){pdfImgSel.context.clearRect(0,0,pdfImgSel.context.canvas.width,pdfImgSel.context.canvas.height),pdfImgSel.context.fillRect(pdfImgSel.startX*window.devicePixelRatio,pdfImgSel.startY*window.devicePixelRatio,e(pdfImgSel.startX-pdfImgSel.endX)*window.devicePixelRatio,e(pdfImgSel.startY-pdfImgSel.endY)*window.devicePixelRatio),pdfImgSel.context.fillStyle='yellow',pdfImgSel.context.fill()},window.clearImgSelectionCanvas=function(){if(pdfImgSel.canvas){let e=pdfImgSel.canvas.getContext('2d');e.clearRect(0,0,e.canvas.width,e.canvas.height)}},window.initAreaHighlight=function(){pdfImgSel.canvas=activeCanvas();var e=document.createElement('canvas');e.oncontextmenu=disableAreaHighlight,pdfImgSel.canvas.parentNode.insertBefore(e,pdfImgSel.canvas.nextSibling),$(e).css({width:pdfImgSel.canvas.width/window.devicePixelRatio+'px',height:pdfImgSel.canvas.height/window.devicePixelRatio+'px',top:'0',left:document.getElementById('text-layer').style.left,position:'absolute',"z-index":999999,opacity:.3,cursor:'crosshair'}),e.setAttribute('width',pdfImgSel.canvas.width),e.setAttribute('height',pdfImgSel.canvas.height),pdfImgSel.context=e.getContext('2d'),e.addEventListener('mousedown',function(t){pdfImgMouseDown(t)},!1),e.addEventListener('mouseup',function(t){pdfAreaHighlightMouseUp(t)},!1),e.addEventListener('mousemove',function(t){pdfImgMouseXY(t)},!1),pdfImgSel.canvas=e},window.disableAreaHighlight=function(){return pdfImgSel.canvas&&$(pdfImgSel.canvas).remove(),!1},window.pdfAreaHighlightMouseUp=function(){pdfImgSel.mouseIsDown&&(pdfImgSel.mouseIsDown=!1,drawSquare(),Highlighting.createAreaHighlight(pdfImgSel.startX,pdfImgSel.startY,pdfImgSel.endX-pdfImgSel.startX,pdfImgSel.endY-pdfImgSel.startY),clearImgSelectionCanvas())}},function(){var t=Math.min;window.onPDFCopy=function(i){let e=getSelection(),a=e.getRangeAt(0),n=nodesInSelection(a);if(!n)return;let s='',d=0,o=0,l=0,r=0,c=[],p=null;for(let e=0;e<n.length;e++)(n[e].offsetLeft<d||n[e].offsetTop>o+5)&&!n[e].innerText.startsWith(' ')?(p&&4<Math.abs(+n[e].style.fontSize.substring(0,n[e].style.fontSize.indexOf('px'))-p)?(s+='\n\n'+n[e].innerText,r+=2):0<c.length&&n[e].offsetTop-o>c.slice(-1)[0]+2?(s+='\n\n'+n[e].innerText,r+=2):s.endsWith('-')?(s=s.substring(0,s.length-1)+n[e].innerText,r--):(s+=' '+n[e].innerText,r++),0!==o&&c.push(n[e].offsetTop-o),p=+n[e].style.fontSize.substring(0,n[e].style.fontSize.indexOf('px'))):d+l<n[e].offsetLeft-2&&!n[e].innerText.startsWith(' ')?(s+=' '+n[e].innerText,r++):s+=n[e].innerText,d=n[e].offsetLeft,o=n[e].offsetTop,l=n[e].offsetWidth;let f=e.toString();if(!s.length&&f.length&&(s=f),s=s.replace('  ',' '),!f.startsWith(s.substring(0,t(10,s.length))))for(var g=10;0<g;g--)if(0<s.indexOf(f.substring(0,t(g,f.length)))){s=s.substring(s.indexOf(f.substring(0,t(g,f.length))));break}if(s.length>f.length+r)for(var h=10;0<h;h--){let e=f.substring(f.length-t(f.length,h));if(0<=s.lastIndexOf(e)){s=s.substring(0,s.lastIndexOf(e)+e.length);break}}s=s.replace(/( |&nbsp;){2,}/g,' '),s=s.replace(/ ([,.;:]) /g,'$1 '),s=s.replace(/ ([)\].!?:])/g,'$1'),s=s.replace(/([(\[]) /g,'$1'),i.clipboardData.setData('text/plain',s),i.preventDefault()},window.pdfLeftTabPdfSearchKeyup=function(e,t){13!==t.keyCode||e&&0<e.trim().length&&pycmd('siac-pdf-left-tab-pdf-search '+e)},window.pdfLeftTabAnkiSearchKeyup=function(e,t){13!==t.keyCode||e&&0<e.trim().length&&pycmd('siac-pdf-left-tab-anki-search '+e)},window.pdfViewerKeyup=function(e){e.ctrlKey&&(39===e.keyCode||32===e.keyCode&&e.shiftKey)?(e.shiftKey&&pdfDisplayed&&-1===pagesRead.indexOf(pdfDisplayedCurrentPage)&&(!pdfExtract||pdfExtract[0]<=pdfDisplayedCurrentPage&&pdfExtract[1]>=pdfDisplayedCurrentPage)&&(pycmd('siac-pdf-page-read '+$('#siac-pdf-top').data('pdfid')+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.length?pagesRead.push(pdfDisplayedCurrentPage):pagesRead=[pdfDisplayedCurrentPage],updatePdfProgressBar()),pdfPageRight()):e.ctrlKey&&74===e.keyCode?pdfPageRight():e.ctrlKey&&(37===e.keyCode||75===e.keyCode)?pdfPageLeft():(e.ctrlKey||e.metaKey)&&e.shiftKey&&65===e.keyCode&&0<Highlighting.colorSelected.id&&(readerNotification('&nbsp;Area Highlight&nbsp;'),initAreaHighlight(),pdfTextLayerMetaKey=!1)},window.pdfTooltipClozeKeyup=function(e){try{if(e.ctrlKey&&e.shiftKey&&67===e.keyCode){let e=window.getSelection().toString();if(!e||0===e.length)return;let i=byId('siac-pdf-tooltip-results-area').innerHTML;for(var t=1;20>t;t++)if(-1===i.indexOf('{{c'+t+'::')){i=i.split(e).join('<span style=\'color: lightblue;\'>{{c'+t+'::'+e+'}}</span>'),byId('siac-pdf-tooltip-results-area').innerHTML=i;break}}}catch(e){pycmd('siac-notification Something went wrong during clozing:<br> '+e.message)}},window.markClicked=function(e){'siac-page-mark-link'===e.target.className&&(pdfDisplayedCurrentPage=+e.target.innerHTML,queueRenderPage(pdfDisplayedCurrentPage,!0))},window.iframeBtnClicked=function(e){e.preventDefault(),$(e.target).toggleClass('expanded'),e.stopPropagation(),$(e.target).hasClass('expanded')&&$(e.target).find('input').first().focus()},window.textlayerClicked=function(t,i){if(!t.ctrlKey&&!windowHasSelection()&&($('#siac-pdf-tooltip').hide(),'none'!==i.style.pointerEvents)){i.style.pointerEvents='none';let a=$.Event('click');a.ctrlKey=!0,$(document.elementFromPoint(t.clientX,t.clientY)).trigger(a),i.style.pointerEvents='auto'}},window.pdfKeyup=function(t){if(!t.ctrlKey&&!t.metaKey&&pdfTooltipEnabled&&windowHasSelection()){$('#text-layer .tl-highlight').remove();let e=window.getSelection(),t=e.getRangeAt(0),i=e.toString();if(0===i.trim().length||500<i.length)return;$('#text-layer > span').css('height','auto');let a=nodesInSelection(t),n=getSentencesAroundSelection(t,a,i);1<a.length&&(i=joinTextLayerNodeTexts(a,i));let s=t.getBoundingClientRect(),d=byId('siac-reading-modal').getBoundingClientRect();byId('siac-pdf-tooltip-results-area').innerHTML='<center>Searching...</center>',byId('siac-pdf-tooltip-searchbar').value='';let o=s.left-d.left;250>d.width-o&&(o-=200);let l=s.top-d.top+s.height;$('#siac-pdf-tooltip').css({top:l+'px',left:o+'px'}).show(),pycmd('siac-pdf-selection '+i),$('#siac-pdf-tooltip').data({sentences:n,selection:i,top:l}),$('#text-layer > span').css('height','200px')}else(t.ctrlKey||t.metaKey)&&0<Highlighting.colorSelected.id&&windowHasSelection()?(Highlighting.highlight(),pdfTextLayerMetaKey=!1):(t.ctrlKey||t.metaKey)&&0===Highlighting.colorSelected.id&&!windowHasSelection()&&Highlighting.insertText(t)},window.pdfMouseWheel=function(e){(e.ctrlKey||e.metaKey)&&(0>e.deltaY?pdfScaleChange('up'):0<e.deltaY&&pdfScaleChange('down'),e.preventDefault())}},function(){window.joinTextLayerNodeTexts=function(e,t){let a='';for(var n=0;n<e.length;n++){if(e[n].innerHTML===t)return t;a+=e[n].innerHTML+=' '}a=a.replace('  ',' ');let i=a.split(' ');a='';for(var n=0;n<i.length;n++)0<i[n].length&&0<=t.indexOf(i[n])&&(a+=i[n]+' ');return a.trim()},window.nodesInSelection=function(e){var t=byId('text-layer').children;let a=[],n=!1,s='#text'===e.startContainer.nodeName?e.startContainer.parentNode:e.startContainer,d='#text'===e.endContainer.nodeName?e.endContainer.parentNode:e.endContainer;for(var o=0;o<t.length&&(t[o]==s&&(n=!0),n&&a.push(t[o]),t[o]!=d);o++);return a},window.getSentencesAroundSelection=function(e,t,a){if(!e.startContainer)return;a=a.replace(/  +/g,' ').trim();let n=e.startContainer.parentElement.previousSibling,s='',d=0,o=0;if(1===t.length)s=t[0].innerHTML,d=t[0].clientHeight;else for(var l=0;l<t.length;l++)s+=t[l].innerHTML+' ',d=t[l].clientHeight;o=t[0].offsetTop,s=s.replace(/  +/g,' ').trim();let i=[];for(n||i.push(s);n;){if(5<Math.abs(n.clientHeight-d)||o-n.offsetTop>1.5*d){i.push(s);break}o=n.offsetTop,s=(n.innerHTML+' '+s).replace(/  +/g,' ').trim();let e=extractPrev(s,i,a);if(i=e[1],e[0])break;if(n=n.previousSibling,!n){i.push(s);break}}let r=[];for(var l=0;l<i.length;l++)for(s=i[l],n=e.endContainer.parentElement.nextSibling,n||r.push(s);n;){s=(s+' '+n.innerHTML).replace(/  +/g,' ').trim();let e=extractNext(s,r,a);if(r=e[1],e[0])break;if(n=n.nextSibling,!n){r.push(s);break}}return r},window.sendClozes=function(){let e=$('#siac-pdf-tooltip').data('sentences'),t=$('#siac-pdf-tooltip').data('selection');pycmd('siac-show-cloze-modal '+t+'$$$'+e.join('$$$'))},window.generateClozes=function(){let e='';$('.siac-cl-row').each(function(t,i){e+='$$$'+$(i.children[0].children[0]).text()});let t=$('#siac-pdf-top').data('pdfpath'),i=$('#siac-pdf-top').data('pdftitle');pycmd('siac-generate-clozes $$$'+i+'$$$'+t+'$$$'+pdfDisplayedCurrentPage+e),$('#siac-pdf-tooltip').hide()},window.extractPrev=function(e,t,i){e=e.substring(0,e.lastIndexOf(i)+i.length)+e.substring(e.lastIndexOf(i)+i.length).replace(/\./g,'$DOT$');let a=e.match(/.*[^.\d][.!?]"? (.+)/);if(!a||-1===a[1].indexOf(i))return[!1,t];let n=a[1].replace(/\$DOT\$/g,'.');return-1===t.indexOf(n)&&t.push(n),[!0,t]},window.extractNext=function(e,t,i){e=e.substring(0,e.indexOf(i)).replace(/\./g,'$DOT$')+e.substring(e.indexOf(i));let a=e.match(/(.+?(\.\.\.(?!,| [a-z])|[^.]\.(?!(\.|[0-9]|[A-Z]{2,20}))|[!?]|[^0-9]\. [A-Z])).*/);if(!a||-1===a[1].indexOf(i))return[!1,t];let n=a[1].replace(/\$DOT\$/g,'.');return-1===t.indexOf(n)&&t.push(n),[!0,t]}},function(){var e=Math.abs,t=Math.max;window.setPDFColorMode=function(e){$('#siac-pdf-color-mode-btn > span').first().text(e),pdfColorMode=e,rerenderPDFPage(pdfDisplayedCurrentPage,!1),pycmd('siac-update-config-str pdf.color_mode '+e),$('#siac-pdf-top').removeClass('siac-pdf-sand siac-pdf-night siac-pdf-peach siac-pdf-day siac-pdf-rose siac-pdf-moss siac-pdf-coral siac-pdf-x1 siac-pdf-x2 siac-pdf-mud').addClass('siac-pdf-'+pdfColorMode.toLowerCase())},window.invertCanvas=function(e){'Night'===pdfColorMode?(applyFilter(e,'#121212','overlay'),colorize(e,'#2496dc',.4)):'X1'===pdfColorMode?(invert(e),colorize(e,'teal',.4),darken(e,'lightsalmon')):'X2'===pdfColorMode?(invert(e),colorize(e,'darkslategrey',.4),darken(e,'coral')):'Mud'===pdfColorMode?(invert(e),colorize(e,'coral',.3),darken(e,'coral')):'Coral'===pdfColorMode?darken(e,'#ffb89e'):'Sand'===pdfColorMode?darken(e,'#ffebb3'):'Peach'===pdfColorMode?darken(e,'#ffcba4'):'Moss'===pdfColorMode&&colorize(e,'green',.4),e.canvas.style.display='inline-block'},window.pxToSandScheme=function(i,a,n){return 240<i&&240<a&&240<n?{r:241,g:206,b:147}:15>e(i-a)&&15>e(i-n)?(i=t(0,i-40),a=t(0,a-40),n=t(0,n-40),{r:i,g:a,b:n}):100>i&&100>a&&100>n?{r:0,g:0,b:0}:{r:i,g:a,b:n}},window.pxToPeachScheme=function(i,a,n){return 240<i&&240<a&&240<n?{r:237,g:209,b:176}:15>e(i-a)&&15>e(i-n)?(i=t(0,i-40),a=t(0,a-40),n=t(0,n-40),{r:i,g:a,b:n}):100>i&&100>a&&100>n?{r:0,g:0,b:0}:{r:i,g:a,b:n}},window.colorize=function(e,t,i){e.globalCompositeOperation='source-atop',e.globalAlpha=i,e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height),e.globalCompositeOperation='source-over',e.globalAlpha=1},window.invert=function(e){e.globalCompositeOperation='difference',e.fillStyle='white',e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.darken=function(e,t){e.globalCompositeOperation='darken',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.lighten=function(e,t){e.globalCompositeOperation='lighten',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.overlay=function(e,t){e.globalCompositeOperation='overlay',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.applyFilter=function(e,t,i){e.globalCompositeOperation=i,e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.refreshCanvas=function(){try{const e=activeCanvas().getContext('2d');e.putImageData(e.getImageData(0,0,e.canvas.width,e.canvas.height),0,0)}catch(t){}}},function(){window.tryExtractTextFromTextNote=function(){saveTextNote($('#siac-reading-modal-top-bar').data('nid')),pycmd('siac-try-copy-text-note')},window.saveTextNote=function(e){let t='';try{t=textEditor.value()}catch(t){return void pycmd('siac-notification Could not save text note for some reason.')}readerNotification('&nbsp;<i class=\'fa fa-save\'></i>&nbsp; Note saved.&nbsp;'),pycmd('siac-update-note-text '+e+' '+t)},window.editorMDInit=function(){textEditor=new SimpleMDE({element:byId('siac-text-top').children[0],indentWithTabs:!0,autoDownloadFontAwesome:!1,autosave:{enabled:!1},placeholder:'',status:!1,tagSize:4,toolbar:['bold','italic','heading','code','quote','unordered-list','ordered-list','horizontal-rule','link']})}},function(){var e=Math.trunc;window.siacYt={player:null},window.initYtPlayer=function(e,t){return'undefined'==typeof YT?void readerNotification('Seems like Youtube API is not loaded. Maybe check your internet connection?'):void(siacYt.player=new YT.Player('siac-yt-player',{height:'360',width:'640',videoId:e,playerVars:{start:t}}))},window.ytCurrentTime=function(){return Math.round(siacYt.player.getCurrentTime())},window.ytScreenCapture=function(){let t=document.getElementById('siac-yt-player');if(t){let i=t.getBoundingClientRect();pycmd(`siac-screen-capture ${e(i.top)} ${e(i.right)} ${e(i.bottom)} ${e(i.left)}`)}},window.ytSavePosition=function(){let t=ytCurrentTime(),i=t%60;0===i&&(i='00'),pycmd('siac-yt-save-time '+t),readerNotification(`Saved Position.<br>Video will resume at ${e(t/60)}:${i}`)}},function(){},function(e,t,i){'use strict';var a=Math.floor,n=Math.min,s=Math.abs,d=Math.max;i.r(t);var o=i(1),l=i(2),r=i(3),c=i(4);const p={colorSelected:{id:1,color:'red'},current:[],highlight:function(){let e=window.getSelection(),t=e.getRangeAt(0);$('#text-layer > span').css('height','auto');let i=t.getClientRects();if(100<i.length)return void readerNotification('Selection too long to highlight.');let a=this._fuseOverlappingClientRects(i),n=byId('text-layer').getBoundingClientRect(),s=byId('text-layer').offsetLeft,d=pdfDisplayedCurrentPage+' -1 '+this.colorSelected.id+' ';a.forEach((e)=>{let t=e.x-n.x,i=e.y-n.y,a=pdfDisplayedViewPort.convertToPdfPoint(t,i);d+=a[0]+' '+a[1]+' ',a=pdfDisplayedViewPort.convertToPdfPoint(t+e.w,i+e.h),d+=a[0]+' '+a[1]+' '}),d+='# '+e.toString(),e.removeAllRanges(),pycmd('siac-hl-new '+d),$('#text-layer > span').css('height','100px')},createAreaHighlight:function(e,i,a,n){let s=this.colorSelected.id;if(!(1>s||2>a&&2>n)&&!(e+a>activeCanvas().offsetWidth)&&!(i+n>activeCanvas().offsetHeight)){6<=s&&(s+=3,e-=3,i-=3);let t=pdfDisplayedViewPort.convertToPdfPoint(e,i),d=pdfDisplayedViewPort.convertToPdfPoint(e+a,i+n),o=`siac-hl-new ${pdfDisplayedCurrentPage} -1 ${s} ${t[0]} ${t[1]} ${d[0]} ${d[1]} # `;pycmd(o)}},insertText:function(e){let t=byId('text-layer').getBoundingClientRect(),i=byId('text-layer').offsetLeft,a=e.clientX-t.x,n=e.clientY-t.y;this._createHighlightDiv(a+i,n,100,20,this.colorSelected.id,'');let s=pdfDisplayedCurrentPage+' -1 0 ',d=pdfDisplayedViewPort.convertToPdfPoint(a,n);s+=d[0]+' '+d[1]+' ',d=pdfDisplayedViewPort.convertToPdfPoint(a+100,n+20),s+=d[0]+' '+d[1]+' #',pycmd('siac-hl-new '+s)},displayFakeHighlight:function(){this._createHighlightDiv(0,0,50,50,1,-1)},displayHighlights:function(){this._removeAllHighlights();let e=activeCanvas();if(e){let t=byId('siac-pdf-overflow').scrollTop;this.current.forEach((i)=>{let a=i[0],d=i[1],o=i[2],l=i[3],r=i[4],t=i[5],c=i[6],p=pdfDisplayedViewPort.convertToViewportRectangle([a,d,o,l]),f=n(p[0],p[2]);f+=e.offsetLeft;let g=n(p[1],p[3]),u=s(p[0]-p[2]),m=s(p[1]-p[3]);this._createHighlightDiv(f,g,u,m,r,t,c)}),byId('siac-pdf-overflow').scrollTop=t}},_removeAllHighlights:function(){for(let e=document.getElementsByClassName('siac-hl');e[0];)e[0].parentNode.removeChild(e[0])},_colorById:function(e){return 0===e?'white':1===e?'#e65100':2===e?'#558b2f':3===e?'#2196f3':4===e?'#ffee58':5===e?'#ab47bc':6===e||9===e?'#e65100':7===e||10===e?'#558b2f':8===e||11===e?'#2196f3':void 0},_fuseOverlappingClientRects:function(e){let t,i,a,o=!0,l=0,r=[];for(var c=0;c<e.length;c++)r.push({x:e[c].x,y:e[c].y,w:e[c].width,h:e[c].height});if(1===r.length)return r;for(;o;){o=!1;let e=[],c=0;for(var p=0;p<r.length;p++)if(!(o&&c===p)){if(t=r[p].x,i=r[p].y,a=r[p].w,l=r[p].h,!o)for(c=0;c<r.length;c++)if(c!==p&&(r[c].x===t&&r[c].y===i&&r[c].w===a&&r[c].h!==l?(l=d(r[c].h,l),o=!0):r[c].x===t&&r[c].y===i&&r[c].w!==a&&r[c].h===l?(a=d(r[c].w,a),o=!0):r[c].x===t&&r[c].y!==i&&r[c].w===a&&r[c].h===l?(i=n(i,r[c].y),o=!0):r[c].x!==t&&r[c].y===i&&r[c].w===a&&r[c].h===l?(t=n(t,r[c].x),o=!0):r[c].x!==t&&r[c].y===i&&r[c].w===a&&r[c].h!==l&&100>s(r[c].h-l)?(t=n(t,r[c].x),l=d(r[c].h,l),o=!0):r[c].x!==t&&r[c].y===i&&r[c].h===l?(r[c].x<t?(a=t+a-r[c].x,t=r[c].x):a=r[c].x+r[c].w-t,o=!0):r[c].x===t&&r[c].w===a?(l=d(r[c].h,l,d(i+l,r[c].y+r[c].h)-n(r[c].y,i)),i=n(r[c].y,i),o=!0):r[c].y>i&&r[c].y+r[c].h<i+l?(a=d(r[c].w,a,r[c].x+r[c].w-n(r[c].x,t),t+a-n(r[c].x,t)),t=n(r[c].x,t),o=!0):s(r[c].y-i)<l&&(a=d(r[c].w,a,r[c].x+r[c].w-n(r[c].x,t),t+a-n(r[c].x,t)),i=n(r[c].y,i),l=r[c].h+s(r[c].y-i),o=!0),o)){c<p&&e.splice(c,1);break}-1===e.indexOf({x:t,y:i,w:a,h:l})&&e.push({x:t,y:i,w:a,h:l})}if(o&&r.length===e.length)return console.log('something went terribly wrong'),r;r=Array.from(e)}return r},onColorBtn:function(e){this.colorSelected={id:+$(e).data('id'),color:$(e).data('color')},$('.siac-pdf-color-btn,.siac-pdf-ul-btn').removeClass('active'),$(e).addClass('active'),pycmd('siac-hl-clicked '+this.colorSelected.id+' '+this.colorSelected.color),0<this.colorSelected.id?readerNotification('CTRL + select to Highlight<br>CTRL + Shift + A to Area Highlight'):readerNotification('CTRL + click to insert text<br>CTRL + click again to remove')},onTextMouseUp:function(e,t){if(t.dataset.id&&(t.offsetWidth!=t.dataset.ow||t.clientHeight!=t.dataset.oh)){t.dataset.ow=t.offsetWidth,t.dataset.oh=t.clientHeight;let e=byId('text-layer').getBoundingClientRect(),i=t.offsetLeft-activeCanvas().offsetLeft,a=t.offsetTop,n=i+t.offsetWidth-6,s=a+t.clientHeight,d=pdfDisplayedViewPort.convertToPdfPoint(i,a);i=d[0],a=d[1],d=pdfDisplayedViewPort.convertToPdfPoint(n,s),n=d[0],s=d[1],pycmd(`siac-hl-text-update-coords ${t.dataset.id} ${i} ${a} ${n-2} ${s+2}`)}},onTextBlur:function(e){e.dataset.id&&pycmd(`siac-hl-text-update-text ${e.dataset.id} ${pdfDisplayedCurrentPage} ${$(e).val()}`)},onTextKeyup:function(e){$(e).height(1),$(e).height($(e).prop('scrollHeight')+1),this.onTextMouseUp(null,e)},hlClick:function(e,t){!t.dataset.id||(e.ctrlKey||e.metaKey)&&(this.current=this.current.filter((e)=>e[5]!=t.dataset.id),pycmd('siac-hl-del '+t.dataset.id),$(t).remove())},_createHighlightDiv:function(e,i,a,n,s,t=-1,d=''){let o;return 0<s?(o=document.createElement('div'),o.className='siac-hl siac-hl-c',o.style.height=n+'px',o.style.width=a+'px',o.style.top=i+'px',o.style.left=e+'px',-1!==t&&(o.dataset.id=t),o.setAttribute('onclick','Highlighting.hlClick(event, this);'),6<=s&&9>s?o.style.borderBottom='3px solid '+this._colorById(s):9<=s?o.style.border='3px solid '+this._colorById(s):o.style.background=this._colorById(s)):(o=document.createElement('textarea'),o.className='siac-hl siac-text-hl',o.style.height=n+'px',o.style.width=a+'px',o.style.top=i+'px',o.style.left=e+'px',-1!==t&&(o.dataset.id=t),o.value=d,o.setAttribute('onclick','Highlighting.hlClick(event, this);'),o.style.background=this._colorById(s),o.setAttribute('onmouseup','Highlighting.onTextMouseUp(event, this);'),o.setAttribute('onblur','Highlighting.onTextBlur(this);'),o.setAttribute('onkeyup','Highlighting.onTextKeyup(this);')),byId('siac-pdf-overflow').append(o),o}};if(window.Highlighting=p,window.tomato={remainingSeconds:1800,readingTimer:null,lastStart:30},window.pdfDisplayed=null,window.pdfDisplayedViewPort=null,window.pdfPageRendering=!1,window.pdfDisplayedCurrentPage=null,window.pdfDisplayedScale=2,window.pdfHighDPIWasUsed=!1,window.pageNumPending=null,window.latestRenderTimestamp=null,window.pdfTOC=null,window.pagesRead=[],window.pdfExtract=null,window.pdfDisplayedMarks=null,window.pdfDisplayedMarksTable=null,window.pdfLastReadPages={},window.noteLoading=!1,window.pdfLoading=!1,window.modalShown=!1,window.pdfTooltipEnabled=!0,window.iframeIsDisplayed=!1,window.pageSidebarDisplayed=!0,window.pdfFullscreen=!1,window.displayedNoteId=null,window.pdfTextLayerMetaKey=!1,window.bottomBarTabDisplayed='marks',window.pdfNotification={queue:[],current:''},window.textEditor=null,'undefined'==typeof f)var f=window;window.activeCanvas=function(){let e=byId('siac-pdf-canvas');return e?'none'===e.style.display?byId('siac-pdf-canvas_1'):e:null},window.checkTOC=function(){if(!pdfDisplayed)return;let e=pdfDisplayed;e.getOutline().then(function(t){if(!t||0===t.length)return Promise.reject();let i=t[0].dest;Array.isArray(i)?e.getPageIndex(i[0]).catch((t)=>(console.log(t),Promise.reject())).then(function(e){e&&(byId('siac-toc-btn').style.display='block')}):e.getDestination(i).then(function(e){if(!e)return null;const t=e[0];return t}).then(e.getPageIndex.bind(e)).then(function(e){e&&(byId('siac-toc-btn').style.display='block')})})},window.loadTOC=function(){if(!pdfDisplayed)return;let e=pdfDisplayed;window.pdfTOC=[],e.getOutline().then(function(t){if(console.log(t),t){let a=[];for(let n,s=0;s<t.length;s++){n=t[s].dest;const i=t[s].title;Array.isArray(n)?a.push(e.getPageIndex(n).catch((t)=>(console.log(t),Promise.resolve())).then(function(e){if(e)return window.pdfTOC.push({title:i,page:parseInt(e)+1}),Promise.resolve()})):a.push(e.getDestination(n).then(function(e){if(!e)return null;const t=e[0];return t}).then(e.getPageIndex.bind(e)).then(function(e){return window.pdfTOC.push({title:i,page:parseInt(e)+1}),Promise.resolve()}))}return Promise.all(a)}}).then(function(){let e='';if(pdfTOC&&pdfTOC.length){for(var t=0;t<pdfTOC.length;t++)e+=`<div class='siac-toc-item blue-hover' onclick='pdfGotoPg(${pdfTOC[t].page})'>${pdfTOC[t].page}: ${pdfTOC[t].title}</div>`;e=`<div style='text-align: center; margin-bottom: 5px;'><b style='font-size: 15px;'>Table of Contents</b></div><div style='overflow: auto; color: lightgrey;'>${e}</div>`}byId('siac-toc').innerHTML=e})},window.tocBtnClicked=function(){noteLoading||pdfLoading||($('#siac-toc').is(':visible')?byId('siac-toc').style.display='none':(byId('siac-toc').style.display='flex',loadTOC()))},window.pdfFitToPage=function(){iframeIsDisplayed||rerenderPDFPage(pdfDisplayedCurrentPage,!1,!0,!1,'',!1)},window.queueRenderPage=function(e,t=!0,i=!1,a=!1,n='',s=!0){pdfPageRendering?pageNumPending=e:rerenderPDFPage(e,t,i,a,n,s)},window.rerenderPDFPage=function(e,t=!0,i=!1,a=!1,n='',s=!0){!pdfDisplayed||iframeIsDisplayed||(byId('siac-pdf-tooltip').style.display='none',byId('siac-pdf-page-lbl').innerHTML=`${pdfDisplayedCurrentPage} / ${pdfDisplayed.numPages}`,pdfLoading=!0,a&&pdfLoaderText('Initializing Reader...'),pdfDisplayed.getPage(e).then(function(d){pdfPageRendering=!0;var o=new Date().getTime();latestRenderTimestamp=o;var l=pdf_canvas_0;if('none'!==l.style.display&&(l=pdf_canvas_1),i){var r=d.getViewport({scale:1});pdfDisplayedScale=(l.parentNode.clientWidth-23)/r.width}var r=d.getViewport({scale:pdfDisplayedScale});l.height=r.height*window.devicePixelRatio,l.width=r.width*window.devicePixelRatio,(1!==window.devicePixelRatio||pdfHighDPIWasUsed)&&(pdfHighDPIWasUsed=!0,l.style.height=r.height+'px',l.style.width=r.width+'px');var c=l.getContext('2d'),f=d.render({canvasContext:c,viewport:r,transform:1===window.devicePixelRatio?null:[window.devicePixelRatio,0,0,window.devicePixelRatio,0,0]});return null===pageNumPending?void f.promise.then(function(){return(pdfPageRendering=!1,null!==pageNumPending)?(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,Promise.reject()):(t&&(l.parentElement.scrollTop=0),'siac-pdf-canvas'===l.id?pdf_canvas_1.style.display='none':pdf_canvas_0.style.display='none',l.style.display='inline-block',p._removeAllHighlights(),s&&updatePdfDisplayedMarks(!0),-1!==['Sand','Peach','Night','X1','X2','Mud','Coral','Moss'].indexOf(pdfColorMode)&&invertCanvas(c),d.getTextContent({normalizeWhitespace:!1,disableCombineTextItems:!1}))}).catch(function(){return Promise.reject()}).then(function(d){return!d||pdfPageRendering?Promise.reject():pageNumPending?(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,null):void($('#text-layer').css({height:l.height/window.devicePixelRatio,width:l.width/window.devicePixelRatio+1,left:l.offsetLeft}).html(''),pdfjsLib.renderTextLayer({textContent:d,container:byId('text-layer'),viewport:r,textDivs:[]}),n?highlightPDFText(n):resetSearch(),pdfLoading=!1,(a||n)&&ungreyoutBottom(),a&&$('#siac-pdf-loader-wrapper').remove(),pdfDisplayedViewPort=r,s?(p.current=[],pycmd('siac-pdf-page-loaded '+pdfDisplayedCurrentPage)):p.displayHighlights(),!pageNumPending&&!pdfPageRendering&&(-1===pagesRead.indexOf(e)?(byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book"></i>&nbsp; Read'):(byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book"></i>&nbsp; Unread'),s&&pdfExtract&&(pdfExtract[0]>pdfDisplayedCurrentPage||pdfExtract[1]<pdfDisplayedCurrentPage?$('#siac-pdf-top').addClass('extract'):$('#siac-pdf-top').removeClass('extract')),s&&pageSidebarDisplayed&&pycmd(`siac-linked-to-page ${pdfDisplayedCurrentPage} ${pdfDisplayed.numPages}`),setLastReadPage()))}):(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,Promise.reject())}).catch(function(e){setTimeout(function(){console.log(e)})}))},window.pdfPageRight=function(){!pdfDisplayed||iframeIsDisplayed||pdfDisplayedCurrentPage<pdfDisplayed.numPages&&(pdfDisplayedCurrentPage++,queueRenderPage(pdfDisplayedCurrentPage))},window.pdfPageLeft=function(){!pdfDisplayed||iframeIsDisplayed||1<pdfDisplayedCurrentPage&&(pdfDisplayedCurrentPage--,queueRenderPage(pdfDisplayedCurrentPage))},window.togglePageRead=function(e){!pdfDisplayed||pdfExtract&&(pdfDisplayedCurrentPage<pdfExtract[0]||pdfDisplayedCurrentPage>pdfExtract[1])||(!e&&(e=displayedNoteId),-1===pagesRead.indexOf(pdfDisplayedCurrentPage)?(byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book" aria-hidden="true"></i>&nbsp; Unread',pycmd('siac-pdf-page-read '+e+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.length?pagesRead.push(pdfDisplayedCurrentPage):pagesRead=[pdfDisplayedCurrentPage]):(byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book" aria-hidden="true"></i>&nbsp; Read',pycmd('siac-pdf-page-unread '+e+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.splice(pagesRead.indexOf(pdfDisplayedCurrentPage),1)),updatePdfProgressBar())},window.pdfHidePageReadMark=function(){byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='\u2713&nbsp; Read'},window.pdfShowPageReadMark=function(){byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='&times; Unread'},window.pdfJumpToPage=function(t,e){if(13!==t.keyCode)return;let i=e.value;i=n(pdfDisplayed.numPages,i),pdfDisplayedCurrentPage=i,queueRenderPage(pdfDisplayedCurrentPage)},window.pdfScaleChange=function(e){'up'===e?pdfDisplayedScale+=.1:(pdfDisplayedScale-=.1,pdfDisplayedScale=d(.1,pdfDisplayedScale)),queueRenderPage(pdfDisplayedCurrentPage,!1,!1,!1,'',!1)},window.setAllPagesRead=function(){if(!pdfExtract)pagesRead=Array.from(Array(pdfDisplayed.numPages).keys()).map((e)=>++e);else{pagesRead=[];for(var e=pdfExtract[0];e<=pdfExtract[1];e++)pagesRead.push(e)}-1!==pagesRead.indexOf(pdfDisplayedCurrentPage)&&pdfShowPageReadMark()},window.setLastReadPage=function(){pdfLastReadPages[displayedNoteId]=pdfDisplayedCurrentPage},window.getLastReadPage=function(){return displayedNoteId&&displayedNoteId in pdfLastReadPages?pdfLastReadPages[displayedNoteId]:null},window.updatePdfProgressBar=function(){let e=a(10*pagesRead.length/numPagesExtract()),t=`<span style='margin-right: 10px; display: inline-block; min-width: 35px; font-weight: bold; color: lightgrey;'>${Math.trunc(100*pagesRead.length/numPagesExtract())} %</span>`;for(var i=0;10>i;i++)t+=i<e?`<div class='siac-prog-sq-filled'></div>`:`<div class='siac-prog-sq'></div>`;byId('siac-prog-bar-wr').innerHTML=t,'pages'===bottomBarTabDisplayed&&pycmd(`siac-pdf-show-bottom-tab ${displayedNoteId} pages`)},window.numPagesExtract=function(){return pdfExtract?pdfExtract[1]-pdfExtract[0]+1:pdfDisplayed.numPages},window.markReadUpToCurrent=function(){for(var e=0;e<pdfDisplayedCurrentPage;e++)-1===pagesRead.indexOf(e+1)&&(!pdfExtract||e+1>=pdfExtract[0]&&e+1<=pdfExtract[1])&&pagesRead.push(e+1);-1!==pagesRead.indexOf(pdfDisplayedCurrentPage)&&pdfShowPageReadMark()},window._startTimer=function(){tomato.readingTimer&&clearInterval(tomato.readingTimer),tomato.readingTimer=setInterval(function(){if(tomato.remainingSeconds--,$('.siac-reading-modal-timer-lbl').text(a(tomato.remainingSeconds/60)+' : '+(10>tomato.remainingSeconds%60?'0'+tomato.remainingSeconds%60:tomato.remainingSeconds%60)),0>=tomato.remainingSeconds){clearInterval(tomato.readingTimer),tomato.remainingSeconds=60*tomato.lastStart,$('.siac-timer-play-btn').html('<i class=\'fa fa-play mr-5\'></i>Start').addClass('inactive'),setTimerActive(tomato.lastStart);let e=tomato.remainingSeconds;$('.siac-reading-modal-timer-lbl').text(a(e/60)+' : '+(10>e%60?'0'+e%60:e%60)),pycmd('siac-timer-elapsed '+$('#siac-reading-modal-top-bar').data('nid')),tomato.readingTimer=null}},999)},window.toggleTimer=function(){$('.siac-timer-play-btn').first().hasClass('inactive')?($('.siac-timer-play-btn').removeClass('inactive'),$('.siac-timer-play-btn').html('<i class=\'fa fa-pause mr-5\'></i>Pause'),_startTimer()):(clearInterval(tomato.readingTimer),tomato.readingTimer=null,$('.siac-timer-play-btn').addClass('inactive'),$('.siac-timer-play-btn').html('<i class=\'fa fa-play mr-5\'></i>Start'))},window.resetTimer=function(e){clearInterval(tomato.readingTimer),tomato.readingTimer=null,$('.siac-timer-btn').removeClass('active');let t=+e.innerHTML;$('.siac-timer-btn.'+t).addClass('active'),tomato.remainingSeconds=60*t,tomato.lastStart=t;let i=tomato.remainingSeconds;$('.siac-reading-modal-timer-lbl').text(a(i/60)+' : '+(10>i%60?'0'+i%60:i%60)),$('.siac-timer-play-btn').addClass('inactive').html('<i class=\'fa fa-play mr-5\'></i>Start')},window.startTimer=function(e){resetTimer($('.siac-timer-btn.'+e).get(0)),$('.siac-timer-play-btn').first().trigger('click')},window.setTimerActive=function(e){$('.siac-timer-btn').removeClass('active'),$('.siac-timer-btn.'+e).addClass('active')},window.escapeRegExp=function(e){return e.replace(/[.*+?^${}()|[\]\\]/g,'\\$&')},window.readerNotification=function(e,t){if(e){if(!t&&''!=pdfNotification.current){if(0<pdfNotification.queue.length){if(e===pdfNotification.queue[pdfNotification.queue.length-1])return;}else if(pdfNotification.current===e)return;return void pdfNotification.queue.push(e)}pdfNotification.current=e,byId('siac-pdf-br-notify').innerHTML=e,byId('siac-pdf-br-notify').style.display='block',window.setTimeout(()=>{pdfNotification.current='',byId('siac-pdf-br-notify')?(byId('siac-pdf-br-notify').style.display='none',pdfNotification.queue.length&&setTimeout(function(){let e=pdfNotification.queue.shift();readerNotification(e,!0)},800)):pdfNotification.queue=[]},3500)}},window.swapReadingModal=function(){let e=byId('siac-reading-modal');'siac-right-side'===e.parentNode.id?byId('leftSide').appendChild(e):byId('siac-right-side').appendChild(e)},window.updatePdfDisplayedMarks=function(e){if(null!=pdfDisplayedMarks){if(e){let e='';if($('.siac-mark-btn-inner').removeClass('active'),pdfDisplayedCurrentPage in pdfDisplayedMarks)for(var t=0;t<pdfDisplayedMarks[pdfDisplayedCurrentPage].length;t++)switch(pdfDisplayedMarks[pdfDisplayedCurrentPage][t]){case 1:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Revisit &nbsp;<b onclick=\'$(".siac-mark-btn-inner-1").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-1').first().addClass('active');break;case 2:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Hard &nbsp;<b onclick=\'$(".siac-mark-btn-inner-2").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-2').first().addClass('active');break;case 3:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; More Info &nbsp;<b onclick=\'$(".siac-mark-btn-inner-3").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-3').first().addClass('active');break;case 4:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; More Cards &nbsp;<b onclick=\'$(".siac-mark-btn-inner-4").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-4').first().addClass('active');break;case 5:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Bookmark &nbsp;<b onclick=\'$(".siac-mark-btn-inner-5").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-5').first().addClass('active');}byId('siac-pdf-overlay-top-lbl-wrap')&&(byId('siac-pdf-overlay-top-lbl-wrap').innerHTML=e)}let i=byId('siac-queue-readings-list').offsetWidth,n=byId('siac-queue-actions').offsetWidth,s=byId('siac-reading-modal-bottom-bar').clientWidth-i-n-100;var a='';Object.keys(pdfDisplayedMarksTable).forEach(function(e){let t='';'1'===e?t='Revisit':'2'===e?t='Hard':'3'===e?t='More Info':'4'===e?t='More Cards':'5'===e?t='Bookmark':void 0;let n='';for(var s=0;s<pdfDisplayedMarksTable[e].length;s++)n+='<span class=\'siac-page-mark-link\'>'+pdfDisplayedMarksTable[e][s]+'</span>, ';n=0<n.length?n.substring(0,n.length-2):n,a+=`<tr style='color: grey;'><td><b>${t}</b></td><td>${n}</td></tr>`}),a.length&&(a=`<table style='user-select: none; table-layout: fixed; max-width: ${s}px;'>`+a+'</table>'),byId('siac-marks-display')&&(a.length?byId('siac-marks-display').innerHTML=a:byId('siac-marks-display').innerHTML=`<div style='display: flex; flex-direction: column; justify-content: center; height: 80px; width: 135px; text-align: center; color: grey;'>
+            `;if($('.field').length>8)
+$('.field').first().after(floatingNote);else
+$('.field').last().after(floatingNote);dragElement(byId("nF-"+nid),`nFH-${nid}`);updatePinned();}
+window.dragElement=function(elmnt,headerId,inModal=false){var pos1=0,pos2=0,pos3=0,pos4=0,lMYSum=0,lMXSum=0;if(byId(headerId)){byId(headerId).onmousedown=dragMouseDown;}else{elmnt.onmousedown=dragMouseDown;}
+function dragMouseDown(e){e=e||window.event;e.preventDefault();pos3=e.clientX;pos4=e.clientY;document.onmouseup=closeDragElement;document.onmousemove=elementDrag;}
+function elementDrag(e){e=e||window.event;e.preventDefault();pos1=pos3-e.clientX;pos2=pos4-e.clientY;pos3=e.clientX;pos4=e.clientY;elmnt.style.top=(elmnt.offsetTop-pos2)+"px";elmnt.style.left=(elmnt.offsetLeft-pos1)+"px";}
+function closeDragElement(){document.onmouseup=null;document.onmousemove=null;}}
+window.drawHeatmap=function(id,data){if(typeof CalHeatMap==="undefined"||typeof d3==="undefined"){setTimeout(()=>{drawHeatmap(id,data);},200);return;}
+var cal=new CalHeatMap();let legendColors={min:"lightskyblue",max:"steelblue",empty:"#e1e1e1"};if(document.body.classList.contains("nightMode")){legendColors={min:"#fed976",max:"#800026",empty:"black"}}
+let cellSize=11;let cellPadding=2;let domainLabelFormat="%B";let srw=byId("searchResults").offsetWidth;if(srw<500){domainLabelFormat="%b";}else if(srw<600){domainLabelFormat="%b";}else if(srw<700){domainLabelFormat="%b";}else if(srw<750){}else if(srw<800){}else if(srw<900){}
+cal.init({data,legendColors,itemName:["page","pages"],itemSelector:id,considerMissingDataAsZero:true,dataType:"json",start:new Date(new Date().getFullYear(),0),maxDate:new Date(),range:12,rowLimit:7,cellSize,cellPadding,domain:"month",domainLabelFormat,subDomain:"day"});let el=document.getElementsByClassName("cal-heatmap-container")[0];if(el.getBBox().width>srw){el.style.zoom=srw/(el.getBBox().width+120);}}
+window.drawTopics=function(id,topics){if(typeof $==="undefined"||typeof $.plot==="undefined"){setTimeout(()=>{drawTopics(id,topics);},200);return;}
+$.plot('#'+id,topics.map(t=>{return{label:t[0],data:t[1]};}),{series:{pie:{show:true,label:{show:true,},combine:{threshold:0.02,label:'Others (< 2%)'},stroke:{color:document.body.classList.contains("nightMode")?'#ffffff':'black',}},},legend:{show:false},});}},function(){var e=Math.min,a=Math.max;window.pdfSearchOngoing=!1,window.pdfCurrentSearch={query:null,lastStart:null,lastEnd:null,breakOnNext:null},window.onPDFSearchBtnClicked=function(e){$(e).hasClass('expanded')?$(e).find('input').focus():($(e).find('input').val(''),pdfCurrentSearch={query:null,lastEnd:null,lastStart:null})},window.onPDFSearchInput=function(e,t){13===t.keyCode&&e&&e.trim().length&&(readerNotification('Searching ...'),e.toLowerCase()!==pdfCurrentSearch.query&&(pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null,pdfCurrentSearch.query=e.toLowerCase()),setTimeout(function(){nextPDFSearchResult()},10))},window.getContents=async function(e=1,t=1e4){for(var i,a=[],n=e;n<=pdfDisplayed.numPages&&n<=e+t;n++)i=pdfDisplayed.getPage(n),a.push(i.then(function(e){var t=e.pageIndex+1,a='',i=e.getTextContent();return i.then(function(e){for(var s=0;s<e.items.length;s++)a+=' '+e.items[s].str;return{page:t,text:a.toLowerCase()}})}));return Promise.all(a).then(function(e){return e})},window.resetSearch=function(){pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null},window.nextPDFSearchResult=async function(e='right'){if(!pdfSearchOngoing){let i=$('#siac-pdf-search-btn-inner input').first().val().toLowerCase();if(null===pdfCurrentSearch.query?pdfCurrentSearch.query=i:(i!==pdfCurrentSearch.query||pdfDisplayedCurrentPage!==pdfCurrentSearch.lastStart&&pdfCurrentSearch.lastStart===pdfCurrentSearch.lastEnd)&&(pdfCurrentSearch.lastStart=null,pdfCurrentSearch.lastEnd=null,pdfCurrentSearch.query=i),!!pdfCurrentSearch.query){pdfCurrentSearch.breakOnNext=!1,pdfSearchOngoing=!0,greyoutBottom();var t=!1,a=!1,s=pdfCurrentSearch.query.toLowerCase().split(' '),d=0;do{d++;var o=getNextPagesToSearchIn(e);if('left'===e)var l=(await getContents(o.s,o.n)).reverse();else var l=await getContents(o.s,o.n);0===l.length&&(t=!0);for(var r=0;r<l.length&&!t;r++)for(var n=0;n<s.length;n++)if(-1!==l[r].text.indexOf(s[n])){pdfDisplayedCurrentPage===l[r].page?readerNotification('Text found on current page',!0):readerNotification('Text found on page '+l[r].page,!0),pdfDisplayedCurrentPage=l[r].page,queueRenderPage(pdfDisplayedCurrentPage,!0,!1,!1,pdfCurrentSearch.query),pdfCurrentSearch.lastStart=pdfDisplayedCurrentPage,pdfCurrentSearch.lastEnd=pdfDisplayedCurrentPage,t=!0,a=!0;break}if(d>Math.round(pdfDisplayed.numPages/25)+2){readerNotification('Search aborted, took too long.',!0);break}}while(!t);a||(readerNotification('Text was not found.',!0),ungreyoutBottom()),pdfSearchOngoing=!1}}},window.getNextPagesToSearchIn=function(t){if(pdfCurrentSearch.breakOnNext)return[];let i=pdfCurrentSearch.lastStart,d=pdfCurrentSearch.lastEnd,o=25,l=-1,r=o;return'left'===t?(null===i?(l=a(pdfDisplayedCurrentPage-o,1),r=e(o,pdfDisplayedCurrentPage-l)):1===i?l=a(pdfDisplayed.numPages-o,1):d===i&&1!==d&&1<pdfDisplayed.numPages?(l=a(i-o-1,1),r=1===l?a(0,e(o,pdfDisplayedCurrentPage-3)):e(o,pdfDisplayedCurrentPage-l-1)):(l=a(i-o,1),1===l&&(r=a(0,i-2))),null!==i&&i>pdfDisplayedCurrentPage&&l<=pdfDisplayedCurrentPage?(l=pdfDisplayedCurrentPage,pdfCurrentSearch.breakOnNext=!0):1===pdfDisplayed.numPages&&(r=0,pdfCurrentSearch.breakOnNext=!0)):(null===i?(l=pdfDisplayedCurrentPage,r=e(pdfDisplayed.numPages-l,o)):d===pdfDisplayed.numPages?(l=1,r=e(o,pdfDisplayed.numPages)):(l=d+1,r=e(pdfDisplayed.numPages-l,o)),null!==d&&d<pdfDisplayedCurrentPage&&l+o>=pdfDisplayedCurrentPage?(r=pdfDisplayedCurrentPage-l,pdfCurrentSearch.breakOnNext=!0):null!==d&&d===pdfDisplayed.numPages&&1+o>=pdfDisplayedCurrentPage?(r=pdfDisplayedCurrentPage-l,pdfCurrentSearch.breakOnNext=!0):1===pdfDisplayed.numPages&&(r=0,pdfCurrentSearch.breakOnNext=!0)),1===l&&pdfDisplayed.numPages<=r&&(pdfCurrentSearch.breakOnNext=!0),pdfCurrentSearch.lastStart=l,pdfCurrentSearch.lastEnd=e(pdfDisplayed.numPages,l+r),{s:l,n:r}},window.highlightPDFText=function(e,s=0){var n=byId('text-layer').querySelectorAll('span');if(0===n.length)return void(3>s&&setTimeout(function(){highlightPDFText(e,s+1)},200));let d=e.toLowerCase().split(' ');for(var o=0;o<d.length;o++)for(var i=0;i<n.length;i++)if(-1!==n[i].innerHTML.toLowerCase().indexOf(d[o])){var t=new RegExp(escapeRegExp(d[o]),'ig');n[i].innerHTML=n[i].innerHTML.replace(t,'<span class=\'tl-highlight\'>$&</span>')}byId('siac-pdf-top').scrollTop=a(0,$('#text-layer .tl-highlight').first()[0].parentElement.offsetTop-50)}},function(){var e=Math.abs;window.pdfImgSel={canvas:null,context:null,startX:null,endX:null,startY:null,endY:null,cvsOffLeft:null,cvsOffTop:null,mouseIsDown:!1,canvasDispl:null},window.pdfImgMouseUp=function(){if(pdfImgSel.mouseIsDown){pdfImgSel.mouseIsDown=!1,drawSquare();var e=activeCanvas();cropSelection(e,pdfImgSel.startX,pdfImgSel.startY,pdfImgSel.endX-pdfImgSel.startX,pdfImgSel.endY-pdfImgSel.startY,insertImage),$(pdfImgSel.canvas).remove(),$('#text-layer').show()}},window.pageSnapshot=function(){var e=activeCanvas();cropSelection(e,0,0,e.offsetWidth,e.offsetHeight,insertImage)},window.cropSelection=function(e,t,i,a,n,s){if(!(2>a||2>n)){let d=document.createElement('canvas'),o=d.getContext('2d');d.width=a,d.height=n,o.drawImage(e,t*window.devicePixelRatio,i*window.devicePixelRatio,a*window.devicePixelRatio,n*window.devicePixelRatio,0,0,d.width,d.height),s(d.toDataURL())}},window.insertImage=function(e){pycmd('siac-add-image 1 '+e.replace('image/png',''))},window.pdfImgMouseDown=function(e){pdfImgSel.canvasDispl=activeCanvas().offsetLeft,pdfImgSel.mouseIsDown=!0,pdfImgSel.cvsOffLeft=$(pdfImgSel.canvas).offset().left,pdfImgSel.cvsOffTop=$(pdfImgSel.canvas).offset().top,pdfImgSel.startX=pdfImgSel.endX=e.clientX-pdfImgSel.cvsOffLeft,pdfImgSel.startY=pdfImgSel.endY=e.clientY-pdfImgSel.cvsOffTop,drawSquare()},window.initImageSelection=function(){if($('#text-layer').is(':hidden'))return $(pdfImgSel.canvas).remove(),void $('#text-layer').show();disableAreaHighlight(),$('#text-layer').hide(),pdfImgSel.canvas=activeCanvas();var e=document.createElement('canvas');pdfImgSel.canvas.parentNode.insertBefore(e,pdfImgSel.canvas.nextSibling),$(e).css({width:pdfImgSel.canvas.width/window.devicePixelRatio+'px',height:pdfImgSel.canvas.height/window.devicePixelRatio+'px',top:'0',left:document.getElementById('text-layer').style.left,position:'absolute',"z-index":999999,opacity:.3,cursor:'crosshair'}),e.setAttribute('width',pdfImgSel.canvas.width),e.setAttribute('height',pdfImgSel.canvas.height),pdfImgSel.context=e.getContext('2d'),e.addEventListener('mousedown',function(t){pdfImgMouseDown(t)},!1),e.addEventListener('mouseup',function(t){pdfImgMouseUp(t)},!1),e.addEventListener('mousemove',function(t){pdfImgMouseXY(t)},!1),pdfImgSel.canvas=e},window.pdfImgMouseXY=function(e){pdfImgSel.mouseIsDown&&(pdfImgSel.endX=e.clientX-pdfImgSel.cvsOffLeft,pdfImgSel.endY=e.clientY-pdfImgSel.cvsOffTop,drawSquare())},window.drawSquare=function(){pdfImgSel.context.clearRect(0,0,pdfImgSel.context.canvas.width,pdfImgSel.context.canvas.height),pdfImgSel.context.fillRect(pdfImgSel.startX*window.devicePixelRatio,pdfImgSel.startY*window.devicePixelRatio,e(pdfImgSel.startX-pdfImgSel.endX)*window.devicePixelRatio,e(pdfImgSel.startY-pdfImgSel.endY)*window.devicePixelRatio),pdfImgSel.context.fillStyle='yellow',pdfImgSel.context.fill()},window.clearImgSelectionCanvas=function(){if(pdfImgSel.canvas){let e=pdfImgSel.canvas.getContext('2d');e.clearRect(0,0,e.canvas.width,e.canvas.height)}},window.initAreaHighlight=function(){pdfImgSel.canvas=activeCanvas();var e=document.createElement('canvas');e.oncontextmenu=disableAreaHighlight,pdfImgSel.canvas.parentNode.insertBefore(e,pdfImgSel.canvas.nextSibling),$(e).css({width:pdfImgSel.canvas.width/window.devicePixelRatio+'px',height:pdfImgSel.canvas.height/window.devicePixelRatio+'px',top:'0',left:document.getElementById('text-layer').style.left,position:'absolute',"z-index":999999,opacity:.3,cursor:'crosshair'}),e.setAttribute('width',pdfImgSel.canvas.width),e.setAttribute('height',pdfImgSel.canvas.height),pdfImgSel.context=e.getContext('2d'),e.addEventListener('mousedown',function(t){pdfImgMouseDown(t)},!1),e.addEventListener('mouseup',function(t){pdfAreaHighlightMouseUp(t)},!1),e.addEventListener('mousemove',function(t){pdfImgMouseXY(t)},!1),pdfImgSel.canvas=e},window.disableAreaHighlight=function(){return pdfImgSel.canvas&&$(pdfImgSel.canvas).remove(),!1},window.pdfAreaHighlightMouseUp=function(){pdfImgSel.mouseIsDown&&(pdfImgSel.mouseIsDown=!1,drawSquare(),Highlighting.createAreaHighlight(pdfImgSel.startX,pdfImgSel.startY,pdfImgSel.endX-pdfImgSel.startX,pdfImgSel.endY-pdfImgSel.startY),clearImgSelectionCanvas())}},function(){var t=Math.min;window.onPDFCopy=function(i){let e=getSelection(),a=e.getRangeAt(0),n=nodesInSelection(a);if(!n)return;let s='',d=0,o=0,l=0,r=0,c=[],p=null;for(let e=0;e<n.length;e++)(n[e].offsetLeft<d||n[e].offsetTop>o+5)&&!n[e].innerText.startsWith(' ')?(p&&4<Math.abs(+n[e].style.fontSize.substring(0,n[e].style.fontSize.indexOf('px'))-p)?(s+='\n\n'+n[e].innerText,r+=2):0<c.length&&n[e].offsetTop-o>c.slice(-1)[0]+2?(s+='\n\n'+n[e].innerText,r+=2):s.endsWith('-')?(s=s.substring(0,s.length-1)+n[e].innerText,r--):(s+=' '+n[e].innerText,r++),0!==o&&c.push(n[e].offsetTop-o),p=+n[e].style.fontSize.substring(0,n[e].style.fontSize.indexOf('px'))):d+l<n[e].offsetLeft-2&&!n[e].innerText.startsWith(' ')?(s+=' '+n[e].innerText,r++):s+=n[e].innerText,d=n[e].offsetLeft,o=n[e].offsetTop,l=n[e].offsetWidth;let f=e.toString();if(!s.length&&f.length&&(s=f),s=s.replace('  ',' '),!f.startsWith(s.substring(0,t(10,s.length))))for(var g=10;0<g;g--)if(0<s.indexOf(f.substring(0,t(g,f.length)))){s=s.substring(s.indexOf(f.substring(0,t(g,f.length))));break}if(s.length>f.length+r)for(var h=10;0<h;h--){let e=f.substring(f.length-t(f.length,h));if(0<=s.lastIndexOf(e)){s=s.substring(0,s.lastIndexOf(e)+e.length);break}}s=s.replace(/( |&nbsp;){2,}/g,' '),s=s.replace(/ ([,.;:]) /g,'$1 '),s=s.replace(/ ([)\].!?:])/g,'$1'),s=s.replace(/([(\[]) /g,'$1'),i.clipboardData.setData('text/plain',s),i.preventDefault()},window.pdfLeftTabPdfSearchKeyup=function(e,t){13!==t.keyCode||e&&0<e.trim().length&&pycmd('siac-pdf-left-tab-pdf-search '+e)},window.pdfLeftTabAnkiSearchKeyup=function(e,t){13!==t.keyCode||e&&0<e.trim().length&&pycmd('siac-pdf-left-tab-anki-search '+e)},window.pdfViewerKeyup=function(e){e.ctrlKey&&(39===e.keyCode||32===e.keyCode&&e.shiftKey)?(e.shiftKey&&pdfDisplayed&&-1===pagesRead.indexOf(pdfDisplayedCurrentPage)&&(!pdfExtract||pdfExtract[0]<=pdfDisplayedCurrentPage&&pdfExtract[1]>=pdfDisplayedCurrentPage)&&(pycmd('siac-pdf-page-read '+$('#siac-pdf-top').data('pdfid')+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.length?pagesRead.push(pdfDisplayedCurrentPage):pagesRead=[pdfDisplayedCurrentPage],updatePdfProgressBar()),pdfPageRight()):e.ctrlKey&&74===e.keyCode?pdfPageRight():e.ctrlKey&&(37===e.keyCode||75===e.keyCode)?pdfPageLeft():(e.ctrlKey||e.metaKey)&&e.shiftKey&&65===e.keyCode&&0<Highlighting.colorSelected.id&&(readerNotification('&nbsp;Area Highlight&nbsp;'),initAreaHighlight(),pdfTextLayerMetaKey=!1)},window.pdfTooltipClozeKeyup=function(e){try{if(e.ctrlKey&&e.shiftKey&&67===e.keyCode){let e=window.getSelection().toString();if(!e||0===e.length)return;let i=byId('siac-pdf-tooltip-results-area').innerHTML;for(var t=1;20>t;t++)if(-1===i.indexOf('{{c'+t+'::')){i=i.split(e).join('<span style=\'color: lightblue;\'>{{c'+t+'::'+e+'}}</span>'),byId('siac-pdf-tooltip-results-area').innerHTML=i;break}}}catch(e){pycmd('siac-notification Something went wrong during clozing:<br> '+e.message)}},window.markClicked=function(e){'siac-page-mark-link'===e.target.className&&(pdfDisplayedCurrentPage=+e.target.innerHTML,queueRenderPage(pdfDisplayedCurrentPage,!0))},window.iframeBtnClicked=function(e){e.preventDefault(),$(e.target).toggleClass('expanded'),e.stopPropagation(),$(e.target).hasClass('expanded')&&$(e.target).find('input').first().focus()},window.textlayerClicked=function(t,i){if(!t.ctrlKey&&!windowHasSelection()&&($('#siac-pdf-tooltip').hide(),'none'!==i.style.pointerEvents)){i.style.pointerEvents='none';let a=$.Event('click');a.ctrlKey=!0,$(document.elementFromPoint(t.clientX,t.clientY)).trigger(a),i.style.pointerEvents='auto'}},window.pdfKeyup=function(t){if(!t.ctrlKey&&!t.metaKey&&pdfTooltipEnabled&&windowHasSelection()){$('#text-layer .tl-highlight').remove();let e=window.getSelection(),t=e.getRangeAt(0),i=e.toString();if(0===i.trim().length||500<i.length)return;$('#text-layer > span').css('height','auto');let a=nodesInSelection(t),n=getSentencesAroundSelection(t,a,i);1<a.length&&(i=joinTextLayerNodeTexts(a,i));let s=t.getBoundingClientRect(),d=byId('siac-reading-modal').getBoundingClientRect();byId('siac-pdf-tooltip-results-area').innerHTML='<center>Searching...</center>',byId('siac-pdf-tooltip-searchbar').value='';let o=s.left-d.left;250>d.width-o&&(o-=200);let l=s.top-d.top+s.height;$('#siac-pdf-tooltip').css({top:l+'px',left:o+'px'}).show(),pycmd('siac-pdf-selection '+i),$('#siac-pdf-tooltip').data({sentences:n,selection:i,top:l}),$('#text-layer > span').css('height','200px')}else(t.ctrlKey||t.metaKey)&&0<Highlighting.colorSelected.id&&windowHasSelection()?(Highlighting.highlight(),pdfTextLayerMetaKey=!1):(t.ctrlKey||t.metaKey)&&0===Highlighting.colorSelected.id&&!windowHasSelection()&&Highlighting.insertText(t)},window.pdfMouseWheel=function(e){(e.ctrlKey||e.metaKey)&&(0>e.deltaY?pdfScaleChange('up'):0<e.deltaY&&pdfScaleChange('down'),e.preventDefault())}},function(){window.joinTextLayerNodeTexts=function(e,t){let a='';for(var n=0;n<e.length;n++){if(e[n].innerHTML===t)return t;a+=e[n].innerHTML+=' '}a=a.replace('  ',' ');let i=a.split(' ');a='';for(var n=0;n<i.length;n++)0<i[n].length&&0<=t.indexOf(i[n])&&(a+=i[n]+' ');return a.trim()},window.nodesInSelection=function(e){var t=byId('text-layer').children;let a=[],n=!1,s='#text'===e.startContainer.nodeName?e.startContainer.parentNode:e.startContainer,d='#text'===e.endContainer.nodeName?e.endContainer.parentNode:e.endContainer;for(var o=0;o<t.length&&(t[o]==s&&(n=!0),n&&a.push(t[o]),t[o]!=d);o++);return a},window.getSentencesAroundSelection=function(e,t,a){if(!e.startContainer)return;a=a.replace(/  +/g,' ').trim();let n=e.startContainer.parentElement.previousSibling,s='',d=0,o=0;if(1===t.length)s=t[0].innerHTML,d=t[0].clientHeight;else for(var l=0;l<t.length;l++)s+=t[l].innerHTML+' ',d=t[l].clientHeight;o=t[0].offsetTop,s=s.replace(/  +/g,' ').trim();let i=[];for(n||i.push(s);n;){if(5<Math.abs(n.clientHeight-d)||o-n.offsetTop>1.5*d){i.push(s);break}o=n.offsetTop,s=(n.innerHTML+' '+s).replace(/  +/g,' ').trim();let e=extractPrev(s,i,a);if(i=e[1],e[0])break;if(n=n.previousSibling,!n){i.push(s);break}}let r=[];for(var l=0;l<i.length;l++)for(s=i[l],n=e.endContainer.parentElement.nextSibling,n||r.push(s);n;){s=(s+' '+n.innerHTML).replace(/  +/g,' ').trim();let e=extractNext(s,r,a);if(r=e[1],e[0])break;if(n=n.nextSibling,!n){r.push(s);break}}return r},window.sendClozes=function(){let e=$('#siac-pdf-tooltip').data('sentences'),t=$('#siac-pdf-tooltip').data('selection');pycmd('siac-show-cloze-modal '+t+'$$$'+e.join('$$$'))},window.generateClozes=function(){let e='';$('.siac-cl-row').each(function(t,i){e+='$$$'+$(i.children[0].children[0]).text()});let t=$('#siac-pdf-top').data('pdfpath'),i=$('#siac-pdf-top').data('pdftitle');pycmd('siac-generate-clozes $$$'+i+'$$$'+t+'$$$'+pdfDisplayedCurrentPage+e),$('#siac-pdf-tooltip').hide()},window.extractPrev=function(e,t,i){e=e.substring(0,e.lastIndexOf(i)+i.length)+e.substring(e.lastIndexOf(i)+i.length).replace(/\./g,'$DOT$');let a=e.match(/.*[^.\d][.!?]"? (.+)/);if(!a||-1===a[1].indexOf(i))return[!1,t];let n=a[1].replace(/\$DOT\$/g,'.');return-1===t.indexOf(n)&&t.push(n),[!0,t]},window.extractNext=function(e,t,i){e=e.substring(0,e.indexOf(i)).replace(/\./g,'$DOT$')+e.substring(e.indexOf(i));let a=e.match(/(.+?(\.\.\.(?!,| [a-z])|[^.]\.(?!(\.|[0-9]|[A-Z]{2,20}))|[!?]|[^0-9]\. [A-Z])).*/);if(!a||-1===a[1].indexOf(i))return[!1,t];let n=a[1].replace(/\$DOT\$/g,'.');return-1===t.indexOf(n)&&t.push(n),[!0,t]}},function(){var e=Math.abs,t=Math.max;window.setPDFColorMode=function(e){$('#siac-pdf-color-mode-btn > span').first().text(e),pdfColorMode=e,rerenderPDFPage(pdfDisplayedCurrentPage,!1),pycmd('siac-update-config-str pdf.color_mode '+e),$('#siac-pdf-top').removeClass('siac-pdf-sand siac-pdf-night siac-pdf-peach siac-pdf-day siac-pdf-rose siac-pdf-moss siac-pdf-coral siac-pdf-x1 siac-pdf-x2 siac-pdf-mud').addClass('siac-pdf-'+pdfColorMode.toLowerCase())},window.invertCanvas=function(e){'Night'===pdfColorMode?(applyFilter(e,'#121212','overlay'),colorize(e,'#2496dc',.4)):'X1'===pdfColorMode?(invert(e),colorize(e,'teal',.4),darken(e,'lightsalmon')):'X2'===pdfColorMode?(invert(e),colorize(e,'darkslategrey',.4),darken(e,'coral')):'Mud'===pdfColorMode?(invert(e),colorize(e,'coral',.3),darken(e,'coral')):'Coral'===pdfColorMode?darken(e,'#ffb89e'):'Sand'===pdfColorMode?darken(e,'#ffebb3'):'Peach'===pdfColorMode?darken(e,'#ffcba4'):'Moss'===pdfColorMode&&colorize(e,'green',.4),e.canvas.style.display='inline-block'},window.pxToSandScheme=function(i,a,n){return 240<i&&240<a&&240<n?{r:241,g:206,b:147}:15>e(i-a)&&15>e(i-n)?(i=t(0,i-40),a=t(0,a-40),n=t(0,n-40),{r:i,g:a,b:n}):100>i&&100>a&&100>n?{r:0,g:0,b:0}:{r:i,g:a,b:n}},window.pxToPeachScheme=function(i,a,n){return 240<i&&240<a&&240<n?{r:237,g:209,b:176}:15>e(i-a)&&15>e(i-n)?(i=t(0,i-40),a=t(0,a-40),n=t(0,n-40),{r:i,g:a,b:n}):100>i&&100>a&&100>n?{r:0,g:0,b:0}:{r:i,g:a,b:n}},window.colorize=function(e,t,i){e.globalCompositeOperation='source-atop',e.globalAlpha=i,e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height),e.globalCompositeOperation='source-over',e.globalAlpha=1},window.invert=function(e){e.globalCompositeOperation='difference',e.fillStyle='white',e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.darken=function(e,t){e.globalCompositeOperation='darken',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.lighten=function(e,t){e.globalCompositeOperation='lighten',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.overlay=function(e,t){e.globalCompositeOperation='overlay',e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.applyFilter=function(e,t,i){e.globalCompositeOperation=i,e.fillStyle=t,e.fillRect(0,0,e.canvas.width,e.canvas.height)},window.refreshCanvas=function(){try{const e=activeCanvas().getContext('2d');e.putImageData(e.getImageData(0,0,e.canvas.width,e.canvas.height),0,0)}catch(t){}}},function(){window.tryExtractTextFromTextNote=function(){saveTextNote($('#siac-reading-modal-top-bar').data('nid')),pycmd('siac-try-copy-text-note')},window.saveTextNote=function(e){let t='';try{t=textEditor.value()}catch(t){return void pycmd('siac-notification Could not save text note for some reason.')}readerNotification('&nbsp;<i class=\'fa fa-save\'></i>&nbsp; Note saved.&nbsp;'),pycmd('siac-update-note-text '+e+' '+t)},window.editorMDInit=function(){textEditor=new SimpleMDE({element:byId('siac-text-top').children[0],indentWithTabs:!0,autoDownloadFontAwesome:!1,autosave:{enabled:!1},placeholder:'',status:!1,tagSize:4,toolbar:['bold','italic','heading','code','quote','unordered-list','ordered-list','horizontal-rule','link']})}},function(){var e=Math.trunc;window.siacYt={player:null},window.initYtPlayer=function(e,t){return'undefined'==typeof YT?void readerNotification('Seems like Youtube API is not loaded. Maybe check your internet connection?'):void(siacYt.player=new YT.Player('siac-yt-player',{height:'360',width:'640',videoId:e,playerVars:{start:t}}))},window.ytCurrentTime=function(){return Math.round(siacYt.player.getCurrentTime())},window.ytScreenCapture=function(){let t=document.getElementById('siac-yt-player');if(t){let i=t.getBoundingClientRect();pycmd(`siac-screen-capture ${e(i.top)} ${e(i.right)} ${e(i.bottom)} ${e(i.left)}`)}},window.ytSavePosition=function(){let t=ytCurrentTime(),i=t%60;0===i&&(i='00'),pycmd('siac-yt-save-time '+t),readerNotification(`Saved Position.<br>Video will resume at ${e(t/60)}:${i}`)}},function(){},function(e,t,i){'use strict';var a=Math.floor,n=Math.min,s=Math.abs,d=Math.max;i.r(t);var o=i(1),l=i(2),r=i(3),c=i(4);const p={colorSelected:{id:1,color:'red'},current:[],highlight:function(){let e=window.getSelection(),t=e.getRangeAt(0);$('#text-layer > span').css('height','auto');let i=t.getClientRects();if(100<i.length)return void readerNotification('Selection too long to highlight.');let a=this._fuseOverlappingClientRects(i),n=byId('text-layer').getBoundingClientRect(),s=byId('text-layer').offsetLeft,d=pdfDisplayedCurrentPage+' -1 '+this.colorSelected.id+' ';a.forEach((e)=>{let t=e.x-n.x,i=e.y-n.y,a=pdfDisplayedViewPort.convertToPdfPoint(t,i);d+=a[0]+' '+a[1]+' ',a=pdfDisplayedViewPort.convertToPdfPoint(t+e.w,i+e.h),d+=a[0]+' '+a[1]+' '}),d+='# '+e.toString(),e.removeAllRanges(),pycmd('siac-hl-new '+d),$('#text-layer > span').css('height','100px')},createAreaHighlight:function(e,i,a,n){let s=this.colorSelected.id;if(!(1>s||2>a&&2>n)&&!(e+a>activeCanvas().offsetWidth)&&!(i+n>activeCanvas().offsetHeight)){6<=s&&(s+=3,e-=3,i-=3);let t=pdfDisplayedViewPort.convertToPdfPoint(e,i),d=pdfDisplayedViewPort.convertToPdfPoint(e+a,i+n),o=`siac-hl-new ${pdfDisplayedCurrentPage} -1 ${s} ${t[0]} ${t[1]} ${d[0]} ${d[1]} # `;pycmd(o)}},insertText:function(e){let t=byId('text-layer').getBoundingClientRect(),i=byId('text-layer').offsetLeft,a=e.clientX-t.x,n=e.clientY-t.y;this._createHighlightDiv(a+i,n,100,20,this.colorSelected.id,'');let s=pdfDisplayedCurrentPage+' -1 0 ',d=pdfDisplayedViewPort.convertToPdfPoint(a,n);s+=d[0]+' '+d[1]+' ',d=pdfDisplayedViewPort.convertToPdfPoint(a+100,n+20),s+=d[0]+' '+d[1]+' #',pycmd('siac-hl-new '+s)},displayFakeHighlight:function(){this._createHighlightDiv(0,0,50,50,1,-1)},displayHighlights:function(){this._removeAllHighlights();let e=activeCanvas();if(e){let t=byId('siac-pdf-overflow').scrollTop;this.current.forEach((i)=>{let a=i[0],d=i[1],o=i[2],l=i[3],r=i[4],t=i[5],c=i[6],p=pdfDisplayedViewPort.convertToViewportRectangle([a,d,o,l]),f=n(p[0],p[2]);f+=e.offsetLeft;let g=n(p[1],p[3]),u=s(p[0]-p[2]),m=s(p[1]-p[3]);this._createHighlightDiv(f,g,u,m,r,t,c)}),byId('siac-pdf-overflow').scrollTop=t}},_removeAllHighlights:function(){for(let e=document.getElementsByClassName('siac-hl');e[0];)e[0].parentNode.removeChild(e[0])},_colorById:function(e){return 0===e?'white':1===e?'#e65100':2===e?'#558b2f':3===e?'#2196f3':4===e?'#ffee58':5===e?'#ab47bc':6===e||9===e?'#e65100':7===e||10===e?'#558b2f':8===e||11===e?'#2196f3':void 0},_fuseOverlappingClientRects:function(e){let t,i,a,o=!0,l=0,r=[];for(var c=0;c<e.length;c++)r.push({x:e[c].x,y:e[c].y,w:e[c].width,h:e[c].height});if(1===r.length)return r;for(;o;){o=!1;let e=[],c=0;for(var p=0;p<r.length;p++)if(!(o&&c===p)){if(t=r[p].x,i=r[p].y,a=r[p].w,l=r[p].h,!o)for(c=0;c<r.length;c++)if(c!==p&&(r[c].x===t&&r[c].y===i&&r[c].w===a&&r[c].h!==l?(l=d(r[c].h,l),o=!0):r[c].x===t&&r[c].y===i&&r[c].w!==a&&r[c].h===l?(a=d(r[c].w,a),o=!0):r[c].x===t&&r[c].y!==i&&r[c].w===a&&r[c].h===l?(i=n(i,r[c].y),o=!0):r[c].x!==t&&r[c].y===i&&r[c].w===a&&r[c].h===l?(t=n(t,r[c].x),o=!0):r[c].x!==t&&r[c].y===i&&r[c].w===a&&r[c].h!==l&&100>s(r[c].h-l)?(t=n(t,r[c].x),l=d(r[c].h,l),o=!0):r[c].x!==t&&r[c].y===i&&r[c].h===l?(r[c].x<t?(a=t+a-r[c].x,t=r[c].x):a=r[c].x+r[c].w-t,o=!0):r[c].x===t&&r[c].w===a?(l=d(r[c].h,l,d(i+l,r[c].y+r[c].h)-n(r[c].y,i)),i=n(r[c].y,i),o=!0):r[c].y>i&&r[c].y+r[c].h<i+l?(a=d(r[c].w,a,r[c].x+r[c].w-n(r[c].x,t),t+a-n(r[c].x,t)),t=n(r[c].x,t),o=!0):s(r[c].y-i)<l&&(a=d(r[c].w,a,r[c].x+r[c].w-n(r[c].x,t),t+a-n(r[c].x,t)),i=n(r[c].y,i),l=r[c].h+s(r[c].y-i),o=!0),o)){c<p&&e.splice(c,1);break}-1===e.indexOf({x:t,y:i,w:a,h:l})&&e.push({x:t,y:i,w:a,h:l})}if(o&&r.length===e.length)return console.log('something went terribly wrong'),r;r=Array.from(e)}return r},onColorBtn:function(e){this.colorSelected={id:+$(e).data('id'),color:$(e).data('color')},$('.siac-pdf-color-btn,.siac-pdf-ul-btn').removeClass('active'),$(e).addClass('active'),pycmd('siac-hl-clicked '+this.colorSelected.id+' '+this.colorSelected.color),0<this.colorSelected.id?readerNotification('CTRL + select to Highlight<br>CTRL + Shift + A to Area Highlight'):readerNotification('CTRL + click to insert text<br>CTRL + click again to remove')},onTextMouseUp:function(e,t){if(t.dataset.id&&(t.offsetWidth!=t.dataset.ow||t.clientHeight!=t.dataset.oh)){t.dataset.ow=t.offsetWidth,t.dataset.oh=t.clientHeight;let e=byId('text-layer').getBoundingClientRect(),i=t.offsetLeft-activeCanvas().offsetLeft,a=t.offsetTop,n=i+t.offsetWidth-6,s=a+t.clientHeight,d=pdfDisplayedViewPort.convertToPdfPoint(i,a);i=d[0],a=d[1],d=pdfDisplayedViewPort.convertToPdfPoint(n,s),n=d[0],s=d[1],pycmd(`siac-hl-text-update-coords ${t.dataset.id} ${i} ${a} ${n-2} ${s+2}`)}},onTextBlur:function(e){e.dataset.id&&pycmd(`siac-hl-text-update-text ${e.dataset.id} ${pdfDisplayedCurrentPage} ${$(e).val()}`)},onTextKeyup:function(e){$(e).height(1),$(e).height($(e).prop('scrollHeight')+1),this.onTextMouseUp(null,e)},hlClick:function(e,t){!t.dataset.id||(e.ctrlKey||e.metaKey)&&(this.current=this.current.filter((e)=>e[5]!=t.dataset.id),pycmd('siac-hl-del '+t.dataset.id),$(t).remove())},_createHighlightDiv:function(e,i,a,n,s,t=-1,d=''){let o;return 0<s?(o=document.createElement('div'),o.className='siac-hl siac-hl-c',o.style.height=n+'px',o.style.width=a+'px',o.style.top=i+'px',o.style.left=e+'px',-1!==t&&(o.dataset.id=t),o.setAttribute('onclick','Highlighting.hlClick(event, this);'),6<=s&&9>s?o.style.borderBottom='3px solid '+this._colorById(s):9<=s?o.style.border='3px solid '+this._colorById(s):o.style.background=this._colorById(s)):(o=document.createElement('textarea'),o.className='siac-hl siac-text-hl',o.style.height=n+'px',o.style.width=a+'px',o.style.top=i+'px',o.style.left=e+'px',-1!==t&&(o.dataset.id=t),o.value=d,o.setAttribute('onclick','Highlighting.hlClick(event, this);'),o.style.background=this._colorById(s),o.setAttribute('onmouseup','Highlighting.onTextMouseUp(event, this);'),o.setAttribute('onblur','Highlighting.onTextBlur(this);'),o.setAttribute('onkeyup','Highlighting.onTextKeyup(this);')),byId('siac-pdf-overflow').append(o),o}};if(window.Highlighting=p,window.tomato={remainingSeconds:1800,readingTimer:null,lastStart:30},window.pdfDisplayed=null,window.pdfDisplayedViewPort=null,window.pdfPageRendering=!1,window.pdfDisplayedCurrentPage=null,window.pdfDisplayedScale=2,window.pdfHighDPIWasUsed=!1,window.pageNumPending=null,window.latestRenderTimestamp=null,window.pdfTOC=null,window.pagesRead=[],window.pdfExtract=null,window.pdfDisplayedMarks=null,window.pdfDisplayedMarksTable=null,window.pdfLastReadPages={},window.noteLoading=!1,window.pdfLoading=!1,window.modalShown=!1,window.pdfTooltipEnabled=!0,window.iframeIsDisplayed=!1,window.pageSidebarDisplayed=!0,window.pdfFullscreen=!1,window.displayedNoteId=null,window.pdfTextLayerMetaKey=!1,window.bottomBarTabDisplayed='marks',window.pdfNotification={queue:[],current:''},window.textEditor=null,'undefined'==typeof f)var f=window;window.activeCanvas=function(){let e=byId('siac-pdf-canvas');return e?'none'===e.style.display?byId('siac-pdf-canvas_1'):e:null},window.checkTOC=function(){if(!pdfDisplayed)return;let e=pdfDisplayed;e.getOutline().then(function(t){if(!t||0===t.length)return Promise.reject();let i=t[0].dest;Array.isArray(i)?e.getPageIndex(i[0]).catch((t)=>(console.log(t),Promise.reject())).then(function(e){e&&(byId('siac-toc-btn').style.display='block')}):e.getDestination(i).then(function(e){if(!e)return null;const t=e[0];return t}).then(e.getPageIndex.bind(e)).then(function(e){e&&(byId('siac-toc-btn').style.display='block')})})},window.loadTOC=function(){if(!pdfDisplayed)return;let e=pdfDisplayed;window.pdfTOC=[],e.getOutline().then(function(t){if(console.log(t),t){let a=[];for(let n,s=0;s<t.length;s++){n=t[s].dest;const i=t[s].title;Array.isArray(n)?a.push(e.getPageIndex(n).catch((t)=>(console.log(t),Promise.resolve())).then(function(e){if(e)return window.pdfTOC.push({title:i,page:parseInt(e)+1}),Promise.resolve()})):a.push(e.getDestination(n).then(function(e){if(!e)return null;const t=e[0];return t}).then(e.getPageIndex.bind(e)).then(function(e){return window.pdfTOC.push({title:i,page:parseInt(e)+1}),Promise.resolve()}))}return Promise.all(a)}}).then(function(){let e='';if(pdfTOC&&pdfTOC.length){for(var t=0;t<pdfTOC.length;t++)e+=`<div class='siac-toc-item blue-hover' onclick='pdfGotoPg(${pdfTOC[t].page})'>${pdfTOC[t].page}: ${pdfTOC[t].title}</div>`;e=`<div style='text-align: center; margin-bottom: 5px;'><b style='font-size: 15px;'>Table of Contents</b></div><div style='overflow: auto; color: lightgrey;'>${e}</div>`}byId('siac-toc').innerHTML=e})},window.tocBtnClicked=function(){noteLoading||pdfLoading||($('#siac-toc').is(':visible')?byId('siac-toc').style.display='none':(byId('siac-toc').style.display='flex',loadTOC()))},window.pdfFitToPage=function(){iframeIsDisplayed||rerenderPDFPage(pdfDisplayedCurrentPage,!1,!0,!1,'',!1)},window.queueRenderPage=function(e,t=!0,i=!1,a=!1,n='',s=!0){pdfPageRendering?pageNumPending=e:rerenderPDFPage(e,t,i,a,n,s)},window.rerenderPDFPage=function(e,t=!0,i=!1,a=!1,n='',s=!0){!pdfDisplayed||iframeIsDisplayed||(byId('siac-pdf-tooltip').style.display='none',byId('siac-pdf-page-lbl').innerHTML=`${pdfDisplayedCurrentPage} / ${pdfDisplayed.numPages}`,pdfLoading=!0,a&&pdfLoaderText('Initializing Reader...'),pdfDisplayed.getPage(e).then(function(d){pdfPageRendering=!0;var o=new Date().getTime();latestRenderTimestamp=o;var l=pdf_canvas_0;if('none'!==l.style.display&&(l=pdf_canvas_1),i){var r=d.getViewport({scale:1});pdfDisplayedScale=(l.parentNode.clientWidth-23)/r.width}var r=d.getViewport({scale:pdfDisplayedScale});l.height=r.height*window.devicePixelRatio,l.width=r.width*window.devicePixelRatio,(1!==window.devicePixelRatio||pdfHighDPIWasUsed)&&(pdfHighDPIWasUsed=!0,l.style.height=r.height+'px',l.style.width=r.width+'px');var c=l.getContext('2d'),f=d.render({canvasContext:c,viewport:r,transform:1===window.devicePixelRatio?null:[window.devicePixelRatio,0,0,window.devicePixelRatio,0,0]});return null===pageNumPending?void f.promise.then(function(){return(pdfPageRendering=!1,null!==pageNumPending)?(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,Promise.reject()):(t&&(l.parentElement.scrollTop=0),'siac-pdf-canvas'===l.id?pdf_canvas_1.style.display='none':pdf_canvas_0.style.display='none',l.style.display='inline-block',p._removeAllHighlights(),s&&updatePdfDisplayedMarks(!0),-1!==['Sand','Peach','Night','X1','X2','Mud','Coral','Moss'].indexOf(pdfColorMode)&&invertCanvas(c),d.getTextContent({normalizeWhitespace:!1,disableCombineTextItems:!1}))}).catch(function(){return Promise.reject()}).then(function(d){return!d||pdfPageRendering?Promise.reject():pageNumPending?(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,null):void($('#text-layer').css({height:l.height/window.devicePixelRatio,width:l.width/window.devicePixelRatio+1,left:l.offsetLeft}).html(''),pdfjsLib.renderTextLayer({textContent:d,container:byId('text-layer'),viewport:r,textDivs:[]}),n?highlightPDFText(n):resetSearch(),pdfLoading=!1,(a||n)&&ungreyoutBottom(),a&&$('#siac-pdf-loader-wrapper').remove(),pdfDisplayedViewPort=r,s?(p.current=[],pycmd('siac-pdf-page-loaded '+pdfDisplayedCurrentPage)):p.displayHighlights(),!pageNumPending&&!pdfPageRendering&&(-1===pagesRead.indexOf(e)?(byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book"></i>&nbsp; Read'):(byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book"></i>&nbsp; Unread'),s&&pdfExtract&&(pdfExtract[0]>pdfDisplayedCurrentPage||pdfExtract[1]<pdfDisplayedCurrentPage?$('#siac-pdf-top').addClass('extract'):$('#siac-pdf-top').removeClass('extract')),s&&pageSidebarDisplayed&&pycmd(`siac-linked-to-page ${pdfDisplayedCurrentPage} ${pdfDisplayed.numPages}`),setLastReadPage()))}):(rerenderPDFPage(pageNumPending,t,i,a,n,s),pageNumPending=null,Promise.reject())}).catch(function(e){setTimeout(function(){console.log(e)})}))},window.pdfPageRight=function(){!pdfDisplayed||iframeIsDisplayed||pdfDisplayedCurrentPage<pdfDisplayed.numPages&&(pdfDisplayedCurrentPage++,queueRenderPage(pdfDisplayedCurrentPage))},window.pdfPageLeft=function(){!pdfDisplayed||iframeIsDisplayed||1<pdfDisplayedCurrentPage&&(pdfDisplayedCurrentPage--,queueRenderPage(pdfDisplayedCurrentPage))},window.togglePageRead=function(e){!pdfDisplayed||pdfExtract&&(pdfDisplayedCurrentPage<pdfExtract[0]||pdfDisplayedCurrentPage>pdfExtract[1])||(!e&&(e=displayedNoteId),-1===pagesRead.indexOf(pdfDisplayedCurrentPage)?(byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book" aria-hidden="true"></i>&nbsp; Unread',pycmd('siac-pdf-page-read '+e+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.length?pagesRead.push(pdfDisplayedCurrentPage):pagesRead=[pdfDisplayedCurrentPage]):(byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='<i class="fa fa-book" aria-hidden="true"></i>&nbsp; Read',pycmd('siac-pdf-page-unread '+e+' '+pdfDisplayedCurrentPage+' '+numPagesExtract()),pagesRead.splice(pagesRead.indexOf(pdfDisplayedCurrentPage),1)),updatePdfProgressBar())},window.pdfHidePageReadMark=function(){byId('siac-pdf-overlay').style.display='none',byId('siac-pdf-read-btn').innerHTML='\u2713&nbsp; Read'},window.pdfShowPageReadMark=function(){byId('siac-pdf-overlay').style.display='block',byId('siac-pdf-read-btn').innerHTML='&times; Unread'},window.pdfJumpToPage=function(t,e){if(13!==t.keyCode)return;let i=e.value;i=n(pdfDisplayed.numPages,i),pdfDisplayedCurrentPage=i,queueRenderPage(pdfDisplayedCurrentPage)},window.pdfScaleChange=function(e){'up'===e?pdfDisplayedScale+=.1:(pdfDisplayedScale-=.1,pdfDisplayedScale=d(.1,pdfDisplayedScale)),queueRenderPage(pdfDisplayedCurrentPage,!1,!1,!1,'',!1)},window.setAllPagesRead=function(){if(!pdfExtract)pagesRead=Array.from(Array(pdfDisplayed.numPages).keys()).map((e)=>++e);else{pagesRead=[];for(var e=pdfExtract[0];e<=pdfExtract[1];e++)pagesRead.push(e)}-1!==pagesRead.indexOf(pdfDisplayedCurrentPage)&&pdfShowPageReadMark()},window.setLastReadPage=function(){pdfLastReadPages[displayedNoteId]=pdfDisplayedCurrentPage},window.getLastReadPage=function(){return displayedNoteId&&displayedNoteId in pdfLastReadPages?pdfLastReadPages[displayedNoteId]:null},window.updatePdfProgressBar=function(){let e=a(10*pagesRead.length/numPagesExtract()),t=`<span style='margin-right: 10px; display: inline-block; min-width: 35px; font-weight: bold; color: lightgrey;'>${Math.trunc(100*pagesRead.length/numPagesExtract())} %</span>`;for(var i=0;10>i;i++)t+=i<e?`<div class='siac-prog-sq-filled'></div>`:`<div class='siac-prog-sq'></div>`;byId('siac-prog-bar-wr').innerHTML=t,'pages'===bottomBarTabDisplayed&&pycmd(`siac-pdf-show-bottom-tab ${displayedNoteId} pages`)},window.numPagesExtract=function(){return pdfExtract?pdfExtract[1]-pdfExtract[0]+1:pdfDisplayed.numPages},window.markReadUpToCurrent=function(){for(var e=0;e<pdfDisplayedCurrentPage;e++)-1===pagesRead.indexOf(e+1)&&(!pdfExtract||e+1>=pdfExtract[0]&&e+1<=pdfExtract[1])&&pagesRead.push(e+1);-1!==pagesRead.indexOf(pdfDisplayedCurrentPage)&&pdfShowPageReadMark()},window._startTimer=function(){tomato.readingTimer&&clearInterval(tomato.readingTimer),tomato.readingTimer=setInterval(function(){if(tomato.remainingSeconds--,$('.siac-reading-modal-timer-lbl').text(a(tomato.remainingSeconds/60)+' : '+(10>tomato.remainingSeconds%60?'0'+tomato.remainingSeconds%60:tomato.remainingSeconds%60)),0>=tomato.remainingSeconds){clearInterval(tomato.readingTimer),tomato.remainingSeconds=60*tomato.lastStart,$('.siac-timer-play-btn').html('<i class=\'fa fa-play mr-5\'></i>Start').addClass('inactive'),setTimerActive(tomato.lastStart);let e=tomato.remainingSeconds;$('.siac-reading-modal-timer-lbl').text(a(e/60)+' : '+(10>e%60?'0'+e%60:e%60)),pycmd('siac-timer-elapsed '+$('#siac-reading-modal-top-bar').data('nid')),tomato.readingTimer=null}},999)},window.toggleTimer=function(){$('.siac-timer-play-btn').first().hasClass('inactive')?($('.siac-timer-play-btn').removeClass('inactive'),$('.siac-timer-play-btn').html('<i class=\'fa fa-pause mr-5\'></i>Pause'),_startTimer()):(clearInterval(tomato.readingTimer),tomato.readingTimer=null,$('.siac-timer-play-btn').addClass('inactive'),$('.siac-timer-play-btn').html('<i class=\'fa fa-play mr-5\'></i>Start'))},window.resetTimer=function(e){clearInterval(tomato.readingTimer),tomato.readingTimer=null,$('.siac-timer-btn').removeClass('active');let t=+e.innerHTML;$('.siac-timer-btn.'+t).addClass('active'),tomato.remainingSeconds=60*t,tomato.lastStart=t;let i=tomato.remainingSeconds;$('.siac-reading-modal-timer-lbl').text(a(i/60)+' : '+(10>i%60?'0'+i%60:i%60)),$('.siac-timer-play-btn').addClass('inactive').html('<i class=\'fa fa-play mr-5\'></i>Start')},window.startTimer=function(e){resetTimer($('.siac-timer-btn.'+e).get(0)),$('.siac-timer-play-btn').first().trigger('click')},window.setTimerActive=function(e){$('.siac-timer-btn').removeClass('active'),$('.siac-timer-btn.'+e).addClass('active')},window.escapeRegExp=function(e){return e.replace(/[.*+?^${}()|[\]\\]/g,'\\$&')},window.readerNotification=function(e,t){if(e){if(!t&&''!=pdfNotification.current){if(0<pdfNotification.queue.length){if(e===pdfNotification.queue[pdfNotification.queue.length-1])return;}else if(pdfNotification.current===e)return;return void pdfNotification.queue.push(e)}pdfNotification.current=e,byId('siac-pdf-br-notify').innerHTML=e,byId('siac-pdf-br-notify').style.display='block',window.setTimeout(()=>{pdfNotification.current='',byId('siac-pdf-br-notify')?(byId('siac-pdf-br-notify').style.display='none',pdfNotification.queue.length&&setTimeout(function(){let e=pdfNotification.queue.shift();readerNotification(e,!0)},800)):pdfNotification.queue=[]},3500)}},window.swapReadingModal=function(){let e=byId('siac-reading-modal');'siac-right-side'===e.parentNode.id?byId('leftSide').appendChild(e):byId('siac-right-side').appendChild(e)},window.updatePdfDisplayedMarks=function(e){if(null!=pdfDisplayedMarks){if(e){let e='';if($('.siac-mark-btn-inner').removeClass('active'),pdfDisplayedCurrentPage in pdfDisplayedMarks)for(var t=0;t<pdfDisplayedMarks[pdfDisplayedCurrentPage].length;t++)switch(pdfDisplayedMarks[pdfDisplayedCurrentPage][t]){case 1:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Revisit &nbsp;<b onclick=\'$(".siac-mark-btn-inner-1").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-1').first().addClass('active');break;case 2:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Hard &nbsp;<b onclick=\'$(".siac-mark-btn-inner-2").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-2').first().addClass('active');break;case 3:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; More Info &nbsp;<b onclick=\'$(".siac-mark-btn-inner-3").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-3').first().addClass('active');break;case 4:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; More Cards &nbsp;<b onclick=\'$(".siac-mark-btn-inner-4").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-4').first().addClass('active');break;case 5:e+='<div class=\'siac-pdf-mark-lbl\'><i class=\'fa fa-star\'></i>&nbsp; Bookmark &nbsp;<b onclick=\'$(".siac-mark-btn-inner-5").trigger("click");\'>&times</b></div>',$('.siac-mark-btn-inner-5').first().addClass('active');}byId('siac-pdf-overlay-top-lbl-wrap')&&(byId('siac-pdf-overlay-top-lbl-wrap').innerHTML=e)}let i=byId('siac-queue-readings-list').offsetWidth,n=byId('siac-queue-actions').offsetWidth,s=byId('siac-reading-modal-bottom-bar').clientWidth-i-n-100;var a='';Object.keys(pdfDisplayedMarksTable).forEach(function(e){let t='';'1'===e?t='Revisit':'2'===e?t='Hard':'3'===e?t='More Info':'4'===e?t='More Cards':'5'===e?t='Bookmark':void 0;let n='';for(var s=0;s<pdfDisplayedMarksTable[e].length;s++)n+='<span class=\'siac-page-mark-link\'>'+pdfDisplayedMarksTable[e][s]+'</span>, ';n=0<n.length?n.substring(0,n.length-2):n,a+=`<tr style='color: grey;'><td><b>${t}</b></td><td>${n}</td></tr>`}),a.length&&(a=`<table style='user-select: none; table-layout: fixed; max-width: ${s}px;'>`+a+'</table>'),byId('siac-marks-display')&&(a.length?byId('siac-marks-display').innerHTML=a:byId('siac-marks-display').innerHTML=`<div style='display: flex; flex-direction: column; justify-content: center; height: 80px; width: 135px; text-align: center; color: grey;'>
                     <div class='siac-caps'><i class="fa fa-star-o"></i>&nbsp; No marks</div>
                 </div>`),onMarkBtnClicked(byId('siac-mark-jump-btn'))}},window.doneShortcut=function(){pdfLoading||noteLoading||modalShown||!document.body.classList.contains('siac-reading-modal-displayed')||$('#siac-first-in-queue-btn').trigger('click')},window.laterShortcut=function(){pdfLoading||noteLoading||modalShown||!document.body.classList.contains('siac-reading-modal-displayed')||!byId('siac-later-btn')||$('#siac-later-btn').trigger('click')},window.jumpLastPageShortcut=function(){pdfLoading||noteLoading||modalShown||!pdfDisplayed||(pdfDisplayedCurrentPage=pdfDisplayed.numPages,queueRenderPage(pdfDisplayedCurrentPage,!0))},window.jumpFirstPageShortcut=function(){pdfLoading||noteLoading||modalShown||!pdfDisplayed||(pdfDisplayedCurrentPage=1,queueRenderPage(1,!0))},window.pdfGotoPg=function(e){pdfLoading||noteLoading||modalShown||!pdfDisplayed||(pdfDisplayedCurrentPage=e,queueRenderPage(e,!0))},window.togglePDFSelect=function(e){e||(e=byId('siac-pdf-tooltip-toggle')),e&&(pdfTooltipEnabled=!pdfTooltipEnabled,pdfTooltipEnabled?($(e).addClass('active'),readerNotification('Search on select enabled.',!0)):($(e).removeClass('active'),$('#siac-pdf-tooltip').hide(),readerNotification('Search on select disabled.',!0)))},window.onMarkBtnClicked=function(e){$(e).hasClass('expanded')&&(pdfDisplayedMarks&&0<Object.keys(pdfDisplayedMarks).length?byId('siac-mark-jump-btn-inner').innerHTML='<b onclick=\'event.stopPropagation(); jumpToNextMark();\' style=\'vertical-align: middle;\'>Jump to Next Mark</b>':byId('siac-mark-jump-btn-inner').innerHTML='<b style=\'vertical-align:middle; color: grey;\'>No Marks in PDF</b>')},window.jumpToNextMark=function(){if(pdfDisplayed){let t=Object.keys(pdfDisplayedMarks);for(var e=0;e<t.length;e++)if(+t[e]>pdfDisplayedCurrentPage)return pdfDisplayedCurrentPage=+t[e],void queueRenderPage(pdfDisplayedCurrentPage,!0,!1,!1);pdfDisplayedCurrentPage=+t[0],queueRenderPage(pdfDisplayedCurrentPage,!0,!1,!1)}},window.bringPDFIntoView=function(){($('#siac-right-side').hasClass('addon-hidden')||$('#switchBtn').is(':visible'))&&toggleAddon()},window.beforeNoteQuickOpen=function(){return!(noteLoading||pdfLoading||modalShown)&&(pdfDisplayed&&(noteLoading=!0,greyoutBottom(),destroyPDF()),bringPDFIntoView(),!0)},window.centerTooltip=function(){let e=$('#siac-pdf-top').width(),t=$('#siac-pdf-top').height(),i=$('#siac-pdf-tooltip');byId('siac-pdf-tooltip-results-area').style.removeProperty('max-height'),byId('siac-pdf-tooltip').style.removeProperty('max-width'),i.css({top:t/2-i.height()/2,left:e/2-i.width()/2})},window.destroyPDF=function(){pdfDisplayed&&pdfDisplayed.destroy(),pdfDisplayed=null},window.pdfUrlSearch=function(e){if(!e.length)return;let t='';$('#siac-iframe-btn tr').each(function(){$(this.children[1].children[0]).is(':checked')&&(t=$(this.children[1].children[0]).data('url'))}),pycmd('siac-url-srch $$$'+e+'$$$'+t),$('#siac-iframe-btn').removeClass('expanded')},window.showQueueInfobox=function(e,t){pdfLoading||noteLoading||modalShown||(pycmd('siac-queue-info '+t),document.documentElement.style.setProperty('--ttop',e.offsetTop+'px'),pdfLoading||noteLoading||modalShown)},window.leaveQueueItem=function(){window.setTimeout(function(){$('#siac-queue-infobox').is(':hover')||$('#siac-queue-readings-list .siac-link-btn:hover').length||hideQueueInfobox()},400)},window.hideQueueInfobox=function(){byId('siac-queue-infobox')&&(byId('siac-queue-infobox').style.display='none',byId('siac-pdf-bottom-tabs').style.visibility='visible')},window.greyoutBottom=function(){$('#siac-reading-modal-bottom-bar .siac-link-btn,#siac-reading-modal-bottom-bar .fa,.siac-bb-btn,.siac-prio-lbl,.siac-queue-btn,#siac-reading-modal-bottom-bar .blue-hover, .siac-page-mark-link,.siac-sched-icn').addClass('siac-disabled')},window.ungreyoutBottom=function(){$('#siac-reading-modal-bottom-bar .siac-link-btn,#siac-reading-modal-bottom-bar .fa,.siac-bb-btn,.siac-prio-lbl,.siac-queue-btn, #siac-reading-modal-bottom-bar .blue-hover, .siac-page-mark-link,.siac-sched-icn').removeClass('siac-disabled')},window.unhideQueue=function(e){pdfLoading||noteLoading||modalShown||pycmd('siac-unhide-pdf-queue '+e)},window.hideQueue=function(e){pdfLoading||noteLoading||modalShown||pycmd('siac-hide-pdf-queue '+e)},window.toggleBottomBar=function(){byId('siac-reading-modal-bottom-bar').classList.contains('bottom-hidden')?(byId('siac-reading-modal-bottom-bar').classList.remove('bottom-hidden'),pycmd('siac-config-bool notes.queue.hide_bottom_bar false')):(byId('siac-reading-modal-bottom-bar').classList.add('bottom-hidden'),pycmd('siac-config-bool notes.queue.hide_bottom_bar true'))},window.toggleTopBar=function(){byId('siac-reading-modal-top-bar').classList.contains('top-hidden')?(byId('siac-reading-modal-top-bar').classList.remove('top-hidden'),byId('siac-reading-modal-top-btns').classList.remove('top-hidden'),pycmd('siac-config-bool notes.queue.hide_top_bar false')):(byId('siac-reading-modal-top-bar').classList.add('top-hidden'),byId('siac-reading-modal-top-btns').classList.add('top-hidden'),pycmd('siac-config-bool notes.queue.hide_top_bar true'))},window.hideBothBars=function(){byId('siac-reading-modal-top-bar').classList.add('top-hidden'),byId('siac-reading-modal-top-btns').classList.add('top-hidden'),byId('siac-reading-modal-bottom-bar').classList.add('bottom-hidden'),pycmd('siac-config-bool notes.queue.hide_top_bar true'),pycmd('siac-config-bool notes.queue.hide_bottom_bar true')},window.toggleBothBars=function(){byId('siac-reading-modal-bottom-bar').classList.contains('bottom-hidden')?(byId('siac-reading-modal-bottom-bar').classList.remove('bottom-hidden'),byId('siac-reading-modal-top-bar').classList.remove('top-hidden'),byId('siac-reading-modal-top-btns').classList.remove('top-hidden'),pycmd('siac-config-bool notes.queue.hide_bottom_bar false'),pycmd('siac-config-bool notes.queue.hide_top_bar false')):(byId('siac-reading-modal-bottom-bar').classList.add('bottom-hidden'),byId('siac-reading-modal-top-bar').classList.add('top-hidden'),byId('siac-reading-modal-top-btns').classList.add('top-hidden'),pycmd('siac-config-bool notes.queue.hide_bottom_bar true'),pycmd('siac-config-bool notes.queue.hide_top_bar true'))},window.bothBarsAreHidden=function(){return byId('siac-reading-modal-top-bar').classList.contains('top-hidden')&&byId('siac-reading-modal-bottom-bar').classList.contains('bottom-hidden')},window.toggleReadingModalFullscreen=function(){pdfFullscreen=!pdfFullscreen,pdfFullscreen?($(document.body).removeClass('siac-fullscreen-show-fields').addClass('siac-fullscreen-show-right'),pdfDisplayed&&pdfFitToPage(),hideBothBars(),pycmd('siac-notification Press toggle shortcut (default Ctrl+F) to switch.')):($(document.body).removeClass('siac-fullscreen-show-fields').removeClass('siac-fullscreen-show-right'),$('#switchBtn').is(':visible')&&$('#outerWr').addClass('onesided'),onWindowResize(),pdfDisplayed&&pdfFitToPage())},window.activateReadingModalFullscreen=function(){pdfFullscreen=!1,toggleReadingModalFullscreen()},window.onReadingModalClose=function(){if(!pdfLoading){if(displayedNoteId=null,$(document.body).removeClass('siac-fullscreen-show-fields').removeClass('siac-fullscreen-show-right').removeClass('siac-reading-modal-displayed'),$('#siac-left-tab-browse,#siac-left-tab-pdfs,#siac-reading-modal-tabs-left').remove(),$('#fields').show(),$('#siac-reading-modal').hide(),byId('resultsArea').style.display='block',byId('bottomContainer').style.display='block',byId('topContainer').style.display='flex',destroyPDF(),siacYt.player)try{siacYt.player.destroy()}catch(t){}byId('siac-reading-modal-center').innerHTML='',onWindowResize(),window.$fields=$('.field'),siacState.searchOnTyping&&setSearchOnTyping(!0,!1),pycmd('siac-on-reading-modal-close')}},window.modalTabsLeftClicked=function(e,t){$('#siac-reading-modal-tabs-left .siac-btn').removeClass('active'),$(t).addClass('active'),pycmd('siac-reading-modal-tabs-left-'+e)},window.setPdfTheme=function(e){let t=byId('siac-pdf-css');t.href=t.href.substring(0,t.href.lastIndexOf('/')+1)+e,pycmd('siac-eval update_config(\'pdf.theme\', \''+e+'\')')},window.schedChange=function(e){byId('siac-sched-prio-val').innerHTML=prioVerbose(e.value)},window.prioVerbose=function(e){return 85<=e?`Very high (<b>${e}</b>)`:70<=e?`High (<b>${e}</b>)`:30<=e?`Medium (<b>${e}</b>)`:15<=e?`Low (<b>${e}</b>)`:1<=e?`Very low (<b>${e}</b>)`:'Remove from Queue (<b>0</b>)'},window.scheduleDialogQuickAction=function(){let e=$('input[name=sched]:checked').data('pycmd');pycmd(`siac-eval index.ui.reading_modal.schedule_note(${e})`)},window.removeDialogOk=function(e){'1'==$('input[name=del]:checked').data('pycmd')?pycmd('siac-remove-from-queue '+e):pycmd('siac-delete-current-user-note '+e),modalShown=!1,$('#siac-rm-greyout').hide(),$('#siac-schedule-dialog').hide()},window.updateSchedule=function(){let e=$('input[name=sched]:checked').data('pycmd');if('4'==e){let e=byId('siac-sched-td-inp').value;if(!e)return void pycmd('siac-notification Value is empty!');pycmd('siac-update-schedule td '+e)}else if('5'==e){let e='';if($('#siac-sched-wd input').each(function(t){$(this).is(':checked')&&(e+=(t+1).toString())}),!e.length)return void pycmd('siac-notification Value is empty!');pycmd('siac-update-schedule wd '+e)}else{let e=byId('siac-sched-id-inp').value;if(!e)return void pycmd('siac-notification Value is empty!');pycmd('siac-update-schedule id '+e)}},window.togglePageSidebar=function(e=!0){pageSidebarDisplayed=!pageSidebarDisplayed,pageSidebarDisplayed?($('#siac-reading-modal-center').addClass('siac-page-sidebar'),e&&pycmd(`siac-linked-to-page ${pdfDisplayedCurrentPage} ${pdfDisplayed.numPages}`)):$('#siac-reading-modal-center').removeClass('siac-page-sidebar'),e&&(pdfFitToPage(),pycmd('siac-config-bool pdf.page_sidebar_shown '+pageSidebarDisplayed))},window.updatePageSidebarIfShown=function(){pdfDisplayed&&pageSidebarDisplayed&&pycmd(`siac-linked-to-page ${pdfDisplayedCurrentPage} ${pdfDisplayed.numPages}`)},window.modalBgUpdate=function(){$('#siac-modal-bg-update .siac-link-btn').addClass('siac-disabled'),setTimeout(function(){$('#siac-modal-bg-update .siac-link-btn').removeClass('siac-disabled')},1200)},window.windowHasSelection=function(){return window.getSelection().toString().length},window.pdfLoaderText=function(e){try{byId('siac-pdf-loader-text').innerHTML=e}catch(t){}};var g=i(5),h=i(6),u=i(7),m=i(8),y=i(9)}]));
\ No newline at end of file
@@ -20,7 +20,8 @@ window.siacState = {
     isFrozen : false,
     searchOnSelection : true,
     searchOnTyping : true,
-    keepPositionAtRendering: false
+    keepPositionAtRendering: false,
+    resultWindow: null
 };
 
 window.lastHadResults = false;
@@ -515,8 +516,9 @@ window.clearSearchResults = function() {
         byId("greyout").style.display = "none";
     } catch(e) {}
 
-    $('.siac-tag-info-box,#siac-results-loader-wrapper').remove();
+    $('.siac-tag-info-box,#siac-results-loader-wrapper,#siac-results-spacer').remove();
     $('.tagLbl').css("z-index", "999");
+    siacState.resultWindow = null;
 }
 
 window.setSearchResults = function(html, infoStr, infoMap, page = 1, pageMax = 1, total = 50, cacheSize = -1, stamp = -1, printTiming = false, isRerender= false) {
@@ -526,7 +528,179 @@ window.setSearchResults = function(html, infoStr, infoMap, page = 1, pageMax = 1
     sr.style.overflowY = 'hidden';
     sr.style.paddingRight = '24px';
     sr.innerHTML += html;
-    if (!isRerender && !siacState.keepPositionAtRendering && html.length > 0) {
+    finishSearchResults(rStart, html.length > 0, infoStr, infoMap, page, pageMax, total, cacheSize, stamp, printTiming, isRerender);
+}
+
+/**
+ * Rendered cards, key is "nid|hash", value is the .cardWrapper element (attached or not).
+ * Python assumes at most half of this size to be cached, so a card it doesn't send html for should always be here.
+ */
+window.siacCardCache = new Map();
+window.SIAC_CARD_CACHE_SIZE = 400;
+
+/**
+ * Like setSearchResults, but takes a list of {nid, hash, counter, html?}.
+ * Cards without html are taken from siacCardCache and only get their counter updated, 
+ * so unchanged cards are neither rebuilt in Python nor parsed again here.
+ * Returns false if cards were missing and a full render has been requested instead.
+ */
+window.patchSearchResults = function(cards, infoStr, infoMap, page = 1, pageMax = 1, total = 50, cacheSize = -1, stamp = -1, printTiming = false, isRerender= false) {
+    let rStart = new Date().getTime();
+    let wrappers = buildCardElements(cards);
+    if (wrappers === null) {
+        return false;
+    }
+    clearSearchResults();
+    var sr = byId("searchResults");
+    sr.style.overflowY = 'hidden';
+    sr.style.paddingRight = '24px';
+    let frag = document.createDocumentFragment();
+    for (var i = 0; i < wrappers.length; i++) {
+        frag.appendChild(wrappers[i]);
+    }
+    sr.appendChild(frag);
+    finishSearchResults(rStart, cards.length > 0, infoStr, infoMap, page, pageMax, total, cacheSize, stamp, printTiming, isRerender);
+    return true;
+}
+/**
+ * Returns the .cardWrapper elements for the given cards, or null if a card is missing in the cache.
+ * A cached element can only be at one position, so if it is already used in this batch (or, with keepAttached, 
+ * is still displayed somewhere else), a copy is used instead of moving it.
+ */
+window.buildCardElements = function(cards, keepAttached = false) {
+    let wrappers = [];
+    let used = new Set();
+    for (var i = 0; i < cards.length; i++) {
+        let card = cards[i];
+        let key = card.nid + "|" + card.hash;
+        let el = siacCardCache.get(key);
+        if (typeof card.html === "string") {
+            let tpl = document.createElement("template");
+            tpl.innerHTML = card.html;
+            el = tpl.content.firstElementChild;
+        } else if (!el || el.classList.contains("pinned")) {
+            // cache is out of sync with what Python assumes, so render all cards again
+            pycmd("siac-rerender-full");
+            return null;
+        } else if (used.has(el) || (keepAttached && el.isConnected)) {
+            wrappers.push(el.cloneNode(true));
+            setCardCounter(wrappers[wrappers.length - 1], card.nid, card.counter);
+            continue;
+        } else {
+            setCardCounter(el, card.nid, card.counter);
+        }
+        used.add(el);
+        // re-insert to keep the map in lru order
+        siacCardCache.delete(key);
+        siacCardCache.set(key, el);
+        wrappers.push(el);
+    }
+    while (siacCardCache.size > SIAC_CARD_CACHE_SIZE) {
+        siacCardCache.delete(siacCardCache.keys().next().value);
+    }
+    return wrappers;
+}
+
+/**
+ * Virtual scrolling over the whole result list (results.virtualScrolling).
+ * Only a window of at most SIAC_WINDOW_MAX_CARDS cards is in the DOM, cards above it are replaced by a spacer of the same height.
+ * When the user scrolls within two screen heights of either end of the window, the next batch is requested from Python.
+ */
+window.SIAC_WINDOW_MAX_CARDS = 150;
+
+window.initResultWindow = function(id, total, loaded, batchSize) {
+    let sr = byId("searchResults");
+    let first = sr.querySelector(".cardWrapper:not(.pinned)");
+    if (!first) {
+        return;
+    }
+    let spacer = document.createElement("div");
+    spacer.id = "siac-results-spacer";
+    spacer.style.height = "0px";
+    sr.insertBefore(spacer, first);
+    siacState.resultWindow = { id: id, total: total, start: 0, end: loaded, batchSize: batchSize, loading: false };
+    sr.onscroll = checkResultWindow;
+    checkResultWindow();
+}
+window.checkResultWindow = function() {
+    let w = siacState.resultWindow;
+    if (!w || w.loading) {
+        return;
+    }
+    let sr = byId("searchResults");
+    let spacer = byId("siac-results-spacer");
+    let margin = sr.clientHeight * 2;
+    if (w.end < w.total && sr.scrollTop + sr.clientHeight > sr.scrollHeight - margin) {
+        w.loading = true;
+        pycmd(`siac-results-window ${w.id} ${w.end}`);
+    } else if (w.start > 0 && spacer && sr.scrollTop < spacer.offsetTop + spacer.offsetHeight + margin) {
+        w.loading = true;
+        pycmd(`siac-results-window ${w.id} ${Math.max(0, w.start - w.batchSize)}`);
+    }
+}
+window.insertResultWindow = function(id, start, cards) {
+    let w = siacState.resultWindow;
+    if (!w || w.id !== id) {
+        return;
+    }
+    w.loading = false;
+    let wrappers = buildCardElements(cards, true);
+    if (wrappers === null || wrappers.length === 0) {
+        return;
+    }
+    let sr = byId("searchResults");
+    let spacer = byId("siac-results-spacer");
+    let display = gridView ? "inline-block" : "block";
+    let frag = document.createDocumentFragment();
+    for (var i = 0; i < wrappers.length; i++) {
+        wrappers[i].style.display = display;
+        frag.appendChild(wrappers[i]);
+    }
+    let inDom = () => sr.querySelectorAll(".cardWrapper:not(.pinned)");
+
+    if (start === w.end) {
+        sr.appendChild(frag);
+        w.end += wrappers.length;
+        // drop cards from the top, grow the spacer by the height they took up
+        let current = inDom();
+        if (current.length > SIAC_WINDOW_MAX_CARDS) {
+            let drop = current.length - SIAC_WINDOW_MAX_CARDS;
+            let firstKept = current[drop];
+            let topBefore = firstKept.offsetTop;
+            for (var i = 0; i < drop; i++) {
+                current[i].remove();
+            }
+            spacer.style.height = (spacer.offsetHeight + topBefore - firstKept.offsetTop) + "px";
+            w.start += drop;
+        }
+    } else if (start + wrappers.length === w.start) {
+        let firstOld = inDom()[0];
+        let topBefore = firstOld.offsetTop;
+        sr.insertBefore(frag, firstOld);
+        spacer.style.height = Math.max(0, spacer.offsetHeight - (firstOld.offsetTop - topBefore)) + "px";
+        w.start = start;
+        if (w.start === 0) {
+            spacer.style.height = "0px";
+        }
+        // drop cards from the bottom, nothing to compensate there
+        let current = inDom();
+        for (var i = SIAC_WINDOW_MAX_CARDS; i < current.length; i++) {
+            current[i].remove();
+            w.end--;
+        }
+    }
+    checkResultWindow();
+}
+window.setCardCounter = function(el, nid, counter) {
+    el.id = "nWr-" + counter;
+    let lbl = el.querySelector("#cW-" + nid);
+    if (lbl && lbl.firstChild && lbl.firstChild.nodeType === Node.TEXT_NODE) {
+        lbl.firstChild.nodeValue = lbl.firstChild.nodeValue.replace(/^\d+/, counter);
+    }
+}
+window.finishSearchResults = function(rStart, hasResults, infoStr, infoMap, page, pageMax, total, cacheSize, stamp, printTiming, isRerender) {
+    var sr = byId("searchResults");
+    if (!isRerender && !siacState.keepPositionAtRendering && hasResults) {
         sr.scrollTop = 0;
     } else if (siacState.keepPositionAtRendering) {
         siacState.keepPositionAtRendering = false;
@@ -556,7 +730,7 @@ window.setSearchResults = function(html, infoStr, infoMap, page = 1, pageMax = 1
         sr.style.overflowY = 'auto';
         sr.style.paddingRight = '10px';
         byId("greyout").style.display = "none";
-        displayPagination(page, pageMax, total, html.length > 0, cacheSize);
+        displayPagination(page, pageMax, total, hasResults, cacheSize);
 
         if (stamp > -1 && byId("info-took")) {
             if (printTiming) {
@@ -599,7 +773,7 @@ window.setSearchResults = function(html, infoStr, infoMap, page = 1, pageMax = 1
             }, time);
         }
         renderLoop();
-        displayPagination(page, pageMax, total, html.length > 0, cacheSize);
+        displayPagination(page, pageMax, total, hasResults, cacheSize);
     }
 }
 window.displayPagination = function(page, pageMax, total, resultsFound, cacheSize) {